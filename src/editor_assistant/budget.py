@@ -0,0 +1,138 @@
+"""
+Token and cost budget for batch and worker runs (`--max-cost`, `--max-tokens`).
+
+Every LLM request reserves its estimated tokens and cost before it is sent:
+the prompt's token estimate plus the task's expected output
+(Task.expected_output_tokens(), capped at the model's max_tokens), priced
+with the model's pricing. When the response arrives the reservation is
+settled against the actual usage, so the budget tracks what was really
+spent plus what is still in flight.
+
+A request that does not fit in what is left waits while other requests are
+in flight (their settlement may free enough). When nothing is in flight and
+it still does not fit, the budget is exhausted: that request and every later
+one is refused with BudgetExceededError, while requests already sent finish
+normally. Spending can exceed the limit only by the amount that actual usage
+exceeds the estimates.
+
+A Budget is shared by every assistant in one process (a batch, or a worker's
+per-model assistants) and used from one event loop. Costs are in each
+model's pricing currency, so one cost budget should not mix currencies.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+class BudgetExceededError(Exception):
+    """Raised when a request does not fit in what is left of the budget."""
+    pass
+
+
+@dataclass
+class Reservation:
+    """Estimated tokens and cost held for one request in flight."""
+    tokens: int
+    cost: float
+
+
+class Budget:
+    """
+    Admission control for LLM requests against token and cost limits.
+
+    Usage:
+        budget = Budget(max_cost=5.0)
+        reservation = await budget.reserve(tokens=12_000, cost=0.05)
+        try:
+            response, usage = await call_llm()
+        except BaseException:
+            budget.settle(reservation)  # Nothing spent
+            raise
+        budget.settle(reservation, tokens=actual_tokens, cost=actual_cost)
+    """
+
+    def __init__(self, max_cost: Optional[float] = None, max_tokens: Optional[int] = None):
+        """
+        Initialize the budget.
+
+        Args:
+            max_cost: Spending limit in the models' pricing currency (None = no limit)
+            max_tokens: Input plus output token limit (None = no limit)
+        """
+        if (max_cost is not None and max_cost < 0) or (max_tokens is not None and max_tokens < 0):
+            raise ValueError("Budget limits must not be negative")
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.spent_tokens = 0
+        self.spent_cost = 0.0
+        self.reserved_tokens = 0
+        self.reserved_cost = 0.0
+        self.in_flight = 0
+        self.settled = 0
+        self.refused = 0
+        self.exhausted = False
+        self._waiters: List[asyncio.Future] = []
+
+    def _fits(self, tokens: int, cost: float) -> bool:
+        if self.max_tokens is not None and self.spent_tokens + self.reserved_tokens + tokens > self.max_tokens:
+            return False
+        if self.max_cost is not None and self.spent_cost + self.reserved_cost + cost > self.max_cost:
+            return False
+        return True
+
+    async def reserve(self, tokens: int, cost: float) -> Reservation:
+        """
+        Reserve a request's estimated tokens and cost, waiting for requests in
+        flight to settle if it does not fit yet.
+
+        Raises:
+            BudgetExceededError: If the budget is exhausted
+        """
+        while self.exhausted or not self._fits(tokens, cost):
+            if self.exhausted or self.in_flight == 0:
+                self.exhausted = True
+                self.refused += 1
+                raise BudgetExceededError(f"Budget exhausted ({self.describe()})")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.in_flight += 1
+        self.reserved_tokens += tokens
+        self.reserved_cost += cost
+        return Reservation(tokens, cost)
+
+    def settle(self, reservation: Reservation, tokens: int = 0, cost: float = 0.0) -> None:
+        """Replace a reservation with the request's actual usage (none if it failed)."""
+        self.in_flight -= 1
+        self.reserved_tokens -= reservation.tokens
+        self.reserved_cost -= reservation.cost
+        self.spent_tokens += tokens
+        self.spent_cost += cost
+        self.settled += 1
+        # Waiting requests check again
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def remaining(self) -> Dict[str, Any]:
+        """
+        What is left of each limit after actual spending.
+
+        Returns:
+            Dict with cost and tokens (None for a limit that is not set)
+        """
+        return {
+            "cost": None if self.max_cost is None else self.max_cost - self.spent_cost,
+            "tokens": None if self.max_tokens is None else self.max_tokens - self.spent_tokens,
+        }
+
+    def describe(self, currency: str = "") -> str:
+        """One-line spent/limit summary, e.g. 'spent 0.9200 of 1.0000; 41,200 of 50,000 tokens'."""
+        parts = []
+        if self.max_cost is not None:
+            parts.append(f"spent {currency}{self.spent_cost:.4f} of {currency}{self.max_cost:.4f}")
+        if self.max_tokens is not None:
+            parts.append(f"{self.spent_tokens:,} of {self.max_tokens:,} tokens")
+        return "; ".join(parts) or "no limit"
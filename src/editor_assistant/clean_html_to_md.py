@@ -5,8 +5,8 @@ extracting only the main content from a webpage
 and removing all the noise like ads, headers, footers, etc.
 """
 
-import requests
 from .data_models import MDArticle, InputType
+from .fetch_scheduler import get_fetch_scheduler
 from .config.constants import DEFAULT_USER_AGENT, DEBUG_LOGGING_LEVEL
 import logging
 from typing import Optional
@@ -41,8 +41,8 @@ class CleanHTML2Markdown:
         # handle url
         if path.startswith("http"):
             try:
-                response = requests.get(path, headers=HEADERS)
-                response.raise_for_status()
+                # Per-host concurrency cap and delay (raises on HTTP errors)
+                response = get_fetch_scheduler().get(path, headers=HEADERS)
                 return response.text
             except Exception as e:
                 self.logger.error(
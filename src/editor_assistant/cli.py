@@ -6,27 +6,83 @@ Provides a clean, consistent CLI with subcommands for different operations.
 """
 
 import argparse
+import importlib
+import importlib.util
+import inspect
 import sys
-import asyncio
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-# Optional rich import for better UI
-try:
-    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
-
-from .main import EditorAssistant
-from .data_models import ProcessType, Input, InputType
-from .llm_client import LLMClient
-from .md_converter import MarkdownConverter
-from .clean_html_to_md import CleanHTML2Markdown
 from .config.logging_config import progress
-from .storage import RunRepository
+from .scanning import matches, scan_files
+from .scheduling import SCHEDULING_POLICIES, parse_deadline_spec
+from .sharding import parse_shard, select_shard
+from .storage import AsyncRunRepository, FileIndex, JobQueue, RunRepository
+from .storage.export import detect_format as detect_export_format, parse_since, parse_until
+from .config.model_index import get_model_names
+from .config.constants import (
+    CONVERSION_BACKEND,
+    CONVERSION_WORKERS,
+    CONVERSION_TIMEOUT_SECONDS,
+    CONVERSION_WORKER_MAX_RSS_MB,
+    FETCH_MAX_PER_HOST,
+    FETCH_MIN_DELAY_SECONDS,
+    HISTORY_PAGE_SIZE,
+    JOB_MAX_ATTEMPTS,
+    OUTPUT_PREVIEW_CHARS,
+    OUTPUT_RETENTION_DAYS,
+    SCHEDULE_POLICY,
+    WATCH_POLL_INTERVAL_SECONDS,
+    WATCH_SETTLE_SECONDS,
+    WATCH_STATUS_INTERVAL_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from .data_models import Input
+
+# Heavy modules (rich, httpx via EditorAssistant, pydantic models, MarkItDown,
+# the Jinja prompt loader, the LLM YAML config) are imported lazily, so
+# DB-only commands like `history` and `stats` start fast. Names listed here
+# resolve on first use via _lazy() (or module attribute access, which keeps
+# `patch("editor_assistant.cli.<name>")` working in tests).
+_LAZY_IMPORTS = {
+    "EditorAssistant": (".main", "EditorAssistant"),
+    "MarkdownConverter": (".md_converter", "MarkdownConverter"),
+    "CleanHTML2Markdown": (".clean_html_to_md", "CleanHTML2Markdown"),
+    "ProcessType": (".data_models", "ProcessType"),
+    "Input": (".data_models", "Input"),
+    "InputType": (".data_models", "InputType"),
+    "TaskRegistry": (".tasks", "TaskRegistry"),
+    "Progress": ("rich.progress", "Progress"),
+    "SpinnerColumn": ("rich.progress", "SpinnerColumn"),
+    "TextColumn": ("rich.progress", "TextColumn"),
+    "BarColumn": ("rich.progress", "BarColumn"),
+    "TimeRemainingColumn": ("rich.progress", "TimeRemainingColumn"),
+    "Console": ("rich.console", "Console"),
+    "Table": ("rich.table", "Table"),
+    "Panel": ("rich.panel", "Panel"),
+}
+
+# Optional rich dependency for better UI (checked without importing it)
+RICH_AVAILABLE = importlib.util.find_spec("rich") is not None
+
+
+def _lazy(name: str):
+    """Return a lazily imported name, preferring an already bound (or patched) global."""
+    if name in globals():
+        return globals()[name]
+    module_name, attr = _LAZY_IMPORTS[name]
+    module = importlib.import_module(module_name, __package__)
+    value = getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 DEFAULT_MODEL = "glm-4.7-or"
@@ -37,7 +93,7 @@ def add_common_arguments(parser):
     parser.add_argument(
         "--model", 
         default=DEFAULT_MODEL,
-        choices=LLMClient.get_supported_models(),
+        choices=get_model_names(),
         help="Model to use for generation"
     )
     parser.add_argument(
@@ -63,49 +119,222 @@ def add_common_arguments(parser):
         action="store_true",
         help="Persist generated files to disk (default: off; DB always updated)"
     )
+    add_reconvert_argument(parser)
+
+
+def add_scan_arguments(parser):
+    """Add the file selection arguments of folder commands (batch, watch)."""
+    parser.add_argument(
+        "--ext",
+        default=".pdf",
+        help="File extension to filter by (default: .pdf; ignored with --include)"
+    )
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Also scan subfolders"
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Process files matching GLOB (repeatable). A glob with '/' matches the path "
+             "relative to the folder, otherwise the file name (default: *<ext>)"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files (and, without '/', folders) matching GLOB (repeatable)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also process files whose content already has a successful run "
+             "of this task, model and prompt"
+    )
+
+
+def add_conversion_arguments(parser):
+    """Add the document conversion backend arguments."""
+    parser.add_argument(
+        "--convert-backend",
+        choices=["thread", "process"],
+        default=CONVERSION_BACKEND,
+        help=f"Where document conversion runs: 'process' uses a warm worker pool "
+             f"for CPU-bound PDFs (default: {CONVERSION_BACKEND})"
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=CONVERSION_WORKERS,
+        help="Number of conversion worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--convert-timeout",
+        type=float,
+        default=CONVERSION_TIMEOUT_SECONDS,
+        help=f"Per-document conversion timeout in seconds for the process backend "
+             f"(default: {CONVERSION_TIMEOUT_SECONDS})"
+    )
+    parser.add_argument(
+        "--convert-max-rss",
+        type=float,
+        default=CONVERSION_WORKER_MAX_RSS_MB,
+        help=f"Recycle a conversion worker above this RSS in MB "
+             f"(default: {CONVERSION_WORKER_MAX_RSS_MB})"
+    )
+
+
+def add_reconvert_argument(parser):
+    """Add the flag that bypasses articles stored by earlier runs."""
+    parser.add_argument(
+        "--reconvert",
+        action="store_true",
+        help="Fetch and convert sources again instead of loading the markdown stored by earlier runs"
+    )
 
 
 
-def parse_source_spec(spec: str) -> Input:
+def parse_source_spec(spec: str) -> "Input":
     """Parse key=value format into Input object."""
-    if "=" not in spec:
-        raise argparse.ArgumentTypeError("Sources must be in format 'type=path' (e.g., paper=file.pdf, news=url.com)")
+    from .manifest import parse_source
+    try:
+        return parse_source(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def shard_spec(spec: str):
+    """Parse a --shard value ('i/N') into (i, N)."""
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
 
-    type_str, path = spec.split("=", 1)
-    type_str = type_str.strip().lower()
+def deadline_spec(spec: str):
+    """Parse a --deadline value ('GLOB=DURATION') into (glob, seconds)."""
+    try:
+        return parse_deadline_spec(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_fetch_arguments(parser):
+    """Add per-host politeness arguments for commands that fetch URLs."""
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=FETCH_MAX_PER_HOST,
+        help=f"Maximum concurrent requests per host (default: {FETCH_MAX_PER_HOST})"
+    )
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=FETCH_MIN_DELAY_SECONDS,
+        help=f"Minimum seconds between requests to the same host; a larger robots.txt "
+             f"Crawl-delay wins (default: {FETCH_MIN_DELAY_SECONDS})"
+    )
+
+
+def add_budget_arguments(parser):
+    """Add the token/cost budget arguments of long-running commands (batch, worker)."""
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        metavar="AMOUNT",
+        help="Stop starting LLM requests once this much would be spent, in the model's "
+             "pricing currency; requests in flight finish (default: no limit)"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        metavar="N",
+        help="Stop starting LLM requests once N input+output tokens would be used "
+             "(default: no limit)"
+    )
+
+
+def _budget(args):
+    """Budget from --max-cost/--max-tokens, or None without limits."""
+    if args.max_cost is None and args.max_tokens is None:
+        return None
+    from .budget import Budget
+    return Budget(max_cost=args.max_cost, max_tokens=args.max_tokens)
 
-    if type_str not in ["paper", "news"]:
-        raise argparse.ArgumentTypeError(f"Invalid source type '{type_str}'. Use 'paper' or 'news'")
 
-    if not path.strip():
-        raise argparse.ArgumentTypeError("Path cannot be empty in 'type=path' format")
+def _budget_remaining(budget, currency=""):
+    """'Budget Remaining' summary value, e.g. '$0.4210 of $5.0000; 12,000 of 100,000 tokens'."""
+    remaining = budget.remaining()
+    parts = []
+    if remaining["cost"] is not None:
+        parts.append(f"{currency}{remaining['cost']:.4f} of {currency}{budget.max_cost:.4f}")
+    if remaining["tokens"] is not None:
+        parts.append(f"{remaining['tokens']:,} of {budget.max_tokens:,} tokens")
+    if budget.exhausted:
+        parts.append("exhausted")
+    return "; ".join(parts)
+
+
+def _configure_fetching(args):
+    """Apply per-host fetch limits from CLI arguments."""
+    from .fetch_scheduler import configure_fetch_scheduler
+    configure_fetch_scheduler(max_per_host=args.per_host, min_delay=args.host_delay)
+
+
+def _print_fetch_stats():
+    """Print per-host fetch statistics (if any URL was fetched)."""
+    from .fetch_scheduler import get_fetch_scheduler
+    stats = get_fetch_scheduler().get_stats()
+    if not stats:
+        return
+    print("\nFetch Statistics")
+    for host, s in sorted(stats.items(), key=lambda item: -item[1]["requests"]):
+        print(
+            f"  {host}: {s['requests']} requests, {s['failures']} failed, "
+            f"{s['bytes'] / 1024:,.0f} KB, avg {s['avg_latency']:.2f}s, max {s['max_latency']:.2f}s"
+        )
 
-    src_type = InputType.PAPER if type_str == "paper" else InputType.NEWS
-    return Input(type=src_type, path=path.strip())
 
 async def cmd_generate_brief(args):
     """Generate brief news from one or more sources (multi-source supported)."""
+    EditorAssistant = _lazy("EditorAssistant")
+    ProcessType = _lazy("ProcessType")
     stream = not getattr(args, 'no_stream', False)
-    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream)
+    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream,
+                                reconvert=args.reconvert)
 
     # Parse key=value sources into Input objects
     inputs = [parse_source_spec(source) for source in args.sources]
 
+    _configure_fetching(args)
     await assistant.process_multiple(inputs, ProcessType.BRIEF, save_files=args.save_files)
+    _print_fetch_stats()
 
 
 async def cmd_generate_outline(args):
     """Generate research outlines from a single paper."""
+    EditorAssistant = _lazy("EditorAssistant")
+    ProcessType = _lazy("ProcessType")
+    Input = _lazy("Input")
+    InputType = _lazy("InputType")
     stream = not getattr(args, 'no_stream', False)
-    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream)
+    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream,
+                                reconvert=args.reconvert)
     # Create Input object for the paper
     input_obj = Input(type=InputType.PAPER, path=args.input_file)
     await assistant.process_multiple([input_obj], ProcessType.OUTLINE, save_files=args.save_files)
 
 async def cmd_generate_translate(args):
     """Generate translation from a single paper."""
+    EditorAssistant = _lazy("EditorAssistant")
+    ProcessType = _lazy("ProcessType")
+    Input = _lazy("Input")
+    InputType = _lazy("InputType")
     stream = not getattr(args, 'no_stream', False)
-    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream)
+    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream,
+                                reconvert=args.reconvert)
     # Create Input object for the paper
     input_obj = Input(type=InputType.PAPER, path=args.input_file)
     await assistant.process_multiple([input_obj], ProcessType.TRANSLATE, save_files=args.save_files)
@@ -113,8 +342,10 @@ async def cmd_generate_translate(args):
 
 async def cmd_process_multi_task(args):
     """Process input with multiple tasks (serial execution)."""
+    EditorAssistant = _lazy("EditorAssistant")
     stream = not getattr(args, 'no_stream', False)
-    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream)
+    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream,
+                                reconvert=args.reconvert)
     
     # Parse sources into Input objects
     inputs = [parse_source_spec(source) for source in args.sources]
@@ -129,34 +360,226 @@ async def cmd_process_multi_task(args):
         await assistant.process_multiple(inputs, task_name, save_files=args.save_files)
 
 async def cmd_batch_process(args):
-    """Batch process files in a directory."""
+    """Batch process files in a directory (or the jobs of a --manifest)."""
+    if args.manifest:
+        await _run_manifest(args)
+        return
+    if not args.folder or not args.task:
+        # A usage error, like the ones argparse reports (exit status 2)
+        print("editor-assistant batch: error: a folder and --task are required (or --manifest)", file=sys.stderr)
+        sys.exit(2)
+    EditorAssistant = _lazy("EditorAssistant")
     folder = Path(args.folder)
     if not folder.exists():
         print(f"Error: Folder '{folder}' does not exist")
         return
 
-    # Support filtering by extension
-    ext = args.ext if args.ext.startswith(".") else f".{args.ext}"
-    pattern = f"*{ext}"
-    files = sorted(folder.glob(pattern))
+    include = _include_globs(args)
+    files = scan_files(folder, include, args.exclude or [], recursive=args.recursive)
+    what = ", ".join(include)
     
     if not files:
-        print(f"No {ext} files found in '{folder}'")
+        print(f"No {what} files found in '{folder}'")
         return
 
-    print(f"Found {len(files)} {ext} files in '{folder}'")
+    print(f"Found {len(files)} {what} files in '{folder}'")
     
-    stream = not getattr(args, 'no_stream', False)
-    assistant = EditorAssistant(args.model, debug_mode=args.debug, thinking_level=args.thinking, stream=stream)
+    if args.shard:
+        index, count = args.shard
+        total = len(files)
+        files = select_shard(files, folder, index, count)
+        print(f"Shard {index}/{count}: {len(files)} of {total} files")
+        if not files:
+            return
     
-    # Create Input objects for all files
+    files = _select_new_files(files, args.task, args.model, force=args.force)
+    if not files:
+        return
+    
+    stream = not getattr(args, 'no_stream', False)
+    budget = _budget(args)
+    assistant = EditorAssistant(
+        args.model,
+        debug_mode=args.debug,
+        thinking_level=args.thinking,
+        stream=stream,
+        conversion_backend=args.convert_backend,
+        conversion_workers=args.convert_workers,
+        conversion_timeout=args.convert_timeout,
+        conversion_max_rss_mb=args.convert_max_rss,
+        reconvert=args.reconvert,
+        budget=budget,
+    )
+    _configure_fetching(args)
+    try:
+        await _run_batch(assistant, args, files, stream, budget)
+    finally:
+        await assistant.aclose()
+    _print_fetch_stats()
+
+
+async def _run_manifest(args):
+    """Run the jobs of a JSONL manifest, streaming JSONL results."""
+    import contextlib
+    from .manifest import ManifestError, ManifestRunner, load_manifest, open_results
+    EditorAssistant = _lazy("EditorAssistant")
+
+    defaults = {"thinking": args.thinking, "save_files": args.save_files, "reconvert": args.reconvert}
+    try:
+        jobs = load_manifest(Path(args.manifest), task=args.task, model=args.model, options=defaults)
+    except (OSError, ManifestError) as e:
+        print(f"Error: manifest {args.manifest}: {e}")
+        return
+    if not jobs:
+        print(f"No jobs in manifest {args.manifest}")
+        return
+
+    budget = _budget(args)
+    stream = not getattr(args, 'no_stream', False)
+    _configure_fetching(args)
+    # With results on stdout, everything else goes to stderr
+    to_stderr = contextlib.redirect_stdout(sys.stderr) if args.results == "-" else contextlib.nullcontext()
+    with open_results(args.results) as emit, to_stderr:
+        print(f"Running {len(jobs)} manifest job(s) from {args.manifest}")
+        async with AsyncRunRepository() as db:
+            def make_assistant(model, thinking_level, reconvert):
+                return EditorAssistant(
+                    model,
+                    debug_mode=args.debug,
+                    thinking_level=thinking_level,
+                    stream=stream,
+                    conversion_backend=args.convert_backend,
+                    conversion_workers=args.convert_workers,
+                    conversion_timeout=args.convert_timeout,
+                    conversion_max_rss_mb=args.convert_max_rss,
+                    reconvert=reconvert,
+                    db=db,
+                    budget=budget,
+                )
+
+            counts = await ManifestRunner(jobs, make_assistant, emit, schedule=args.schedule).run()
+
+        summary = f"✓ Manifest finished: {counts['success']} succeeded, {counts['failed']} failed"
+        if counts["budget_exhausted"]:
+            summary += f", {counts['budget_exhausted']} not started (budget)"
+        print(summary)
+        if budget is not None:
+            print(f"  Budget remaining: {_budget_remaining(budget)}")
+        _print_fetch_stats()
+
+
+def _include_globs(args):
+    """Include globs of a folder command: --include, or the --ext filter."""
+    if args.include:
+        return args.include
+    ext = args.ext if args.ext.startswith(".") else f".{args.ext}"
+    return [f"*{ext}"]
+
+
+def _select_new_files(files, task, model, force=False, repository=None):
+    """
+    Hash batch files (through the file index) and drop repeats.
+
+    Files with the same content as an earlier file in the batch are dropped,
+    and so are files whose content already has a successful run of this
+    task, model and prompt version (unless force).
+
+    Returns:
+        List of (path, content hash) to process
+    """
+    repository = repository if repository is not None else RunRepository()
+    index = FileIndex(repository)
+    hashes = index.hashes(files)
+
+    unique = {}
+    for f in files:
+        unique.setdefault(hashes[f], f)
+    duplicates = len(files) - len(unique)
+
+    done = set()
+    if not force:
+        task_cls = _lazy("TaskRegistry").get(task)
+        prompt_version = task_cls().prompt_version() if task_cls else None
+        done = repository.find_done_sources(list(unique), task, model, prompt_version)
+
+    selected = [(f, file_hash) for file_hash, f in unique.items() if file_hash not in done]
+    notes = []
+    if index.cached:
+        notes.append(f"{index.cached} unchanged since last indexed")
+    if duplicates:
+        notes.append(f"{duplicates} duplicate{'s' if duplicates != 1 else ''} skipped")
+    if done:
+        notes.append(f"{len(done)} already done (use --force to rerun)")
+    suffix = f" ({'; '.join(notes)})" if notes else ""
+    print(f"{len(selected)} of {len(files)} files to process{suffix}")
+    return selected
+
+
+def _batch_deadlines(files, folder, specs, start):
+    """
+    Deadline of each batch file from --deadline specs.
+
+    The first GLOB matching the file (a glob with '/' matches the path
+    relative to the folder, otherwise the file name) sets its deadline to
+    start + DURATION.
+
+    Returns:
+        Dict of path -> deadline (epoch seconds) for files with one
+    """
+    deadlines = {}
+    for f in files:
+        rel_path = Path(f).relative_to(folder).as_posix()
+        for glob, seconds in specs or []:
+            if matches(rel_path, [glob]):
+                deadlines[f] = start + seconds
+                break
+    return deadlines
+
+
+def _schedule_report(results, start):
+    """
+    Completion-time metrics of a batch for the summary.
+
+    Returns:
+        List of (label, value) rows (empty if no input finished)
+    """
+    finished = [r for r in results or [] if r.finished_at is not None]
+    if not finished:
+        return []
+    completion = [r.finished_at - start for r in finished]
+    rows = [
+        ("Time to First Result", f"{min(completion):.1f}s"),
+        ("Mean Completion Time", f"{sum(completion) / len(completion):.1f}s"),
+    ]
+    with_deadline = [r for r in finished if r.deadline is not None]
+    if with_deadline:
+        missed = sum(1 for r in with_deadline if not r.success or r.finished_at > r.deadline)
+        rows.append(("Missed Deadlines", f"{missed} of {len(with_deadline)}"))
+    return rows
+
+
+async def _run_batch(assistant, args, files, stream, budget=None):
+    """Run the batch with progress UI and print the summary."""
+    Input = _lazy("Input")
+    InputType = _lazy("InputType")
+    start = time.time()
+    schedule = args.schedule
+    deadlines = _batch_deadlines([f for f, _ in files], Path(args.folder), args.deadline, start)
+    # Create Input objects for all (path, content hash) pairs
     # Default to PAPER type for batch processing unless specified (future enhancement)
-    inputs = [Input(type=InputType.PAPER, path=str(f)) for f in files]
+    inputs = [
+        Input(type=InputType.PAPER, path=str(f), source_hash=file_hash, deadline=deadlines.get(f))
+        for f, file_hash in files
+    ]
     
     # Prepare callbacks for Rich UI if available and streaming enabled
     progress_callbacks = {}
     
     if RICH_AVAILABLE and stream:
+        Console, Progress = _lazy("Console"), _lazy("Progress")
+        SpinnerColumn, TextColumn = _lazy("SpinnerColumn"), _lazy("TextColumn")
+        BarColumn, TimeRemainingColumn = _lazy("BarColumn"), _lazy("TimeRemainingColumn")
+
         # Suppress INFO logs to prevent interfering with Rich UI
         import logging
         logging.getLogger().setLevel(logging.WARNING)
@@ -234,13 +657,14 @@ async def cmd_batch_process(args):
             for inp in inputs:
                 progress_callbacks[inp.path] = make_callback(inp.path)
             
-            await assistant.process_multiple(
+            results = await assistant.process_multiple(
                 inputs, 
                 args.task, 
                 output_to_console=False, 
                 save_files=args.save_files, 
                 progress_callbacks=progress_callbacks,
-                done_callback=on_done
+                done_callback=on_done,
+                schedule=schedule,
             )
             
             # Ensure overall is done (in case of weirdness)
@@ -254,10 +678,11 @@ async def cmd_batch_process(args):
         if not RICH_AVAILABLE and stream:
             print("Warning: 'rich' library not found. Streaming output will be interleaved.")
             
-        await assistant.process_multiple(
+        results = await assistant.process_multiple(
             inputs, 
             args.task, 
-            save_files=args.save_files # Force save for batch
+            save_files=args.save_files, # Force save for batch
+            schedule=schedule,
         )
 
     # Print Batch Summary
@@ -273,8 +698,16 @@ async def cmd_batch_process(args):
     else:
         avg_cost = 0
         avg_tokens = 0
+    schedule_rows = _schedule_report(results if isinstance(results, list) else None, start)
+    budget_rows = []
+    if budget is not None:
+        budget_rows.append(("Budget Remaining", _budget_remaining(budget, currency)))
+        not_started = sum(1 for r in results if r.budget_exhausted) if isinstance(results, list) else 0
+        if not_started:
+            budget_rows.append(("Not Started (Budget)", f"{not_started} (rerun the batch to continue)"))
 
     if RICH_AVAILABLE:
+        Console, Table, Panel = _lazy("Console"), _lazy("Table"), _lazy("Panel")
         console = Console(force_terminal=True)
         table = Table(show_header=False, box=None)
         table.add_row("Total Files", str(len(inputs)))
@@ -283,6 +716,10 @@ async def cmd_batch_process(args):
         table.add_row("Total Cost", f"{currency}{total_cost:.4f}")
         table.add_row("Avg Tokens/Task", f"{avg_tokens:,.0f}")
         table.add_row("Avg Cost/Task", f"{currency}{avg_cost:.4f}")
+        if schedule_rows:
+            table.add_row("Schedule", schedule)
+        for label, value in schedule_rows + budget_rows:
+            table.add_row(label, value)
         
         console.print()
         console.print(Panel(table, title="[bold green]Batch Processing Summary[/bold green]", expand=False))
@@ -294,11 +731,16 @@ async def cmd_batch_process(args):
         print(f"Total Cost: {currency}{total_cost:.4f}")
         print(f"Avg Tokens/Task: {avg_tokens:,.0f}")
         print(f"Avg Cost/Task: {currency}{avg_cost:.4f}")
+        if schedule_rows:
+            print(f"Schedule: {schedule}")
+        for label, value in schedule_rows + budget_rows:
+            print(f"{label}: {value}")
 
 
 # Synchronous commands (CPU bound or simple IO)
 def cmd_convert_to_md(args):
     """Convert various formats to markdown."""
+    MarkdownConverter = _lazy("MarkdownConverter")
     from urllib.parse import urlparse
     converter = MarkdownConverter()
     
@@ -339,6 +781,7 @@ def cmd_convert_to_md(args):
 
 def cmd_clean_html(args):
     """Clean HTML and convert to markdown."""
+    CleanHTML2Markdown = _lazy("CleanHTML2Markdown")
     try:
         converter = CleanHTML2Markdown()
         result = converter.convert(args.url_or_file)
@@ -387,8 +830,11 @@ def cmd_history(args):
         runs = repo.search_by_title(args.search, limit=args.limit)
         print(f"\n📋 Runs matching '{args.search}':\n")
     else:
-        runs = repo.get_recent_runs(limit=args.limit)
-        print(f"\n📋 Recent {len(runs)} runs:\n")
+        runs = repo.get_recent_runs(limit=args.limit, before_id=args.before_id)
+        if args.before_id is not None:
+            print(f"\n📋 {len(runs)} runs before #{args.before_id}:\n")
+        else:
+            print(f"\n📋 Recent {len(runs)} runs:\n")
     
     if not runs:
         print("  No runs found.")
@@ -412,12 +858,51 @@ def cmd_history(args):
         status_icon = "✓" if status == "success" else "✗" if status == "failed" else "○"
         print(f"{run_id:>5} │ {timestamp} │ {task:<10} │ {model:<18} │ {status_icon} {status:<6} │ {currency}{cost:>6.4f} │ {titles}")
     
+    if not args.search and len(runs) == args.limit:
+        print(f"\n  Older runs: editor-assistant history --before-id {runs[-1]['id']} --page-size {args.limit}")
+    print()
+
+
+def cmd_search(args):
+    """Full-text search over input titles, source paths and outputs."""
+    repo = RunRepository()
+    query = " ".join(args.query)
+    runs = repo.search(
+        query,
+        task=args.task,
+        model=args.model,
+        since=args.since,
+        until=args.until,
+        limit=args.limit,
+    )
+    
+    print(f"\n🔎 Runs matching '{query}':\n")
+    if not runs:
+        print("  No runs found.")
+        return
+    
+    print(f"{'ID':>5} │ {'Time':^19} │ {'Task':<10} │ {'Model':<18} │ {'Match':<10} │ Input")
+    print("─" * 100)
+    
+    for run in runs:
+        timestamp = run.get('timestamp', '')[:19] if run.get('timestamp') else ''
+        titles = run.get('input_titles', '') or 'Unknown'
+        titles = titles[:30] + '...' if len(titles) > 30 else titles
+        snippet = " ".join((run.get('snippet') or '').split())
+        print(f"{run['id']:>5} │ {timestamp} │ {run.get('task', '')[:10]:<10} │ "
+              f"{run.get('model', '')[:18]:<18} │ {(run.get('field') or '')[:10]:<10} │ {titles}")
+        if snippet:
+            print(f"      {snippet}")
+    
     print()
 
 
 def cmd_stats(args):
     """Show usage statistics."""
     repo = RunRepository()
+    if args.rebuild:
+        rows = repo.rebuild_stats()
+        print(f"\n✓ Rebuilt daily statistics from run history ({rows} rollup rows)")
     stats = repo.get_stats(days=args.days)
     
     print(f"\n📊 Usage Statistics (last {stats['period_days']} days)\n")
@@ -458,7 +943,13 @@ def cmd_stats(args):
 def cmd_show_run(args):
     """Show details of a specific run."""
     repo = RunRepository()
-    run = repo.get_run_details(args.run_id)
+    # Metadata first: output bodies are only loaded for --output, otherwise
+    # only the start of each body is read for the preview
+    run = repo.get_run_details(
+        args.run_id,
+        include_content=args.output,
+        preview_chars=0 if args.output else args.preview_chars,
+    )
     
     if not run:
         print(f"✗ Run #{args.run_id} not found")
@@ -498,14 +989,24 @@ def cmd_show_run(args):
     for out in outputs:
         out_type = out.get('output_type', 'unknown')
         content_type = out.get('content_type', 'text')
-        content = out.get('content', '')
-        preview = content[:200] + '...' if len(content) > 200 else content
-        preview = preview.replace('\n', ' ')
         
-        print(f"  • {out_type} ({content_type})")
         if args.output:
-            print(f"\n{content}\n")
-        else:
+            print(f"  • {out_type} ({content_type})")
+            print(f"\n{out.get('content') or ''}\n")
+            continue
+        
+        size = out.get('size')
+        details = [content_type, _format_bytes(size) if size is not None else "size unknown"]
+        if out.get('archived'):
+            details.append("archived")
+        print(f"  • {out_type} ({', '.join(details)})")
+        if 'preview' in out:
+            preview = out['preview']
+            if preview is None:
+                print("    Preview: (unavailable)")
+                continue
+            truncated = size is None or len(preview.encode('utf-8')) < size
+            preview = preview.replace('\n', ' ') + ('...' if truncated else '')
             print(f"    Preview: {preview}")
     
     print()
@@ -513,8 +1014,15 @@ def cmd_show_run(args):
 
 async def cmd_resume(args):
     """Resume interrupted/aborted runs."""
-    repo = RunRepository()
-    resumable = repo.get_resumable_runs()
+    EditorAssistant = _lazy("EditorAssistant")
+    Input = _lazy("Input")
+    InputType = _lazy("InputType")
+    async with AsyncRunRepository() as db:
+        await _resume_runs(args, db, EditorAssistant, Input, InputType)
+
+
+async def _resume_runs(args, db, EditorAssistant, Input, InputType):
+    resumable = await db.get_resumable_runs()
     
     if not resumable:
         print("\n✓ No interrupted runs to resume.\n")
@@ -537,78 +1045,368 @@ async def cmd_resume(args):
         print("\n[Dry run] No runs were executed.\n")
         return
     
-    print(f"\nResuming {len(resumable)} run(s)...\n")
-    
+    # Runs with the same model, thinking level and task share one assistant
+    # (one LLM client and HTTP connection pool) and run through its pipeline
+    # concurrently, within the LLM concurrency and rate limits
+    groups = {}
     for run in resumable:
-        run_id = run.get('id')
-        task = run.get('task')
-        model = run.get('model')
-        thinking_level = run.get('thinking_level')
-        stream = bool(run.get('stream', 1))
+        key = (run.get('model'), run.get('thinking_level'), run.get('task'), bool(run.get('stream', 1)))
+        groups.setdefault(key, []).append(run)
+    
+    # Groups of one model run one after another, so its rate limits hold;
+    # different models run concurrently
+    by_model = {}
+    for key, runs in groups.items():
+        by_model.setdefault(key[0], []).append((key, runs))
+    
+    print(f"\nResuming {len(resumable)} run(s) in {len(groups)} group(s)...\n")
+    
+    async def resume_model(model_groups):
+        for key, runs in model_groups:
+            await _resume_group(args, db, EditorAssistant, Input, InputType, key, runs)
+    
+    import asyncio
+    await asyncio.gather(*(resume_model(model_groups) for model_groups in by_model.values()))
+    
+    print()
+
+
+async def _resume_group(args, db, EditorAssistant, Input, InputType, key, runs):
+    """Resume runs sharing (model, thinking level, task, stream) with one assistant."""
+    model, thinking_level, task, stream = key
+    
+    # Inputs shared by several runs (e.g. one paper aborted twice) run once.
+    # The stored article is loaded by id, so sources are not fetched or
+    # converted again.
+    input_objs = {}
+    pending = []
+    for run in runs:
         inputs = run.get('inputs', [])
-        
         if not inputs:
-            print(f"  ✗ Run #{run_id}: No inputs found, skipping")
-            repo.update_run_status(run_id, "failed", "No inputs found for resume")
+            print(f"  ✗ Run #{run['id']}: No inputs found, skipping")
+            await db.update_run_status(run['id'], "failed", "No inputs found for resume")
             continue
-        
+        pending.append(run)
+        for inp in inputs:
+            input_type = InputType.PAPER if inp.get('type') == 'paper' else InputType.NEWS
+            input_objs.setdefault(
+                inp['id'], Input(type=input_type, path=inp.get('source_path', ''), input_id=inp['id'])
+            )
+    if not pending:
+        return
+    
+    progress(f"Resuming {len(pending)} {task} run(s) with {model} on {len(input_objs)} input(s)")
+    try:
+        assistant = EditorAssistant(
+            model, 
+            debug_mode=args.debug, 
+            thinking_level=thinking_level, 
+            stream=stream,
+            reconvert=args.reconvert,
+            db=db
+        )
         try:
-            # Mark as in-progress (pending -> running conceptually)
-            # We'll update to success/failed after processing
-            
-            # Create Input objects from stored data
-            input_objs = []
-            for inp in inputs:
-                input_type = InputType.PAPER if inp.get('type') == 'paper' else InputType.NEWS
-                input_objs.append(Input(type=input_type, path=inp.get('source_path', '')))
-            
-            # Process
-            progress(f"Resuming run #{run_id}: {task} on {len(input_objs)} input(s)")
-            assistant = EditorAssistant(
-                model, 
-                debug_mode=args.debug, 
-                thinking_level=thinking_level, 
-                stream=stream
+            # Concurrent runs would interleave streamed text: report per run instead
+            results = await assistant.process_multiple(
+                list(input_objs.values()), task, output_to_console=False, save_files=args.save_files
             )
-            
-            await assistant.process_multiple(input_objs, task, save_files=args.save_files)
-            
-            # Mark original run as success
-            repo.update_run_status(run_id, "success")
-            print(f"  ✓ Run #{run_id} completed successfully")
-            
-        except Exception as e:
-            repo.update_run_status(run_id, "failed", str(e))
-            print(f"  ✗ Run #{run_id} failed: {e}")
+        finally:
+            await assistant.aclose()
+    except Exception as e:
+        for run in pending:
+            await db.update_run_status(run['id'], "failed", str(e))
+            print(f"  ✗ Run #{run['id']} failed: {e}")
+        return
     
+    # Mark each original run by the outcome of all its inputs
+    outcome = dict(zip(input_objs, results))
+    for run in pending:
+        failed = [outcome.get(inp['id']) for inp in run['inputs']]
+        failed = [result for result in failed if result is None or not result.success]
+        if not failed:
+            await db.update_run_status(run['id'], "success")
+            print(f"  ✓ Run #{run['id']} completed successfully")
+        else:
+            message = "; ".join(
+                f"{result.source_path}: {result.error or 'failed'}" if result else "not processed"
+                for result in failed
+            )
+            await db.update_run_status(run['id'], "failed", message)
+            print(f"  ✗ Run #{run['id']} failed: {message}")
+
+
+async def cmd_watch(args):
+    """Process files dropped into a folder until interrupted, then drain in-flight work."""
+    import asyncio
+    import signal
+    from .watcher import FolderWatcher, Watcher
+    EditorAssistant = _lazy("EditorAssistant")
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        print(f"Error: Folder '{folder}' does not exist")
+        return
+
+    include = _include_globs(args)
+    stream = not getattr(args, 'no_stream', False)
+    assistant = EditorAssistant(
+        args.model,
+        debug_mode=args.debug,
+        thinking_level=args.thinking,
+        stream=stream,
+        conversion_backend=args.convert_backend,
+        conversion_workers=args.convert_workers,
+        conversion_timeout=args.convert_timeout,
+        conversion_max_rss_mb=args.convert_max_rss,
+        reconvert=args.reconvert,
+    )
+    _configure_fetching(args)
+
+    def report(stats):
+        print(f"📊 Queue depth {stats['queue_depth']} ({stats['waiting']} waiting, {stats['in_flight']} in flight), "
+              f"{stats['done']} done, {stats['failed']} failed, {stats['skipped']} skipped, "
+              f"{stats['per_minute']:.1f} files/min", flush=True)
+
+    watcher = Watcher(
+        assistant,
+        FolderWatcher(folder, include, args.exclude or [], recursive=args.recursive, settle_seconds=args.settle),
+        args.task,
+        args.model,
+        force=args.force,
+        save_files=args.save_files,
+        poll_interval=args.interval,
+        status_interval=args.status_interval,
+        on_status=report,
+    )
+
+    # First Ctrl+C/SIGTERM: stop taking files and drain; second: abort
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+
+    def on_signal():
+        if watcher.stopping:
+            main_task.cancel()
+            return
+        print("\n⏳ Stopping: finishing files in progress (Ctrl+C again to abort)...", flush=True)
+        watcher.stop()
+
+    handled = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal)
+            handled.append(sig)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows: Ctrl+C aborts
+
+    print(f"\n👀 Watching '{folder}' for {', '.join(include)} ({args.task} with {args.model}); Ctrl+C to stop\n")
+    try:
+        stats = await watcher.run()
+    finally:
+        for sig in handled:
+            loop.remove_signal_handler(sig)
+        await assistant.aclose()
+
+    print(f"\n✓ Watch stopped: {stats['done']} done, {stats['failed']} failed, {stats['skipped']} skipped "
+          f"({stats['waiting']} stable file(s) not started, picked up on the next start)")
+    _print_fetch_stats()
+
+
+def cmd_enqueue(args):
+    """Queue jobs for `worker` processes: one per source file or URL."""
+    ext = args.ext if args.ext.startswith(".") else f".{args.ext}"
+    sources, missing = [], []
+    for source in args.sources:
+        path = Path(source)
+        if source.startswith(("http://", "https://")):
+            sources.append(source)
+        elif path.is_dir():
+            found = sorted(path.glob(f"*{ext}"))
+            if not found:
+                print(f"No {ext} files found in '{path}'")
+            sources.extend(str(f.resolve()) for f in found)
+        elif path.exists():
+            # Absolute, so workers started from another directory find it
+            sources.append(str(path.resolve()))
+        else:
+            missing.append(source)
+    if missing:
+        print(f"✗ Not found: {', '.join(missing)}")
+        sys.exit(1)
+    if not sources:
+        return
+    
+    options = {
+        "thinking_level": args.thinking,
+        "stream": not args.no_stream,
+        "save_files": args.save_files,
+        "reconvert": args.reconvert,
+    }
+    queue = JobQueue()
+    with queue.repository.transaction():
+        job_ids = [
+            queue.enqueue(args.type, source, args.task, args.model, options, max_attempts=args.max_attempts)
+            for source in sources
+        ]
+    print(f"✓ Queued {len(job_ids)} {args.task} job(s) with {args.model} (#{job_ids[0]}-#{job_ids[-1]})")
+    print("  Run `editor-assistant worker` to process them")
+
+
+async def cmd_worker(args):
+    """Process queued jobs until interrupted (or, with --drain, until the queue is empty)."""
+    from .worker import Worker
+    EditorAssistant = _lazy("EditorAssistant")
+    _configure_fetching(args)
+    async with AsyncRunRepository() as db:
+        budget = _budget(args)
+        worker = Worker(db, EditorAssistant, concurrency=args.concurrency, debug=args.debug, budget=budget)
+        until = "until the queue is empty" if args.drain else "until interrupted (Ctrl+C)"
+        print(f"\n👷 Worker {worker.worker_id}: up to {args.concurrency} job(s) at once, {until}\n")
+        stats = await worker.run(drain=args.drain)
+    
+    print(f"\n✓ Worker finished: {stats['done']} done, {stats['retried']} to retry, "
+          f"{stats['dead']} dead-lettered" + (f", {stats['lost']} lost to other workers" if stats["lost"] else "")
+          + (f", {stats['deferred']} left queued (budget)" if stats["deferred"] else ""))
+    if budget is not None:
+        print(f"  Budget remaining: {_budget_remaining(budget)}")
+    _print_fetch_stats()
+
+
+def cmd_queue(args):
+    """Show job queue status and dead-lettered jobs."""
+    queue = JobQueue()
+    
+    if args.retry_dead:
+        print(f"✓ Requeued {queue.retry_dead()} dead-lettered job(s)")
+    
+    counts = queue.counts()
+    print("\n📋 Job Queue\n")
+    for status, count in counts.items():
+        print(f"  {status.capitalize():<8} {count}")
+    
+    dead = queue.list_jobs("dead", limit=args.limit)
+    if dead:
+        print("\nDead letters (most recent first):")
+        for job in dead:
+            print(f"  #{job['id']}: {job['task']} with {job['model']} on {job['source_path']} "
+                  f"({job['attempts']} attempts)")
+            if job.get("last_error"):
+                print(f"       Error: {job['last_error'][:120]}")
+        print("\n  Requeue them with: editor-assistant queue --retry-dead")
     print()
 
 
 def cmd_export(args):
-    """Export run history to file."""
+    """Export run history to file (streamed in chunks)."""
     repo = RunRepository()
     output_path = Path(args.output)
     
-    # Determine format from extension if not specified
-    format_type = args.format
-    if not format_type:
-        if output_path.suffix.lower() == '.csv':
-            format_type = 'csv'
-        else:
-            format_type = 'json'
+    # Format and compression default to the file extension (e.g. history.jsonl.gz)
+    detected_format, detected_compression = detect_export_format(output_path)
+    format_type = args.format or detected_format
+    compression = args.compress or detected_compression
+    
+    def report(count):
+        print(f"\r  Exported {count} runs...", end="", flush=True)
     
     try:
-        repo.export_runs(output_path, format=format_type, limit=args.limit)
+        total = repo.export_runs(
+            output_path,
+            format=format_type,
+            limit=args.limit,
+            since=args.since,
+            until=args.until,
+            compression=compression,
+            progress_callback=report,
+        )
+        if total:
+            print()
         print(f"✓ Exported runs to: {output_path}")
         
         # Show summary
-        runs = repo.get_recent_runs(limit=args.limit or 1000)
-        print(f"  Total runs exported: {len(runs)}")
-        print(f"  Format: {format_type.upper()}")
+        print(f"  Total runs exported: {total}")
+        print(f"  Format: {format_type.upper()}" + (f" ({compression})" if compression else ""))
         
     except Exception as e:
-        print(f"✗ Export failed: {e}")
+        print(f"\n✗ Export failed: {e}")
+        sys.exit(1)
+
+
+def cmd_merge(args):
+    """Merge run databases or exports (e.g. from batch shards) into one history."""
+    repo = RunRepository(db_path=Path(args.into)) if args.into else RunRepository()
+    
+    def report(count):
+        print(f"\r  Read {count} runs...", end="", flush=True)
+    
+    print(f"\n🔀 Merging into {repo.db_path}")
+    for source in args.sources:
+        print(f"\n  {source}")
+        try:
+            stats = repo.merge_from(Path(source), progress_callback=report)
+        except Exception as e:
+            print(f"\n✗ Merge of {source} failed: {e}")
+            sys.exit(1)
+        print(f"\r  Runs: {stats['runs']} merged, {stats['skipped']} already present")
+        print(f"  Inputs: {stats['inputs']} new; outputs: {stats['outputs']}"
+              + (f" ({stats['missing_outputs']} archived bodies not found)" if stats["missing_outputs"] else ""))
+    print()
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+
+def cmd_compact(args):
+    """Move output bodies into compressed blob storage and reclaim space."""
+    repo = RunRepository()
+    
+    print("\n🗜  Compacting run database...")
+    try:
+        stats = repo.compact(vacuum=not args.no_vacuum)
+    except Exception as e:
+        print(f"✗ Compaction failed: {e}")
+        sys.exit(1)
+    
+    logical = stats["logical_bytes"]
+    stored = stats["stored_bytes"]
+    saved = 1 - stored / logical if logical else 0
+    print(f"  Outputs: {stats['outputs']} ({stats['migrated']} moved to blob storage)")
+    print(f"  Distinct bodies: {stats['blobs']} ({stats['blobs_removed']} unreferenced removed)")
+    print(f"  Output text: {_format_bytes(logical)} -> {_format_bytes(stored)} stored ({saved:.0%} smaller)")
+    print(f"  Database file: {_format_bytes(stats['file_bytes_before'])} -> {_format_bytes(stats['file_bytes'])}")
+    print()
+
+
+def cmd_gc(args):
+    """Archive output bodies past their retention period and reclaim space."""
+    repo = RunRepository()
+    
+    if args.keep_days <= 0:
+        print("\n🧹 Output retention disabled (--keep-days 0): removing unreferenced data only...")
+    else:
+        print(f"\n🧹 Archiving outputs of runs older than {args.keep_days} days...")
+    try:
+        stats = repo.gc(keep_days=args.keep_days, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"✗ Garbage collection failed: {e}")
         sys.exit(1)
+    
+    if args.dry_run:
+        print(f"  Would archive: {stats['archived']} outputs ({_format_bytes(stats['archived_bytes'])} of text)")
+        print()
+        return
+    
+    print(f"  Archived: {stats['archived']} outputs ({_format_bytes(stats['archived_bytes'])} of text) "
+          f"into {stats['archive_files']} archive files ({_format_bytes(stats['archive_bytes'])})")
+    print(f"  Unreferenced blobs removed: {stats['blobs_removed']}")
+    print(f"  Database file: {_format_bytes(stats['file_bytes_before'])} -> {_format_bytes(stats['file_bytes'])} "
+          f"({_format_bytes(stats['reclaimed_bytes'])} reclaimed)")
+    if stats["archive_files"]:
+        print(f"  Archives: {repo.archive_dir}")
+    print()
 
 
 def create_parser():
@@ -628,6 +1426,24 @@ Examples:
   # Batch processing
   %(prog)s batch ./samples/ --ext .pdf --task brief
   %(prog)s batch ./papers/ --ext .html --task translate --model deepseek-v3.2
+  %(prog)s batch ./papers/ --task brief --shard 1/4      # on each of 4 hosts
+  %(prog)s batch ./library/ -r --include "*.pdf" --exclude drafts --task outline
+  %(prog)s batch ./papers/ --task brief --schedule sjf   # first results sooner
+  %(prog)s batch ./papers/ -r --task brief --schedule edf --deadline "urgent/*=30m"
+  %(prog)s batch ./papers/ --task translate --max-cost 5 --max-tokens 2000000
+  %(prog)s batch --manifest jobs.jsonl --results results.jsonl
+  %(prog)s batch --manifest jobs.jsonl | jq 'select(.status == "failed")'
+  %(prog)s merge host1/runs.db host2/runs.db host3.jsonl.gz
+  
+  # Watch a drop folder (Ctrl+C finishes files in progress, then exits)
+  %(prog)s watch ./inbox/ --task brief
+  %(prog)s watch ./inbox/ -r --include "*.pdf" --include "*.docx" --task outline --settle 10
+  
+  # Job queue (run several workers to drain it in parallel)
+  %(prog)s enqueue ./papers/ --task brief --model deepseek-v3.2
+  %(prog)s worker --concurrency 4
+  %(prog)s worker --drain --max-cost 10
+  %(prog)s queue
   
   # Convert and clean
   %(prog)s convert *.pdf -o ./markdown/
@@ -636,6 +1452,7 @@ Examples:
   # View history and stats
   %(prog)s history -n 20
   %(prog)s history --search "quantum"
+  %(prog)s search CRISPR --task brief --since 2026-01-01
   %(prog)s stats -d 30
   %(prog)s show 1 --output
   
@@ -644,6 +1461,8 @@ Examples:
   %(prog)s resume --save-files
   %(prog)s export history.json
   %(prog)s export history.csv --limit 100
+  %(prog)s export history.jsonl.gz --since 2026-01-01 --until 2026-01-31
+  %(prog)s compact
 """
     )
     
@@ -672,6 +1491,7 @@ Examples:
         nargs="+",
         help="Sources in format 'type=path' (e.g., paper=file.pdf news=url.com)"
     )
+    add_fetch_arguments(brief_parser)
     add_common_arguments(brief_parser)
     brief_parser.set_defaults(func=cmd_generate_brief)
     
@@ -728,21 +1548,208 @@ Examples:
     )
     batch_parser.add_argument(
         "folder",
-        help="Path to folder containing files"
+        nargs="?",
+        help="Path to folder containing files (not needed with --manifest)"
+    )
+    batch_parser.add_argument(
+        "--task",
+        choices=["brief", "outline", "translate"],
+        help="Task to run on each file (with --manifest: for lines without a task)"
+    )
+    batch_parser.add_argument(
+        "--manifest",
+        metavar="JSONL",
+        help="Run the jobs of a JSONL manifest instead of a folder: one JSON object per line "
+             "with inputs (type=path specs or paths), and optionally task, model, options "
+             "(thinking, save_files, reconvert) and id"
+    )
+    batch_parser.add_argument(
+        "--results",
+        default="-",
+        metavar="PATH",
+        help="With --manifest: write one JSONL result per input (run id, status, output paths, "
+             "tokens, latency) as it completes, to PATH or '-' for stdout (default: -)"
     )
+    add_scan_arguments(batch_parser)
+    add_conversion_arguments(batch_parser)
     batch_parser.add_argument(
+        "--shard",
+        type=shard_spec,
+        metavar="i/N",
+        help="Process only shard i of N (1-based): a stable, hash-based subset of the files, "
+             "so N hosts split one folder without overlap; combine their histories with `merge`"
+    )
+    batch_parser.add_argument(
+        "--schedule",
+        choices=SCHEDULING_POLICIES,
+        default=SCHEDULE_POLICY,
+        help="Order in which files start and get LLM slots: fifo (folder order), sjf "
+             "(smallest first: earlier first results, lower mean completion time), "
+             "longest-first (shortest total time), edf (earliest --deadline first) "
+             f"(default: {SCHEDULE_POLICY})"
+    )
+    batch_parser.add_argument(
+        "--deadline",
+        action="append",
+        type=deadline_spec,
+        metavar="GLOB=DURATION",
+        help="Files matching GLOB are due DURATION (e.g. 30m, 2h) after the batch starts "
+             "(repeatable; first match wins); used by --schedule edf and reported in the summary"
+    )
+    add_budget_arguments(batch_parser)
+    add_fetch_arguments(batch_parser)
+    add_common_arguments(batch_parser)
+    batch_parser.set_defaults(func=cmd_batch_process)
+    
+    # Watch command
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Process files as they are dropped into a folder",
+        description="Poll a folder and run a task on each new or changed file once it is stable, "
+                    "through one long-running pipeline; Ctrl+C stops after finishing files in progress"
+    )
+    watch_parser.add_argument(
+        "folder",
+        help="Folder to watch"
+    )
+    watch_parser.add_argument(
         "--task",
         required=True,
         choices=["brief", "outline", "translate"],
         help="Task to run on each file"
     )
-    batch_parser.add_argument(
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_POLL_INTERVAL_SECONDS,
+        help=f"Seconds between folder scans (default: {WATCH_POLL_INTERVAL_SECONDS})"
+    )
+    watch_parser.add_argument(
+        "--settle",
+        type=float,
+        default=WATCH_SETTLE_SECONDS,
+        help=f"Process a file once its size and mtime are unchanged for this many seconds "
+             f"(default: {WATCH_SETTLE_SECONDS})"
+    )
+    watch_parser.add_argument(
+        "--status-interval",
+        type=float,
+        default=WATCH_STATUS_INTERVAL_SECONDS,
+        help=f"Seconds between queue depth / throughput lines, 0 for none "
+             f"(default: {WATCH_STATUS_INTERVAL_SECONDS})"
+    )
+    add_scan_arguments(watch_parser)
+    add_conversion_arguments(watch_parser)
+    add_fetch_arguments(watch_parser)
+    add_common_arguments(watch_parser)
+    watch_parser.set_defaults(func=cmd_watch)
+    
+    # Enqueue command
+    enqueue_parser = subparsers.add_parser(
+        "enqueue",
+        help="Queue jobs for worker processes",
+        description="Write one job per source (file, URL, or folder of files) to the job queue "
+                    "in the run database; `worker` processes drain it"
+    )
+    enqueue_parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Files, URLs, or folders (files matching --ext)"
+    )
+    enqueue_parser.add_argument(
+        "--task",
+        required=True,
+        choices=["brief", "outline", "translate"],
+        help="Task to run on each source"
+    )
+    enqueue_parser.add_argument(
+        "--type",
+        choices=["paper", "news"],
+        default="paper",
+        help="Input type of the sources (default: paper)"
+    )
+    enqueue_parser.add_argument(
         "--ext",
         default=".pdf",
-        help="File extension to filter by (default: .pdf)"
+        help="File extension to pick from folders (default: .pdf)"
     )
-    add_common_arguments(batch_parser)
-    batch_parser.set_defaults(func=cmd_batch_process)
+    enqueue_parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        choices=get_model_names(),
+        help="Model to use for generation"
+    )
+    enqueue_parser.add_argument(
+        "--thinking",
+        choices=["low", "medium", "high"],
+        default=None,
+        help="Thinking/reasoning level for models that support it"
+    )
+    enqueue_parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        dest="no_stream",
+        help="Disable streaming LLM responses"
+    )
+    enqueue_parser.add_argument(
+        "--save-files",
+        action="store_true",
+        help="Persist generated files to disk (default: off; DB always updated)"
+    )
+    enqueue_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=JOB_MAX_ATTEMPTS,
+        help=f"Attempts per job before it is dead-lettered (default: {JOB_MAX_ATTEMPTS})"
+    )
+    add_reconvert_argument(enqueue_parser)
+    enqueue_parser.set_defaults(func=cmd_enqueue)
+    
+    # Worker command
+    worker_parser = subparsers.add_parser(
+        "worker",
+        help="Process queued jobs",
+        description="Claim jobs from the queue with leases and heartbeats and process them; "
+                    "start several workers to drain one queue in parallel"
+    )
+    worker_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Jobs processed at once by this worker (default: 1)"
+    )
+    worker_parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Exit once no job is queued or running (default: keep polling)"
+    )
+    worker_parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug mode"
+    )
+    add_budget_arguments(worker_parser)
+    add_fetch_arguments(worker_parser)
+    worker_parser.set_defaults(func=cmd_worker)
+    
+    # Queue status command
+    queue_parser = subparsers.add_parser(
+        "queue",
+        help="Show job queue status",
+        description="Show job counts by status and dead-lettered jobs"
+    )
+    queue_parser.add_argument(
+        "-n", "--limit",
+        type=int,
+        default=10,
+        help="Number of dead-lettered jobs to list (default: 10)"
+    )
+    queue_parser.add_argument(
+        "--retry-dead",
+        action="store_true",
+        help="Requeue dead-lettered jobs with fresh attempts"
+    )
+    queue_parser.set_defaults(func=cmd_queue)
     
     # Format conversion command
     convert_parser = subparsers.add_parser(
@@ -798,10 +1805,17 @@ Examples:
         description="List recent runs from the database"
     )
     history_parser.add_argument(
-        "-n", "--limit",
+        "-n", "--limit", "--page-size",
+        dest="limit",
         type=int,
-        default=20,
-        help="Number of runs to show (default: 20)"
+        default=HISTORY_PAGE_SIZE,
+        help=f"Number of runs to show per page (default: {HISTORY_PAGE_SIZE})"
+    )
+    history_parser.add_argument(
+        "--before-id",
+        type=int,
+        default=None,
+        help="Show runs older than this run id (next page; printed below a full page)"
     )
     history_parser.add_argument(
         "--search",
@@ -809,6 +1823,45 @@ Examples:
     )
     history_parser.set_defaults(func=cmd_history)
     
+    # Search command
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Full-text search of run history",
+        description="Search input titles, source paths and generated outputs (ranked, with snippets)"
+    )
+    search_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Search terms (all must match; terms of 3+ characters use the full-text index)"
+    )
+    search_parser.add_argument(
+        "--task",
+        help="Only runs of this task (e.g. brief, outline, translate)"
+    )
+    search_parser.add_argument(
+        "--model",
+        help="Only runs using this model"
+    )
+    search_parser.add_argument(
+        "--since",
+        type=parse_since,
+        metavar="DATE",
+        help="Only runs at or after this UTC date/time (ISO)"
+    )
+    search_parser.add_argument(
+        "--until",
+        type=parse_until,
+        metavar="DATE",
+        help="Only runs before this UTC date/time (a bare date includes that day)"
+    )
+    search_parser.add_argument(
+        "-n", "--limit",
+        type=int,
+        default=20,
+        help="Number of results to show (default: 20)"
+    )
+    search_parser.set_defaults(func=cmd_search)
+    
     # Stats command
     stats_parser = subparsers.add_parser(
         "stats",
@@ -821,6 +1874,11 @@ Examples:
         default=7,
         help="Number of days to include (default: 7)"
     )
+    stats_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute the daily rollups from the full run history first"
+    )
     stats_parser.set_defaults(func=cmd_stats)
     
     # Show command
@@ -839,6 +1897,13 @@ Examples:
         action="store_true",
         help="Include full output content"
     )
+    show_parser.add_argument(
+        "--preview-chars",
+        type=int,
+        default=OUTPUT_PREVIEW_CHARS,
+        help=f"Characters of each output to preview without --output "
+             f"(default: {OUTPUT_PREVIEW_CHARS}; 0 = metadata only)"
+    )
     show_parser.set_defaults(func=cmd_show_run)
     
     # Resume command
@@ -862,13 +1927,14 @@ Examples:
         action="store_true",
         help="Save output files to disk"
     )
+    add_reconvert_argument(resume_parser)
     resume_parser.set_defaults(func=cmd_resume)
     
     # Export command
     export_parser = subparsers.add_parser(
         "export",
         help="Export run history to file",
-        description="Export run history to CSV or JSON format"
+        description="Export run history to JSON, JSONL or CSV (optionally gzip/zstd compressed)"
     )
     export_parser.add_argument(
         "output",
@@ -876,16 +1942,88 @@ Examples:
     )
     export_parser.add_argument(
         "--format",
-        choices=["json", "csv"],
+        choices=["json", "jsonl", "csv"],
         help="Export format (default: auto-detect from extension)"
     )
+    export_parser.add_argument(
+        "--compress",
+        choices=["gzip", "zstd"],
+        help="Compress the output (default: auto-detect from .gz/.zst extension; zstd needs 'zstandard')"
+    )
     export_parser.add_argument(
         "-n", "--limit",
         type=int,
-        help="Maximum number of runs to export"
+        help="Maximum number of runs to export (most recent first)"
+    )
+    export_parser.add_argument(
+        "--since",
+        type=parse_since,
+        metavar="DATE",
+        help="Only runs at or after this UTC date/time (ISO, e.g. 2026-01-31 or 2026-01-31T08:00)"
+    )
+    export_parser.add_argument(
+        "--until",
+        type=parse_until,
+        metavar="DATE",
+        help="Only runs before this UTC date/time (a bare date includes that day)"
     )
     export_parser.set_defaults(func=cmd_export)
     
+    # Merge command
+    merge_parser = subparsers.add_parser(
+        "merge",
+        help="Merge run histories from other databases or exports",
+        description="Combine run databases or JSON/JSONL exports (e.g. from `batch --shard` hosts) "
+                    "into one history; runs already present are skipped"
+    )
+    merge_parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Run databases (runs.db) or JSON/JSONL exports (optionally .gz/.zst)"
+    )
+    merge_parser.add_argument(
+        "--into",
+        metavar="DB",
+        help="Target run database (default: this machine's run database)"
+    )
+    merge_parser.set_defaults(func=cmd_merge)
+    
+    # Compact command
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Compress stored outputs and shrink the run database",
+        description="Move output bodies into deduplicated, compressed blob storage, "
+                    "drop unreferenced blobs and VACUUM the database file"
+    )
+    compact_parser.add_argument(
+        "--no-vacuum",
+        action="store_true",
+        help="Skip VACUUM (faster; freed pages are reused but the file does not shrink)"
+    )
+    compact_parser.set_defaults(func=cmd_compact)
+    
+    # GC command
+    gc_parser = subparsers.add_parser(
+        "gc",
+        help="Archive old outputs and reclaim database space",
+        description="Move output bodies of old runs into compressed archive files "
+                    "(still shown by `show`), keep run metadata, and return freed space "
+                    "with an incremental vacuum"
+    )
+    gc_parser.add_argument(
+        "--keep-days",
+        type=int,
+        default=OUTPUT_RETENTION_DAYS,
+        help=f"Keep output bodies of runs from the last N days in the database "
+             f"(default: {OUTPUT_RETENTION_DAYS}; 0 = keep all)"
+    )
+    gc_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many outputs would be archived"
+    )
+    gc_parser.set_defaults(func=cmd_gc)
+    
     return parser
 
 
@@ -901,7 +2039,8 @@ def main():
     
     # Execute the appropriate command
     try:
-        if asyncio.iscoroutinefunction(args.func):
+        if inspect.iscoroutinefunction(args.func):
+            import asyncio
             asyncio.run(args.func(args))
         else:
             args.func(args)
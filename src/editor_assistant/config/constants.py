@@ -85,6 +85,251 @@ RESPONSE_CACHE_MAX_SIZE = 100
 RESPONSE_CACHE_TTL_SECONDS = 3600  # 1 hour
 
 
+# =============================================================================
+# CONVERSION CACHE
+# =============================================================================
+
+# Cache converted documents (PDF, DOCX, ...) keyed by file hash + converter version.
+# Unchanged files are not re-converted across batch/outline runs.
+CONVERSION_CACHE_ENABLED = True
+
+# Cache directory name, created next to the run database.
+CONVERSION_CACHE_DIR_NAME = "conversion_cache"
+
+# Bump to invalidate all cached conversions (e.g. after changing converter logic).
+CONVERSION_CACHE_VERSION = 1
+
+# Read size when hashing input files.
+FILE_HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+# =============================================================================
+# CONVERSION WORKERS
+# =============================================================================
+
+# Where document conversion runs:
+# - "thread": asyncio.to_thread (simple, but CPU-bound parsing shares one core via the GIL)
+# - "process": warm pool of worker processes (true parallelism, timeouts, memory caps)
+CONVERSION_BACKEND = "thread"
+
+# Number of conversion worker processes (0 = os.cpu_count()).
+CONVERSION_WORKERS = 0
+
+# Per-document conversion timeout for the process backend (seconds, 0 = none).
+# A worker exceeding it is killed and replaced.
+CONVERSION_TIMEOUT_SECONDS = 300
+
+# Recycle a worker process when its RSS exceeds this (MB, 0 = no limit).
+CONVERSION_WORKER_MAX_RSS_MB = 2048
+
+# Recycle a worker process after this many conversions (0 = no limit).
+CONVERSION_WORKER_MAX_TASKS = 200
+
+# Attempts to start a replacement worker process, and the delay between them
+# (seconds, multiplied by the attempt number). When every attempt fails the
+# pool is marked broken and conversions fail instead of waiting for a worker.
+CONVERSION_WORKER_SPAWN_ATTEMPTS = 3
+CONVERSION_WORKER_SPAWN_RETRY_SECONDS = 1.0
+
+
+# =============================================================================
+# BATCH PIPELINE
+# =============================================================================
+
+# Batches run as a pipeline: convert -> validate -> register -> LLM (+ persist), with a
+# bounded queue in front of each stage. Memory in flight is bounded by the
+# queue sizes and stage concurrency, not by the number of inputs.
+
+# Capacity of each inter-stage queue.
+PIPELINE_QUEUE_SIZE = 8
+
+# Concurrent conversions for the thread backend
+# (the process backend uses one slot per worker process).
+PIPELINE_CONVERT_CONCURRENCY = 4
+
+# Concurrent LLM requests (MDProcessor semaphore size).
+PIPELINE_LLM_CONCURRENCY = 5
+
+
+# =============================================================================
+# BATCH SCHEDULING
+# =============================================================================
+
+# Order in which batch inputs are converted and sent to the LLM (`--schedule`):
+# fifo, sjf (smallest first: lower mean completion time, first results
+# sooner), longest-first (shorter makespan) or edf (earliest deadline first).
+SCHEDULE_POLICY = "fifo"
+
+# Before conversion, a document's size in tokens is guessed from its file
+# size. Bytes per token by extension; other files are treated as plain text
+# (CHAR_TOKEN_RATIO_EN). Rough: they only need to rank documents. Once
+# converted, documents are ranked by the token estimate of their markdown.
+SCHEDULE_BYTES_PER_TOKEN = {
+    ".pdf": 60,
+    ".docx": 10,
+    ".html": 12,
+    ".htm": 12,
+}
+
+# Guessed size of a URL source (unknown until fetched).
+SCHEDULE_URL_TOKENS = 8000
+
+
+# =============================================================================
+# INCREMENTAL BATCHES
+# =============================================================================
+
+# `batch` hashes the files it finds, skipping files whose content already has
+# a successful run for the same task, model and prompt (unless --force), and
+# processes duplicate files once. Hashes are cached in the run database's file
+# index and reused while a file's size and mtime are unchanged.
+
+# Files looked up (file index / done runs) per query.
+FILE_INDEX_LOOKUP_BATCH_SIZE = 500
+
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+# `watch` polls a folder and processes files once they are stable, through
+# one pipeline that stays open (warm LLM client and conversion workers).
+
+# Seconds between folder scans.
+WATCH_POLL_INTERVAL_SECONDS = 2.0
+
+# A file is processed once its size and mtime have not changed for this long
+# (files still being copied in are not picked up half-written).
+WATCH_SETTLE_SECONDS = 5.0
+
+# Seconds between status lines (queue depth, throughput); 0 = none.
+WATCH_STATUS_INTERVAL_SECONDS = 60.0
+
+# Throughput is reported over this trailing window (seconds).
+WATCH_THROUGHPUT_WINDOW_SECONDS = 300.0
+
+
+# =============================================================================
+# RUN DATABASE (SQLite)
+# =============================================================================
+
+# Connections are kept open per thread and reused across repository calls.
+# The database runs in WAL mode so readers never block the writer, and
+# concurrent writers wait (busy_timeout) instead of failing with
+# "database is locked".
+
+# How long a writer waits for the write lock before failing (milliseconds).
+SQLITE_BUSY_TIMEOUT_MS = 10000
+
+# Page cache per connection (KiB; passed to PRAGMA cache_size as a negative value).
+SQLITE_CACHE_SIZE_KB = 16384  # 16 MB
+
+# WAL with synchronous=NORMAL fsyncs on checkpoint rather than on every commit.
+# A power loss can roll back the last commits but never corrupts the database.
+SQLITE_SYNCHRONOUS = "NORMAL"
+
+# Run-history writes (run records, outputs, token usage, status updates) go
+# through one writer thread that group-commits them: it commits when this many
+# writes are queued, or when the flush window after the first one has passed.
+DB_WRITER_BATCH_SIZE = 64
+
+# Flush window for group commits (seconds).
+DB_WRITER_FLUSH_INTERVAL_SECONDS = 0.01
+
+# The writer thread exits after this long without writes and restarts on demand.
+DB_WRITER_IDLE_TIMEOUT_SECONDS = 5.0
+
+
+# =============================================================================
+# OUTPUT STORAGE
+# =============================================================================
+
+# Output bodies are stored once per distinct content (SHA-256 addressed) and
+# zlib-compressed. Bilingual outputs repeat the source text and reruns repeat
+# whole outputs, so deduplication and compression both pay off.
+
+# zlib level (1 fastest .. 9 smallest); 6 is zlib's default trade-off.
+OUTPUT_COMPRESSION_LEVEL = 6
+
+# Bodies smaller than this are stored uncompressed (zlib overhead dominates).
+OUTPUT_COMPRESS_MIN_BYTES = 256
+
+# Inline outputs moved to blob storage per transaction by `compact`.
+OUTPUT_COMPACT_BATCH_SIZE = 500
+
+
+# =============================================================================
+# JOB QUEUE
+# =============================================================================
+
+# `enqueue` writes jobs to the run database; `worker` processes claim them
+# with a lease that they renew by heartbeat. A job whose lease expires (its
+# worker died) is claimed again by another worker.
+
+# Lease length (seconds). Must comfortably exceed the heartbeat interval.
+JOB_LEASE_SECONDS = 300
+
+# How often a worker renews the leases of its running jobs (seconds).
+JOB_HEARTBEAT_SECONDS = 30
+
+# Attempts per job (first run included) before it is dead-lettered.
+JOB_MAX_ATTEMPTS = 3
+
+# Delay before a failed job is retried (seconds), doubled per attempt.
+JOB_RETRY_DELAY_SECONDS = 30
+
+# How often an idle worker polls the queue (seconds).
+JOB_POLL_INTERVAL_SECONDS = 2.0
+
+
+# =============================================================================
+# HISTORY RETENTION
+# =============================================================================
+
+# `gc` moves output bodies of runs older than this out of the database into
+# compressed archive files (still shown by `show` and exported). Run metadata
+# (runs, inputs, token usage, stats) is kept forever. 0 = keep outputs forever.
+OUTPUT_RETENTION_DAYS = 90
+
+# Archive directory name, created next to the run database.
+OUTPUT_ARCHIVE_DIR_NAME = "archive"
+
+# Outputs archived per archive file (and per transaction).
+OUTPUT_ARCHIVE_BATCH_SIZE = 500
+
+
+# =============================================================================
+# HISTORY BROWSING
+# =============================================================================
+
+# Runs per `history` page. Pages are keyset-paginated on run id (`--before-id`),
+# so a page deep in the history costs the same as the first one.
+HISTORY_PAGE_SIZE = 20
+
+# Characters of each output previewed by `show` (without `--output`). Only the
+# start of the stored body is read and decompressed, however large it is.
+OUTPUT_PREVIEW_CHARS = 200
+
+
+# =============================================================================
+# HISTORY EXPORT
+# =============================================================================
+
+# Runs fetched (with their inputs, outputs and token usage) per export chunk.
+# Memory use is bounded by one chunk, regardless of history size.
+EXPORT_CHUNK_SIZE = 200
+
+
+# =============================================================================
+# HISTORY SEARCH
+# =============================================================================
+
+# Length of search result snippets. FTS5 counts tokens; the index uses the
+# trigram tokenizer, so a "token" is roughly one character, and snippets of
+# (compressed) output bodies are cut to the same number of characters.
+SEARCH_SNIPPET_TOKENS = 48
+
+
 # =============================================================================
 # CONTENT VALIDATION
 # =============================================================================
@@ -106,6 +351,14 @@ DEFAULT_LOGGING_LEVEL = logging.INFO
 DEBUG_LOGGING_LEVEL = logging.DEBUG
 
 
+# =============================================================================
+# CLI STARTUP
+# =============================================================================
+
+# Cached model names for argparse choices (stored next to the run database).
+MODEL_INDEX_FILENAME = "model_index.json"
+
+
 # =============================================================================
 # HTTP CONFIGURATION
 # =============================================================================
@@ -119,3 +372,23 @@ DEFAULT_USER_AGENT = (
 
 # Timeout for HTTP HEAD requests (URL content-type detection).
 URL_HEAD_TIMEOUT_SECONDS = 10
+
+
+# =============================================================================
+# FETCH SCHEDULING (per-host politeness)
+# =============================================================================
+
+# Maximum concurrent requests to one host.
+FETCH_MAX_PER_HOST = 2
+
+# Minimum interval between request starts to the same host (seconds).
+FETCH_MIN_DELAY_SECONDS = 1.0
+
+# Honor `Crawl-delay` from a host's robots.txt when it exceeds the minimum delay.
+FETCH_RESPECT_CRAWL_DELAY = True
+
+# Timeout for fetching robots.txt (seconds).
+FETCH_ROBOTS_TIMEOUT_SECONDS = 5
+
+# Timeout for page/document fetches (seconds).
+FETCH_TIMEOUT_SECONDS = 60
@@ -4,56 +4,263 @@ Simplified Prompt Template Loader
 Utility for loading and rendering prompt templates from external files.
 Uses Jinja2 for template rendering with support for variables and logic.
 Supports user-customizable prompts in ~/.editor_assistant/prompts/
+
+Templates are compiled once when the loader is created. Because document
+bodies can be megabytes long, they are not rendered through Jinja on every
+call: each template is rendered once with placeholder sentinels in place of
+the document contents, split into static segments, and cached. A prompt is
+then assembled with a single join of the cached segments and the contents,
+and its token estimate is the cached segment estimates plus the estimates
+of the contents. Templates whose output cannot be split cleanly (e.g. a
+filter applied to the content) fall back to a full Jinja render.
 """
 
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
 from jinja2 import Environment, FileSystemLoader
 
+from ..utils import estimate_tokens
+
 # Prompt files
 RESEARCH_OUTLINER_PROMPT_FILE = "research_outliner.txt"
 NEWS_GENERATOR_PROMPT_FILE = "news_generator.txt"
 TRANSLATOR_PROMPT_FILE = "translator.txt"
 
+# Maximum number of cached segment lists (one per template + static context)
+PROMPT_PARTS_CACHE_SIZE = 256
+
+# Hex digits of a template's SHA-256 kept as its version
+PROMPT_VERSION_LENGTH = 12
+
+
+def _sentinel(index: int) -> str:
+    # Mixed case and edge whitespace, so filters like upper/lower/trim alter it
+    # and the template is detected as not splittable
+    return f" \n\x00ea-Content-{index}\x00\n "
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """Static segments of a rendered template, around N content slots."""
+    segments: Tuple[str, ...]
+    segment_tokens: int
+
+    def assemble(self, contents: Sequence[str]) -> str:
+        """Interleave segments and contents with a single join."""
+        pieces: List[str] = [self.segments[0]]
+        for content, segment in zip(contents, self.segments[1:]):
+            pieces.append(content)
+            pieces.append(segment)
+        return "".join(pieces)
+
+
+@dataclass(frozen=True)
+class BuiltPrompt:
+    """An assembled prompt and its token estimate."""
+    text: str
+    estimated_tokens: int
+
+
 class PromptLoader:
     """Loads and renders prompt templates from user config or fallback to source."""
-    
-    def __init__(self):
-        self.prompts_dir = Path(__file__).parent / "prompts"
-        
+
+    def __init__(self, prompts_dir: Optional[Path] = None):
+        self.prompts_dir = Path(prompts_dir) if prompts_dir else Path(__file__).parent / "prompts"
+
         # Create Jinja2 environment
         self.env = None
-        
+        self.templates: Dict[str, Any] = {}
+        self._parts_cache: "OrderedDict[Tuple[str, Hashable], Optional[PromptParts]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+
         if self.prompts_dir.exists():
             self.env = Environment(
                 loader=FileSystemLoader(str(self.prompts_dir)),
                 trim_blocks=True,
                 lstrip_blocks=True
             )
-    
-    def render(self, template_name: str, **kwargs) -> str:
-        """Load and render a template with the provided variables."""
-        # Try user template first, fallback to source template
-        try:
-            if self.env:
+            # Precompile all templates once
+            for template_name in self.env.list_templates(extensions=["txt"]):
+                self.templates[template_name] = self.env.get_template(template_name)
+
+    def _get_template(self, template_name: str):
+        template = self.templates.get(template_name)
+        if template is None:
+            if not self.env:
+                raise FileNotFoundError(f"Template '{template_name}' not found in prompt directories")
+            try:
                 template = self.env.get_template(template_name)
-                return template.render(**kwargs)
-        except:
-            raise FileNotFoundError(f"Template '{template_name}' not found in prompt directories")
+            except Exception:
+                raise FileNotFoundError(f"Template '{template_name}' not found in prompt directories")
+            self.templates[template_name] = template
+        return template
+
+    def template_version(self, template_name: str) -> str:
+        """
+        Version of a template: a short hash of its source.
+
+        Runs record it, so an edited prompt counts as a different run
+        configuration (batch skips only runs made with the same prompt).
+        """
+        version = self._versions.get(template_name)
+        if version is None:
+            self._get_template(template_name)  # Same not-found error as render()
+            source = self.env.loader.get_source(self.env, template_name)[0]
+            version = hashlib.sha256(source.encode("utf-8")).hexdigest()[:PROMPT_VERSION_LENGTH]
+            self._versions[template_name] = version
+        return version
+
+    def render(self, template_name: str, **kwargs) -> str:
+        """Load and render a template with the provided variables (full Jinja render)."""
+        return self._get_template(template_name).render(**kwargs)
+
+    def get_parts(
+        self,
+        template_name: str,
+        slots: int,
+        make_context: Callable[[Sequence[str]], Dict[str, Any]],
+        key: Hashable = None,
+    ) -> Optional[PromptParts]:
+        """
+        Split a template into static segments around `slots` content slots.
+
+        Args:
+            template_name: Template file name
+            slots: Number of document contents in the template
+            make_context: Builds the render context from a list of contents
+            key: Identifies the static (non-content) context for caching
+
+        Returns:
+            PromptParts, or None if the template output cannot be split cleanly
+        """
+        cache_key = (template_name, slots, key)
+        if cache_key in self._parts_cache:
+            self._parts_cache.move_to_end(cache_key)
+            return self._parts_cache[cache_key]
+
+        sentinels = [_sentinel(i) for i in range(slots)]
+        rendered = self.render(template_name, **make_context(sentinels))
+
+        parts: Optional[PromptParts] = None
+        segments = []
+        rest = rendered
+        for sentinel in sentinels:
+            head, found, rest = rest.partition(sentinel)
+            if not found or sentinel in rest:
+                break
+            segments.append(head)
+        else:
+            segments.append(rest)
+            if not any("\x00ea-Content-" in segment for segment in segments):
+                parts = PromptParts(
+                    segments=tuple(segments),
+                    segment_tokens=sum(estimate_tokens(segment) for segment in segments),
+                )
+
+        self._parts_cache[cache_key] = parts
+        if len(self._parts_cache) > PROMPT_PARTS_CACHE_SIZE:
+            self._parts_cache.popitem(last=False)
+        return parts
+
+    def build(
+        self,
+        template_name: str,
+        contents: Sequence[str],
+        make_context: Callable[[Sequence[str]], Dict[str, Any]],
+        key: Hashable = None,
+    ) -> BuiltPrompt:
+        """
+        Assemble a prompt from cached segments and the given contents.
+
+        Args:
+            template_name: Template file name
+            contents: Document contents, in template order
+            make_context: Builds the render context from a list of contents
+            key: Identifies the static (non-content) context for caching
+
+        Returns:
+            BuiltPrompt with the prompt text and its token estimate
+        """
+        contents = [content or "" for content in contents]
+        parts = self.get_parts(template_name, len(contents), make_context, key)
+        if parts is None:
+            text = self.render(template_name, **make_context(contents))
+            return BuiltPrompt(text=text, estimated_tokens=estimate_tokens(text))
+        return BuiltPrompt(
+            text=parts.assemble(contents),
+            estimated_tokens=parts.segment_tokens + sum(estimate_tokens(c) for c in contents),
+        )
+
 
 # Global loader instance
 _loader = PromptLoader()
 
+
+def prompt_version(template_name: str) -> str:
+    """Version (short source hash) of a prompt template."""
+    return _loader.template_version(template_name)
+
+
+def build_research_outliner_prompt(content: str) -> BuiltPrompt:
+    """Build the research outliner prompt for one paper."""
+    return _loader.build(
+        RESEARCH_OUTLINER_PROMPT_FILE,
+        [content],
+        lambda contents: {"content": contents[0]},
+    )
+
+
+def build_translation_prompt(content: str, title: str = "") -> BuiltPrompt:
+    """Build the translation prompt for one document."""
+    return _loader.build(
+        TRANSLATOR_PROMPT_FILE,
+        [content],
+        lambda contents: {"content": contents[0], "title": title},
+        key=title,
+    )
+
+
+def build_news_generator_prompt(articles: List[Any]) -> BuiltPrompt:
+    """Build the news generator prompt for one or more articles."""
+    def make_context(contents: Sequence[str]) -> Dict[str, Any]:
+        return {
+            "articles": [
+                article.model_copy(update={"content": content})
+                for article, content in zip(articles, contents)
+            ]
+        }
+
+    # Segments depend on everything but the contents
+    key = tuple(repr(article.model_dump(exclude={"content"})) for article in articles)
+    return _loader.build(
+        NEWS_GENERATOR_PROMPT_FILE,
+        [article.content for article in articles],
+        make_context,
+        key=key,
+    )
+
+
 # Simplified convenience functions
 def load_research_outliner_prompt(**kwargs) -> str:
     """Load research outliner prompt with fallback system."""
+    if set(kwargs) == {"content"}:
+        return build_research_outliner_prompt(kwargs["content"]).text
     return _loader.render(RESEARCH_OUTLINER_PROMPT_FILE, **kwargs)
 
 def load_news_generator_prompt(**kwargs) -> str:
     """Load news generator prompt with fallback system."""
+    if set(kwargs) == {"articles"} and all(hasattr(a, "model_copy") for a in kwargs["articles"]):
+        return build_news_generator_prompt(kwargs["articles"]).text
     return _loader.render(NEWS_GENERATOR_PROMPT_FILE, **kwargs)
 
 def load_translation_prompt(**kwargs) -> str:
     """Load translation prompt with fallback system."""
+    if set(kwargs) <= {"content", "title"} and "content" in kwargs:
+        return build_translation_prompt(kwargs["content"], kwargs.get("title", "")).text
     return _loader.render(TRANSLATOR_PROMPT_FILE, **kwargs)
 
 
@@ -66,4 +273,4 @@ if __name__ == "__main__":
         )
         print(f"Test render successful. Length: {len(rendered)} characters")
     except Exception as e:
-        print(f"Test render failed: {e}") 
\ No newline at end of file
+        print(f"Test render failed: {e}")
@@ -0,0 +1,80 @@
+"""
+Cached model-name index for fast CLI startup.
+
+Loading `llm_models` parses llm_config.yml and validates every provider with
+pydantic, which dominates CLI startup time. Argparse only needs the model
+names for `--model` choices, so they are cached in a small JSON file next to
+the run database, keyed by the YAML file's size and mtime (and the package
+version). The cache is rebuilt automatically when the YAML changes.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import __version__
+from .constants import MODEL_INDEX_FILENAME
+
+
+def _get_config_path() -> Path:
+    """Get path to llm_config.yml."""
+    return Path(__file__).parent / "llm_config.yml"
+
+
+def _get_index_path() -> Path:
+    """Index file next to the run database (respects test isolation)."""
+    from ..storage.database import get_database_path
+    return get_database_path().parent / MODEL_INDEX_FILENAME
+
+
+def _fingerprint(config_path: Path) -> Dict[str, Any]:
+    stat = config_path.stat()
+    return {
+        "config": str(config_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "version": __version__,
+    }
+
+
+def _read_index(index_path: Path, fingerprint: Dict[str, Any]) -> Optional[List[str]]:
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != fingerprint or not isinstance(data.get("models"), list):
+        return None
+    return data["models"]
+
+
+def _write_index(index_path: Path, fingerprint: Dict[str, Any], names: List[str]) -> None:
+    tmp_path = index_path.with_suffix(f".tmp{os.getpid()}")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "models": names}, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        # The index is an optimization; a read-only data dir just means no cache
+        pass
+
+
+def get_model_names() -> List[str]:
+    """
+    Return all supported model names, from the cached index when it is fresh.
+
+    Falls back to loading llm_models (and refreshes the index) on a miss.
+    """
+    config_path = _get_config_path()
+    fingerprint = _fingerprint(config_path)
+    index_path = _get_index_path()
+
+    names = _read_index(index_path, fingerprint)
+    if names is not None:
+        return names
+
+    from .llm_models import get_supported_models
+    names = list(get_supported_models())
+    _write_index(index_path, fingerprint, names)
+    return names
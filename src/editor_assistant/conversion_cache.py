@@ -0,0 +1,152 @@
+"""
+Content-addressed cache for converted documents.
+
+Converting a large PDF/DOCX with MarkItDown takes seconds, and batch runs
+over the same folder convert the same files again and again. This module
+stores the result of a conversion (markdown, title, authors, converter)
+keyed by the SHA-256 of the file bytes plus the converter version, so an
+unchanged file is never converted twice.
+
+Layout on disk (under the data directory, next to runs.db):
+
+    conversion_cache/<first 2 hex chars>/<sha256>-<version tag>.json.gz
+
+Only local files are cached; URLs can change between runs.
+"""
+
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from .data_models import MDArticle, InputType
+from .config.constants import (
+    CONVERSION_CACHE_DIR_NAME,
+    CONVERSION_CACHE_VERSION,
+)
+
+
+def get_converter_version() -> str:
+    """
+    Version tag of the conversion toolchain.
+
+    Bumping CONVERSION_CACHE_VERSION or upgrading MarkItDown invalidates
+    every cached entry, because the converted markdown may differ.
+    """
+    try:
+        from importlib.metadata import version
+        markitdown_version = version("markitdown")
+    except Exception:
+        markitdown_version = "unknown"
+    return f"{CONVERSION_CACHE_VERSION}.{markitdown_version}"
+
+
+def get_default_cache_dir() -> Path:
+    """Cache directory next to the run database (respects test isolation)."""
+    from .storage.database import get_database_path
+    return get_database_path().parent / CONVERSION_CACHE_DIR_NAME
+
+
+class ConversionCache:
+    """Content-addressed store of conversion results (file hash + converter version)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, converter_version: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Optional cache directory. Uses the default data directory if not provided.
+            converter_version: Optional version tag override (mainly for tests)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else get_default_cache_dir()
+        self.converter_version = converter_version or get_converter_version()
+        self.logger = logging.getLogger(__name__)
+        self._hits = 0
+        self._misses = 0
+
+    def is_cacheable(self, path: str) -> bool:
+        """Only existing local files are cached (not URLs, not plain markdown)."""
+        if path.startswith(("http://", "https://")):
+            return False
+        return os.path.isfile(path)
+
+    def make_key(self, file_hash: str) -> str:
+        """Build the cache key from the file hash and the converter version."""
+        return f"{file_hash}-{self.converter_version}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str, input_type: InputType, source_path: str) -> Optional[MDArticle]:
+        """
+        Look up a cached conversion.
+
+        Args:
+            key: Cache key from make_key()
+            input_type: Type to assign to the returned article
+            source_path: Source path to assign to the returned article
+
+        Returns:
+            MDArticle on hit, None on miss (or unreadable entry)
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with gzip.open(entry_path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Ignoring corrupt conversion cache entry {entry_path}: {e}")
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return MDArticle(
+            type=input_type,
+            content=data.get("content"),
+            title=data.get("title"),
+            authors=data.get("authors"),
+            converter=data.get("converter"),
+            source_path=source_path,
+            # Existing file: MDProcessor derives the output directory from its parent
+            output_path=Path(source_path),
+        )
+
+    def put(self, key: str, article: MDArticle) -> None:
+        """
+        Store a conversion result. Writes atomically (temp file + rename).
+
+        Args:
+            key: Cache key from make_key()
+            article: Converted article
+        """
+        entry_path = self._entry_path(key)
+        data: Dict[str, Any] = {
+            "content": article.content,
+            "title": article.title,
+            "authors": article.authors,
+            "converter": article.converter,
+            "converter_version": self.converter_version,
+        }
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(f".tmp{os.getpid()}")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            # Caching is an optimization; never fail a conversion because of it
+            self.logger.debug(f"Failed to write conversion cache entry {entry_path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics."""
+        total = self._hits + self._misses
+        hit_rate = (self._hits / total * 100) if total > 0 else 0
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": f"{hit_rate:.1f}%",
+        }
@@ -0,0 +1,418 @@
+"""
+Process-pool conversion backend.
+
+PDF/DOCX parsing and readability extraction are CPU-bound and hold the GIL,
+so converting through `asyncio.to_thread` uses a single core no matter how
+many conversions run "in parallel". This module runs conversions in a pool
+of warm worker processes instead:
+
+- Workers are long-lived and import MarkItDown once at startup (warm start).
+- Each task has a timeout; a worker that exceeds it is killed and replaced,
+  so one pathological PDF cannot hang a whole batch.
+- Workers report their RSS after every task and are recycled when they
+  exceed the memory cap (or a maximum number of tasks), which bounds leaks
+  in the parsing libraries.
+
+Workers communicate with the event loop over pipes watched with
+`loop.add_reader()`, so waiting for results does not occupy executor threads.
+Once a reply starts arriving it is read in a thread, so a multi-MB article
+does not block the loop while the worker finishes writing it.
+
+A worker that cannot be replaced after CONVERSION_WORKER_SPAWN_ATTEMPTS
+marks the pool broken: waiting and later conversions fail with
+ConversionWorkerError instead of waiting for a worker that never comes.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from .data_models import MDArticle, InputType
+from .config.constants import (
+    CONVERSION_TIMEOUT_SECONDS,
+    CONVERSION_WORKER_MAX_RSS_MB,
+    CONVERSION_WORKER_MAX_TASKS,
+    CONVERSION_WORKER_SPAWN_ATTEMPTS,
+    CONVERSION_WORKER_SPAWN_RETRY_SECONDS,
+)
+
+
+class ConversionWorkerError(Exception):
+    """Raised when a conversion worker fails (crash, broken pipe)."""
+    pass
+
+
+class ConversionTimeoutError(ConversionWorkerError):
+    """Raised when a conversion exceeds the per-task timeout."""
+    pass
+
+
+# =============================================================================
+# Worker-side code (runs in child processes)
+# =============================================================================
+
+_worker_converter = None
+
+
+def _current_rss_mb() -> float:
+    """Resident set size of the current process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to peak RSS (KB on Linux, bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _preload_converter() -> None:
+    """Create the process-local converter and import MarkItDown eagerly."""
+    global _worker_converter
+    from .md_converter import MarkdownConverter
+    _worker_converter = MarkdownConverter()
+    _worker_converter.markitdown  # noqa: B018 - triggers the lazy import
+
+
+def convert_in_worker(path: str, type_value: str) -> Optional[Dict[str, Any]]:
+    """
+    Default worker job: convert one input with the process-local converter.
+
+    Returns:
+        MDArticle fields as a dict (picklable), or None if conversion failed
+    """
+    if _worker_converter is None:
+        _preload_converter()
+    article = _worker_converter.convert_content(path, type=InputType(type_value))
+    return article.model_dump() if article is not None else None
+
+
+def _worker_main(conn, job_fn: Callable[..., Any], preload: bool) -> None:
+    """Worker loop: receive job args, run job_fn, send (status, payload, rss_mb)."""
+    if preload:
+        try:
+            _preload_converter()
+        except Exception:
+            # Conversion will retry the import and report the error per task
+            pass
+
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, OSError):
+            break
+        if args is None:
+            break
+
+        try:
+            reply = ("ok", job_fn(*args))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply + (_current_rss_mb(),))
+        except (BrokenPipeError, OSError):
+            break
+
+
+# =============================================================================
+# Parent-side pool
+# =============================================================================
+
+class _Worker:
+    """Handle to one worker process."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks_done = 0
+        self.last_rss_mb = 0.0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2)
+        self.kill()
+
+
+class ConversionPool:
+    """
+    Pool of warm conversion worker processes (Async interface).
+
+    Usage:
+        pool = ConversionPool(workers=8, task_timeout=120)
+        article = await pool.convert("paper.pdf", InputType.PAPER)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        task_timeout: float = CONVERSION_TIMEOUT_SECONDS,
+        max_rss_mb: float = CONVERSION_WORKER_MAX_RSS_MB,
+        max_tasks_per_worker: int = CONVERSION_WORKER_MAX_TASKS,
+        preload: bool = True,
+        job_fn: Callable[..., Any] = convert_in_worker,
+        start_method: str = "spawn",
+    ):
+        """
+        Initialize the pool (workers start lazily on first use).
+
+        Args:
+            workers: Number of worker processes (default: CPU count)
+            task_timeout: Per-task timeout in seconds (0 = no timeout)
+            max_rss_mb: Recycle a worker once its RSS exceeds this (0 = no limit)
+            max_tasks_per_worker: Recycle a worker after this many tasks (0 = no limit)
+            preload: Import MarkItDown in workers at startup
+            job_fn: Picklable module-level function run in workers
+            start_method: multiprocessing start method ("spawn" is safe with threads)
+        """
+        self.num_workers = workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.preload = preload
+        self.job_fn = job_fn
+        self._ctx = multiprocessing.get_context(start_method)
+        self.logger = logging.getLogger(__name__)
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._failure: Optional[str] = None
+        self._background: set = set()
+        self._stats = {"tasks": 0, "failures": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def _spawn_worker(self) -> _Worker:
+        """Start one worker process (blocking; call via to_thread)."""
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.job_fn, self.preload),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    async def start(self) -> None:
+        """Start all workers (idempotent)."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            if self._closed:
+                raise RuntimeError("ConversionPool is closed")
+            self._idle = asyncio.Queue()
+            workers = await asyncio.gather(*[
+                asyncio.to_thread(self._spawn_worker) for _ in range(self.num_workers)
+            ], return_exceptions=True)
+            for worker in workers:
+                if isinstance(worker, Exception):
+                    self.logger.warning(f"Failed to start conversion worker: {worker!r}")
+                    self._in_background(self._respawn())
+                    continue
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+
+    async def _respawn(self) -> None:
+        """Start a worker for the idle queue, retrying; mark the pool broken if it cannot."""
+        error = None
+        for attempt in range(1, CONVERSION_WORKER_SPAWN_ATTEMPTS + 1):
+            if self._closed:
+                return
+            try:
+                new_worker = await asyncio.to_thread(self._spawn_worker)
+            except Exception as e:
+                error = e
+                self.logger.warning(
+                    f"Failed to start conversion worker "
+                    f"(attempt {attempt}/{CONVERSION_WORKER_SPAWN_ATTEMPTS}): {e!r}"
+                )
+                await asyncio.sleep(CONVERSION_WORKER_SPAWN_RETRY_SECONDS * attempt)
+                continue
+            self._workers.append(new_worker)
+            self._idle.put_nowait(new_worker)
+            return
+        if not self._closed and self._failure is None:
+            self._failure = f"Could not start a conversion worker: {error!r}"
+            self.logger.error(self._failure)
+            self._idle.put_nowait(None)
+
+    async def _replace(self, worker: _Worker) -> None:
+        """Kill a worker and return a fresh one to the idle queue."""
+        await asyncio.to_thread(worker.kill)
+        if worker in self._workers:
+            self._workers.remove(worker)
+        await self._respawn()
+
+    async def _retire(self, worker: _Worker) -> None:
+        """Gracefully stop a worker that reached its memory/task limit."""
+        self._stats["recycled"] += 1
+        await asyncio.to_thread(worker.stop)
+        if worker in self._workers:
+            self._workers.remove(worker)
+        await self._respawn()
+
+    async def _acquire(self) -> _Worker:
+        """
+        Take an idle worker.
+
+        Raises:
+            ConversionWorkerError: If the pool is broken or closed while waiting
+        """
+        idle = self._idle
+        worker = await idle.get()
+        if worker is None:
+            # Pass the wake-up on to the next waiter
+            idle.put_nowait(None)
+            raise ConversionWorkerError(self._failure or "ConversionPool is closed")
+        return worker
+
+    def _in_background(self, coro) -> None:
+        """Run worker replacement without blocking the caller (keeps a strong ref)."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        """Stop all workers (submit() calls waiting for one fail)."""
+        self._closed = True
+        if self._idle is not None:
+            self._idle.put_nowait(None)
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*[asyncio.to_thread(w.stop) for w in workers])
+        self._idle = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # -------------------------------------------------------------------------
+    # Task execution
+    # -------------------------------------------------------------------------
+
+    async def _wait_readable(self, worker: _Worker) -> None:
+        """Wait until the worker's pipe has data (or EOF), honoring the timeout."""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = worker.conn.fileno()
+
+        def on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            await asyncio.wait_for(readable, self.task_timeout or None)
+        finally:
+            loop.remove_reader(fd)
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        if self.max_rss_mb and worker.last_rss_mb > self.max_rss_mb:
+            return True
+        if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+            return True
+        return False
+
+    async def submit(self, *args) -> Any:
+        """
+        Run job_fn(*args) in a worker process.
+
+        Raises:
+            ConversionTimeoutError: If the task exceeds task_timeout
+            ConversionWorkerError: If the worker crashed, the job raised, or
+                                   the pool is broken or closed
+        """
+        await self.start()
+        if self._failure:
+            raise ConversionWorkerError(self._failure)
+        worker = await self._acquire()
+        self._stats["tasks"] += 1
+
+        try:
+            worker.conn.send(args)
+            await self._wait_readable(worker)
+            # The reply has started arriving; read the rest of it off the loop
+            status, payload, rss_mb = await asyncio.to_thread(worker.conn.recv)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            self.logger.warning(
+                f"Conversion timed out after {self.task_timeout}s "
+                f"(worker {worker.pid}); restarting worker"
+            )
+            self._in_background(self._replace(worker))
+            raise ConversionTimeoutError(f"Conversion timed out after {self.task_timeout}s")
+        except (EOFError, OSError) as e:
+            self._stats["crashes"] += 1
+            exitcode = worker.process.exitcode
+            self._in_background(self._replace(worker))
+            raise ConversionWorkerError(f"Conversion worker died (exit code {exitcode}): {e!r}")
+        except asyncio.CancelledError:
+            # The worker may still be busy with our task; never reuse it
+            self._in_background(self._replace(worker))
+            raise
+
+        worker.tasks_done += 1
+        worker.last_rss_mb = rss_mb
+        if self._should_recycle(worker):
+            self.logger.debug(
+                f"Recycling conversion worker {worker.pid} "
+                f"(rss={rss_mb:.0f}MB, tasks={worker.tasks_done})"
+            )
+            self._in_background(self._retire(worker))
+        elif self._idle is not None:
+            self._idle.put_nowait(worker)
+
+        if status != "ok":
+            self._stats["failures"] += 1
+            raise ConversionWorkerError(payload)
+        return payload
+
+    async def convert(self, path: str, input_type: InputType = InputType.PAPER) -> Optional[MDArticle]:
+        """
+        Convert one input in a worker process.
+
+        Returns:
+            MDArticle, or None if the converter returned no result
+        """
+        data = await self.submit(path, input_type.value)
+        return MDArticle(**data) if data is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool statistics."""
+        return {
+            "workers": self.num_workers,
+            "alive": sum(1 for w in self._workers if w.process.is_alive()),
+            **self._stats,
+        }
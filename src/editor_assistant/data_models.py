@@ -1,7 +1,7 @@
 # This file contains the data models for the project.
 
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 from pathlib import Path
 
@@ -21,6 +21,9 @@ class Input(BaseModel):
     """
     type: InputType
     path: str
+    input_id: Optional[int] = None  # stored input to load the article from (resume)
+    source_hash: Optional[str] = None  # SHA-256 of the file's bytes, if already known (batch file index)
+    deadline: Optional[float] = None  # epoch seconds; earlier deadlines run first with the edf schedule
 
 # for the process type
 class ProcessType(str, Enum):
@@ -43,10 +46,32 @@ class MDArticle(BaseModel):
     converter: Optional[str] = None
     source_path: Optional[str] = None
     output_path: Optional[Path] = None
+    source_hash: Optional[str] = None  # SHA-256 of the local source file's bytes
 
     model_config = ConfigDict(arbitrary_types_allowed=True)  # Allow Path type
 
 
+# for the outcome of one input in a batch
+class ProcessResult(BaseModel):
+    """
+    Result of processing one input through the batch pipeline.
+    """
+    source_path: str
+    success: bool = False
+    run_id: int = -1
+    title: Optional[str] = None
+    error: Optional[str] = None
+    estimated_tokens: Optional[int] = None  # token estimate of the converted article
+    deadline: Optional[float] = None
+    finished_at: Optional[float] = None  # epoch seconds
+    budget_exhausted: bool = False  # not processed: the token/cost budget ran out
+    started_at: Optional[float] = None  # epoch seconds
+    output_paths: List[str] = []  # files written with save_files
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0  # in the model's pricing currency
+
+
 class SaveType(str, Enum):
     """
     Type of content to save.
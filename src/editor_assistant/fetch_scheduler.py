@@ -0,0 +1,259 @@
+"""
+Per-host politeness for source fetching.
+
+Batch briefs over news URLs often hit the same publisher many times at once.
+Every HTTP fetch made while converting inputs goes through one
+FetchScheduler, which enforces per host:
+
+- a concurrency cap (at most N requests in flight),
+- a minimum delay between request starts,
+- the `Crawl-delay` from the host's robots.txt, when it is larger,
+
+and records per-host statistics (requests, failures, bytes, latency) for the
+batch summary.
+
+The scheduler is thread-safe (conversions run in worker threads) and is
+shared per process via `get_fetch_scheduler()`. With the process conversion
+backend each worker process has its own scheduler, so caps apply per worker.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from .config.constants import (
+    DEFAULT_USER_AGENT,
+    FETCH_MAX_PER_HOST,
+    FETCH_MIN_DELAY_SECONDS,
+    FETCH_RESPECT_CRAWL_DELAY,
+    FETCH_ROBOTS_TIMEOUT_SECONDS,
+    FETCH_TIMEOUT_SECONDS,
+)
+
+
+@dataclass
+class FetchRecord:
+    """Mutable record of one fetch; callers set `bytes` when they know the size."""
+    url: str
+    bytes: int = 0
+
+
+@dataclass
+class _HostState:
+    """Limits and counters for one host."""
+    semaphore: threading.BoundedSemaphore
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    next_start: float = 0.0
+    crawl_delay: Optional[float] = None  # None = robots.txt not loaded yet
+    requests: int = 0
+    failures: int = 0
+    bytes: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+class FetchScheduler:
+    """
+    Per-host concurrency caps, delays and statistics for HTTP fetches.
+
+    Usage:
+        scheduler = get_fetch_scheduler()
+        response = scheduler.get("https://example.com/article")
+
+        # or around a fetch made by another library
+        with scheduler.slot(url) as record:
+            data = urllib.request.urlopen(url).read()
+            record.bytes = len(data)
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = FETCH_MAX_PER_HOST,
+        min_delay: float = FETCH_MIN_DELAY_SECONDS,
+        respect_crawl_delay: bool = FETCH_RESPECT_CRAWL_DELAY,
+        user_agent: str = DEFAULT_USER_AGENT,
+        timeout: float = FETCH_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_per_host: Maximum concurrent requests per host
+            min_delay: Minimum seconds between request starts to the same host
+            respect_crawl_delay: Honor `Crawl-delay` from robots.txt when larger than min_delay
+            user_agent: User-Agent for requests and robots.txt matching
+            timeout: Timeout for requests made via get()/head()
+        """
+        self.max_per_host = max(1, max_per_host)
+        self.min_delay = min_delay
+        self.respect_crawl_delay = respect_crawl_delay
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Host state
+    # -------------------------------------------------------------------------
+
+    def _host_state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = _HostState(semaphore=threading.BoundedSemaphore(self.max_per_host))
+                self._hosts[host] = state
+            return state
+
+    def _fetch_robots(self, scheme: str, host: str) -> Optional[float]:
+        """Load robots.txt and return the Crawl-delay for our user agent (if any)."""
+        import requests
+
+        robots_url = f"{scheme}://{host}/robots.txt"
+        try:
+            response = requests.get(
+                robots_url,
+                headers={"User-Agent": self.user_agent},
+                timeout=FETCH_ROBOTS_TIMEOUT_SECONDS,
+            )
+            if response.status_code != 200:
+                return None
+            parser = RobotFileParser(robots_url)
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay(self.user_agent)
+            return float(delay) if delay is not None else None
+        except Exception as e:
+            self.logger.debug(f"Could not read {robots_url}: {e}")
+            return None
+
+    def _delay_for(self, scheme: str, host: str, state: _HostState) -> float:
+        """Effective delay between request starts for a host."""
+        if not self.respect_crawl_delay:
+            return self.min_delay
+        if state.crawl_delay is None:
+            # Loaded once per host; concurrent first requests may both fetch it
+            state.crawl_delay = self._fetch_robots(scheme, host) or 0.0
+            if state.crawl_delay > self.min_delay:
+                self.logger.debug(f"Using robots.txt crawl-delay {state.crawl_delay}s for {host}")
+        return max(self.min_delay, state.crawl_delay)
+
+    # -------------------------------------------------------------------------
+    # Fetching
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[FetchRecord]:
+        """
+        Hold a fetch slot for the URL's host.
+
+        Blocks until the host is below its concurrency cap and its delay has
+        elapsed. Latency is measured over the body of the `with` block; an
+        exception inside it counts as a failure and is re-raised.
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        state = self._host_state(host)
+        record = FetchRecord(url=url)
+
+        with state.semaphore:
+            delay = self._delay_for(parsed.scheme or "https", host, state)
+            with state.lock:
+                now = time.monotonic()
+                start_at = max(now, state.next_start)
+                state.next_start = start_at + delay
+            if start_at > now:
+                time.sleep(start_at - now)
+
+            started = time.monotonic()
+            failed = False
+            try:
+                yield record
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                latency = time.monotonic() - started
+                with state.lock:
+                    state.requests += 1
+                    state.failures += int(failed)
+                    state.bytes += record.bytes
+                    state.total_latency += latency
+                    state.max_latency = max(state.max_latency, latency)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """
+        Make an HTTP request through the scheduler.
+
+        HTTP error statuses raise `requests.HTTPError` (and count as failures).
+
+        Returns:
+            requests.Response with the body loaded
+        """
+        import requests
+
+        headers = {"User-Agent": self.user_agent}
+        headers.update(kwargs.pop("headers", None) or {})
+        kwargs.setdefault("timeout", self.timeout)
+
+        with self.slot(url) as record:
+            response = requests.request(method, url, headers=headers, **kwargs)
+            record.bytes = len(response.content)
+            response.raise_for_status()
+        return response
+
+    def get(self, url: str, **kwargs: Any):
+        """GET a URL through the scheduler."""
+        return self.request("GET", url, **kwargs)
+
+    # -------------------------------------------------------------------------
+    # Statistics
+    # -------------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host statistics, keyed by host."""
+        stats = {}
+        with self._lock:
+            hosts = list(self._hosts.items())
+        for host, state in hosts:
+            with state.lock:
+                if state.requests == 0:
+                    continue
+                stats[host] = {
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "bytes": state.bytes,
+                    "avg_latency": state.total_latency / state.requests,
+                    "max_latency": state.max_latency,
+                }
+        return stats
+
+    def reset_stats(self) -> None:
+        """Forget all hosts (limits and statistics)."""
+        with self._lock:
+            self._hosts.clear()
+
+
+_scheduler: Optional[FetchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """Return the process-wide fetch scheduler (created on first use)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler()
+        return _scheduler
+
+
+def configure_fetch_scheduler(**kwargs: Any) -> FetchScheduler:
+    """Replace the process-wide scheduler with one built from the given settings."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = FetchScheduler(**kwargs)
+        return _scheduler
@@ -443,6 +443,10 @@ class LLMClient:
         
         return response_text, usage
 
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Cost of a request with these token counts, in the pricing currency."""
+        return (input_tokens * self.pricing.input + output_tokens * self.pricing.output) / 1_000_000
+
     def _track_usage(self, input_tokens: int, output_tokens: int, 
                      start_time: float, request_name: str) -> Dict[str, Any]:
         """Track token usage and costs. Returns usage for this request."""
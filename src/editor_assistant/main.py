@@ -1,23 +1,180 @@
 from .md_processor import MDProcessor
-from .data_models import MDArticle, InputType, Input, ProcessType
+from .data_models import MDArticle, InputType, Input, ProcessType, ProcessResult
 from .md_converter import MarkdownConverter
+from .conversion_cache import ConversionCache
+from .conversion_pool import ConversionPool
+from .pipeline import Pipeline, Stage
+from .scheduling import order_inputs, schedule_key
+from .budget import BudgetExceededError
+from .utils import estimate_tokens, hash_file
 from .config.logging_config import setup_logging, progress, error, warning, user_message
+from .config.constants import (
+    CONVERSION_CACHE_ENABLED,
+    CONVERSION_BACKEND,
+    CONVERSION_WORKERS,
+    CONVERSION_TIMEOUT_SECONDS,
+    CONVERSION_WORKER_MAX_RSS_MB,
+    PIPELINE_CONVERT_CONCURRENCY,
+    PIPELINE_LLM_CONCURRENCY,
+    PIPELINE_QUEUE_SIZE,
+    SCHEDULE_POLICY,
+)
 import logging
 import asyncio
+import time
 from pathlib import Path
-from typing import Union, Optional, Tuple, Dict, Callable
+from typing import Union, Optional, Tuple, Dict, Callable, List, AsyncIterable
 
 class EditorAssistant:
-    def __init__(self, model_name, debug_mode=False, thinking_level=None, stream=True):
+    def __init__(self, model_name, debug_mode=False, thinking_level=None, stream=True,
+                 use_conversion_cache=CONVERSION_CACHE_ENABLED,
+                 conversion_backend=CONVERSION_BACKEND,
+                 conversion_workers=CONVERSION_WORKERS,
+                 conversion_timeout=CONVERSION_TIMEOUT_SECONDS,
+                 conversion_max_rss_mb=CONVERSION_WORKER_MAX_RSS_MB,
+                 llm_concurrency=PIPELINE_LLM_CONCURRENCY,
+                 reconvert=False,
+                 db=None,
+                 budget=None):
         setup_logging(debug_mode)
         self.logger = logging.getLogger(__name__)
-        self.md_processor = MDProcessor(model_name, thinking_level=thinking_level, stream=stream)
+        # db: run-history facade shared with other assistants (see MDProcessor)
+        # budget: token/cost budget shared with other assistants (see budget.py)
+        self.md_processor = MDProcessor(model_name, thinking_level=thinking_level, stream=stream,
+                                        max_concurrent=llm_concurrency, db=db, budget=budget)
+        self.budget = budget
+        self.llm_concurrency = llm_concurrency
         self.md_converter = MarkdownConverter()
-    
+        self.conversion_cache = ConversionCache() if use_conversion_cache else None
+        # Convert every source again instead of loading articles stored by earlier runs
+        self.reconvert = reconvert
+        # In-flight conversions keyed by cache key, so identical files in one batch convert once
+        self._inflight_conversions: Dict[str, asyncio.Future] = {}
+
+        if conversion_backend not in ("thread", "process"):
+            raise ValueError(f"Unknown conversion backend: {conversion_backend}")
+        self.conversion_backend = conversion_backend
+        self.conversion_pool: Optional[ConversionPool] = None
+        if conversion_backend == "process":
+            # Workers start lazily on the first conversion
+            self.conversion_pool = ConversionPool(
+                workers=conversion_workers or None,
+                task_timeout=conversion_timeout,
+                max_rss_mb=conversion_max_rss_mb,
+            )
+
+    async def aclose(self) -> None:
+        """Release long-lived resources (conversion workers, DB threads)."""
+        if self.conversion_pool is not None:
+            await self.conversion_pool.close()
+        await self.md_processor.aclose()
+
+    async def _convert(self, input: Input) -> Optional[MDArticle]:
+        """Run the converter on the configured backend (thread or worker process)."""
+        if self.conversion_pool is not None:
+            return await self.conversion_pool.convert(input.path, input.type)
+        return await asyncio.to_thread(
+            self.md_converter.convert_content, input.path, type=input.type
+        )
+
+    async def _convert_with_cache(self, input: Input, file_hash: str) -> Tuple[Optional[MDArticle], Optional[str]]:
+        """
+        Convert a local file through the content-addressed conversion cache.
+
+        Concurrent conversions of the same file bytes are coalesced: the first
+        caller converts, later callers await its result. With `reconvert` the
+        cached entry is not read but replaced.
+        """
+        key = self.conversion_cache.make_key(file_hash)
+
+        inflight = self._inflight_conversions.get(key)
+        if inflight is not None:
+            article, err_msg = await asyncio.shield(inflight)
+            if article is None:
+                return None, err_msg
+            # Same bytes, possibly a different path: rebind source metadata
+            return article.model_copy(update={
+                "type": input.type,
+                "source_path": input.path,
+                "output_path": Path(input.path),
+            }), None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_conversions[key] = future
+        result: Tuple[Optional[MDArticle], Optional[str]] = (None, "conversion cancelled")
+        try:
+            article = None
+            if not self.reconvert:
+                article = await asyncio.to_thread(self.conversion_cache.get, key, input.type, input.path)
+            if article is not None:
+                self.logger.debug(f"Conversion cache hit: {input.path}")
+                result = (article, None)
+            else:
+                article = await self._convert(input)
+                if article is None:
+                    result = (None, "conversion returned None")
+                else:
+                    await asyncio.to_thread(self.conversion_cache.put, key, article)
+                    result = (article, None)
+        except Exception as e:
+            result = (None, str(e))
+        finally:
+            del self._inflight_conversions[key]
+            future.set_result(result)
+        return result
+
+    async def _load_stored_article(self, input: Input, file_hash: Optional[str]) -> Optional[MDArticle]:
+        """
+        The article an earlier run stored for this source, if any.
+
+        Resumed inputs are loaded by id; local files by the hash of their
+        bytes (an edited file converts again); URLs by address.
+        """
+        db = self.md_processor.db
+        if input.input_id is not None:
+            stored = await db.get_input_article(input.input_id)
+        elif file_hash is not None:
+            stored = await db.find_input_article(source_hash=file_hash)
+        elif input.path.startswith(("http://", "https://")):
+            stored = await db.find_input_article(source_path=input.path)
+        else:
+            return None
+        if stored is None:
+            return None
+
+        if input.path.startswith(("http://", "https://")):
+            # Same directory the converter writes web pages to
+            output_path = Path(input.path.replace("https:", "webpage")).parent
+        else:
+            output_path = Path(input.path)
+        self.logger.debug(f"Loaded stored article for {input.path} (input #{stored['id']})")
+        return MDArticle(
+            type=input.type,
+            content=stored["content"],
+            title=stored["title"],
+            source_path=input.path,
+            output_path=output_path,
+            source_hash=file_hash,
+        )
+
     async def _process_input_to_article(self, input: Input) -> Tuple[Optional[MDArticle], Optional[str]]:
         """Helper to convert/read input to MDArticle (Async via thread pool)."""
         try:
-            if input.path.endswith(".md"):
+            is_markdown = input.path.endswith(".md")
+            file_hash = input.source_hash
+            if file_hash is None and not input.path.startswith(("http://", "https://")) and Path(input.path).is_file():
+                file_hash = await asyncio.to_thread(hash_file, input.path)
+
+            if not self.reconvert and (input.input_id is not None or not is_markdown):
+                try:
+                    article = await self._load_stored_article(input, file_hash)
+                except Exception as e:
+                    self.logger.warning(f"Failed to load stored article for {input.path}: {e}")
+                    article = None
+                if article is not None:
+                    return article, None
+
+            if is_markdown:
                 # File I/O in thread
                 def read_md():
                     with open(input.path, 'r', encoding='utf-8') as f:
@@ -30,28 +187,56 @@ class EditorAssistant:
                     title=Path(input.path).stem,
                     source_path=input.path,
                     output_path=input.path,
+                    source_hash=file_hash,
                 ), None
+            elif file_hash is not None and self.conversion_cache:
+                md_article, err_msg = await self._convert_with_cache(input, file_hash)
             else:
-                # Conversion in thread (CPU/IO bound)
-                md_article = await asyncio.to_thread(
-                    self.md_converter.convert_content, input.path, type=input.type
-                )
-                if md_article:
-                    return md_article, None
-                else:
-                    return None, "conversion returned None"
+                # Conversion in thread or worker process (CPU/IO bound)
+                md_article = await self._convert(input)
+                err_msg = None if md_article else "conversion returned None"
+            if md_article is None:
+                return None, err_msg
+            # Recorded with the input, so reruns of the same bytes find the article
+            return md_article.model_copy(update={"source_hash": file_hash}), None
         except Exception as e:
             return None, str(e)
 
     # LLM processor for multiple files (Async)
-    async def process_multiple(self, inputs: list[Input], process_type: Union[ProcessType, str], 
+    async def process_multiple(self, inputs: Union[List[Input], AsyncIterable[Input]],
+                             process_type: Union[ProcessType, str],
                              output_to_console=True, save_files=False,
                              progress_callbacks: Dict[str, Callable[[str], None]] = None,
-                             done_callback: Optional[Callable[[str, bool], None]] = None):       
+                             done_callback: Optional[Callable[[str, bool], None]] = None,
+                             schedule: str = SCHEDULE_POLICY,
+                             result_callback: Optional[Callable[[ProcessResult], None]] = None) -> List[ProcessResult]:
+        """
+        Process inputs as a pipeline: convert -> validate -> register -> LLM (+ persist).
+
+        Stages are connected by bounded queues with their own concurrency, so
+        the first LLM call starts as soon as the first document is converted,
+        and only a bounded number of article bodies are in memory at once.
+        Run records are created ahead of the LLM stage; registrations in flight
+        together are group-committed in one transaction by the DB writer.
+
+        Args:
+            inputs: Inputs to process (a list, or an async iterable that keeps producing)
+            process_type: Task to run on each input
+            progress_callbacks: Optional stream callbacks keyed by input path
+            done_callback: Optional callback(path, success) when an input finishes
+            schedule: Scheduling policy (see scheduling.py): the order in which
+                      a list of inputs is started, and in which converted
+                      articles get LLM slots
+            result_callback: Optional callback(result) with the complete
+                             ProcessResult when an input finishes
+
+        Returns:
+            One ProcessResult per input, in input order
+        """
         # early return if no paths are provided
-        if len(inputs) == 0:
+        if isinstance(inputs, list) and len(inputs) == 0:
             error("No input provided")
-            return
+            return []
 
         # Normalize task name (support both ProcessType enum and string)
         task_name = process_type.value if isinstance(process_type, ProcessType) else process_type
@@ -59,83 +244,118 @@ class EditorAssistant:
         # show clean progress message to user
         progress(f"Start to {task_name} with {self.md_processor.llm_client.model_name}")
 
-        # Step 1: Pre-process inputs (Convert/Read) - Parallel
-        progress(f"Converting/Reading {len(inputs)} inputs in parallel...")
-        
-        conversion_tasks = [self._process_input_to_article(inp) for inp in inputs]
-        conversion_results = await asyncio.gather(*conversion_tasks)
+        schedule_key(schedule, 0)  # Unknown policies fail before any work starts
+        results: List[ProcessResult] = []
+        not_admitted = 0
 
-        md_articles = []
-        failed_inputs = []
+        def finish(result: ProcessResult, success: bool, err_msg: Optional[str] = None) -> None:
+            result.success = success
+            result.finished_at = time.time()
+            if err_msg:
+                result.error = err_msg
+            if done_callback:
+                done_callback(result.source_path, success)
+            if result_callback:
+                result_callback(result)
 
-        for i, (article, err_msg) in enumerate(conversion_results):
-            if article:
-                md_articles.append(article)
+        async def source():
+            if hasattr(inputs, "__aiter__"):
+                # Results are registered in arrival order
+                async for inp in inputs:
+                    results.append(ProcessResult(source_path=inp.path, deadline=inp.deadline))
+                    yield inp, results[-1]
             else:
-                failed_inputs.append((inputs[i].path, err_msg))
-
-        if failed_inputs and not md_articles:
-            error(f"All inputs failed to convert: {failed_inputs}")
-            return
-        if failed_inputs:
-            for path, msg in failed_inputs:
-                warning(f"Failed to convert {path}: {msg}")
-            user_message(
-                f"{len(failed_inputs)} input(s) failed conversion; continuing with remaining."
-            )
+                # Results stay in input order; inputs start in schedule order
+                results.extend(ProcessResult(source_path=inp.path, deadline=inp.deadline) for inp in inputs)
+                by_input = {id(inp): result for inp, result in zip(inputs, results)}
+                for inp in order_inputs(inputs, schedule):
+                    yield inp, by_input[id(inp)]
+
+        async def convert_stage(item):
+            nonlocal not_admitted
+            inp, result = item
+            result.started_at = time.time()
+            if self.budget is not None and self.budget.exhausted:
+                # Stop admitting work; inputs already past this stage finish
+                result.budget_exhausted = True
+                not_admitted += 1
+                finish(result, False, "budget exhausted")
+                return None
+            article, err_msg = await self._process_input_to_article(inp)
+            if article is None:
+                warning(f"Failed to convert {inp.path}: {err_msg}")
+                finish(result, False, err_msg)
+                return None
+            result.title = article.title
+            return article, result
+
+        async def validate_stage(item):
+            article, result = item
+            if not self.md_processor.validate_articles([article], task_name):
+                finish(result, False, "validation failed")
+                return None
+            result.estimated_tokens = estimate_tokens(article.content or "")
+            return item
 
-        progress("Inputs ready. Starting parallel processing...")
-        
-        # process the md files concurrently
-        # Logic: We launch a task for each article.
-        tasks = []
-        for article in md_articles:
-            # Find callback for this file if available
+        async def register_stage(item):
+            article, result = item
+            result.run_id = await self.md_processor.register_run([article], task_name)
+            return item
+
+        async def llm_stage(item):
+            article, result = item
             callback = None
             if progress_callbacks:
                 # Key is the source path (absolute or relative as passed in input)
-                # We expect strict string matching
                 callback = progress_callbacks.get(str(article.source_path))
-
-            async def process_wrapper(art, task, out, save, cb, done_cb):
-                try:
-                    res = await self.md_processor.process_mds([art], task, out, save_files=save, stream_callback=cb)
-                    success = res[0] if isinstance(res, tuple) else False
-                    if done_cb:
-                        done_cb(str(art.source_path), success)
-                    return res
-                except Exception as e:
-                    if done_cb:
-                        done_cb(str(art.source_path), False)
-                    raise e
-
-            tasks.append(
-                process_wrapper(
-                    article,
-                    task_name,
-                    output_to_console,
-                    save_files,
-                    callback,
-                    done_callback
+            try:
+                success, run_id = await self.md_processor.process_mds(
+                    [article], task_name, output_to_console,
+                    save_files=save_files, stream_callback=callback, validated=True,
+                    run_id=result.run_id, result=result,
                 )
+            except BudgetExceededError as e:
+                result.budget_exhausted = True
+                finish(result, False, str(e))
+                return None
+            except Exception as e:
+                self.logger.warning(f"Failed to process {article.title}: {e}")
+                finish(result, False, str(e))
+                return None
+            result.run_id = run_id
+            if not success:
+                self.logger.warning(f"Failed to process {article.title} (Task returned failure)")
+            finish(result, success, None if success else "task returned failure")
+            return result
+
+        if self.conversion_pool is not None:
+            convert_concurrency = self.conversion_pool.num_workers
+        else:
+            convert_concurrency = PIPELINE_CONVERT_CONCURRENCY
+
+        def llm_priority(item):
+            result = item[1]
+            return schedule_key(schedule, result.estimated_tokens, result.deadline)
+
+        pipeline = Pipeline([
+            Stage("convert", convert_stage, concurrency=convert_concurrency),
+            Stage("validate", validate_stage),
+            Stage("register", register_stage, concurrency=PIPELINE_QUEUE_SIZE),
+            Stage("llm", llm_stage, concurrency=self.llm_concurrency,
+                  priority=llm_priority if schedule != "fifo" else None),
+        ])
+        progress("Processing inputs (convert -> validate -> register -> LLM pipeline)...")
+        await pipeline.run(source())
+
+        converted = pipeline.stats["convert"]["out"]
+        failed_conversions = pipeline.stats["convert"]["dropped"] - not_admitted
+        if not_admitted:
+            warning(f"Budget exhausted: {not_admitted} input(s) not started")
+        if failed_conversions and not converted:
+            error(f"All inputs failed to convert: {[(r.source_path, r.error) for r in results]}")
+        elif failed_conversions:
+            user_message(
+                f"{failed_conversions} input(s) failed conversion; the remaining inputs were processed."
             )
 
-        try:
-            # Run all tasks concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Check results
-            for i, result in enumerate(results):
-                article_title = md_articles[i].title
-                if isinstance(result, Exception):
-                    self.logger.warning(f"Failed to process {article_title}: {result}")
-                else:
-                    success, _ = result
-                    if not success:
-                        self.logger.warning(f"Failed to process {article_title} (Task returned failure)")
-                        
-        except Exception as e:
-            self.logger.warning(f"Critical error during concurrent processing: {str(e)}")
-            return
-         
-        return 
+        return results
@@ -0,0 +1,321 @@
+"""
+Manifest-driven batches: `editor-assistant batch --manifest jobs.jsonl`.
+
+Each line of the manifest is one job with its own inputs, task, model and
+options:
+
+    {"id": "q3-42", "task": "brief", "model": "deepseek-v3.2",
+     "inputs": ["paper=papers/a.pdf", "news=https://example.com/story"],
+     "options": {"thinking": "high", "save_files": true}}
+
+Inputs are `type=path` source specs (as on the command line), plain paths
+(papers) or {"type": ..., "path": ...} objects; "input" takes a single one.
+Missing task, model and options fall back to the command line. Blank lines
+and lines starting with '#' are skipped. The whole manifest is validated
+before anything runs, and errors name the line.
+
+Jobs run through the shared concurrency machinery: one assistant (LLM
+client, semaphore, conversion backend) per model and assistant options, and
+one process_multiple() pipeline per task and output option on it, all
+concurrent, sharing the DB writer, the fetch scheduler and any budget. Like
+the `brief` command, each input of a job gets its own run.
+
+Every result is handed to `emit` as a JSON-ready record the moment its input
+finishes, so downstream tools can consume results while the run goes on.
+"""
+
+import asyncio
+import json
+import sys
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .config.constants import SCHEDULE_POLICY
+from .config.logging_config import warning
+from .config.model_index import get_model_names
+from .data_models import Input, InputType, ProcessResult
+from .tasks import TaskRegistry
+
+# Per-job options and their types
+MANIFEST_OPTIONS = {"thinking": str, "save_files": bool, "reconvert": bool}
+
+
+class ManifestError(ValueError):
+    """Raised for a malformed manifest line."""
+    pass
+
+
+@dataclass
+class ManifestJob:
+    """One manifest line: inputs to run a task on with a model."""
+    line: int
+    task: str
+    model: str
+    inputs: List[Input]
+    id: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_source(spec: str) -> Input:
+    """
+    Parse a 'type=path' source spec (e.g. 'paper=file.pdf', 'news=url.com').
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    if "=" not in spec:
+        raise ValueError("Sources must be in format 'type=path' (e.g., paper=file.pdf, news=url.com)")
+
+    type_str, path = spec.split("=", 1)
+    type_str = type_str.strip().lower()
+
+    if type_str not in ["paper", "news"]:
+        raise ValueError(f"Invalid source type '{type_str}'. Use 'paper' or 'news'")
+
+    if not path.strip():
+        raise ValueError("Path cannot be empty in 'type=path' format")
+
+    src_type = InputType.PAPER if type_str == "paper" else InputType.NEWS
+    return Input(type=src_type, path=path.strip())
+
+
+def _parse_input(value: Any) -> Input:
+    if isinstance(value, dict):
+        return parse_source(f"{value.get('type', 'paper')}={value.get('path', '')}")
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid input {value!r}")
+    prefix = value.split("=", 1)[0].strip().lower()
+    if prefix in ("paper", "news"):
+        return parse_source(value)
+    return Input(type=InputType.PAPER, path=value)
+
+
+def parse_job(record: Any, line: int, task: Optional[str] = None, model: Optional[str] = None,
+              options: Optional[Dict[str, Any]] = None) -> ManifestJob:
+    """
+    Validate one manifest record.
+
+    Args:
+        record: Decoded JSON line
+        line: Line number, for errors
+        task, model, options: Defaults for fields the record leaves out
+
+    Raises:
+        ManifestError: If the record is not a valid job
+    """
+    if not isinstance(record, dict):
+        raise ManifestError(f"line {line}: expected a JSON object")
+    unknown = set(record) - {"id", "task", "model", "inputs", "input", "options"}
+    if unknown:
+        raise ManifestError(f"line {line}: unknown field(s) {', '.join(sorted(unknown))}")
+
+    task = record.get("task", task)
+    if task is None or TaskRegistry.get(task) is None:
+        raise ManifestError(f"line {line}: unknown or missing task {task!r} "
+                            f"(choose from {', '.join(TaskRegistry.list_tasks())}, or pass --task)")
+    model = record.get("model", model)
+    if model not in get_model_names():
+        raise ManifestError(f"line {line}: unknown or missing model {model!r}")
+
+    sources = record.get("inputs", [record["input"]] if "input" in record else [])
+    if isinstance(sources, str) or not sources:
+        raise ManifestError(f"line {line}: 'inputs' must be a non-empty list (or use 'input')")
+    try:
+        inputs = [_parse_input(source) for source in sources]
+    except ValueError as e:
+        raise ManifestError(f"line {line}: {e}")
+    if len(inputs) > 1 and not TaskRegistry.get(task).supports_multi_input:
+        raise ManifestError(f"line {line}: task '{task}' takes one input per job")
+
+    merged = dict(options or {})
+    job_options = record.get("options", {})
+    if not isinstance(job_options, dict):
+        raise ManifestError(f"line {line}: 'options' must be an object")
+    for name, value in job_options.items():
+        expected = MANIFEST_OPTIONS.get(name)
+        if expected is None:
+            raise ManifestError(f"line {line}: unknown option '{name}' "
+                                f"(choose from {', '.join(MANIFEST_OPTIONS)})")
+        if not isinstance(value, expected):
+            raise ManifestError(f"line {line}: option '{name}' must be a {expected.__name__}")
+        merged[name] = value
+
+    job_id = record.get("id")
+    return ManifestJob(line=line, task=task, model=model, inputs=inputs,
+                       id=None if job_id is None else str(job_id), options=merged)
+
+
+def load_manifest(path: Path, task: Optional[str] = None, model: Optional[str] = None,
+                  options: Optional[Dict[str, Any]] = None) -> List[ManifestJob]:
+    """
+    Read and validate a JSONL manifest.
+
+    Args:
+        path: Manifest file
+        task, model, options: Defaults for fields a line leaves out
+
+    Raises:
+        ManifestError: For the first malformed line
+        OSError: If the file cannot be read
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line, text in enumerate(f, 1):
+            text = text.strip()
+            if not text or text.startswith("#"):
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ManifestError(f"line {line}: invalid JSON ({e.msg})")
+            jobs.append(parse_job(record, line, task, model, options))
+    return jobs
+
+
+def result_record(job: ManifestJob, result: ProcessResult, currency: str = "") -> Dict[str, Any]:
+    """JSON-ready result of one input of a job."""
+    if result.success:
+        status = "success"
+    elif result.budget_exhausted:
+        status = "budget_exhausted"
+    else:
+        status = "failed"
+    latency = None
+    if result.started_at is not None and result.finished_at is not None:
+        latency = round(result.finished_at - result.started_at, 3)
+    return {
+        "id": job.id,
+        "line": job.line,
+        "task": job.task,
+        "model": job.model,
+        "source": result.source_path,
+        "status": status,
+        "run_id": result.run_id if result.run_id > 0 else None,
+        "error": result.error,
+        "output_paths": result.output_paths,
+        "input_tokens": result.input_tokens,
+        "output_tokens": result.output_tokens,
+        "cost": round(result.cost, 6),
+        "currency": currency,
+        "latency": latency,
+    }
+
+
+@contextmanager
+def open_results(target: str) -> Iterator[Callable[[Dict[str, Any]], None]]:
+    """
+    JSONL result writer: one line per record, flushed as it is written.
+
+    Args:
+        target: File path, or '-' for stdout
+    """
+    stream = sys.stdout if target == "-" else open(target, "w", encoding="utf-8")
+
+    def emit(record: Dict[str, Any]) -> None:
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stream.flush()
+
+    try:
+        yield emit
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+class ManifestRunner:
+    """Runs manifest jobs concurrently and emits each result as it completes."""
+
+    def __init__(
+        self,
+        jobs: List[ManifestJob],
+        assistant_factory: Callable[..., Any],
+        emit: Callable[[Dict[str, Any]], None],
+        schedule: str = SCHEDULE_POLICY,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            jobs: Validated jobs (load_manifest())
+            assistant_factory: Called as (model, thinking_level, reconvert) to
+                               create an assistant (EditorAssistant or a
+                               stand-in with process_multiple/aclose)
+            emit: Called with result_record() of every finished input
+            schedule: Scheduling policy of each pipeline
+        """
+        self.jobs = jobs
+        self.assistant_factory = assistant_factory
+        self.emit = emit
+        self.schedule = schedule
+        self.counts = {"success": 0, "failed": 0, "budget_exhausted": 0}
+        self._assistants: Dict[Tuple, Any] = {}
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Run every job and close the assistants.
+
+        Returns:
+            Number of results by status
+        """
+        groups: Dict[Tuple, List[ManifestJob]] = defaultdict(list)
+        for job in self.jobs:
+            options = job.options
+            groups[(job.model, options.get("thinking"), options.get("reconvert", False),
+                    job.task, options.get("save_files", False))].append(job)
+        try:
+            await asyncio.gather(*(self._run_group(key, jobs) for key, jobs in groups.items()))
+        finally:
+            for assistant in self._assistants.values():
+                await assistant.aclose()
+            self._assistants.clear()
+        return self.counts
+
+    async def _run_group(self, key: Tuple, jobs: List[ManifestJob]) -> None:
+        """One pipeline for the jobs sharing an assistant, task and output option."""
+        model, thinking, reconvert, task, save_files = key
+        assistant = self._assistant_for(model, thinking, reconvert)
+        llm_client = getattr(getattr(assistant, "md_processor", None), "llm_client", None)
+        currency = getattr(llm_client, "pricing_currency", "")
+
+        # Results name their source; jobs sharing a source take results in order
+        waiting: Dict[str, Deque[ManifestJob]] = defaultdict(deque)
+        inputs = []
+        for job in jobs:
+            for inp in job.inputs:
+                waiting[inp.path].append(job)
+                inputs.append(inp)
+
+        def on_result(result: ProcessResult) -> None:
+            job = waiting[result.source_path].popleft()
+            self._emit(result_record(job, result, currency))
+
+        try:
+            await assistant.process_multiple(
+                inputs,
+                task,
+                output_to_console=False,
+                save_files=save_files,
+                schedule=self.schedule,
+                result_callback=on_result,
+            )
+        except Exception as e:
+            warning(f"Manifest jobs for {task} with {model} stopped: {e}")
+            # Report the inputs that never finished
+            for path, pending in waiting.items():
+                while pending:
+                    failed = ProcessResult(source_path=path, error=str(e) or type(e).__name__)
+                    self._emit(result_record(pending.popleft(), failed, currency))
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        self.counts[record["status"]] += 1
+        self.emit(record)
+
+    def _assistant_for(self, model: str, thinking: Optional[str], reconvert: bool) -> Any:
+        """Shared assistant for a model and assistant options (created on first use)."""
+        key = (model, thinking, reconvert)
+        if key not in self._assistants:
+            self._assistants[key] = self.assistant_factory(model, thinking, reconvert)
+        return self._assistants[key]
@@ -28,6 +28,7 @@ from .data_models import MDArticle, InputType
 from .config.markitdown_formats import SUPPORTED_FORMATS
 from .config.logging_config import error, warning
 from .config.constants import DEFAULT_LOGGING_LEVEL, URL_HEAD_TIMEOUT_SECONDS
+from .fetch_scheduler import get_fetch_scheduler
 import logging
 
 markitdown_supported_formats = SUPPORTED_FORMATS["file_extentions"]
@@ -75,7 +76,8 @@ class MarkdownConverter:
             req = urllib.request.Request(url, method='HEAD')
             req.add_header('User-Agent', 'Mozilla/5.0')
 
-            with urllib.request.urlopen(req, timeout=URL_HEAD_TIMEOUT_SECONDS) as response:
+            with get_fetch_scheduler().slot(url), \
+                 urllib.request.urlopen(req, timeout=URL_HEAD_TIMEOUT_SECONDS) as response:
                 # Check the status code (optional, but good practice)
                 if response.getcode () == 200:
                     content_type = response.headers.get ('Content-Type')
@@ -146,7 +148,12 @@ class MarkdownConverter:
         # if it's not html, or if html conversion fails, try to convert with MarkItDown
         if md_article is None:
             try:
-                ms_conversion = self.markitdown.convert(content_path)
+                if self._is_url(content_path):
+                    # Fetch through the scheduler so per-host limits apply
+                    response = get_fetch_scheduler().get(content_path)
+                    ms_conversion = self.markitdown.convert_response(response)
+                else:
+                    ms_conversion = self.markitdown.convert(content_path)
                 md_article = MDArticle(
                     type=type,
                     content=ms_conversion.markdown,
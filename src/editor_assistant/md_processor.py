@@ -27,15 +27,16 @@ from .config.constants import (
 
 # for LLM processing
 from .llm_client import LLMClient
+from .budget import Budget, BudgetExceededError, Reservation
 
 # for data models
-from .data_models import MDArticle, ProcessType, SaveType
+from .data_models import MDArticle, ProcessType, ProcessResult, SaveType
 
 # for the pluggable task system
 from .tasks import TaskRegistry, Task
 
 # for storage
-from .storage import RunRepository
+from .storage import RunRepository, AsyncRunRepository
 # for content validation
 from .content_validation import validate_content, BlockedPublisherError
 # for token estimation
@@ -49,11 +50,16 @@ class ContentTooSmallError(Exception):
     """Raised when content is suspiciously small for llm processing."""
     pass
 
-def check_context_budget(content: str, llm_client: LLMClient) -> None:
+def check_context_budget(content: str, llm_client: LLMClient, estimated_tokens: Optional[int] = None) -> None:
     """
     Context-budget guardrail.
+
+    Args:
+        estimated_tokens: Precomputed estimate (e.g. composed from prompt parts);
+                          the content is scanned only if this is None.
     """
-    estimated_tokens = estimate_tokens(content)
+    if estimated_tokens is None:
+        estimated_tokens = estimate_tokens(content)
 
     # Reserve space for prompt overhead and model output
     output_reserve = llm_client.max_tokens or OUTPUT_TOKEN_RESERVE
@@ -81,7 +87,8 @@ class MDProcessor:
     Processes documents using large language models (Async).
     """
     
-    def __init__(self, model_name: str, thinking_level: str = None, stream: bool = True, max_concurrent: int = 5):
+    def __init__(self, model_name: str, thinking_level: str = None, stream: bool = True, max_concurrent: int = 5,
+                 db: Optional[AsyncRunRepository] = None, budget: Optional[Budget] = None):
         """
         Initialize the processor.
         
@@ -90,6 +97,9 @@ class MDProcessor:
             thinking_level: Optional thinking/reasoning level override
             stream: Whether to use streaming output
             max_concurrent: Maximum number of concurrent requests (semaphore size)
+            db: Run-history facade to share with other processors (closed by
+                its owner); a new one is created if None
+            budget: Token/cost budget every request reserves from (None = unlimited)
         """
         self.llm_client = LLMClient(model_name, thinking_level=thinking_level)
         self.model_name = model_name
@@ -98,43 +108,39 @@ class MDProcessor:
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(DEBUG_LOGGING_LEVEL)
         
-        # Initialize storage repository
-        self.repository = RunRepository()
+        # Initialize storage repository. The event loop reaches it only through
+        # the async facade: writes are group-committed by a dedicated writer
+        # thread, reads run on a dedicated reader thread
+        self._owns_db = db is None
+        self.db = db if db is not None else AsyncRunRepository(RunRepository())
+        self.repository = self.db.repository
         
         # Concurrency control
         self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.budget = budget
     
-    async def process_mds(self, md_articles: List[MDArticle],
-                     task_type: Union[ProcessType, str],
-                     output_to_console: bool = True,
-                     save_files: bool = False,
-                     stream_callback: Optional[Callable[[str], None]] = None) -> tuple[bool, int]:
-        """
-        Process documents using the pluggable task system (Async).
-        
-        Args:
-            stream_callback: Optional callback function to receive streaming chunks.
-                           If None and output_to_console is True, chunks are printed to stdout.
+    def validate_articles(self, md_articles: List[MDArticle], task_type: Union[ProcessType, str]) -> bool:
         """
-        run_id = -1
+        Run task-level, content and context-budget validation.
 
-        # Resolve task type to string
+        Failures are reported through the logging helpers, so callers only
+        need the boolean result.
+
+        Returns:
+            True if the articles can be sent to the LLM
+        """
         task_name = task_type.value if isinstance(task_type, ProcessType) else task_type
-        
-        # Get the task class from registry
+
         task_cls = TaskRegistry.get(task_name)
         if task_cls is None:
             error(f"Unknown task type: {task_name}. Available: {TaskRegistry.list_tasks()}")
-            return False, run_id
-        
-        # Instantiate task
-        task: Task = task_cls()
-        
+            return False
+
         # Validate inputs (task-level)
-        is_valid, err_msg = task.validate(md_articles)
+        is_valid, err_msg = task_cls().validate(md_articles)
         if not is_valid:
             error(f"Validation failed for {task_name}: {err_msg}")
-            return False, run_id
+            return False
 
         # Content validation per article
         for md_article in md_articles:
@@ -148,10 +154,10 @@ class MDProcessor:
                     warning(warn_msg)
                 if not is_content_valid:
                     error(f"Content invalid for {md_article.title or 'Untitled'}: {warn_msg}")
-                    return False, run_id
+                    return False
             except BlockedPublisherError as e:
                 error(f"Blocked publisher: {e}")
-                return False, run_id
+                return False
 
         # Context budget check
         for md_article in md_articles:
@@ -159,15 +165,53 @@ class MDProcessor:
                 check_context_budget(md_article.content or "", self.llm_client)
             except ContentTooLargeError as e:
                 error(f"Content too large: {md_article.title}: {str(e)}")
-                return False, run_id
+                return False
 
-        # Create run record in database (Async via thread pool)
-        # Offload synchronous DB write to prevent blocking the event loop
-        try:
-            run_id = await asyncio.to_thread(self._create_run_record, md_articles, task_name)
-        except Exception as e:
-            self.logger.warning(f"Async DB creation failed, falling back: {e}")
-            run_id = self._create_run_record(md_articles, task_name)
+        return True
+
+    async def process_mds(self, md_articles: List[MDArticle],
+                     task_type: Union[ProcessType, str],
+                     output_to_console: bool = True,
+                     save_files: bool = False,
+                     stream_callback: Optional[Callable[[str], None]] = None,
+                     validated: bool = False,
+                     run_id: Optional[int] = None,
+                     result: Optional[ProcessResult] = None) -> tuple[bool, int]:
+        """
+        Process documents using the pluggable task system (Async).
+        
+        Args:
+            stream_callback: Optional callback function to receive streaming chunks.
+                           If None and output_to_console is True, chunks are printed to stdout.
+            validated: Skip validation because the caller already ran validate_articles()
+                       (the batch pipeline validates in its own stage).
+            run_id: Run record already created by register_run() (the batch
+                    pipeline registers runs in its own stage); created here if None.
+            result: Batch result to fill in with token usage, cost and the
+                    paths of saved files.
+        """
+        create_record = run_id is None
+        if create_record:
+            run_id = -1
+
+        # Resolve task type to string
+        task_name = task_type.value if isinstance(task_type, ProcessType) else task_type
+        
+        # Get the task class from registry
+        task_cls = TaskRegistry.get(task_name)
+        if task_cls is None:
+            error(f"Unknown task type: {task_name}. Available: {TaskRegistry.list_tasks()}")
+            return False, run_id
+        
+        # Instantiate task
+        task: Task = task_cls()
+        
+        if not validated and not self.validate_articles(md_articles, task_name):
+            return False, run_id
+
+        # Create run record in database (group-committed on the writer thread)
+        if create_record:
+            run_id = await self.register_run(md_articles, task_name)
 
         # Create base title
         title_base = md_articles[0].title if md_articles and md_articles[0].title else "untitled"
@@ -188,14 +232,16 @@ class MDProcessor:
 
         # Build prompt using task
         try:
-            prompt = task.build_prompt(md_articles)
+            prompt, prompt_tokens = task.build_prompt_with_estimate(md_articles)
         except Exception as e:
             error(f"Failed to build prompt: {e}")
             return False, run_id
           
-        # Check prompt size
+        # Check prompt size (estimate composed from template parts when available)
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
         try:
-            check_context_budget(prompt, self.llm_client)
+            check_context_budget(prompt, self.llm_client, estimated_tokens=prompt_tokens)
         except ContentTooLargeError as e:
             error(f"Prompt too large: {str(e)}")
             return False, run_id
@@ -209,16 +255,32 @@ class MDProcessor:
                 if final_callback is None and not output_to_console:
                     final_callback = lambda x: None
                 
-                response, usage_stats = await self._make_api_request(prompt, task_name, stream=self.stream, stream_callback=final_callback)
+                reservation = await self._reserve_budget(task, prompt_tokens)
+                try:
+                    response, usage_stats = await self._make_api_request(prompt, task_name, stream=self.stream, stream_callback=final_callback)
+                except BaseException:
+                    self._settle_budget(reservation)
+                    raise
+                self._settle_budget(reservation, usage_stats)
+        except BudgetExceededError as e:
+            # Not sent: the run stays resumable
+            warning(f"Run {run_id} not started: {e}")
+            await self._update_run_status(run_id, "aborted", str(e))
+            raise
         except Exception as e:
             error(f"Error making API request: {str(e)}")
-            await asyncio.to_thread(self._update_run_status, run_id, "failed", str(e))
+            await self._update_run_status(run_id, "failed", str(e))
             return False, run_id
         except asyncio.CancelledError:
             warning(f"Run {run_id} cancelled during API request")
-            await asyncio.to_thread(self._update_run_status, run_id, "aborted", "Cancelled by user")
+            await self._update_run_status(run_id, "aborted", "Cancelled by user")
             raise
 
+        if result is not None and usage_stats:
+            result.input_tokens = usage_stats["total_input_tokens"]
+            result.output_tokens = usage_stats["total_output_tokens"]
+            result.cost = usage_stats["cost"]["total_cost"]
+
         # Build metadata prefix
         metadata_lines = []
         for article in md_articles:
@@ -231,7 +293,7 @@ class MDProcessor:
             outputs = task.post_process(response, md_articles)
         except Exception as e:
             error(f"Post-processing failed: {e}")
-            await asyncio.to_thread(self._update_run_status, run_id, "failed", str(e))
+            await self._update_run_status(run_id, "failed", str(e))
             return False, run_id
 
         # Save all outputs
@@ -243,43 +305,45 @@ class MDProcessor:
                 # Save to file (optional)
                 if save_files and output_dir:
                     if output_name == "main":
-                        self._save_content(SaveType.RESPONSE, title, 
-                                           formatted_content, output_dir, should_print)
+                        saved = self._save_content(SaveType.RESPONSE, title, 
+                                                   formatted_content, output_dir, should_print)
                     else:
-                        self._save_content(SaveType.RESPONSE, f"{output_name}_{title}",
-                                           formatted_content, output_dir, False)
+                        saved = self._save_content(SaveType.RESPONSE, f"{output_name}_{title}",
+                                                   formatted_content, output_dir, False)
                         progress(f"{output_name} output saved to {output_dir / f'{output_name}_{title}.md'}")
+                    if result is not None:
+                        result.output_paths.append(str(saved))
                 
-                # Save to database (Async via thread pool)
-                await asyncio.to_thread(self._save_output_to_db, run_id, output_name, content)
+                # Save to database (writer thread)
+                await self._save_output_to_db(run_id, output_name, content)
                 
         except Exception as e:
             error(f"Error saving response: {str(e)}")
-            await asyncio.to_thread(self._update_run_status, run_id, "failed", str(e))
+            await self._update_run_status(run_id, "failed", str(e))
             return False, run_id
         except asyncio.CancelledError:
             warning(f"Run {run_id} cancelled during saving")
-            await asyncio.to_thread(self._update_run_status, run_id, "aborted", "Cancelled by user")
+            await self._update_run_status(run_id, "aborted", "Cancelled by user")
             raise
 
-        # Save token usage (Async via thread pool)
+        # Save token usage (writer thread)
         try:
             if save_files and output_dir:
                 self.llm_client.save_token_usage_report(title, output_dir)
-            await asyncio.to_thread(self._save_token_usage_to_db, run_id, usage_stats)
+            await self._save_token_usage_to_db(run_id, usage_stats)
         except Exception as e:
             warning(f"Unable to save token usage report: {str(e)}")
         
-        # Mark run as successful (Async via thread pool)
-        await asyncio.to_thread(self._update_run_status, run_id, "success")
+        # Mark run as successful (writer thread)
+        await self._update_run_status(run_id, "success")
         
         return True, run_id
 
 
     # save content to a file
     def _save_content(self, type:SaveType, content_name: str, content: str, 
-                      paper_output_dir: Path, console_print: bool = False) -> None:
-        """Save content to a file."""
+                      paper_output_dir: Path, console_print: bool = False) -> Path:
+        """Save content to a file and return its path."""
         save_dir = paper_output_dir
         try:
             os.makedirs(save_dir, exist_ok=True)
@@ -287,14 +351,16 @@ class MDProcessor:
             error(f"Error creating directory: {str(e)}")
             raise
 
+        path = Path(save_dir) / f"{type.value}_{content_name}.md"
         try:
-            with open(f"{save_dir}/{type.value}_{content_name}.md", 'w', encoding='utf-8') as f:
+            with open(path, 'w', encoding='utf-8') as f:
                 f.write(content)
             if type == SaveType.RESPONSE and console_print:
                 user_message(f"{content}")
         except IOError as e:
             error(f"Error saving content: {str(e)}")
             raise
+        return path
 
     async def _make_api_request(self, prompt: str, request_name: str, stream: bool = False, stream_callback: Optional[Callable[[str], None]] = None) -> Tuple[str, Dict[str, Any]]:
         """
@@ -316,57 +382,104 @@ class MDProcessor:
             error(f"Unexpected error in {request_name}: {str(e)}")
             raise RuntimeError(f"Error generating response for {request_name}: {str(e)}") from e
 
+    async def _reserve_budget(self, task: Task, prompt_tokens: int) -> Optional[Reservation]:
+        """Reserve a request's estimated tokens and cost (None without a budget)."""
+        if self.budget is None:
+            return None
+        output_tokens = task.expected_output_tokens(prompt_tokens)
+        if self.llm_client.max_tokens:
+            output_tokens = min(output_tokens, self.llm_client.max_tokens)
+        return await self.budget.reserve(
+            prompt_tokens + output_tokens,
+            self.llm_client.estimate_cost(prompt_tokens, output_tokens),
+        )
+
+    def _settle_budget(self, reservation: Optional[Reservation], usage: Optional[Dict[str, Any]] = None) -> None:
+        """Settle a reservation against the request's actual usage (none if it failed)."""
+        if reservation is None:
+            return
+        if not usage:
+            self.budget.settle(reservation)
+            return
+        self.budget.settle(
+            reservation,
+            tokens=usage["total_input_tokens"] + usage["total_output_tokens"],
+            cost=usage["cost"]["total_cost"],
+        )
+
+    async def register_run(self, md_articles: List[MDArticle], task_type: Union[ProcessType, str]) -> int:
+        """
+        Create the input and run records for one run.
+
+        Registrations queued together (e.g. by the batch pipeline) are
+        committed in one transaction by the writer thread.
+
+        Returns:
+            Run ID, or -1 if the record could not be created
+        """
+        task_name = task_type.value if isinstance(task_type, ProcessType) else task_type
+        try:
+            # Inputs and run in one write intent: they commit together
+            return await self.db.write(self._create_run_record, md_articles, task_name)
+        except Exception as e:
+            self.logger.warning(f"Failed to create run record: {e}")
+            return -1
+
+    async def aclose(self) -> None:
+        """Wait for queued run-history writes to commit and stop the DB threads (if owned)."""
+        if self._owns_db:
+            await self.db.aclose()
+
     # =========================================================================
-    # Database Helper Methods (Synchronous - Called in Thread Pool)
+    # Database Helper Methods (storage errors never fail a run)
     # =========================================================================
     
     def _create_run_record(self, md_articles: List[MDArticle], task_name: str) -> int:
-        try:
-            input_ids = []
-            for article in md_articles:
-                input_id = self.repository.get_or_create_input(
-                    input_type=article.type.value,
-                    source_path=article.source_path or "",
-                    title=article.title or "Untitled",
-                    content=article.content or ""
-                )
-                input_ids.append(input_id)
-            
-            run_id = self.repository.create_run(
-                task=task_name,
-                model=self.model_name,
-                input_ids=input_ids,
-                thinking_level=self.thinking_level,
-                stream=self.stream,
-                currency=self.llm_client.pricing_currency
+        """Create the input and run records (called on the DB writer thread)."""
+        input_ids = []
+        for article in md_articles:
+            input_id = self.repository.get_or_create_input(
+                input_type=article.type.value,
+                source_path=article.source_path or "",
+                title=article.title or "Untitled",
+                content=article.content or "",
+                source_hash=article.source_hash
             )
-            return run_id
-        except Exception as e:
-            self.logger.warning(f"Failed to create run record: {e}")
-            return -1
+            input_ids.append(input_id)
+        
+        task_cls = TaskRegistry.get(task_name)
+        return self.repository.create_run(
+            task=task_name,
+            model=self.model_name,
+            input_ids=input_ids,
+            thinking_level=self.thinking_level,
+            stream=self.stream,
+            currency=self.llm_client.pricing_currency,
+            prompt_version=task_cls().prompt_version() if task_cls else None
+        )
     
-    def _update_run_status(self, run_id: int, status: str, error_message: str = None) -> None:
+    async def _update_run_status(self, run_id: int, status: str, error_message: str = None) -> None:
         if run_id < 0: return
         try:
-            self.repository.update_run_status(run_id, status, error_message)
+            await self.db.update_run_status(run_id, status, error_message)
         except Exception as e:
             self.logger.warning(f"Failed to update run status: {e}")
     
-    def _save_output_to_db(self, run_id: int, output_type: str, content: str) -> None:
+    async def _save_output_to_db(self, run_id: int, output_type: str, content: str) -> None:
         if run_id < 0: return
         try:
             content_type = "json" if content.strip().startswith(("{", "[")) else "text"
-            self.repository.add_output(run_id, output_type, content, content_type)
+            await self.db.add_output(run_id, output_type, content, content_type)
         except Exception as e:
             self.logger.warning(f"Failed to save output to database: {e}")
     
-    def _save_token_usage_to_db(self, run_id: int, usage: Dict[str, Any] = None) -> None:
+    async def _save_token_usage_to_db(self, run_id: int, usage: Dict[str, Any] = None) -> None:
         if run_id < 0: return
         try:
             if usage is None:
                 usage = self.llm_client.get_token_usage()
             
-            self.repository.add_token_usage(
+            await self.db.add_token_usage(
                 run_id=run_id,
                 input_tokens=usage.get("total_input_tokens", 0),
                 output_tokens=usage.get("total_output_tokens", 0),
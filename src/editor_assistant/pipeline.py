@@ -0,0 +1,172 @@
+"""
+Staged producer/consumer pipeline for batch processing.
+
+A batch is processed as a chain of stages connected by bounded queues:
+
+    source -> [queue] -> stage 1 workers -> [queue] -> stage 2 workers -> ...
+
+Each stage has its own concurrency (number of worker coroutines) and input
+queue size. When a downstream stage falls behind, its queue fills up and
+upstream workers block on `put()` (backpressure), so the number of items in
+flight is bounded by the queue sizes plus the worker counts, not by the
+batch size. Items flow through as soon as they are ready: the first item
+can reach the last stage while later items are still being produced.
+
+A stage handler returns the item for the next stage, or None to drop it
+(handlers record their own failures). An exception raised by a handler
+cancels the whole pipeline and is re-raised from `run()`.
+
+A stage with a `priority` key takes the waiting item with the lowest key
+first (equal keys in arrival order) instead of the oldest one, e.g. to let
+short documents overtake long ones in front of the LLM stage.
+"""
+
+import asyncio
+import itertools
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from .config.constants import PIPELINE_QUEUE_SIZE
+
+# Sentinel telling a stage worker that no more items will arrive
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline stage: an async handler run by `concurrency` workers."""
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    priority: Optional[Callable[[Any], Any]] = None  # sort key of waiting items (default: FIFO)
+
+
+class _PriorityQueue(asyncio.PriorityQueue):
+    """Bounded queue returning the item with the lowest key; _DONE sorts last."""
+
+    def __init__(self, maxsize: int, key: Callable[[Any], Any]):
+        super().__init__(maxsize=maxsize)
+        self._key = key
+        self._order = itertools.count()
+
+    async def put(self, item: Any) -> None:
+        # The arrival counter breaks ties, so items themselves are never compared
+        if item is _DONE:
+            await super().put((1, (), next(self._order), item))
+        else:
+            await super().put((0, self._key(item), next(self._order), item))
+
+    async def get(self) -> Any:
+        return (await super().get())[3]
+
+
+class Pipeline:
+    """
+    Run items through stages connected by bounded queues.
+
+    Usage:
+        pipeline = Pipeline([
+            Stage("convert", convert, concurrency=4),
+            Stage("llm", call_llm, concurrency=5),
+        ])
+        await pipeline.run(inputs)
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        for stage in stages:
+            if stage.concurrency < 1 or stage.queue_size < 1:
+                raise ValueError(f"Stage {stage.name}: concurrency and queue_size must be >= 1")
+        self.stages = stages
+        self._queues: List[asyncio.Queue] = []
+        self.stats: Dict[str, Dict[str, int]] = {
+            stage.name: {"in": 0, "out": 0, "dropped": 0, "max_queue": 0} for stage in stages
+        }
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current number of items waiting in front of each stage."""
+        return {stage.name: queue.qsize() for stage, queue in zip(self.stages, self._queues)}
+
+    async def _put(self, index: int, item: Any) -> None:
+        queue = self._queues[index]
+        await queue.put(item)
+        stats = self.stats[self.stages[index].name]
+        stats["max_queue"] = max(stats["max_queue"], queue.qsize())
+
+    async def _feed(self, source: Union[Iterable[Any], AsyncIterable[Any]]) -> None:
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                await self._put(0, item)
+        else:
+            for item in source:
+                await self._put(0, item)
+        for _ in range(self.stages[0].concurrency):
+            await self._queues[0].put(_DONE)
+
+    async def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        queue = self._queues[index]
+        is_last = index == len(self.stages) - 1
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            stats["in"] += 1
+            result = await stage.handler(item)
+            if result is None:
+                stats["dropped"] += 1
+                continue
+            stats["out"] += 1
+            if not is_last:
+                await self._put(index + 1, result)
+
+    async def _run_stage(self, index: int) -> None:
+        workers = [
+            asyncio.ensure_future(self._work(index))
+            for _ in range(self.stages[index].concurrency)
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            # A failed handler (or cancellation) stops the sibling workers too
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        if index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].concurrency):
+                await self._queues[index + 1].put(_DONE)
+
+    async def run(self, source: Union[Iterable[Any], AsyncIterable[Any]]) -> None:
+        """
+        Push every item from `source` through all stages and wait for completion.
+
+        Args:
+            source: Iterable or async iterable of items for the first stage.
+                    An async iterable may keep producing (e.g. a watched folder).
+        """
+        self._queues = [
+            _PriorityQueue(stage.queue_size, stage.priority) if stage.priority
+            else asyncio.Queue(maxsize=stage.queue_size)
+            for stage in self.stages
+        ]
+        tasks = [asyncio.ensure_future(self._feed(source))]
+        tasks += [asyncio.ensure_future(self._run_stage(i)) for i in range(len(self.stages))]
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+        if failed:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise failed[0].exception()
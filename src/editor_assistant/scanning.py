@@ -0,0 +1,58 @@
+"""
+Finding batch input files.
+
+`batch` scans its folder (recursively with `--recursive`) for files matching
+the include globs and none of the exclude globs. A glob without a slash
+matches the file name (`*.pdf`); a glob with one matches the path relative
+to the folder (`drafts/*`, POSIX separators). As with fnmatch, `*` also
+matches slashes, so `drafts/*` covers every file below `drafts`.
+
+Exclude globs without a slash also prune directories by name, so an excluded
+directory is not walked at all (`--exclude .git --exclude node_modules`).
+"""
+
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import List, Sequence
+
+
+def matches(rel_path: str, patterns: Sequence[str]) -> bool:
+    """Whether a relative POSIX path matches any glob (see module docstring)."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch(rel_path if "/" in pattern else name, pattern) for pattern in patterns)
+
+
+def scan_files(
+    root: Path,
+    include: Sequence[str],
+    exclude: Sequence[str] = (),
+    recursive: bool = False,
+) -> List[Path]:
+    """
+    Files under `root` matching the include globs and no exclude glob.
+
+    Args:
+        root: Folder to scan
+        include: Globs a file must match (at least one)
+        exclude: Globs that drop a file (or prune a directory)
+        recursive: Also scan subfolders
+
+    Returns:
+        Matching files, sorted by relative path
+    """
+    root = Path(root)
+    dir_excludes = [pattern for pattern in exclude if "/" not in pattern]
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+        if recursive:
+            dirnames[:] = [d for d in dirnames if not matches(d, dir_excludes)]
+        else:
+            dirnames[:] = []
+        for name in filenames:
+            rel_path = f"{prefix}{name}"
+            if matches(rel_path, include) and not matches(rel_path, exclude):
+                found.append(rel_path)
+    return [root / rel_path for rel_path in sorted(found)]
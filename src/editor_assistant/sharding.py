@@ -0,0 +1,44 @@
+"""
+Deterministic sharding of batch inputs across hosts.
+
+`batch --shard i/N` keeps only the files whose shard is i (1..N). A file's
+shard is the SHA-256 of its path relative to the batch folder, modulo N, so
+every node computes the same partition of the same folder no matter where it
+is mounted or in what order the files are listed, and the N shards together
+cover every file exactly once. Histories of the shards are combined with
+`editor-assistant merge`.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse 'i/N' (1 <= i <= N) into (i, N).
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be 'i/N' (e.g. 1/4), got '{spec}'")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and N, got '{spec}'")
+    return index, count
+
+
+def shard_of(key: str, count: int) -> int:
+    """Shard (1..count) of a key."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(files: Sequence[Path], root: Path, index: int, count: int) -> List[Path]:
+    """
+    Files of shard `index` out of `count`, keyed by their path relative to
+    `root` (POSIX separators, so Windows and Unix nodes agree).
+    """
+    return [f for f in files if shard_of(Path(f).relative_to(root).as_posix(), count) == index]
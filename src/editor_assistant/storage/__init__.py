@@ -5,15 +5,28 @@ This module provides:
 - Database initialization and connection management
 - CRUD operations for runs, inputs, outputs, and token usage
 - Query interface for history and statistics
+- Group-committed writes from a dedicated writer thread
+- An async facade for event-loop code (AsyncRunRepository)
+- A durable job queue drained by worker processes (JobQueue)
+- Cached content hashes of batch input files (FileIndex)
 """
 
-from .database import get_database_path, init_database, get_connection
+from .database import get_database_path, init_database, get_connection, get_connection_manager
 from .repository import RunRepository
+from .writer import DBWriter
+from .async_repository import AsyncRunRepository
+from .jobs import JobQueue
+from .file_index import FileIndex
 
 __all__ = [
     "get_database_path",
     "init_database", 
     "get_connection",
+    "get_connection_manager",
     "RunRepository",
+    "DBWriter",
+    "AsyncRunRepository",
+    "JobQueue",
+    "FileIndex",
 ]
 
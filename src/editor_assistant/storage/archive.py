@@ -0,0 +1,126 @@
+"""
+Archive files for output bodies past their retention period.
+
+`RunRepository.gc()` moves expired output bodies out of the run database
+into zip files under `archive/` next to runs.db. Each gc batch writes a new
+file (to a temporary name, then renamed), with one deflate-compressed member
+per distinct body named by its SHA-256. Existing archives are never
+modified, so an interrupted gc can at worst leave a file no output refers to.
+
+An archived `outputs` row has no blob or inline text; `outputs.archive`
+holds a reference "<archive file>/<sha256>" used to read the body back.
+"""
+
+import logging
+import os
+import secrets
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..config.constants import OUTPUT_ARCHIVE_DIR_NAME, OUTPUT_COMPRESSION_LEVEL
+
+logger = logging.getLogger(__name__)
+
+
+def get_archive_dir(db_path: Path) -> Path:
+    """Archive directory next to the run database."""
+    return Path(db_path).parent / OUTPUT_ARCHIVE_DIR_NAME
+
+
+def write_archive(archive_dir: Path, bodies: Dict[str, str]) -> str:
+    """
+    Write output bodies to a new archive file.
+
+    Args:
+        archive_dir: Archive directory (created if missing)
+        bodies: SHA-256 of each body -> text
+
+    Returns:
+        Archive file name (relative to archive_dir)
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    name = f"outputs-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}.zip"
+    tmp_path = archive_dir / f"{name}.tmp"
+    with zipfile.ZipFile(
+        tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=OUTPUT_COMPRESSION_LEVEL
+    ) as zf:
+        for digest, text in bodies.items():
+            zf.writestr(digest, text)
+    # Durable before the database points at it
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, archive_dir / name)
+    return name
+
+
+def archive_ref(name: str, digest: str) -> str:
+    """Reference stored in outputs.archive."""
+    return f"{name}/{digest}"
+
+
+class ArchiveReader:
+    """Reads archived output bodies, keeping each archive file open once."""
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = Path(archive_dir)
+        self._files: Dict[str, Optional[zipfile.ZipFile]] = {}
+
+    def read(self, ref: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Read an archived body.
+
+        Args:
+            ref: Reference from outputs.archive
+            max_chars: Read only the first N characters (only that much is
+                decompressed)
+
+        Returns:
+            The text, or None if the archive file or member is missing
+        """
+        name, _, digest = ref.partition("/")
+        zf = self._open(name)
+        if zf is None:
+            return None
+        try:
+            if max_chars is None:
+                return zf.read(digest).decode("utf-8")
+            with zf.open(digest) as member:
+                # The cut may split the last character
+                return member.read(max_chars * 4).decode("utf-8", errors="ignore")[:max_chars]
+        except KeyError:
+            logger.warning(f"Output {digest} missing from archive {name}")
+            return None
+
+    def size(self, ref: str) -> Optional[int]:
+        """Uncompressed size of an archived body in bytes (None if missing)."""
+        name, _, digest = ref.partition("/")
+        zf = self._open(name)
+        if zf is None:
+            return None
+        try:
+            return zf.getinfo(digest).file_size
+        except KeyError:
+            return None
+
+    def _open(self, name: str) -> Optional[zipfile.ZipFile]:
+        if name not in self._files:
+            try:
+                self._files[name] = zipfile.ZipFile(self.archive_dir / name)
+            except (OSError, zipfile.BadZipFile) as e:
+                logger.warning(f"Cannot open output archive {name}: {e}")
+                self._files[name] = None
+        return self._files[name]
+
+    def close(self) -> None:
+        for zf in self._files.values():
+            if zf is not None:
+                zf.close()
+        self._files.clear()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,186 @@
+"""
+Async facade over RunRepository for code running on an event loop.
+
+Every call is handed to a dedicated database thread and awaited, so the
+loop never blocks on SQLite and no default-executor (`asyncio.to_thread`)
+threads are occupied:
+
+- writes are queued to a `DBWriter`, which group-commits them on its writer
+  thread (see writer.py);
+- reads run on one reader thread with its own pooled connection. Under WAL
+  they never wait for the writer.
+
+Usage:
+    db = AsyncRunRepository()
+    run_id = await db.create_run("brief", model, [input_id])
+    runs = await db.get_recent_runs()
+    await db.aclose()
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.constants import HISTORY_PAGE_SIZE
+from .repository import RunRepository
+from .writer import DBWriter
+
+
+class AsyncRunRepository:
+    """Awaitable RunRepository: writes group-committed, reads on a reader thread."""
+
+    def __init__(self, repository: Optional[RunRepository] = None, writer: Optional[DBWriter] = None):
+        """
+        Initialize the facade.
+
+        Args:
+            repository: Repository to wrap (default: the default database)
+            writer: Writer thread to share (default: a new one for this repository)
+        """
+        self.repository = repository if repository is not None else RunRepository()
+        self.writer = writer if writer is not None else DBWriter(self.repository)
+        self._reader: Optional[ThreadPoolExecutor] = None
+
+    # =========================================================================
+    # Dispatch
+    # =========================================================================
+
+    async def write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `fn` on the writer thread and await its committed result.
+
+        `fn` runs in its own savepoint inside the batch transaction, so
+        several repository writes made by one `fn` commit (or fail) together.
+        """
+        return await self.writer.run(fn, *args, **kwargs)
+
+    async def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `fn` on the reader thread and await its result."""
+        # Imported here: storage is loaded by DB-only CLI commands, which never await
+        import asyncio
+        if self._reader is None:
+            self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="editor-assistant-db-reader")
+        return await asyncio.wrap_future(self._reader.submit(fn, *args, **kwargs))
+
+    async def aclose(self) -> None:
+        """Wait for queued writes to commit, then stop the database threads."""
+        await self.writer.run(lambda: None)
+        self.close()
+
+    def close(self) -> None:
+        """Commit queued writes and stop the database threads (blocking)."""
+        self.writer.close()
+        if self._reader is not None:
+            self._reader.shutdown(wait=True)
+            self._reader = None
+
+    async def __aenter__(self) -> "AsyncRunRepository":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    # =========================================================================
+    # Writes
+    # =========================================================================
+
+    async def get_or_create_input(
+        self,
+        input_type: str,
+        source_path: str,
+        title: str,
+        content: str,
+        source_hash: Optional[str] = None
+    ) -> int:
+        return await self.write(
+            self.repository.get_or_create_input, input_type, source_path, title, content,
+            source_hash=source_hash
+        )
+
+    async def create_run(
+        self,
+        task: str,
+        model: str,
+        input_ids: List[int],
+        thinking_level: Optional[str] = None,
+        stream: bool = True,
+        currency: str = "$",
+        prompt_version: Optional[str] = None
+    ) -> int:
+        return await self.write(
+            self.repository.create_run, task, model, input_ids,
+            thinking_level=thinking_level, stream=stream, currency=currency,
+            prompt_version=prompt_version
+        )
+
+    async def update_run_status(self, run_id: int, status: str, error_message: Optional[str] = None) -> None:
+        await self.write(self.repository.update_run_status, run_id, status, error_message)
+
+    async def add_output(self, run_id: int, output_type: str, content: str, content_type: str = "text") -> int:
+        return await self.write(self.repository.add_output, run_id, output_type, content, content_type)
+
+    async def add_token_usage(
+        self,
+        run_id: int,
+        input_tokens: int,
+        output_tokens: int,
+        cost_input: float,
+        cost_output: float,
+        process_time: float
+    ) -> None:
+        await self.write(
+            self.repository.add_token_usage,
+            run_id, input_tokens, output_tokens, cost_input, cost_output, process_time
+        )
+
+    # =========================================================================
+    # Reads
+    # =========================================================================
+
+    async def get_recent_runs(self, limit: int = HISTORY_PAGE_SIZE, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.read(self.repository.get_recent_runs, limit, before_id)
+
+    async def get_run_details(
+        self,
+        run_id: int,
+        include_content: bool = True,
+        preview_chars: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        return await self.read(self.repository.get_run_details, run_id, include_content, preview_chars)
+
+    async def get_output(self, output_id: int) -> Optional[Dict[str, Any]]:
+        return await self.read(self.repository.get_output, output_id)
+
+    async def get_stats(self, days: int = 7) -> Dict[str, Any]:
+        return await self.read(self.repository.get_stats, days)
+
+    async def search_by_title(self, title_pattern: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return await self.read(self.repository.search_by_title, title_pattern, limit)
+
+    async def search(
+        self,
+        query: str,
+        task: Optional[str] = None,
+        model: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        return await self.read(
+            self.repository.search, query,
+            task=task, model=model, since=since, until=until, limit=limit
+        )
+
+    async def get_resumable_runs(self) -> List[Dict[str, Any]]:
+        return await self.read(self.repository.get_resumable_runs)
+
+    async def get_input_article(self, input_id: int) -> Optional[Dict[str, Any]]:
+        return await self.read(self.repository.get_input_article, input_id)
+
+    async def find_input_article(
+        self,
+        source_path: Optional[str] = None,
+        source_hash: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return await self.read(
+            self.repository.find_input_article, source_path=source_path, source_hash=source_hash
+        )
@@ -0,0 +1,174 @@
+"""
+Content-addressed, compressed storage for output bodies.
+
+Output text is stored once per distinct content in the `blobs` table, keyed
+by the SHA-256 of its UTF-8 encoding and compressed with zlib. `outputs` rows
+reference a blob through `blob_hash`, so reruns that produce identical text
+share one copy. Rows written before blobs existed keep their text inline in
+`outputs.content` until `RunRepository.compact()` moves it. Bodies past
+their retention period are moved out to archive files (see archive.py).
+
+zlib (stdlib) is used rather than zstd: the run database must stay readable
+on installs without the optional `zstandard` package. The codec is recorded
+per blob, so other codecs can be added without rewriting existing rows.
+"""
+
+import hashlib
+import sqlite3
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config.constants import OUTPUT_COMPRESS_MIN_BYTES, OUTPUT_COMPRESSION_LEVEL
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+
+# Columns to select for an output row with its text (outputs o LEFT JOIN blobs b)
+OUTPUT_COLUMNS = "o.id, o.run_id, o.output_type, o.content_type, o.content, o.archive, b.codec, b.data"
+OUTPUT_BLOB_JOIN = "LEFT JOIN blobs b ON b.hash = o.blob_hash"
+
+# Columns to select for an output without its text: size is the uncompressed
+# size in bytes (NULL once archived). b.data is not read.
+OUTPUT_META_COLUMNS = (
+    "o.id, o.run_id, o.output_type, o.content_type, o.archive, "
+    "COALESCE(b.size, LENGTH(CAST(o.content AS BLOB))) AS size"
+)
+
+# OUTPUT_META_COLUMNS plus the start of the stored text, for
+# output_row_to_meta(); parameters: (max_chars, preview_stored_bytes(max_chars))
+OUTPUT_PREVIEW_COLUMNS = (
+    f"{OUTPUT_META_COLUMNS}, substr(o.content, 1, ?) AS content, b.codec, substr(b.data, 1, ?) AS data"
+)
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 hex digest of the UTF-8 text (the blob key)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_text(text: str) -> Tuple[str, str, int, bytes]:
+    """
+    Prepare text for storage.
+
+    Returns:
+        (hash, codec, uncompressed size in bytes, stored data)
+    """
+    raw = text.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    if len(raw) >= OUTPUT_COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw, OUTPUT_COMPRESSION_LEVEL)
+        if len(packed) < len(raw):
+            return digest, CODEC_ZLIB, len(raw), packed
+    return digest, CODEC_NONE, len(raw), raw
+
+
+def decode_blob(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """Decode stored blob data back to text."""
+    if data is None:
+        return None
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    if codec == CODEC_NONE:
+        return bytes(data).decode("utf-8")
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def preview_stored_bytes(max_chars: int) -> int:
+    """
+    Stored bytes to read for a preview of `max_chars` characters.
+
+    A character is at most 4 UTF-8 bytes, and zlib's worst case adds a few
+    bytes per 16 KiB block to incompressible input, so this prefix of the
+    stored data always holds the start of the text.
+    """
+    raw = max_chars * 4
+    return raw + raw // 1000 + 64
+
+
+def decode_blob_prefix(codec: Optional[str], data: Optional[bytes], max_chars: int) -> Optional[str]:
+    """
+    Decode the first `max_chars` characters of stored blob data.
+
+    `data` may be a prefix of the stored data (see preview_stored_bytes); at
+    most the bytes needed are decompressed.
+    """
+    if data is None:
+        return None
+    if codec == CODEC_ZLIB:
+        raw = zlib.decompressobj().decompress(bytes(data), max_chars * 4)
+    elif codec == CODEC_NONE:
+        raw = bytes(data[:max_chars * 4])
+    else:
+        raise ValueError(f"Unknown blob codec: {codec}")
+    # The cut may split the last character
+    return raw.decode("utf-8", errors="ignore")[:max_chars]
+
+
+def put_blob(conn: sqlite3.Connection, encoded: Tuple[str, str, int, bytes]) -> str:
+    """Store an encoded blob unless it already exists; return its hash."""
+    digest, codec, size, data = encoded
+    conn.execute(
+        "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+        (digest, codec, size, data),
+    )
+    return digest
+
+
+def output_row_to_dict(
+    row: sqlite3.Row,
+    read_archived: Optional[Callable[[str], Optional[str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Convert a row selected with OUTPUT_COLUMNS to an output dict with its text.
+
+    Args:
+        row: Output row
+        read_archived: Reads an archived body by reference (ArchiveReader.read);
+            without it archived outputs have no content
+    """
+    output = dict(row)
+    codec = output.pop("codec")
+    data = output.pop("data")
+    archive = output.pop("archive")
+    if output["content"] is None:
+        if archive is not None:
+            output["content"] = read_archived(archive) if read_archived else None
+        else:
+            output["content"] = decode_blob(codec, data)
+    return output
+
+
+def output_row_to_meta(
+    row: sqlite3.Row,
+    max_chars: int = 0,
+    read_archived: Optional[Callable[..., Optional[str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Convert a row selected with OUTPUT_META_COLUMNS or OUTPUT_PREVIEW_COLUMNS
+    to an output dict without the full text.
+
+    The dict has the output metadata and `archived`; preview rows also have
+    `preview`, the first `max_chars` characters of the text (None if
+    unavailable).
+
+    Args:
+        row: Output row
+        max_chars: Preview length in characters (preview rows)
+        read_archived: Reads the start of an archived body
+            (ArchiveReader.read with max_chars)
+    """
+    output = dict(row)
+    archive = output.pop("archive")
+    output["archived"] = archive is not None
+    if "data" not in output:
+        return output
+    codec = output.pop("codec")
+    data = output.pop("data")
+    inline = output.pop("content")
+    if inline is not None:
+        output["preview"] = inline
+    elif archive is not None:
+        output["preview"] = read_archived(archive, max_chars=max_chars) if read_archived else None
+    else:
+        output["preview"] = decode_blob_prefix(codec, data, max_chars)
+    return output
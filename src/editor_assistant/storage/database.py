@@ -1,18 +1,44 @@
 """
 Database initialization and connection management.
+
+Connections are configured for concurrent use: WAL journal (readers never
+block the writer), synchronous=NORMAL, a busy timeout so competing writers
+wait instead of failing with "database is locked", and a larger page cache.
+
+`ConnectionManager` keeps one long-lived connection per thread, so repository
+calls made through `asyncio.to_thread` reuse the worker thread's connection
+instead of opening and closing a new one for every statement.
+
+The schema itself is defined and upgraded by migrations.py.
 """
 
 import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import os
 
+from ..config.constants import (
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_SYNCHRONOUS,
+)
+from .blobs import decode_blob
+from .migrations import (  # noqa: F401 - re-exported
+    SCHEMA_VERSION,
+    get_schema_version,
+    has_search_index,
+    migrate,
+    rebuild_daily_stats,
+    rebuild_search_index,
+)
+
 # Default database location
 DEFAULT_DB_DIR = Path.home() / ".editor_assistant"
 DEFAULT_DB_NAME = "runs.db"
 
-# Schema version for migrations
-SCHEMA_VERSION = 1
 
 
 def get_database_path() -> Path:
@@ -37,121 +63,189 @@ def get_database_path() -> Path:
     return db_dir / DEFAULT_DB_NAME
 
 
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply row factory and performance/safety pragmas to a connection."""
+    conn.row_factory = sqlite3.Row  # Enable dict-like access
+    conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    # Lets `gc` return freed pages without a full VACUUM. Must precede WAL:
+    # it only applies to a database not yet created (or at its next VACUUM)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")  # Persistent: stored in the file
+    conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = -{int(SQLITE_CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+    # Lets queries read compressed output bodies: blob_text(codec, data)
+    conn.create_function("blob_text", 2, decode_blob, deterministic=True)
+    return conn
+
+
 def get_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
     """
-    Get a database connection.
+    Get a new standalone database connection (the caller closes it).
     
     Args:
         db_path: Optional custom database path. Uses default if not provided.
     
     Returns:
-        SQLite connection with row factory enabled
+        SQLite connection with row factory and pragmas applied
     """
     if db_path is None:
         db_path = get_database_path()
     
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row  # Enable dict-like access
-    conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+    conn = sqlite3.connect(str(db_path), timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    return configure_connection(conn)
+
+
+def get_readonly_connection(db_path: Path) -> sqlite3.Connection:
+    """
+    Open a database read-only (the caller closes it).
+
+    Unlike get_connection(), no pragmas that write to the file are applied,
+    and any write through the connection fails. Used for databases that are
+    not ours to change, such as a copy merged from another host.
+
+    Returns:
+        SQLite connection with row factory
+    """
+    conn = sqlite3.connect(
+        f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.create_function("blob_text", 2, decode_blob, deterministic=True)
     return conn
 
 
-def init_database(db_path: Optional[Path] = None) -> None:
+class ConnectionManager:
     """
-    Initialize the database with schema.
+    Long-lived connections to one database file, one per thread.
     
-    Args:
-        db_path: Optional custom database path
+    sqlite3 connections must not be shared between threads while in use, so
+    each thread gets its own connection on first use and keeps it. Connections
+    of threads that have exited are closed when the next one is opened.
     """
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
     
-    # Create tables
-    cursor.executescript(SCHEMA)
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # (owning thread, connection) for cleanup; threads are held weakly
+        self._connections: List[Tuple["weakref.ref[threading.Thread]", sqlite3.Connection]] = []
     
-    # Set schema version
-    cursor.execute(
-        "INSERT OR REPLACE INTO schema_version (id, version) VALUES (1, ?)",
-        (SCHEMA_VERSION,)
-    )
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        cached = getattr(self._local, "conn", None)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        
+        # check_same_thread=False only so close_all() can close it from
+        # another thread; the connection is used by its owning thread only
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        configure_connection(conn)
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections.append((weakref.ref(threading.current_thread()), conn))
+            self._local.conn = (self._generation, conn)
+        return conn
     
-    conn.commit()
-    conn.close()
-
-
-# Database schema
-SCHEMA = """
--- Schema version tracking
-CREATE TABLE IF NOT EXISTS schema_version (
-    id INTEGER PRIMARY KEY,
-    version INTEGER NOT NULL
-);
-
--- Inputs table (independent, supports deduplication)
-CREATE TABLE IF NOT EXISTS inputs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    type TEXT NOT NULL,                     -- paper, news
-    source_path TEXT,
-    title TEXT,
-    content_hash TEXT UNIQUE,               -- MD5 for deduplication
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-
--- Runs table
-CREATE TABLE IF NOT EXISTS runs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-    task TEXT NOT NULL,                     -- brief, outline, translate
-    model TEXT NOT NULL,                    -- deepseek-v3.2, gemini-3-flash
-    thinking_level TEXT,                    -- low, medium, high, null
-    stream INTEGER DEFAULT 1,               -- 0 or 1
-    currency TEXT DEFAULT '$',              -- pricing currency symbol
-    status TEXT DEFAULT 'pending',          -- pending, success, failed
-    error_message TEXT
-);
-
--- Run-Input association (many-to-many)
-CREATE TABLE IF NOT EXISTS run_inputs (
-    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
-    input_id INTEGER NOT NULL REFERENCES inputs(id) ON DELETE CASCADE,
-    PRIMARY KEY (run_id, input_id)
-);
-
--- Outputs table
-CREATE TABLE IF NOT EXISTS outputs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
-    output_type TEXT NOT NULL,              -- main, bilingual, classification
-    content_type TEXT DEFAULT 'text',       -- text, json
-    content TEXT
-);
-
--- Token usage table
-CREATE TABLE IF NOT EXISTS token_usage (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
-    input_tokens INTEGER DEFAULT 0,
-    output_tokens INTEGER DEFAULT 0,
-    cost_input REAL DEFAULT 0,
-    cost_output REAL DEFAULT 0,
-    process_time REAL DEFAULT 0
-);
-
--- Indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
-CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model);
-CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task);
-CREATE INDEX IF NOT EXISTS idx_inputs_hash ON inputs(content_hash);
-CREATE INDEX IF NOT EXISTS idx_outputs_run ON outputs(run_id);
-"""
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yield this thread's connection; commit on success, roll back on error.
+        
+        The outermost transaction takes the write lock upfront (BEGIN IMMEDIATE),
+        so a read-then-write sequence cannot fail on lock upgrade. Nested calls on
+        the same thread use savepoints and are committed by the outermost one.
+        """
+        conn = self.connection()
+        depth = getattr(self._local, "depth", 0)
+        
+        if depth:
+            savepoint = f"ea_sp{depth}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+            self._local.depth = depth + 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+            finally:
+                self._local.depth = depth
+            return
+        
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+    
+    def close_all(self) -> None:
+        """Close every connection; threads reconnect on next use."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for _, conn in connections:
+            conn.close()
+    
+    def _prune_dead_threads(self) -> None:
+        alive = []
+        for thread_ref, conn in self._connections:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                conn.close()
+            else:
+                alive.append((thread_ref, conn))
+        self._connections = alive
 
 
-def get_schema_version(conn: sqlite3.Connection) -> int:
-    """Get current schema version."""
-    try:
-        cursor = conn.execute("SELECT version FROM schema_version WHERE id = 1")
-        row = cursor.fetchone()
-        return row[0] if row else 0
-    except sqlite3.OperationalError:
-        return 0
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: Optional[Path] = None) -> ConnectionManager:
+    """Get the process-wide connection manager for a database file."""
+    if db_path is None:
+        db_path = get_database_path()
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = ConnectionManager(Path(db_path))
+        return manager
+
 
+def close_all_connections() -> None:
+    """Close pooled connections for every database (e.g. before deleting files)."""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
+
+
+def init_database(db_path: Optional[Path] = None) -> None:
+    """
+    Create the database or upgrade it to the current schema (idempotent).
+    
+    Args:
+        db_path: Optional custom database path
+    """
+    conn = get_connection(db_path)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
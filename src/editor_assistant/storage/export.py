@@ -0,0 +1,323 @@
+"""
+Streaming run-history export.
+
+Runs are read in keyset-paginated chunks (newest first). Each chunk is
+completed with three set-based queries (inputs, outputs, token usage for all
+runs in the chunk) and written out immediately, so memory use is bounded by
+`EXPORT_CHUNK_SIZE` runs no matter how large the history is. Output bodies
+are decompressed from blob storage (or read from archive files) as they are
+read.
+
+The whole export reads from one snapshot (a single read transaction; under
+WAL this does not block writers).
+
+Formats:
+- jsonl: one run object per line
+- csv:   one flattened row per run (input titles joined, token usage columns)
+- json:  {"exported_at", "runs": [...], "total_runs"} written incrementally
+
+Output can be compressed with gzip, or zstd when the optional `zstandard`
+package is installed. Format and compression are detected from the file name
+(e.g. `history.jsonl.gz`) unless given explicitly.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config.constants import EXPORT_CHUNK_SIZE
+from .archive import ArchiveReader, get_archive_dir
+from .blobs import OUTPUT_BLOB_JOIN, OUTPUT_COLUMNS, output_row_to_dict
+from .database import get_connection
+
+EXPORT_FORMATS = ("json", "jsonl", "csv")
+EXPORT_COMPRESSIONS = ("gzip", "zstd")
+
+_COMPRESSION_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+_FORMAT_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+
+CSV_FIELDNAMES = [
+    "id", "timestamp", "task", "model", "thinking_level",
+    "stream", "currency", "status", "error_message",
+    "input_titles", "input_tokens", "output_tokens",
+    "cost_input", "cost_output", "total_cost"
+]
+
+# SQLite timestamp format (CURRENT_TIMESTAMP, UTC)
+_DB_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# =============================================================================
+# Options
+# =============================================================================
+
+def detect_format(output_path: Path) -> Tuple[str, Optional[str]]:
+    """
+    Detect (format, compression) from a file name.
+
+    `history.csv` -> ("csv", None), `history.jsonl.gz` -> ("jsonl", "gzip").
+    Unknown extensions default to JSON.
+    """
+    suffixes = [s.lower() for s in Path(output_path).suffixes]
+    compression = None
+    if suffixes and suffixes[-1] in _COMPRESSION_SUFFIXES:
+        compression = _COMPRESSION_SUFFIXES[suffixes.pop()]
+    format = _FORMAT_SUFFIXES.get(suffixes[-1], "json") if suffixes else "json"
+    return format, compression
+
+
+def _parse_time_bound(value: str, end_of_day: bool) -> str:
+    dt = datetime.fromisoformat(value.strip())
+    if dt.tzinfo is not None:
+        # Run timestamps are stored in UTC
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_of_day and len(value.strip()) == 10:
+        # A bare date as an upper bound includes that whole day
+        dt += timedelta(days=1)
+    return dt.strftime(_DB_TIME_FORMAT)
+
+
+def parse_since(value: str) -> str:
+    """Parse an inclusive lower time bound (ISO date or datetime, UTC if naive)."""
+    return _parse_time_bound(value, end_of_day=False)
+
+
+def parse_until(value: str) -> str:
+    """Parse an exclusive upper time bound; a bare date includes that day."""
+    return _parse_time_bound(value, end_of_day=True)
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+def iter_run_chunks(
+    conn,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    read_archived: Optional[Callable[[str], Optional[str]]] = None,
+    oldest_first: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield runs newest first (or oldest first), in chunks, with inputs,
+    outputs and token usage.
+
+    Args:
+        conn: Database connection
+        since: Inclusive lower bound on run timestamp ('YYYY-MM-DD HH:MM:SS')
+        until: Exclusive upper bound on run timestamp
+        limit: Maximum number of runs
+        chunk_size: Runs per chunk
+        read_archived: Reads archived output bodies (ArchiveReader.read)
+        oldest_first: Yield runs in ascending id order (used by merge)
+    """
+    where = []
+    params: List[Any] = []
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        where.append("timestamp < ?")
+        params.append(until)
+
+    last_id = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        clauses = list(where)
+        chunk_params = list(params)
+        if last_id is not None:
+            clauses.append("id > ?" if oldest_first else "id < ?")
+            chunk_params.append(last_id)
+        query = """
+            SELECT id, uuid, timestamp, task, model, thinking_level, stream,
+                   currency, prompt_version, status, error_message
+            FROM runs
+        """
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id ASC LIMIT ?" if oldest_first else " ORDER BY id DESC LIMIT ?"
+
+        runs = [dict(row) for row in conn.execute(query, (*chunk_params, size))]
+        if not runs:
+            return
+
+        by_id = {}
+        for run in runs:
+            run["inputs"] = []
+            run["outputs"] = []
+            run["token_usage"] = None
+            by_id[run["id"]] = run
+        ids = list(by_id)
+        marks = _placeholders(len(ids))
+
+        for row in conn.execute(f"""
+            SELECT ri.run_id, i.id, i.type, i.source_path, i.title, i.content_hash
+            FROM run_inputs ri
+            JOIN inputs i ON i.id = ri.input_id
+            WHERE ri.run_id IN ({marks})
+        """, ids):
+            item = dict(row)
+            by_id[item.pop("run_id")]["inputs"].append(item)
+
+        for row in conn.execute(f"""
+            SELECT {OUTPUT_COLUMNS}
+            FROM outputs o {OUTPUT_BLOB_JOIN}
+            WHERE o.run_id IN ({marks})
+            ORDER BY o.id
+        """, ids):
+            item = output_row_to_dict(row, read_archived)
+            del item["id"]
+            by_id[item.pop("run_id")]["outputs"].append(item)
+
+        for row in conn.execute(f"""
+            SELECT run_id, input_tokens, output_tokens, cost_input, cost_output, process_time
+            FROM token_usage
+            WHERE run_id IN ({marks})
+            ORDER BY id
+        """, ids):
+            item = dict(row)
+            run = by_id[item.pop("run_id")]
+            if run["token_usage"] is None:
+                run["token_usage"] = item
+
+        yield runs
+
+        last_id = runs[-1]["id"]
+        if remaining is not None:
+            remaining -= len(runs)
+        if len(runs) < size:
+            return
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+def _open_output(output_path: Path, compression: Optional[str]) -> io.TextIOBase:
+    if compression is None:
+        return open(output_path, "w", encoding="utf-8", newline="")
+    if compression == "gzip":
+        return gzip.open(output_path, "wt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                "zstd compression requires the 'zstandard' package (pip install zstandard); "
+                "use gzip instead"
+            )
+        raw = open(output_path, "wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding="utf-8", newline="")
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def flatten_run_for_csv(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a run (with inputs and token usage) into a CSV row."""
+    input_titles = ", ".join(
+        (inp.get("title") or "") for inp in run.get("inputs", [])
+    )
+    usage = run.get("token_usage") or {}
+    return {
+        "id": run.get("id"),
+        "timestamp": run.get("timestamp"),
+        "task": run.get("task"),
+        "model": run.get("model"),
+        "thinking_level": run.get("thinking_level"),
+        "stream": run.get("stream"),
+        "currency": run.get("currency"),
+        "status": run.get("status"),
+        "error_message": run.get("error_message"),
+        "input_titles": input_titles,
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+        "cost_input": usage.get("cost_input"),
+        "cost_output": usage.get("cost_output"),
+        "total_cost": (usage.get("cost_input") or 0) + (usage.get("cost_output") or 0)
+    }
+
+
+def export_history(
+    db_path: Path,
+    output_path: Path,
+    format: Optional[str] = None,
+    compression: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Stream run history to a file.
+
+    Args:
+        db_path: Run database
+        output_path: Output file
+        format: 'json', 'jsonl' or 'csv' (default: detected from the file name)
+        compression: None, 'gzip' or 'zstd' (default: detected from the file name)
+        since: Inclusive lower bound on run timestamp (see parse_since)
+        until: Exclusive upper bound on run timestamp (see parse_until)
+        limit: Maximum number of runs (most recent first)
+        chunk_size: Runs fetched per chunk
+        progress_callback: Called with the running total after each chunk
+
+    Returns:
+        Number of runs exported
+    """
+    output_path = Path(output_path)
+    detected_format, detected_compression = detect_format(output_path)
+    format = format or detected_format
+    compression = compression or detected_compression
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    if compression is not None and compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    conn = get_connection(db_path)
+    archive = ArchiveReader(get_archive_dir(db_path))
+    total = 0
+    try:
+        # One read transaction: the export sees a single consistent snapshot
+        conn.execute("BEGIN")
+        with _open_output(output_path, compression) as f:
+            csv_writer = None
+            if format == "csv":
+                csv_writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+                csv_writer.writeheader()
+            elif format == "json":
+                f.write("{\n")
+                f.write(f'  "exported_at": {json.dumps(datetime.now().isoformat())},\n')
+                f.write('  "runs": [')
+
+            for runs in iter_run_chunks(conn, since, until, limit, chunk_size, archive.read):
+                for run in runs:
+                    if format == "jsonl":
+                        f.write(json.dumps(run, ensure_ascii=False))
+                        f.write("\n")
+                    elif format == "csv":
+                        csv_writer.writerow(flatten_run_for_csv(run))
+                    else:
+                        f.write(",\n    " if total else "\n    ")
+                        f.write(json.dumps(run, ensure_ascii=False))
+                    total += 1
+                if progress_callback:
+                    progress_callback(total)
+
+            if format == "json":
+                f.write(f'\n  ],\n  "total_runs": {total}\n}}\n')
+    finally:
+        conn.rollback()
+        conn.close()
+        archive.close()
+    return total
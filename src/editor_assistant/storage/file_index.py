@@ -0,0 +1,124 @@
+"""
+Content hashes of local files, cached in the run database.
+
+`batch` identifies files by the SHA-256 of their bytes: to skip files that
+already have a successful run, and to process duplicate files once. Hashing
+a large folder on every invocation would re-read every file, so the hash is
+stored with the file's size and mtime in the `file_index` table and reused
+while both are unchanged.
+
+An entry is only trusted if the file's mtime is older than the time it was
+indexed: a file written again within the same mtime tick as its indexing
+could keep its size and mtime with different bytes (the "racily clean" case
+of git's index), so it is hashed again.
+
+Usage:
+    index = FileIndex(repository)
+    hashes = index.hashes([Path("papers/a.pdf"), Path("papers/b.pdf")])
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config.constants import FILE_INDEX_LOOKUP_BATCH_SIZE
+from ..utils import hash_file
+from .repository import RunRepository
+
+
+class FileIndex:
+    """Cache of file content hashes keyed by path, size and mtime."""
+
+    def __init__(self, repository: Optional[RunRepository] = None):
+        """
+        Initialize the index.
+
+        Args:
+            repository: Repository whose database holds the index
+                        (default: the default database)
+        """
+        self.repository = repository if repository is not None else RunRepository()
+        # Files hashed vs. reused from the index, over this instance's lifetime
+        self.hashed = 0
+        self.cached = 0
+
+    def hashes(self, paths: Iterable[Path], skip_unreadable: bool = False) -> Dict[Path, str]:
+        """
+        SHA-256 of each file's bytes, reading only files that changed.
+
+        Args:
+            paths: Local files
+            skip_unreadable: Leave out files that cannot be read (removed,
+                             no permission) instead of raising
+
+        Returns:
+            Mapping of each path (as given) to its hex digest
+
+        Raises:
+            OSError: If a file cannot be read and skip_unreadable is False
+        """
+        paths = list(paths)
+        keys = {path: str(Path(path).resolve()) for path in paths}
+        stored = self._lookup(list(dict.fromkeys(keys.values())))
+
+        result: Dict[Path, str] = {}
+        updates = {}
+        for path in paths:
+            key = keys[path]
+            try:
+                stat = Path(path).stat()
+            except OSError:
+                if not skip_unreadable:
+                    raise
+                continue
+            entry = stored.get(key)
+            if (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and stat.st_mtime_ns / 1e9 < entry["indexed_at"]
+            ):
+                result[path] = entry["content_hash"]
+                self.cached += 1
+                continue
+            if key in updates:
+                # The same file listed twice
+                result[path] = updates[key][3]
+                continue
+            indexed_at = time.time()
+            try:
+                content_hash = hash_file(str(path))
+            except OSError:
+                if not skip_unreadable:
+                    raise
+                continue
+            result[path] = content_hash
+            updates[key] = (key, stat.st_size, stat.st_mtime_ns, content_hash, indexed_at)
+            self.hashed += 1
+
+        if updates:
+            with self.repository.transaction() as conn:
+                conn.executemany(
+                    """INSERT INTO file_index (path, size, mtime_ns, content_hash, indexed_at)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(path) DO UPDATE SET
+                           size = excluded.size,
+                           mtime_ns = excluded.mtime_ns,
+                           content_hash = excluded.content_hash,
+                           indexed_at = excluded.indexed_at""",
+                    list(updates.values())
+                )
+        return result
+
+    def _lookup(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        conn = self.repository._conn()
+        stored = {}
+        for start in range(0, len(keys), FILE_INDEX_LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + FILE_INDEX_LOOKUP_BATCH_SIZE]
+            marks = ",".join("?" * len(batch))
+            for row in conn.execute(
+                f"SELECT path, size, mtime_ns, content_hash, indexed_at FROM file_index WHERE path IN ({marks})",
+                batch
+            ):
+                stored[row["path"]] = dict(row)
+        return stored
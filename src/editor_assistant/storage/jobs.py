@@ -0,0 +1,273 @@
+"""
+Durable job queue in the run database.
+
+`editor-assistant enqueue` writes one job per input (source, task, model,
+options) to the `jobs` table; `editor-assistant worker` processes drain it.
+A job moves through:
+
+    queued -> running -> done
+                      -> queued (failed, retried after a backoff)
+                      -> dead   (failed max_attempts times: dead letter)
+
+Claiming is one UPDATE ... RETURNING under the database write lock, so
+several worker processes never claim the same job. A claimed job carries a
+lease (`lease_expires_at`) that its worker renews by heartbeat. If a worker
+dies, its leases expire and the jobs are claimed again (the lost attempt
+counts towards max_attempts). Workers only complete, fail or renew jobs they
+still hold, so a worker that lost a lease cannot overwrite the new holder.
+
+Usage:
+    queue = JobQueue()
+    queue.enqueue("paper", "/papers/a.pdf", "brief", "deepseek-v3.2")
+    for job in queue.claim("host:1234", limit=4):
+        ...
+        queue.complete(job["id"], "host:1234", run_id)
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_DELAY_SECONDS,
+)
+from .repository import RunRepository
+
+JOB_STATUSES = ("queued", "running", "done", "dead")
+
+
+def _job_to_dict(row) -> Dict[str, Any]:
+    job = dict(row)
+    job["options"] = json.loads(job["options"] or "{}")
+    return job
+
+
+class JobQueue:
+    """Job queue stored in the run database (see module docstring)."""
+
+    def __init__(self, repository: Optional[RunRepository] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            repository: Repository whose database holds the queue
+                        (default: the default database)
+        """
+        self.repository = repository if repository is not None else RunRepository()
+
+    # =========================================================================
+    # Producers
+    # =========================================================================
+
+    def enqueue(
+        self,
+        input_type: str,
+        source_path: str,
+        task: str,
+        model: str,
+        options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> int:
+        """
+        Add a job.
+
+        Args:
+            input_type: Type of input (paper, news)
+            source_path: Source file path or URL
+            task: Task name
+            model: Model name
+            options: thinking_level, stream, save_files, reconvert
+            max_attempts: Attempts before the job is dead-lettered
+
+        Returns:
+            Job ID
+        """
+        with self.repository.transaction() as conn:
+            return conn.execute(
+                """INSERT INTO jobs (input_type, source_path, task, model, options, max_attempts, available_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (input_type, source_path, task, model, json.dumps(options or {}), max_attempts, time.time())
+            ).lastrowid
+
+    def retry_dead(self) -> int:
+        """Queue dead-lettered jobs again with fresh attempts; return how many."""
+        with self.repository.transaction() as conn:
+            return conn.execute(
+                """UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, finished_at = NULL
+                   WHERE status = 'dead'""",
+                (time.time(),)
+            ).rowcount
+
+    # =========================================================================
+    # Workers
+    # =========================================================================
+
+    def claim(
+        self,
+        worker: str,
+        limit: int = 1,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        now: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Claim up to `limit` available jobs for `worker`.
+
+        Jobs whose lease expired are returned to the queue (or dead-lettered
+        if that was their last attempt) first.
+
+        Returns:
+            Claimed jobs (oldest first), with `options` decoded
+        """
+        now = time.time() if now is None else now
+        with self.repository.transaction() as conn:
+            self._reclaim_expired(conn, now)
+            rows = conn.execute(
+                """UPDATE jobs
+                   SET status = 'running', worker = ?, attempts = attempts + 1,
+                       lease_expires_at = ?, heartbeat_at = ?
+                   WHERE id IN (
+                       SELECT id FROM jobs
+                       WHERE status = 'queued' AND available_at <= ?
+                       ORDER BY available_at, id
+                       LIMIT ?
+                   )
+                   RETURNING *""",
+                (worker, now + lease_seconds, now, now, limit)
+            ).fetchall()
+        return sorted((_job_to_dict(row) for row in rows), key=lambda job: job["id"])
+
+    def heartbeat(
+        self,
+        job_ids: List[int],
+        worker: str,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        now: Optional[float] = None,
+    ) -> List[int]:
+        """
+        Renew the leases of `worker`'s running jobs.
+
+        Returns:
+            IDs of the jobs the worker still holds (a missing ID lost its lease)
+        """
+        if not job_ids:
+            return []
+        now = time.time() if now is None else now
+        placeholders = ",".join("?" * len(job_ids))
+        with self.repository.transaction() as conn:
+            rows = conn.execute(
+                f"""UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ?
+                    WHERE id IN ({placeholders}) AND worker = ? AND status = 'running'
+                    RETURNING id""",
+                (now + lease_seconds, now, *job_ids, worker)
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def complete(self, job_id: int, worker: str, run_id: Optional[int] = None) -> bool:
+        """
+        Mark a job done.
+
+        Returns:
+            False if the worker no longer holds the job
+        """
+        with self.repository.transaction() as conn:
+            return conn.execute(
+                """UPDATE jobs SET status = 'done', run_id = ?, lease_expires_at = NULL,
+                       last_error = NULL, finished_at = ?
+                   WHERE id = ? AND worker = ? AND status = 'running'""",
+                (run_id if run_id is not None and run_id >= 0 else None, time.time(), job_id, worker)
+            ).rowcount == 1
+
+    def fail(
+        self,
+        job_id: int,
+        worker: str,
+        error: str,
+        run_id: Optional[int] = None,
+        retry_delay: float = JOB_RETRY_DELAY_SECONDS,
+        now: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Record a failed attempt: retry after a backoff, or dead-letter the job
+        after its last attempt.
+
+        Args:
+            retry_delay: Delay before the first retry (doubled per attempt)
+
+        Returns:
+            The job's new status ('queued' or 'dead'), or None if the worker
+            no longer holds the job
+        """
+        now = time.time() if now is None else now
+        with self.repository.transaction() as conn:
+            row = conn.execute(
+                """UPDATE jobs
+                   SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                       available_at = ? + ? * (1 << (attempts - 1)),
+                       finished_at = CASE WHEN attempts >= max_attempts THEN ? END,
+                       worker = NULL, lease_expires_at = NULL,
+                       last_error = ?, run_id = COALESCE(?, run_id)
+                   WHERE id = ? AND worker = ? AND status = 'running'
+                   RETURNING status""",
+                (now, retry_delay, now, error,
+                 run_id if run_id is not None and run_id >= 0 else None, job_id, worker)
+            ).fetchone()
+        return row[0] if row else None
+
+    def release(self, job_ids: List[int], worker: str) -> int:
+        """
+        Return unfinished jobs to the queue without using up an attempt
+        (worker shutting down).
+
+        Returns:
+            Number of jobs released
+        """
+        if not job_ids:
+            return 0
+        placeholders = ",".join("?" * len(job_ids))
+        with self.repository.transaction() as conn:
+            return conn.execute(
+                f"""UPDATE jobs SET status = 'queued', attempts = attempts - 1, worker = NULL,
+                        lease_expires_at = NULL, available_at = ?
+                    WHERE id IN ({placeholders}) AND worker = ? AND status = 'running'""",
+                (time.time(), *job_ids, worker)
+            ).rowcount
+
+    @staticmethod
+    def _reclaim_expired(conn, now: float) -> None:
+        conn.execute(
+            """UPDATE jobs
+               SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                   finished_at = CASE WHEN attempts >= max_attempts THEN ? END,
+                   last_error = 'lease expired (worker ' || COALESCE(worker, '?') || ' stopped responding)',
+                   worker = NULL, lease_expires_at = NULL, available_at = ?
+               WHERE status = 'running' AND lease_expires_at < ?""",
+            (now, now, now)
+        )
+
+    # =========================================================================
+    # Inspection
+    # =========================================================================
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status (every status present, zero if none)."""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for status, count in self.repository._conn().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+    def pending(self) -> int:
+        """Jobs not finished yet (queued or running)."""
+        return self.repository._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    def list_jobs(self, status: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent jobs with a status (e.g. 'dead' for the dead letters)."""
+        rows = self.repository._conn().execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)
+        ).fetchall()
+        return [_job_to_dict(row) for row in rows]
@@ -0,0 +1,272 @@
+"""
+Merging run histories (e.g. from `batch --shard` nodes) into one database.
+
+A source is either another run database or a JSON/JSONL export (optionally
+gzip/zstd compressed). Runs are identified by `runs.uuid`, so merging the
+same source twice, or sources that overlap, never duplicates a run. Inputs
+are matched by content hash, as in RunRepository.get_or_create_input();
+stored input articles come along from database sources.
+
+Merged runs get new ids in the target, in the source's chronological order.
+Their outputs are stored through RunRepository.add_output() (blob storage and
+search index), and the target's daily_stats rollups are kept current by its
+triggers. Archived outputs of a database source are read from its archive
+files and stored as regular blobs; `gc` archives them again.
+
+Each chunk of runs is merged in one transaction, so an interrupted merge can
+simply be run again.
+
+A source database is only read: it is opened read-only and never migrated,
+so a read-only copy from another host can be merged and stays unchanged.
+Tables and columns that an older source lacks read as empty and NULL, and a
+run without a uuid (older schema, or inserted by hand) gets one derived from
+its own fields, so merging it again still skips it.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config.constants import EXPORT_CHUNK_SIZE
+from .archive import ArchiveReader, get_archive_dir
+from .database import get_readonly_connection
+from .export import detect_format, iter_run_chunks
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def is_run_database(path: Path) -> bool:
+    """Whether a file is an SQLite database (rather than an export)."""
+    with open(path, "rb") as f:
+        return f.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+
+
+# =============================================================================
+# Sources
+# =============================================================================
+
+# Columns added to the tables a merge reads after the base schema
+_LATER_COLUMNS = {
+    "runs": ("uuid", "prompt_version"),
+    "inputs": ("blob_hash", "source_hash"),
+    "outputs": ("blob_hash", "archive"),
+}
+
+
+def _fill_older_schema(conn: sqlite3.Connection) -> None:
+    """
+    Let the usual queries read an older, unmigrated source database.
+
+    TEMP views add the missing columns as NULL, and an empty TEMP table
+    stands in for `blobs`. Unqualified names resolve to the temp schema
+    before main, and temp objects are allowed on a read-only connection.
+    """
+    missing = {}
+    for table, columns in _LATER_COLUMNS.items():
+        present = {row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")}
+        missing[table] = [column for column in columns if column not in present]
+    has_blobs = conn.execute(
+        "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'blobs'"
+    ).fetchone() is not None
+
+    for table, columns in missing.items():
+        if columns:
+            extra = ", ".join(f"NULL AS {column}" for column in columns)
+            conn.execute(f"CREATE TEMP VIEW {table} AS SELECT *, {extra} FROM main.{table}")
+    if not has_blobs:
+        conn.execute("CREATE TEMP TABLE blobs (hash TEXT PRIMARY KEY, codec TEXT, size INTEGER, data BLOB)")
+
+
+def _derived_uuid(run: Dict[str, Any]) -> str:
+    """Stable uuid for a source run that has none, from the run's own fields."""
+    inputs = sorted(inp.get("content_hash") or "" for inp in run["inputs"])
+    identity = "\x00".join([str(run["id"]), str(run["timestamp"]), run["task"] or "", run["model"] or "", *inputs])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+def _iter_database_runs(db_path: Path, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Runs of another run database, oldest first, with their input articles."""
+    conn = get_readonly_connection(db_path)
+    archive = ArchiveReader(get_archive_dir(db_path))
+    try:
+        _fill_older_schema(conn)
+
+        # One read snapshot for the whole merge
+        conn.execute("BEGIN")
+        for runs in iter_run_chunks(conn, chunk_size=chunk_size, read_archived=archive.read, oldest_first=True):
+            input_ids = {inp["id"] for run in runs for inp in run["inputs"]}
+            articles = {}
+            if input_ids:
+                marks = ",".join("?" * len(input_ids))
+                for row in conn.execute(f"""
+                    SELECT i.id, i.source_hash, b.hash, b.codec, b.size, b.data
+                    FROM inputs i LEFT JOIN blobs b ON b.hash = i.blob_hash
+                    WHERE i.id IN ({marks})
+                """, list(input_ids)):
+                    articles[row[0]] = (row[1], tuple(row[2:]) if row[2] is not None else None)
+            for run in runs:
+                for inp in run["inputs"]:
+                    inp["source_hash"], inp["article_blob"] = articles.get(inp["id"], (None, None))
+                if not run["uuid"]:
+                    run["uuid"] = _derived_uuid(run)
+            yield runs
+    finally:
+        conn.rollback()
+        conn.close()
+        archive.close()
+
+
+def _open_export(path: Path, compression: Optional[str]) -> io.TextIOBase:
+    if compression is None:
+        return open(path, "r", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading zstd exports requires the 'zstandard' package (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def _iter_export_runs(path: Path, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Runs of a JSON/JSONL export, oldest first."""
+    format, compression = detect_format(path)
+    if format == "csv":
+        raise ValueError("CSV exports have no outputs and cannot be merged; use a JSON/JSONL export or the run database")
+    with _open_export(path, compression) as f:
+        if format == "jsonl":
+            lines = [line for line in f if line.strip()]
+        else:
+            runs = json.load(f)["runs"]
+    # Exports are written newest first
+    if format == "jsonl":
+        for end in range(len(lines), 0, -chunk_size):
+            yield [json.loads(line) for line in reversed(lines[max(0, end - chunk_size):end])]
+    else:
+        runs.reverse()
+        for start in range(0, len(runs), chunk_size):
+            yield runs[start:start + chunk_size]
+
+
+# =============================================================================
+# Target
+# =============================================================================
+
+def _merge_input(conn, inp: Dict[str, Any]) -> Tuple[int, bool]:
+    """Insert an input or complete the existing one; return (id, created)."""
+    content_hash = inp.get("content_hash")
+    blob = inp.get("article_blob")
+    if blob is not None:
+        conn.execute("INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)", blob)
+    blob_hash = blob[0] if blob is not None else None
+
+    if content_hash is not None:
+        row = conn.execute("SELECT id FROM inputs WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is not None:
+            conn.execute(
+                """UPDATE inputs SET blob_hash = COALESCE(blob_hash, ?), source_hash = COALESCE(source_hash, ?)
+                   WHERE id = ?""",
+                (blob_hash, inp.get("source_hash"), row[0])
+            )
+            return row[0], False
+    cursor = conn.execute(
+        """INSERT INTO inputs (type, source_path, title, content_hash, blob_hash, source_hash)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (inp.get("type"), inp.get("source_path"), inp.get("title"), content_hash, blob_hash, inp.get("source_hash"))
+    )
+    return cursor.lastrowid, True
+
+
+def _merge_run(repository, conn, run: Dict[str, Any], stats: Dict[str, int]) -> None:
+    run_uuid = run.get("uuid")
+    if not run_uuid:
+        raise ValueError(
+            "Source runs have no uuid (export written before run uuids existed); "
+            "merge the run database instead"
+        )
+    if conn.execute("SELECT 1 FROM runs WHERE uuid = ?", (run_uuid,)).fetchone():
+        stats["skipped"] += 1
+        return
+
+    run_id = conn.execute(
+        """INSERT INTO runs (uuid, timestamp, task, model, thinking_level, stream, currency, prompt_version,
+                             status, error_message)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (run_uuid, run.get("timestamp"), run.get("task"), run.get("model"), run.get("thinking_level"),
+         run.get("stream", 1), run.get("currency", "$"), run.get("prompt_version"), run.get("status"),
+         run.get("error_message"))
+    ).lastrowid
+    stats["runs"] += 1
+
+    for inp in run.get("inputs", []):
+        input_id, created = _merge_input(conn, inp)
+        stats["inputs"] += created
+        conn.execute("INSERT OR IGNORE INTO run_inputs (run_id, input_id) VALUES (?, ?)", (run_id, input_id))
+
+    usage = run.get("token_usage")
+    if usage:
+        conn.execute(
+            """INSERT INTO token_usage (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (run_id, usage.get("input_tokens") or 0, usage.get("output_tokens") or 0, usage.get("cost_input") or 0,
+             usage.get("cost_output") or 0, usage.get("process_time") or 0)
+        )
+
+    for output in run.get("outputs", []):
+        if output.get("content") is None:
+            # Archived in the source and its archive file is missing
+            stats["missing_outputs"] += 1
+            continue
+        repository.add_output(run_id, output["output_type"], output["content"], output.get("content_type") or "text")
+        stats["outputs"] += 1
+
+
+def merge_history(
+    repository,
+    source: Path,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Merge the runs of another run database or export into `repository`.
+
+    Args:
+        repository: Target RunRepository
+        source: Run database, or JSON/JSONL export (optionally .gz/.zst)
+        chunk_size: Runs merged per transaction
+        progress_callback: Called with the number of source runs read so far
+
+    Returns:
+        Counts: runs (merged), skipped (already present), inputs (new),
+        outputs, missing_outputs (archived bodies that could not be read)
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f"No such file: {source}")
+    if source.resolve() == Path(repository.db_path).resolve():
+        raise ValueError("Cannot merge a database into itself")
+
+    if is_run_database(source):
+        chunks = _iter_database_runs(source, chunk_size)
+    else:
+        chunks = _iter_export_runs(source, chunk_size)
+
+    stats = {"runs": 0, "skipped": 0, "inputs": 0, "outputs": 0, "missing_outputs": 0}
+    seen = 0
+    try:
+        for runs in chunks:
+            with repository.transaction() as conn:
+                for run in runs:
+                    _merge_run(repository, conn, run, stats)
+            seen += len(runs)
+            if progress_callback:
+                progress_callback(seen)
+    finally:
+        chunks.close()
+    return stats
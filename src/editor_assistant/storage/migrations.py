@@ -0,0 +1,556 @@
+"""
+Versioned schema migrations for the run database.
+
+`MIGRATIONS` is an ordered list of (version, description, apply) steps.
+`migrate()` applies every step above the version recorded in
+`schema_version`, each in its own transaction together with the version
+bump, so an interrupted upgrade leaves the database at the last completed
+version and is resumed on next open. Each step holds the write lock while it
+runs and re-reads the version first, so concurrent processes opening the same
+database do not apply a step twice.
+
+Steps are written to be idempotent (IF NOT EXISTS, column checks), which also
+covers databases created before versioning, where `schema_version` is
+missing but some tables exist.
+
+To change the schema, append a step; never edit a released one.
+"""
+
+import sqlite3
+from typing import Callable, Iterator, List, Tuple
+
+from .blobs import OUTPUT_BLOB_JOIN
+
+
+# =============================================================================
+# Schema
+# =============================================================================
+
+# Version 1: base tables
+BASE_SCHEMA = """
+-- Schema version tracking
+CREATE TABLE IF NOT EXISTS schema_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+-- Inputs table (independent, supports deduplication)
+CREATE TABLE IF NOT EXISTS inputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,                     -- paper, news
+    source_path TEXT,
+    title TEXT,
+    content_hash TEXT UNIQUE,               -- MD5 for deduplication
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Runs table
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    task TEXT NOT NULL,                     -- brief, outline, translate
+    model TEXT NOT NULL,                    -- deepseek-v3.2, gemini-3-flash
+    thinking_level TEXT,                    -- low, medium, high, null
+    stream INTEGER DEFAULT 1,               -- 0 or 1
+    currency TEXT DEFAULT '$',              -- pricing currency symbol
+    status TEXT DEFAULT 'pending',          -- pending, success, failed
+    error_message TEXT
+);
+
+-- Run-Input association (many-to-many)
+CREATE TABLE IF NOT EXISTS run_inputs (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    input_id INTEGER NOT NULL REFERENCES inputs(id) ON DELETE CASCADE,
+    PRIMARY KEY (run_id, input_id)
+);
+
+-- Outputs table
+CREATE TABLE IF NOT EXISTS outputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    output_type TEXT NOT NULL,              -- main, bilingual, classification
+    content_type TEXT DEFAULT 'text',       -- text, json
+    content TEXT                            -- inline body (rows before version 3)
+);
+
+-- Token usage table
+CREATE TABLE IF NOT EXISTS token_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cost_input REAL DEFAULT 0,
+    cost_output REAL DEFAULT 0,
+    process_time REAL DEFAULT 0
+);
+
+-- Indexes for common queries
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task);
+CREATE INDEX IF NOT EXISTS idx_inputs_hash ON inputs(content_hash);
+CREATE INDEX IF NOT EXISTS idx_outputs_run ON outputs(run_id);
+"""
+
+# Version 2: full-text search. inputs_fts is an external-content table (the
+# text is stored once, in inputs) kept in sync by triggers. The trigram
+# tokenizer matches substrings, so CJK text (no spaces between words) is
+# searchable, and LIKE '%...%' on inputs_fts uses the index.
+INPUT_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS inputs_fts USING fts5(
+    title, source_path,
+    content='inputs', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS inputs_fts_ai AFTER INSERT ON inputs BEGIN
+    INSERT INTO inputs_fts(rowid, title, source_path) VALUES (new.id, new.title, new.source_path);
+END;
+CREATE TRIGGER IF NOT EXISTS inputs_fts_ad AFTER DELETE ON inputs BEGIN
+    INSERT INTO inputs_fts(inputs_fts, rowid, title, source_path)
+    VALUES ('delete', old.id, old.title, old.source_path);
+END;
+CREATE TRIGGER IF NOT EXISTS inputs_fts_au AFTER UPDATE OF title, source_path ON inputs BEGIN
+    INSERT INTO inputs_fts(inputs_fts, rowid, title, source_path)
+    VALUES ('delete', old.id, old.title, old.source_path);
+    INSERT INTO inputs_fts(rowid, title, source_path) VALUES (new.id, new.title, new.source_path);
+END;
+"""
+
+# Version 2 indexed outputs.content through an external-content table and
+# triggers; version 3 replaces it (see OUTPUT_SEARCH_SCHEMA)
+V2_OUTPUT_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS outputs_fts USING fts5(
+    content,
+    content='outputs', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS outputs_fts_ai AFTER INSERT ON outputs BEGIN
+    INSERT INTO outputs_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS outputs_fts_ad AFTER DELETE ON outputs BEGIN
+    INSERT INTO outputs_fts(outputs_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS outputs_fts_au AFTER UPDATE OF content ON outputs BEGIN
+    INSERT INTO outputs_fts(outputs_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO outputs_fts(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+DROP_V2_OUTPUT_SEARCH = """
+DROP TRIGGER IF EXISTS outputs_fts_ai;
+DROP TRIGGER IF EXISTS outputs_fts_ad;
+DROP TRIGGER IF EXISTS outputs_fts_au;
+DROP TABLE IF EXISTS outputs_fts;
+"""
+
+# Version 3: output bodies stored once per distinct content (see blobs.py)
+OUTPUT_BLOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,                  -- SHA-256 of the UTF-8 text
+    codec TEXT NOT NULL,                    -- zlib, none
+    size INTEGER NOT NULL,                  -- uncompressed bytes
+    data BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_outputs_blob ON outputs(blob_hash);
+"""
+
+# Version 3: FTS5 cannot read compressed bodies, so outputs_fts is contentless
+# and RunRepository.add_output() indexes each body when it stores it
+OUTPUT_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS outputs_fts USING fts5(
+    content,
+    content='', tokenize='trigram'
+);
+"""
+
+# Version 4: indexes for the history queries (checked against EXPLAIN QUERY
+# PLAN by tests/stress/test_query_plans.py)
+QUERY_INDEXES_SCHEMA = """
+-- Runs of an input (search by title, input deletes cascading to run_inputs)
+CREATE INDEX IF NOT EXISTS idx_run_inputs_input ON run_inputs(input_id);
+
+-- Token usage of a run (history, details, stats joins)
+CREATE INDEX IF NOT EXISTS idx_token_usage_run ON token_usage(run_id);
+
+-- Resumable runs: partial index holding only pending/aborted runs, in id
+-- order. A plain runs(status) index has a handful of distinct values, so
+-- with ANALYZE statistics the planner prefers scanning all runs over it.
+CREATE INDEX IF NOT EXISTS idx_runs_resumable ON runs(id) WHERE status IN ('pending', 'aborted');
+
+-- Time-window stats grouped by model; also serves every timestamp range
+-- query, replacing the single-column index
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp_model ON runs(timestamp, model);
+DROP INDEX IF EXISTS idx_runs_timestamp;
+
+-- No query filters on task or model alone, and for the GROUP BY task/model
+-- stats queries these led the planner to walk the whole index (to skip a
+-- sort) instead of reading only the time window
+DROP INDEX IF EXISTS idx_runs_task;
+DROP INDEX IF EXISTS idx_runs_model;
+"""
+
+# Version 5: per-day rollups for `stats`, one row per (day, model, task,
+# status), kept current by triggers in the same transaction as the run and
+# token usage writes. A run's tokens, cost and time move with it when its
+# status changes. daily_stats is a rowid table so that a NULL key column
+# (which the runs schema allows) cannot make a run insert fail.
+DAILY_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT,                               -- UTC date of runs.timestamp
+    model TEXT,
+    task TEXT,
+    status TEXT,
+    runs INTEGER NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,           -- cost_input + cost_output
+    process_time REAL NOT NULL DEFAULT 0,   -- seconds
+    PRIMARY KEY (day, model, task, status)
+);
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_runs_ai AFTER INSERT ON runs BEGIN
+    INSERT INTO daily_stats (day, model, task, status, runs)
+    VALUES (date(new.timestamp), new.model, new.task, new.status, 1)
+    ON CONFLICT (day, model, task, status) DO UPDATE SET runs = runs + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_runs_au AFTER UPDATE OF timestamp, model, task, status ON runs
+WHEN old.timestamp IS NOT new.timestamp OR old.model IS NOT new.model
+  OR old.task IS NOT new.task OR old.status IS NOT new.status
+BEGIN
+    UPDATE daily_stats SET
+        runs = runs - 1,
+        input_tokens = input_tokens - (SELECT COALESCE(SUM(input_tokens), 0) FROM token_usage WHERE run_id = old.id),
+        output_tokens = output_tokens - (SELECT COALESCE(SUM(output_tokens), 0) FROM token_usage WHERE run_id = old.id),
+        cost = cost - (SELECT COALESCE(SUM(cost_input + cost_output), 0) FROM token_usage WHERE run_id = old.id),
+        process_time = process_time - (SELECT COALESCE(SUM(process_time), 0) FROM token_usage WHERE run_id = old.id)
+    WHERE day = date(old.timestamp) AND model = old.model AND task = old.task AND status = old.status;
+    DELETE FROM daily_stats
+    WHERE day = date(old.timestamp) AND model = old.model AND task = old.task AND status = old.status
+      AND runs <= 0;
+    INSERT INTO daily_stats (day, model, task, status, runs, input_tokens, output_tokens, cost, process_time)
+    SELECT date(new.timestamp), new.model, new.task, new.status, 1,
+           COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0),
+           COALESCE(SUM(cost_input + cost_output), 0), COALESCE(SUM(process_time), 0)
+    FROM token_usage WHERE run_id = new.id
+    ON CONFLICT (day, model, task, status) DO UPDATE SET
+        runs = runs + 1,
+        input_tokens = input_tokens + excluded.input_tokens,
+        output_tokens = output_tokens + excluded.output_tokens,
+        cost = cost + excluded.cost,
+        process_time = process_time + excluded.process_time;
+END;
+
+-- BEFORE: the run's token usage is still there (it is deleted by cascade)
+CREATE TRIGGER IF NOT EXISTS daily_stats_runs_bd BEFORE DELETE ON runs BEGIN
+    UPDATE daily_stats SET
+        runs = runs - 1,
+        input_tokens = input_tokens - (SELECT COALESCE(SUM(input_tokens), 0) FROM token_usage WHERE run_id = old.id),
+        output_tokens = output_tokens - (SELECT COALESCE(SUM(output_tokens), 0) FROM token_usage WHERE run_id = old.id),
+        cost = cost - (SELECT COALESCE(SUM(cost_input + cost_output), 0) FROM token_usage WHERE run_id = old.id),
+        process_time = process_time - (SELECT COALESCE(SUM(process_time), 0) FROM token_usage WHERE run_id = old.id)
+    WHERE day = date(old.timestamp) AND model = old.model AND task = old.task AND status = old.status;
+    DELETE FROM daily_stats
+    WHERE day = date(old.timestamp) AND model = old.model AND task = old.task AND status = old.status
+      AND runs <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_stats_token_usage_ai AFTER INSERT ON token_usage BEGIN
+    UPDATE daily_stats SET
+        input_tokens = input_tokens + COALESCE(new.input_tokens, 0),
+        output_tokens = output_tokens + COALESCE(new.output_tokens, 0),
+        cost = cost + COALESCE(new.cost_input, 0) + COALESCE(new.cost_output, 0),
+        process_time = process_time + COALESCE(new.process_time, 0)
+    WHERE (day, model, task, status) =
+          (SELECT date(timestamp), model, task, status FROM runs WHERE id = new.run_id);
+END;
+"""
+
+
+# Version 7: converted markdown of each input, stored as a blob, so resume
+# and reruns load the article instead of fetching/converting the source again
+INPUT_ARTICLES_SCHEMA = """
+-- Local files: the stored article of the same file bytes
+CREATE INDEX IF NOT EXISTS idx_inputs_source_hash ON inputs(source_hash);
+
+-- URLs: the latest stored article of the same address
+CREATE INDEX IF NOT EXISTS idx_inputs_source_path ON inputs(source_path);
+
+-- Unreferenced-blob cleanup (compact, gc)
+CREATE INDEX IF NOT EXISTS idx_inputs_blob ON inputs(blob_hash);
+"""
+
+# Version 8: durable job queue drained by `editor-assistant worker` processes
+# (see jobs.py). Times are Unix epoch seconds.
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    input_type TEXT NOT NULL,               -- paper, news
+    source_path TEXT NOT NULL,              -- file path or URL
+    task TEXT NOT NULL,
+    model TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',     -- JSON: thinking_level, stream, save_files, reconvert
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, done, dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,             -- not claimed before (retry backoff)
+    worker TEXT,                            -- lease holder while running
+    lease_expires_at REAL,
+    heartbeat_at REAL,
+    run_id INTEGER REFERENCES runs(id) ON DELETE SET NULL,
+    last_error TEXT,
+    finished_at REAL
+);
+
+-- Claim (oldest available queued job), status counts and listings
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, available_at, id);
+
+-- Reclaim: running jobs whose lease expired (worker died)
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires_at);
+"""
+
+# Version 9: globally unique run ids, so run databases and exports from
+# several hosts (batch --shard) merge without duplicating runs (see merge.py)
+RUN_UUIDS_SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_uuid ON runs(uuid);
+"""
+
+# Version 10: incremental batches (see file_index.py). file_index caches the
+# content hash of scanned files by (size, mtime); runs record the version of
+# the prompt template they used, so "already done" means same task, model
+# and prompt.
+FILE_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_index (
+    path TEXT PRIMARY KEY,                  -- absolute path
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,             -- SHA-256 of the file's bytes
+    indexed_at REAL NOT NULL
+);
+"""
+
+# =============================================================================
+# Steps
+# =============================================================================
+
+def _statements(script: str) -> Iterator[str]:
+    """Split a script into statements (trigger bodies stay whole)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement.strip()
+            statement = ""
+
+
+def _run_script(conn: sqlite3.Connection, script: str) -> None:
+    # Not executescript(): that commits first, and each step must stay
+    # inside its transaction
+    for statement in _statements(script):
+        conn.execute(statement)
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    """Whether SQLite was built with FTS5 (and its trigram tokenizer)."""
+    conn.execute("SAVEPOINT ea_fts_probe")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.ea_fts_probe USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.execute("ROLLBACK TO ea_fts_probe")
+        conn.execute("RELEASE ea_fts_probe")
+
+
+def _base_tables(conn: sqlite3.Connection) -> None:
+    _run_script(conn, BASE_SCHEMA)
+
+
+def _search_index(conn: sqlite3.Connection) -> None:
+    if not _fts5_available(conn):
+        return  # Search falls back to LIKE scans
+    _run_script(conn, INPUT_SEARCH_SCHEMA)
+    _run_script(conn, V2_OUTPUT_SEARCH_SCHEMA)
+    # Index rows written before the triggers existed
+    conn.execute("INSERT INTO inputs_fts(inputs_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO outputs_fts(outputs_fts) VALUES ('rebuild')")
+
+
+def _output_blobs(conn: sqlite3.Connection) -> None:
+    if not _has_column(conn, "outputs", "blob_hash"):
+        conn.execute("ALTER TABLE outputs ADD COLUMN blob_hash TEXT REFERENCES blobs(hash)")
+    _run_script(conn, OUTPUT_BLOBS_SCHEMA)
+    if _has_table(conn, "inputs_fts"):
+        _run_script(conn, DROP_V2_OUTPUT_SEARCH)
+        _run_script(conn, OUTPUT_SEARCH_SCHEMA)
+        rebuild_search_index(conn)
+
+
+def _query_indexes(conn: sqlite3.Connection) -> None:
+    _run_script(conn, QUERY_INDEXES_SCHEMA)
+
+
+def _output_archive(conn: sqlite3.Connection) -> None:
+    # "<archive file>/<sha256>" once gc has moved the body out (see archive.py)
+    if not _has_column(conn, "outputs", "archive"):
+        conn.execute("ALTER TABLE outputs ADD COLUMN archive TEXT")
+
+
+def _daily_stats(conn: sqlite3.Connection) -> None:
+    _run_script(conn, DAILY_STATS_SCHEMA)
+    rebuild_daily_stats(conn)
+
+
+def _input_articles(conn: sqlite3.Connection) -> None:
+    if not _has_column(conn, "inputs", "blob_hash"):
+        conn.execute("ALTER TABLE inputs ADD COLUMN blob_hash TEXT REFERENCES blobs(hash)")
+    # SHA-256 of the local source file's bytes (NULL for URLs)
+    if not _has_column(conn, "inputs", "source_hash"):
+        conn.execute("ALTER TABLE inputs ADD COLUMN source_hash TEXT")
+    _run_script(conn, INPUT_ARTICLES_SCHEMA)
+
+
+def _jobs(conn: sqlite3.Connection) -> None:
+    _run_script(conn, JOBS_SCHEMA)
+
+
+def _run_uuids(conn: sqlite3.Connection) -> None:
+    if not _has_column(conn, "runs", "uuid"):
+        conn.execute("ALTER TABLE runs ADD COLUMN uuid TEXT")
+    conn.execute("UPDATE runs SET uuid = lower(hex(randomblob(16))) WHERE uuid IS NULL")
+    _run_script(conn, RUN_UUIDS_SCHEMA)
+
+
+def _file_index(conn: sqlite3.Connection) -> None:
+    if not _has_column(conn, "runs", "prompt_version"):
+        conn.execute("ALTER TABLE runs ADD COLUMN prompt_version TEXT")
+    _run_script(conn, FILE_INDEX_SCHEMA)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "base tables", _base_tables),
+    (2, "FTS5 search index over input titles/paths and output content", _search_index),
+    (3, "output bodies in content-addressed compressed blobs", _output_blobs),
+    (4, "indexes for history, resume and stats queries", _query_indexes),
+    (5, "daily_stats rollups for usage statistics", _daily_stats),
+    (6, "archive references for outputs past retention", _output_archive),
+    (7, "stored converted markdown and source file hashes for inputs", _input_articles),
+    (8, "job queue for worker processes", _jobs),
+    (9, "globally unique run ids for merging histories", _run_uuids),
+    (10, "file index and run prompt versions for incremental batches", _file_index),
+]
+
+# Schema version of a fully migrated database
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get current schema version (0 for a new or unversioned database)."""
+    try:
+        cursor = conn.execute("SELECT version FROM schema_version WHERE id = 1")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply pending migrations in order.
+
+    Args:
+        conn: Connection with no open transaction
+
+    Returns:
+        Versions applied by this call (empty if already up to date)
+    """
+    applied = []
+    for version, _, apply in MIGRATIONS:
+        if get_schema_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if get_schema_version(conn) < version:
+                apply(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_version (id, version) VALUES (1, ?)",
+                    (version,)
+                )
+                applied.append(version)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return applied
+
+
+# =============================================================================
+# Search index maintenance
+# =============================================================================
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    """Whether the FTS5 search tables exist."""
+    return _has_table(conn, "outputs_fts")
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    """Rebuild the FTS5 index from the inputs and outputs tables."""
+    conn.execute("INSERT INTO inputs_fts(inputs_fts) VALUES ('rebuild')")
+    # outputs_fts is contentless (bodies are compressed): re-add every body
+    conn.execute("INSERT INTO outputs_fts(outputs_fts) VALUES ('delete-all')")
+    rows = conn.execute(f"""
+        SELECT o.id, COALESCE(o.content, blob_text(b.codec, b.data))
+        FROM outputs o {OUTPUT_BLOB_JOIN}
+    """).fetchall()
+    conn.executemany(
+        "INSERT INTO outputs_fts(rowid, content) VALUES (?, ?)",
+        [row for row in rows if row[1] is not None],
+    )
+
+
+# =============================================================================
+# Rollup maintenance
+# =============================================================================
+
+def rebuild_daily_stats(conn: sqlite3.Connection) -> int:
+    """
+    Recompute the daily_stats rollups from runs and token_usage.
+
+    Returns:
+        Number of rollup rows written
+    """
+    conn.execute("DELETE FROM daily_stats")
+    cursor = conn.execute("""
+        INSERT INTO daily_stats (day, model, task, status, runs, input_tokens, output_tokens, cost, process_time)
+        SELECT date(r.timestamp), r.model, r.task, r.status, COUNT(*),
+               COALESCE(SUM(t.input_tokens), 0), COALESCE(SUM(t.output_tokens), 0),
+               COALESCE(SUM(t.cost), 0), COALESCE(SUM(t.process_time), 0)
+        FROM runs r
+        LEFT JOIN (
+            SELECT run_id,
+                   SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens,
+                   SUM(cost_input + cost_output) AS cost, SUM(process_time) AS process_time
+            FROM token_usage GROUP BY run_id
+        ) t ON t.run_id = r.id
+        GROUP BY 1, 2, 3, 4
+    """)
+    return cursor.rowcount
@@ -4,12 +4,69 @@ Repository for database CRUD operations.
 
 import sqlite3
 import hashlib
-from typing import List, Dict, Any, Optional
+import re
+import uuid
+from typing import List, Dict, Any, Optional, Callable
 from pathlib import Path
 from dataclasses import dataclass
-from datetime import datetime
 
-from .database import get_connection, init_database, get_database_path
+from ..config.constants import (
+    FILE_INDEX_LOOKUP_BATCH_SIZE,
+    HISTORY_PAGE_SIZE,
+    OUTPUT_ARCHIVE_BATCH_SIZE,
+    OUTPUT_COMPACT_BATCH_SIZE,
+    OUTPUT_RETENTION_DAYS,
+    SEARCH_SNIPPET_TOKENS,
+)
+from .archive import ArchiveReader, archive_ref, get_archive_dir, write_archive
+from .blobs import (
+    OUTPUT_BLOB_JOIN,
+    OUTPUT_COLUMNS,
+    OUTPUT_META_COLUMNS,
+    OUTPUT_PREVIEW_COLUMNS,
+    decode_blob,
+    encode_text,
+    hash_text,
+    output_row_to_dict,
+    output_row_to_meta,
+    preview_stored_bytes,
+    put_blob,
+)
+from .database import (
+    SCHEMA_VERSION,
+    get_connection,
+    get_connection_manager,
+    get_database_path,
+    get_schema_version,
+    has_search_index,
+    init_database,
+    rebuild_daily_stats,
+)
+from .export import export_history
+from .merge import merge_history
+
+
+def _make_snippet(text: str, terms: List[str]) -> str:
+    """Snippet around the first match of any term, with FTS-style [markers]."""
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - SEARCH_SNIPPET_TOKENS // 2) if match else 0
+    end = min(len(text), start + SEARCH_SNIPPET_TOKENS)
+    window = pattern.sub(lambda m: f"[{m.group(0)}]", text[start:end])
+    return ("…" if start > 0 else "") + window + ("…" if end < len(text) else "")
+
+
+# Columns to select for an input with its stored article (inputs i JOIN blobs b)
+_INPUT_ARTICLE_COLUMNS = "i.id, i.type, i.source_path, i.title, b.codec, b.data"
+
+
+def _input_article_to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    """Convert a row selected with _INPUT_ARTICLE_COLUMNS to a dict with its markdown."""
+    if row is None:
+        return None
+    article = {key: row[key] for key in ("id", "type", "source_path", "title")}
+    article["content"] = decode_blob(row["codec"], row["data"])
+    return article
 
 
 @dataclass
@@ -47,17 +104,40 @@ class RunRepository:
             db_path: Optional custom database path
         """
         self.db_path = db_path or get_database_path()
+        self.archive_dir = get_archive_dir(self.db_path)
         self._ensure_initialized()
+        self._connections = get_connection_manager(self.db_path)
     
     def _ensure_initialized(self) -> None:
-        """Ensure database is initialized."""
+        """Ensure database is initialized and its schema is current."""
         if not self.db_path.exists():
             init_database(self.db_path)
+            return
+        conn = get_connection(self.db_path)
+        try:
+            version = get_schema_version(conn)
+        finally:
+            conn.close()
+        if version < SCHEMA_VERSION:
+            init_database(self.db_path)
     
     def _get_conn(self) -> sqlite3.Connection:
-        """Get database connection."""
+        """Get a new standalone connection (the caller closes it)."""
         return get_connection(self.db_path)
     
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's pooled connection (do not close it)."""
+        return self._connections.connection()
+    
+    def transaction(self):
+        """
+        Group repository writes into one transaction on this thread.
+        
+        Write methods called inside run in savepoints and are committed
+        together when the block exits (rolled back if it raises).
+        """
+        return self._connections.transaction()
+    
     # =========================================================================
     # Input Operations
     # =========================================================================
@@ -67,47 +147,92 @@ class RunRepository:
         input_type: str,
         source_path: str,
         title: str,
-        content: str
+        content: str,
+        source_hash: Optional[str] = None
     ) -> int:
         """
         Get existing input by content hash or create new one.
         
+        The converted markdown is kept in blob storage, so the article can be
+        loaded later without fetching or converting the source again (see
+        get_input_article / find_input_article).
+        
         Args:
             input_type: Type of input (paper, news)
             source_path: Source file path or URL
             title: Document title
-            content: Full content for hashing
+            content: Full content (converted markdown)
+            source_hash: SHA-256 of the local source file's bytes, if any
         
         Returns:
             Input ID
         """
         content_hash = self._hash_content(content)
+        # Hash and compress before taking the write lock
+        encoded = encode_text(content) if content else None
+        
+        # UPSERT: one statement, so concurrent writers cannot race between
+        # lookup and insert. The update keeps the first metadata (filling in
+        # the article and source hash on rows stored before they existed)
+        # and makes RETURNING yield the existing row's id.
+        with self.transaction() as conn:
+            blob_hash = put_blob(conn, encoded) if encoded else None
+            row = conn.execute(
+                """INSERT INTO inputs (type, source_path, title, content_hash, blob_hash, source_hash)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(content_hash) DO UPDATE SET
+                       blob_hash = COALESCE(blob_hash, excluded.blob_hash),
+                       source_hash = COALESCE(source_hash, excluded.source_hash)
+                   RETURNING id""",
+                (input_type, source_path, title, content_hash, blob_hash, source_hash)
+            ).fetchone()
+            return row[0]
+    
+    def get_input_article(self, input_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get an input with its stored converted markdown.
         
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        # Try to find existing
-        cursor.execute(
-            "SELECT id FROM inputs WHERE content_hash = ?",
-            (content_hash,)
-        )
-        row = cursor.fetchone()
+        Args:
+            input_id: Input ID
         
-        if row:
-            conn.close()
-            return row[0]
+        Returns:
+            Dict with id, type, source_path, title and content, or None if
+            the input does not exist or has no stored article
+        """
+        row = self._conn().execute(
+            f"SELECT {_INPUT_ARTICLE_COLUMNS} FROM inputs i JOIN blobs b ON b.hash = i.blob_hash WHERE i.id = ?",
+            (input_id,)
+        ).fetchone()
+        return _input_article_to_dict(row)
+    
+    def find_input_article(
+        self,
+        source_path: Optional[str] = None,
+        source_hash: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the latest stored article for a source.
         
-        # Create new
-        cursor.execute(
-            """INSERT INTO inputs (type, source_path, title, content_hash)
-               VALUES (?, ?, ?, ?)""",
-            (input_type, source_path, title, content_hash)
-        )
-        input_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        Args:
+            source_hash: SHA-256 of a local file's bytes (preferred: a changed
+                         file at the same path does not match)
+            source_path: Source path or URL, used when no hash is given
         
-        return input_id
+        Returns:
+            Same as get_input_article, or None if nothing is stored
+        """
+        if source_hash:
+            where, param = "i.source_hash = ?", source_hash
+        elif source_path:
+            where, param = "i.source_path = ?", source_path
+        else:
+            return None
+        row = self._conn().execute(
+            f"""SELECT {_INPUT_ARTICLE_COLUMNS} FROM inputs i JOIN blobs b ON b.hash = i.blob_hash
+                WHERE {where} ORDER BY i.id DESC LIMIT 1""",
+            (param,)
+        ).fetchone()
+        return _input_article_to_dict(row)
     
     def _hash_content(self, content: str) -> str:
         """Generate MD5 hash of content."""
@@ -124,7 +249,8 @@ class RunRepository:
         input_ids: List[int],
         thinking_level: Optional[str] = None,
         stream: bool = True,
-        currency: str = "$"
+        currency: str = "$",
+        prompt_version: Optional[str] = None
     ) -> int:
         """
         Create a new run record.
@@ -136,30 +262,28 @@ class RunRepository:
             thinking_level: Optional thinking level
             stream: Whether streaming was used
             currency: Pricing currency symbol
+            prompt_version: Version of the task's prompt template
         
         Returns:
             Run ID
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        # Create run
-        cursor.execute(
-            """INSERT INTO runs (task, model, thinking_level, stream, currency, status)
-               VALUES (?, ?, ?, ?, ?, 'pending')""",
-            (task, model, thinking_level, 1 if stream else 0, currency)
-        )
-        run_id = cursor.lastrowid
-        
-        # Link inputs
-        for input_id in input_ids:
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Create run (the uuid identifies it across merged histories)
             cursor.execute(
-                "INSERT INTO run_inputs (run_id, input_id) VALUES (?, ?)",
-                (run_id, input_id)
+                """INSERT INTO runs (uuid, task, model, thinking_level, stream, currency, prompt_version, status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')""",
+                (uuid.uuid4().hex, task, model, thinking_level, 1 if stream else 0, currency, prompt_version)
             )
-        
-        conn.commit()
-        conn.close()
+            run_id = cursor.lastrowid
+            
+            # Link inputs
+            for input_id in input_ids:
+                cursor.execute(
+                    "INSERT INTO run_inputs (run_id, input_id) VALUES (?, ?)",
+                    (run_id, input_id)
+                )
         
         return run_id
     
@@ -177,16 +301,13 @@ class RunRepository:
             status: New status (success, failed)
             error_message: Optional error message
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE runs SET status = ?, error_message = ? WHERE id = ?",
-            (status, error_message, run_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                "UPDATE runs SET status = ?, error_message = ? WHERE id = ?",
+                (status, error_message, run_id)
+            )
     
     # =========================================================================
     # Output Operations
@@ -211,18 +332,26 @@ class RunRepository:
         Returns:
             Output ID
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
+        # Hash and compress before taking the write lock
+        encoded = encode_text(content)
         
-        cursor.execute(
-            """INSERT INTO outputs (run_id, output_type, content_type, content)
-               VALUES (?, ?, ?, ?)""",
-            (run_id, output_type, content_type, content)
-        )
-        output_id = cursor.lastrowid
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            blob_hash = put_blob(conn, encoded)
+            cursor.execute(
+                """INSERT INTO outputs (run_id, output_type, content_type, blob_hash)
+                   VALUES (?, ?, ?, ?)""",
+                (run_id, output_type, content_type, blob_hash)
+            )
+            output_id = cursor.lastrowid
+            
+            # outputs_fts is contentless: it is indexed here, not by a trigger
+            if has_search_index(conn):
+                cursor.execute(
+                    "INSERT INTO outputs_fts(rowid, content) VALUES (?, ?)",
+                    (output_id, content)
+                )
         
         return output_id
     
@@ -250,37 +379,41 @@ class RunRepository:
             cost_output: Output cost
             process_time: Processing time in seconds
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """INSERT INTO token_usage 
-               (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
-        )
-        
-        conn.commit()
-        conn.close()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                """INSERT INTO token_usage 
+                   (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
+            )
     
     # =========================================================================
     # Query Operations
     # =========================================================================
     
-    def get_recent_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_recent_runs(self, limit: int = HISTORY_PAGE_SIZE, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Get recent runs.
+        Get recent runs, newest first, one page at a time.
+        
+        Keyset pagination: pass the smallest id of a page as `before_id` to
+        get the next (older) page. The page is read from the runs primary
+        key and each run's inputs and token usage are looked up by index,
+        so every page costs the same however deep it is.
         
         Args:
             limit: Maximum number of runs to return
+            before_id: Only runs with a smaller id (None = start at the newest)
         
         Returns:
             List of run records with input titles
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
+        where, params = "", []
+        if before_id is not None:
+            where, params = "WHERE r.id < ?", [before_id]
         
-        cursor.execute("""
+        rows = self._conn().execute(f"""
             SELECT 
                 r.id,
                 r.timestamp,
@@ -288,42 +421,49 @@ class RunRepository:
                 r.model,
                 r.status,
                 r.currency,
-                GROUP_CONCAT(i.title, ', ') as input_titles,
+                (SELECT GROUP_CONCAT(i.title, ', ')
+                 FROM run_inputs ri JOIN inputs i ON i.id = ri.input_id
+                 WHERE ri.run_id = r.id) AS input_titles,
                 t.input_tokens,
                 t.output_tokens,
-                COALESCE(t.cost_input, 0) + COALESCE(t.cost_output, 0) as total_cost
+                COALESCE(t.cost_input, 0) + COALESCE(t.cost_output, 0) AS total_cost
             FROM runs r
-            LEFT JOIN run_inputs ri ON r.id = ri.run_id
-            LEFT JOIN inputs i ON ri.input_id = i.id
-            LEFT JOIN token_usage t ON r.id = t.run_id
-            GROUP BY r.id
+            LEFT JOIN token_usage t ON t.id = (SELECT MIN(id) FROM token_usage WHERE run_id = r.id)
+            {where}
             ORDER BY r.id DESC
             LIMIT ?
-        """, (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        """, (*params, limit)).fetchall()
         
         return [dict(row) for row in rows]
     
-    def get_run_details(self, run_id: int) -> Optional[Dict[str, Any]]:
+    def get_run_details(
+        self,
+        run_id: int,
+        include_content: bool = True,
+        preview_chars: int = 0
+    ) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a run.
         
         Args:
             run_id: Run ID
+            include_content: Load every output body. If False, outputs carry
+                             only metadata (with `size` in bytes and
+                             `archived`); fetch a body with get_output().
+            preview_chars: Without content, also read the first N characters
+                           of each output as `preview` (only that much of
+                           each body is read and decompressed)
         
         Returns:
             Run details including inputs and outputs
         """
-        conn = self._get_conn()
+        conn = self._conn()
         cursor = conn.cursor()
         
         # Get run info
         cursor.execute("SELECT * FROM runs WHERE id = ?", (run_id,))
         run_row = cursor.fetchone()
         if not run_row:
-            conn.close()
             return None
         
         run = dict(run_row)
@@ -336,12 +476,33 @@ class RunRepository:
         """, (run_id,))
         run["inputs"] = [dict(row) for row in cursor.fetchall()]
         
-        # Get outputs
-        cursor.execute(
-            "SELECT * FROM outputs WHERE run_id = ?",
-            (run_id,)
-        )
-        run["outputs"] = [dict(row) for row in cursor.fetchall()]
+        # Get outputs (bodies are decompressed from blob storage or archives)
+        with ArchiveReader(self.archive_dir) as archive:
+            if include_content:
+                cursor.execute(
+                    f"SELECT {OUTPUT_COLUMNS} FROM outputs o {OUTPUT_BLOB_JOIN} WHERE o.run_id = ? ORDER BY o.id",
+                    (run_id,)
+                )
+                run["outputs"] = [output_row_to_dict(row, archive.read) for row in cursor.fetchall()]
+            else:
+                if preview_chars > 0:
+                    cursor.execute(
+                        f"SELECT {OUTPUT_PREVIEW_COLUMNS} FROM outputs o {OUTPUT_BLOB_JOIN} "
+                        "WHERE o.run_id = ? ORDER BY o.id",
+                        (preview_chars, preview_stored_bytes(preview_chars), run_id)
+                    )
+                else:
+                    cursor.execute(
+                        f"SELECT {OUTPUT_META_COLUMNS} FROM outputs o {OUTPUT_BLOB_JOIN} "
+                        "WHERE o.run_id = ? ORDER BY o.id",
+                        (run_id,)
+                    )
+                run["outputs"] = []
+                for row in cursor.fetchall():
+                    output = output_row_to_meta(row, preview_chars, archive.read)
+                    if output["archived"]:
+                        output["size"] = archive.size(row["archive"])
+                    run["outputs"].append(output)
         
         # Get token usage
         cursor.execute(
@@ -351,68 +512,82 @@ class RunRepository:
         usage_row = cursor.fetchone()
         run["token_usage"] = dict(usage_row) if usage_row else None
         
-        conn.close()
         return run
     
+    def get_output(self, output_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one output with its full text.
+        
+        Args:
+            output_id: Output ID
+        
+        Returns:
+            Output dict (id, run_id, output_type, content_type, content), or None
+        """
+        row = self._conn().execute(
+            f"SELECT {OUTPUT_COLUMNS} FROM outputs o {OUTPUT_BLOB_JOIN} WHERE o.id = ?",
+            (output_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        with ArchiveReader(self.archive_dir) as archive:
+            return output_row_to_dict(row, archive.read)
+    
     def get_stats(self, days: int = 7) -> Dict[str, Any]:
         """
         Get usage statistics.
         
+        Reads the daily_stats rollups, so the cost grows with the number of
+        days rather than the number of runs. Days are UTC calendar days;
+        the window is the last `days` of them, including today.
+        
         Args:
             days: Number of days to include
         
         Returns:
             Statistics dictionary
         """
-        conn = self._get_conn()
+        conn = self._conn()
         cursor = conn.cursor()
-        
-        # Total runs
-        cursor.execute("""
-            SELECT COUNT(*) FROM runs 
-            WHERE timestamp > datetime('now', ?)
-        """, (f'-{days} days',))
-        total_runs = cursor.fetchone()[0]
+        since = (f'-{days} days',)
         
         # By model
         cursor.execute("""
             SELECT 
-                r.model,
-                COUNT(*) as runs,
-                SUM(COALESCE(t.cost_input, 0) + COALESCE(t.cost_output, 0)) as total_cost,
-                SUM(COALESCE(t.input_tokens, 0) + COALESCE(t.output_tokens, 0)) as total_tokens
-            FROM runs r
-            LEFT JOIN token_usage t ON r.id = t.run_id
-            WHERE r.timestamp > datetime('now', ?)
-            GROUP BY r.model
+                model,
+                SUM(runs) as runs,
+                SUM(cost) as total_cost,
+                SUM(input_tokens + output_tokens) as total_tokens
+            FROM daily_stats
+            WHERE day > date('now', ?)
+            GROUP BY model
             ORDER BY runs DESC
-        """, (f'-{days} days',))
+        """, since)
         by_model = [dict(row) for row in cursor.fetchall()]
         
         # By task
         cursor.execute("""
             SELECT 
-                r.task,
-                COUNT(*) as runs
-            FROM runs r
-            WHERE r.timestamp > datetime('now', ?)
-            GROUP BY r.task
+                task,
+                SUM(runs) as runs
+            FROM daily_stats
+            WHERE day > date('now', ?)
+            GROUP BY task
             ORDER BY runs DESC
-        """, (f'-{days} days',))
+        """, since)
         by_task = [dict(row) for row in cursor.fetchall()]
         
         # Success rate
         cursor.execute("""
             SELECT 
                 status,
-                COUNT(*) as count
-            FROM runs
-            WHERE timestamp > datetime('now', ?)
+                SUM(runs) as count
+            FROM daily_stats
+            WHERE day > date('now', ?)
             GROUP BY status
-        """, (f'-{days} days',))
+        """, since)
         by_status = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        conn.close()
+        total_runs = sum(by_status.values())
         
         return {
             "period_days": days,
@@ -423,6 +598,19 @@ class RunRepository:
             "success_rate": by_status.get("success", 0) / total_runs if total_runs > 0 else 0
         }
     
+    def rebuild_stats(self) -> int:
+        """
+        Recompute the daily_stats rollups from the full run history.
+        
+        The rollups are maintained on every write; this backfills or
+        repairs them (e.g. after runs were edited outside the repository).
+        
+        Returns:
+            Number of rollup rows written
+        """
+        with self.transaction() as conn:
+            return rebuild_daily_stats(conn)
+    
     def search_by_title(self, title_pattern: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
         Search runs by input title.
@@ -434,10 +622,16 @@ class RunRepository:
         Returns:
             List of matching runs
         """
-        conn = self._get_conn()
+        conn = self._conn()
         cursor = conn.cursor()
         
-        cursor.execute("""
+        # LIKE on the trigram FTS table uses the index instead of scanning inputs
+        if has_search_index(conn):
+            title_match = "i.id IN (SELECT rowid FROM inputs_fts WHERE title LIKE ?)"
+        else:
+            title_match = "i.title LIKE ?"
+        
+        cursor.execute(f"""
             SELECT DISTINCT
                 r.id,
                 r.timestamp,
@@ -448,15 +642,406 @@ class RunRepository:
             FROM runs r
             JOIN run_inputs ri ON r.id = ri.run_id
             JOIN inputs i ON ri.input_id = i.id
-            WHERE i.title LIKE ?
+            WHERE {title_match}
             ORDER BY r.timestamp DESC
             LIMIT ?
         """, (f'%{title_pattern}%', limit))
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
+    
+    def search(
+        self,
+        query: str,
+        task: Optional[str] = None,
+        model: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over input titles, source paths and output content.
+        
+        All whitespace-separated terms must appear in the same input or output.
+        Results are ranked by BM25 (best first) with a highlighted snippet.
+        Terms shorter than 3 characters (or a database without FTS5) fall back
+        to an unranked LIKE scan, newest first.
+        
+        Args:
+            query: Search terms
+            task: Optional task filter
+            model: Optional model filter
+            since: Optional inclusive lower bound on run timestamp
+            until: Optional exclusive upper bound on run timestamp
+            limit: Maximum results
+        
+        Returns:
+            Runs with id, timestamp, task, model, status, input_titles,
+            field (matched output type or 'input'), snippet and score
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        conn = self._conn()
+        where, params = self._run_filters(task, model, since, until)
+        
+        if has_search_index(conn) and all(len(term) >= 3 for term in terms):
+            rows = self._search_fts(conn, terms, where, params, limit)
+        else:
+            rows = self._search_like(conn, terms, where, params, limit)
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _run_filters(task, model, since, until):
+        clauses, params = [], []
+        for clause, value in (
+            ("r.task = ?", task),
+            ("r.model = ?", model),
+            ("r.timestamp >= ?", since),
+            ("r.timestamp < ?", until),
+        ):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+    
+    def _search_fts(self, conn, terms, where, params, limit) -> List[Dict[str, Any]]:
+        # Quote every term: user input is never parsed as FTS5 query syntax
+        fts_query = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        # MIN(score) picks the best hit per run; SQLite takes the bare
+        # snippet/field/output_id columns from that same row
+        rows = conn.execute(f"""
+            WITH hits AS (
+                SELECT ri.run_id AS run_id,
+                       bm25(inputs_fts) AS score,
+                       snippet(inputs_fts, -1, '[', ']', '…', {SEARCH_SNIPPET_TOKENS}) AS snippet,
+                       'input' AS field,
+                       NULL AS output_id
+                FROM inputs_fts
+                JOIN run_inputs ri ON ri.input_id = inputs_fts.rowid
+                WHERE inputs_fts MATCH ?
+                UNION ALL
+                SELECT o.run_id,
+                       bm25(outputs_fts),
+                       NULL,
+                       o.output_type,
+                       o.id
+                FROM outputs_fts
+                JOIN outputs o ON o.id = outputs_fts.rowid
+                WHERE outputs_fts MATCH ?
+            ),
+            best AS (
+                SELECT r.id, r.timestamp, r.task, r.model, r.status,
+                       MIN(h.score) AS score, h.snippet, h.field, h.output_id
+                FROM hits h
+                CROSS JOIN runs r ON r.id = h.run_id  -- CROSS: drive from the hits
+                {where}
+                GROUP BY r.id
+                ORDER BY score
+                LIMIT ?
+            )
+            SELECT best.*,
+                   (SELECT GROUP_CONCAT(i.title, ', ')
+                    FROM run_inputs ri JOIN inputs i ON i.id = ri.input_id
+                    WHERE ri.run_id = best.id) AS input_titles
+            FROM best
+            ORDER BY score
+        """, (fts_query, fts_query, *params, limit)).fetchall()
+        
+        # The contentless output index has no text for snippet(): cut
+        # snippets from the decompressed bodies of the returned hits only
+        results = []
+        for row in rows:
+            result = dict(row)
+            output_id = result.pop("output_id")
+            if output_id is not None:
+                output = conn.execute(
+                    f"SELECT {OUTPUT_COLUMNS} FROM outputs o {OUTPUT_BLOB_JOIN} WHERE o.id = ?",
+                    (output_id,)
+                ).fetchone()
+                result["snippet"] = _make_snippet(output_row_to_dict(output)["content"] or "", terms)
+            results.append(result)
+        return results
+    
+    def _search_like(self, conn, terms, where, params, limit) -> List[Dict[str, Any]]:
+        patterns = [f"%{term}%" for term in terms]
+        input_match = " AND ".join(["(i.title LIKE ? OR i.source_path LIKE ?)"] * len(terms))
+        output_match = " AND ".join(["o.text LIKE ?"] * len(terms))
+        rows = conn.execute(f"""
+            WITH hits AS (
+                SELECT ri.run_id AS run_id, i.title AS text, 'input' AS field
+                FROM run_inputs ri
+                JOIN inputs i ON i.id = ri.input_id
+                WHERE {input_match}
+                UNION ALL
+                SELECT o.run_id, o.text, o.output_type
+                FROM (
+                    SELECT o.run_id, o.output_type,
+                           COALESCE(o.content, blob_text(b.codec, b.data)) AS text
+                    FROM outputs o {OUTPUT_BLOB_JOIN}
+                ) o
+                WHERE {output_match}
+            ),
+            best AS (
+                SELECT r.id, r.timestamp, r.task, r.model, r.status,
+                       NULL AS score, h.text, h.field
+                FROM hits h
+                CROSS JOIN runs r ON r.id = h.run_id  -- CROSS: drive from the hits
+                {where}
+                GROUP BY r.id
+                ORDER BY r.id DESC
+                LIMIT ?
+            )
+            SELECT best.*,
+                   (SELECT GROUP_CONCAT(i.title, ', ')
+                    FROM run_inputs ri JOIN inputs i ON i.id = ri.input_id
+                    WHERE ri.run_id = best.id) AS input_titles
+            FROM best
+            ORDER BY id DESC
+        """, (*[p for p in patterns for _ in (0, 1)], *patterns, *params, limit)).fetchall()
+        
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["snippet"] = _make_snippet(result.pop("text") or "", terms)
+            results.append(result)
+        return results
+
+    # =========================================================================
+    # Storage Maintenance
+    # =========================================================================
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """
+        Report how output bodies are stored.
+        
+        Returns:
+            Dict with outputs, inline_outputs, archived_outputs, blobs,
+            logical_bytes (text size of the outputs in the database),
+            stored_bytes (blob data plus inline text) and file_bytes
+        """
+        conn = self._conn()
+        stats = dict(conn.execute(f"""
+            SELECT COUNT(*) AS outputs,
+                   COALESCE(SUM(o.blob_hash IS NULL AND o.content IS NOT NULL), 0) AS inline_outputs,
+                   COALESCE(SUM(o.archive IS NOT NULL), 0) AS archived_outputs,
+                   COALESCE(SUM(COALESCE(b.size, LENGTH(CAST(o.content AS BLOB)))), 0) AS logical_bytes,
+                   COALESCE(SUM(CASE WHEN o.blob_hash IS NULL
+                                     THEN LENGTH(CAST(o.content AS BLOB)) END), 0) AS inline_bytes
+            FROM outputs o {OUTPUT_BLOB_JOIN}
+        """).fetchone())
+        blobs = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+        ).fetchone()
+        stats["blobs"] = blobs[0]
+        stats["stored_bytes"] = blobs[1] + stats.pop("inline_bytes")
+        stats["file_bytes"] = self._file_size()
+        return stats
+    
+    def compact(self, vacuum: bool = True, batch_size: int = OUTPUT_COMPACT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Move inline output bodies into compressed blob storage and reclaim space.
+        
+        Outputs written before blob storage keep their text in
+        `outputs.content`; this moves them (deduplicated, compressed), removes
+        blobs no output references any more, and optionally VACUUMs the file.
+        The search index is unaffected: the text and row ids do not change.
+        
+        Args:
+            vacuum: Rebuild the database file to return freed pages to the OS
+            batch_size: Outputs moved per transaction
+        
+        Returns:
+            Storage stats after compaction (see get_storage_stats) plus
+            migrated, blobs_removed and file_bytes_before
+        """
+        file_bytes_before = self._file_size()
+        
+        migrated = 0
+        while True:
+            with self.transaction() as conn:
+                rows = conn.execute(
+                    """SELECT id, content FROM outputs
+                       WHERE blob_hash IS NULL AND content IS NOT NULL
+                       LIMIT ?""",
+                    (batch_size,)
+                ).fetchall()
+                for row in rows:
+                    blob_hash = put_blob(conn, encode_text(row["content"]))
+                    conn.execute(
+                        "UPDATE outputs SET blob_hash = ?, content = NULL WHERE id = ?",
+                        (blob_hash, row["id"])
+                    )
+            migrated += len(rows)
+            if len(rows) < batch_size:
+                break
+        
+        blobs_removed = self._remove_unreferenced_blobs()
+        
+        if vacuum:
+            conn = self._conn()
+            conn.execute("VACUUM")
+            # VACUUM in WAL mode writes through the WAL; fold it back and truncate
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        stats = self.get_storage_stats()
+        stats.update(
+            migrated=migrated,
+            blobs_removed=blobs_removed,
+            file_bytes_before=file_bytes_before,
+        )
+        return stats
+    
+    def gc(
+        self,
+        keep_days: int = OUTPUT_RETENTION_DAYS,
+        batch_size: int = OUTPUT_ARCHIVE_BATCH_SIZE,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Archive output bodies past their retention period and reclaim space.
+        
+        Bodies of outputs whose run is older than `keep_days` are written to
+        compressed archive files (see archive.py) and removed from the
+        database and its search index; `get_run_details()` and export still
+        read them. Run metadata is kept. Blobs no output references any more
+        are deleted and the freed pages returned with an incremental vacuum.
+        
+        Args:
+            keep_days: Keep output bodies of runs from the last N days (0 = all)
+            batch_size: Outputs per archive file and transaction
+            dry_run: Only count what would be archived
+        
+        Returns:
+            Dict with archived, archived_bytes (text size), archive_files,
+            archive_bytes, blobs_removed, file_bytes_before, file_bytes and
+            reclaimed_bytes
+        """
+        file_bytes_before = self._file_size()
+        result = {
+            "archived": 0,
+            "archived_bytes": 0,
+            "archive_files": 0,
+            "archive_bytes": 0,
+            "blobs_removed": 0,
+            "file_bytes_before": file_bytes_before,
+            "file_bytes": file_bytes_before,
+            "reclaimed_bytes": 0,
+        }
+        
+        expired = """
+            FROM outputs o
+            JOIN runs r ON r.id = o.run_id
+            LEFT JOIN blobs b ON b.hash = o.blob_hash
+            WHERE o.archive IS NULL
+              AND (o.blob_hash IS NOT NULL OR o.content IS NOT NULL)
+              AND r.timestamp < datetime('now', ?)
+        """
+        cutoff = f"-{keep_days} days"
+        conn = self._conn()
+        
+        if dry_run:
+            if keep_days > 0:
+                row = conn.execute(f"""
+                    SELECT COUNT(*), COALESCE(SUM(COALESCE(b.size, LENGTH(CAST(o.content AS BLOB)))), 0)
+                    {expired}
+                """, (cutoff,)).fetchone()
+                result.update(archived=row[0], archived_bytes=row[1])
+            return result
+        
+        last_id = 0
+        while keep_days > 0:
+            # Walk outputs in id order (oldest first), so each batch resumes
+            # where the last one stopped
+            rows = conn.execute(f"""
+                SELECT o.id, o.blob_hash, o.content, b.codec, b.data
+                {expired} AND o.id > ?
+                ORDER BY o.id
+                LIMIT ?
+            """, (cutoff, last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            
+            bodies = {}
+            archived = []
+            for row in rows:
+                text = row["content"]
+                if text is None:
+                    text = decode_blob(row["codec"], row["data"])
+                digest = row["blob_hash"] or hash_text(text)
+                bodies[digest] = text
+                archived.append((row["id"], digest, text))
+            
+            # The archive is on disk before any row points at it
+            name = write_archive(self.archive_dir, bodies)
+            with self.transaction() as conn:
+                search_index = has_search_index(conn)
+                for output_id, digest, text in archived:
+                    conn.execute(
+                        """UPDATE outputs SET archive = ?, blob_hash = NULL, content = NULL
+                           WHERE id = ? AND archive IS NULL""",
+                        (archive_ref(name, digest), output_id)
+                    )
+                    # Contentless index: a delete must repeat the indexed text,
+                    # and deleting a row that was never indexed corrupts it
+                    if search_index and conn.execute(
+                        "SELECT 1 FROM outputs_fts WHERE rowid = ?", (output_id,)
+                    ).fetchone():
+                        conn.execute(
+                            "INSERT INTO outputs_fts(outputs_fts, rowid, content) VALUES ('delete', ?, ?)",
+                            (output_id, text)
+                        )
+            
+            result["archived"] += len(archived)
+            result["archived_bytes"] += sum(len(text.encode("utf-8")) for _, _, text in archived)
+            result["archive_files"] += 1
+            result["archive_bytes"] += (self.archive_dir / name).stat().st_size
+            if len(rows) < batch_size:
+                break
+        
+        result["blobs_removed"] = self._remove_unreferenced_blobs()
+        
+        conn = self._conn()
+        if result["archived"] and has_search_index(conn):
+            # FTS5 deletes only add tombstones; merging the segments drops
+            # the archived rows' postings (the bulk of their footprint)
+            with self.transaction() as conn:
+                conn.execute("INSERT INTO outputs_fts(outputs_fts) VALUES ('optimize')")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            # executescript() steps the pragma to completion; execute() frees one page
+            conn.executescript("PRAGMA incremental_vacuum")
+        else:
+            # Databases created before incremental vacuum: switching the mode
+            # takes one full VACUUM, after which gc runs incrementally
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        # Fold the WAL back into the file so the freed pages are truncated
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        result["file_bytes"] = self._file_size()
+        result["reclaimed_bytes"] = max(0, file_bytes_before - result["file_bytes"])
+        return result
+    
+    def _remove_unreferenced_blobs(self) -> int:
+        """Delete blobs no output or input article references; return how many."""
+        with self.transaction() as conn:
+            return conn.execute("""
+                DELETE FROM blobs
+                WHERE NOT EXISTS (SELECT 1 FROM outputs o WHERE o.blob_hash = blobs.hash)
+                  AND NOT EXISTS (SELECT 1 FROM inputs i WHERE i.blob_hash = blobs.hash)
+            """).rowcount
+    
+    def _file_size(self) -> int:
+        """Database file size including its write-ahead log."""
+        total = 0
+        for path in (self.db_path, Path(f"{self.db_path}-wal")):
+            if path.exists():
+                total += path.stat().st_size
+        return total
 
     # =========================================================================
     # Resume Operations
@@ -466,15 +1051,13 @@ class RunRepository:
         """
         Get runs that can be resumed (status='pending' or 'aborted').
         
+        Runs and their inputs are read in one joined query.
+        
         Returns:
             List of resumable runs with their input information,
             ordered by timestamp (oldest first for resume priority)
         """
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        
-        # Get resumable runs
-        cursor.execute("""
+        rows = self._conn().execute("""
             SELECT 
                 r.id,
                 r.timestamp,
@@ -483,31 +1066,80 @@ class RunRepository:
                 r.thinking_level,
                 r.stream,
                 r.currency,
-                r.status
+                r.status,
+                i.id AS input_id,
+                i.type AS input_type,
+                i.source_path,
+                i.title,
+                i.content_hash
             FROM runs r
+            LEFT JOIN run_inputs ri ON ri.run_id = r.id
+            LEFT JOIN inputs i ON i.id = ri.input_id
             WHERE r.status IN ('pending', 'aborted')
             ORDER BY r.id ASC
-        """)
-        
-        runs = []
-        for row in cursor.fetchall():
-            run = dict(row)
-            run_id = run["id"]
-            
-            # Get inputs for this run
-            cursor.execute("""
-                SELECT i.id, i.type, i.source_path, i.title, i.content_hash
+        """).fetchall()
+        
+        runs: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            run = runs.get(row["id"])
+            if run is None:
+                run = runs[row["id"]] = {
+                    key: row[key]
+                    for key in ("id", "timestamp", "task", "model", "thinking_level", "stream", "currency", "status")
+                }
+                run["inputs"] = []
+            if row["input_id"] is not None:
+                run["inputs"].append({
+                    "id": row["input_id"],
+                    "type": row["input_type"],
+                    "source_path": row["source_path"],
+                    "title": row["title"],
+                    "content_hash": row["content_hash"],
+                })
+        
+        return list(runs.values())
+
+    def find_done_sources(
+        self,
+        source_hashes: List[str],
+        task: str,
+        model: str,
+        prompt_version: Optional[str]
+    ) -> set:
+        """
+        Source files that already have a successful single-input run.
+
+        Used by `batch` to skip files done in an earlier batch. Runs recorded
+        before prompt versions existed (prompt_version NULL) only match a
+        NULL prompt_version, so they are processed again once.
+
+        Args:
+            source_hashes: SHA-256 hashes of local source files
+            task: Task name
+            model: Model name
+            prompt_version: Prompt template version (Task.prompt_version())
+
+        Returns:
+            The subset of source_hashes that are done
+        """
+        conn = self._conn()
+        hashes = list(dict.fromkeys(source_hashes))
+        done = set()
+        for start in range(0, len(hashes), FILE_INDEX_LOOKUP_BATCH_SIZE):
+            batch = hashes[start:start + FILE_INDEX_LOOKUP_BATCH_SIZE]
+            marks = ",".join("?" * len(batch))
+            rows = conn.execute(f"""
+                SELECT DISTINCT i.source_hash
                 FROM inputs i
-                JOIN run_inputs ri ON i.id = ri.input_id
-                WHERE ri.run_id = ?
-            """, (run_id,))
-            
-            run["inputs"] = [dict(inp) for inp in cursor.fetchall()]
-            runs.append(run)
-        
-        conn.close()
-        return runs
-    
+                JOIN run_inputs ri ON ri.input_id = i.id
+                JOIN runs r ON r.id = ri.run_id
+                WHERE i.source_hash IN ({marks})
+                  AND r.task = ? AND r.model = ? AND r.prompt_version IS ? AND r.status = 'success'
+                  AND (SELECT COUNT(*) FROM run_inputs n WHERE n.run_id = r.id) = 1
+            """, (*batch, task, model, prompt_version))
+            done.update(row[0] for row in rows)
+        return done
+
     # =========================================================================
     # Export Operations
     # =========================================================================
@@ -515,136 +1147,53 @@ class RunRepository:
     def export_runs(
         self,
         output_path: Path,
-        format: str = "json",
-        limit: Optional[int] = None
-    ) -> None:
+        format: Optional[str] = None,
+        limit: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        compression: Optional[str] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> int:
         """
-        Export run history to file.
+        Export run history to file (streamed; see storage/export.py).
         
         Args:
             output_path: Path to output file
-            format: Export format ('json' or 'csv')
+            format: Export format ('json', 'jsonl' or 'csv'; default: from file name)
             limit: Optional limit on number of runs to export
-        """
-        conn = self._get_conn()
-        cursor = conn.cursor()
+            since: Optional inclusive lower bound on run timestamp
+            until: Optional exclusive upper bound on run timestamp
+            compression: Optional compression ('gzip' or 'zstd'; default: from file name)
+            progress_callback: Called with the number of runs written so far
         
-        # Get all runs
-        query = """
-            SELECT 
-                r.id,
-                r.timestamp,
-                r.task,
-                r.model,
-                r.thinking_level,
-                r.stream,
-                r.currency,
-                r.status,
-                r.error_message
-            FROM runs r
-            ORDER BY r.id DESC
+        Returns:
+            Number of runs exported
         """
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        cursor.execute(query)
-        
-        runs = []
-        for row in cursor.fetchall():
-            run = dict(row)
-            run_id = run["id"]
-            
-            # Get inputs
-            cursor.execute("""
-                SELECT i.id, i.type, i.source_path, i.title
-                FROM inputs i
-                JOIN run_inputs ri ON i.id = ri.input_id
-                WHERE ri.run_id = ?
-            """, (run_id,))
-            run["inputs"] = [dict(inp) for inp in cursor.fetchall()]
-            
-            # Get outputs
-            cursor.execute("""
-                SELECT output_type, content_type, content
-                FROM outputs
-                WHERE run_id = ?
-            """, (run_id,))
-            run["outputs"] = [dict(out) for out in cursor.fetchall()]
-            
-            # Get token usage
-            cursor.execute("""
-                SELECT input_tokens, output_tokens, cost_input, cost_output, process_time
-                FROM token_usage
-                WHERE run_id = ?
-            """, (run_id,))
-            usage_row = cursor.fetchone()
-            run["token_usage"] = dict(usage_row) if usage_row else None
-            
-            runs.append(run)
-        
-        conn.close()
-        
-        # Write to file
-        if format == "json":
-            self._export_json(output_path, runs)
-        elif format == "csv":
-            self._export_csv(output_path, runs)
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
-    
-    def _export_json(self, output_path: Path, runs: List[Dict[str, Any]]) -> None:
-        """Export runs to JSON file."""
-        import json
-        
-        data = {
-            "exported_at": datetime.now().isoformat(),
-            "total_runs": len(runs),
-            "runs": runs
-        }
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        return export_history(
+            self.db_path,
+            output_path,
+            format=format,
+            compression=compression,
+            since=since,
+            until=until,
+            limit=limit,
+            progress_callback=progress_callback,
+        )
     
-    def _export_csv(self, output_path: Path, runs: List[Dict[str, Any]]) -> None:
-        """Export runs to CSV file."""
-        import csv
+    def merge_from(
+        self,
+        source: Path,
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Merge another run database or JSON/JSONL export into this one
+        (see storage/merge.py). Runs already present (same uuid) are skipped.
         
-        fieldnames = [
-            "id", "timestamp", "task", "model", "thinking_level", 
-            "stream", "currency", "status", "error_message",
-            "input_titles", "input_tokens", "output_tokens", 
-            "cost_input", "cost_output", "total_cost"
-        ]
+        Args:
+            source: Run database or export file
+            progress_callback: Called with the number of source runs read so far
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for run in runs:
-                # Flatten input titles
-                input_titles = ", ".join(
-                    inp.get("title", "") for inp in run.get("inputs", [])
-                )
-                
-                # Get token usage
-                usage = run.get("token_usage") or {}
-                
-                row = {
-                    "id": run.get("id"),
-                    "timestamp": run.get("timestamp"),
-                    "task": run.get("task"),
-                    "model": run.get("model"),
-                    "thinking_level": run.get("thinking_level"),
-                    "stream": run.get("stream"),
-                    "currency": run.get("currency"),
-                    "status": run.get("status"),
-                    "error_message": run.get("error_message"),
-                    "input_titles": input_titles,
-                    "input_tokens": usage.get("input_tokens"),
-                    "output_tokens": usage.get("output_tokens"),
-                    "cost_input": usage.get("cost_input"),
-                    "cost_output": usage.get("cost_output"),
-                    "total_cost": (usage.get("cost_input") or 0) + (usage.get("cost_output") or 0)
-                }
-                writer.writerow(row)
-
+        Returns:
+            Counts of merged runs, skipped runs, new inputs and outputs
+        """
+        return merge_history(self, source, progress_callback=progress_callback)
@@ -0,0 +1,178 @@
+"""
+Dedicated database writer with group commit.
+
+Run-history writes are small and frequent: every processed document creates
+a run, outputs, token usage and one or more status updates. Instead of each
+write taking its own `asyncio.to_thread` hop and transaction, write intents
+are queued to a single writer thread, which executes them in batches inside
+one transaction (one fsync per batch) and resolves each intent's future after
+the batch commits.
+
+Each intent runs in its own savepoint, so a failing intent is rolled back and
+reported to its caller without affecting the rest of the batch.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.constants import (
+    DB_WRITER_BATCH_SIZE,
+    DB_WRITER_FLUSH_INTERVAL_SECONDS,
+    DB_WRITER_IDLE_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class _Intent:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    future: Future = field(default_factory=Future)
+
+
+class DBWriter:
+    """
+    Single writer thread that group-commits repository writes.
+
+    Usage:
+        writer = DBWriter(repository)
+        run_id = await writer.run(repository.create_run, "brief", model, [input_id])
+        writer.close()
+
+    `fn` is called on the writer thread; it should use the repository's write
+    methods (or `repository.transaction()`), which join the batch transaction.
+    The thread starts on the first write and exits when idle.
+    """
+
+    def __init__(
+        self,
+        repository,
+        batch_size: int = DB_WRITER_BATCH_SIZE,
+        flush_interval: float = DB_WRITER_FLUSH_INTERVAL_SECONDS,
+        idle_timeout: float = DB_WRITER_IDLE_TIMEOUT_SECONDS,
+    ):
+        self.repository = repository
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.idle_timeout = idle_timeout
+        self.stats = {"writes": 0, "failed": 0, "commits": 0, "max_batch": 0}
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue a write; the future resolves with fn's result once its batch commits."""
+        intent = _Intent(fn, args, kwargs)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DBWriter is closed")
+            self._queue.put(intent)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="editor-assistant-db-writer", daemon=True
+                )
+                self._thread.start()
+        return intent.future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Queue a write and await its committed result."""
+        # Imported here: storage is loaded by DB-only CLI commands, which never await
+        import asyncio
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def flush(self) -> None:
+        """Block until every write queued so far has been committed."""
+        self.submit(lambda: None).result()
+
+    def close(self) -> None:
+        """Commit queued writes and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    # =========================================================================
+    # Writer thread
+    # =========================================================================
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # submit() enqueues under the lock, so nothing can slip in here
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _collect(self, first: _Intent) -> Tuple[List[_Intent], bool]:
+        """Gather up to batch_size intents, waiting at most flush_interval."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: List[_Intent]) -> None:
+        done: List[Tuple[_Intent, Any]] = []
+        try:
+            with self.repository.transaction():
+                for intent in batch:
+                    if not intent.future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        # Savepoint per intent: a failure rolls back only this write
+                        with self.repository.transaction():
+                            result = intent.fn(*intent.args, **intent.kwargs)
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        intent.future.set_exception(e)
+                    else:
+                        done.append((intent, result))
+        except Exception as e:
+            logger.warning(f"Group commit of {len(batch)} writes failed: {e}")
+            self.stats["failed"] += len(done)
+            for intent, _ in done:
+                intent.future.set_exception(e)
+            return
+
+        self.stats["commits"] += 1
+        self.stats["writes"] += len(done)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for intent, result in done:
+            intent.future.set_result(result)
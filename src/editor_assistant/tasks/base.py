@@ -3,8 +3,10 @@ Base Task class and TaskRegistry for pluggable task system.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Type, Optional
+from typing import Dict, List, Type, Optional, Tuple
 from ..data_models import MDArticle
+from ..config.load_prompt import prompt_version as template_version
+from ..config.constants import OUTPUT_TOKEN_RESERVE
 
 
 class TaskRegistry:
@@ -51,6 +53,8 @@ class Task(ABC):
         - build_prompt(): Generate the LLM prompt
     
     Optionally override:
+        - build_prompt_with_estimate(): Prompt plus a cheap token estimate
+        - expected_output_tokens(): Expected response size, for budgets
         - post_process(): Transform the LLM response
         - get_output_suffix(): Custom output file suffix
     """
@@ -59,6 +63,8 @@ class Task(ABC):
     name: str = "base"
     description: str = "Base task"
     supports_multi_input: bool = False
+    # Prompt template file, versioned in the run history
+    prompt_template: Optional[str] = None
     
     @abstractmethod
     def validate(self, articles: List[MDArticle]) -> tuple[bool, str]:
@@ -86,6 +92,42 @@ class Task(ABC):
         """
         pass
     
+    def build_prompt_with_estimate(self, articles: List[MDArticle]) -> Tuple[str, Optional[int]]:
+        """
+        Build the prompt together with its token estimate.
+        
+        Built-in tasks assemble prompts from precompiled template segments
+        and compose the estimate from the parts, so large prompts are not
+        rescanned. The default returns no estimate (the caller estimates).
+        
+        Returns:
+            Tuple of (prompt, estimated_tokens or None)
+        """
+        return self.build_prompt(articles), None
+    
+    def expected_output_tokens(self, prompt_tokens: int) -> int:
+        """
+        Expected size of the response, reserved against --max-tokens/--max-cost.
+        
+        Args:
+            prompt_tokens: Estimated prompt size
+            
+        Returns:
+            Expected output tokens (default: OUTPUT_TOKEN_RESERVE, a summary)
+        """
+        return OUTPUT_TOKEN_RESERVE
+    
+    def prompt_version(self) -> Optional[str]:
+        """
+        Version of this task's prompt, recorded with each run.
+        
+        Returns:
+            Short hash of the prompt template, or None for tasks without one
+        """
+        if self.prompt_template is None:
+            return None
+        return template_version(self.prompt_template)
+    
     def post_process(self, response: str, articles: List[MDArticle]) -> Dict[str, str]:
         """
         Post-process the LLM response.
@@ -2,10 +2,10 @@
 Brief Task - Generate short news from research papers.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from .base import Task, TaskRegistry
 from ..data_models import MDArticle
-from ..config.load_prompt import load_news_generator_prompt
+from ..config.load_prompt import NEWS_GENERATOR_PROMPT_FILE, build_news_generator_prompt
 
 
 @TaskRegistry.register("brief")
@@ -15,6 +15,7 @@ class BriefTask(Task):
     name = "brief"
     description = "Generate brief news from research papers and articles"
     supports_multi_input = True
+    prompt_template = NEWS_GENERATOR_PROMPT_FILE
     
     def validate(self, articles: List[MDArticle]) -> tuple[bool, str]:
         if not articles:
@@ -22,7 +23,11 @@ class BriefTask(Task):
         return True, ""
     
     def build_prompt(self, articles: List[MDArticle]) -> str:
-        return load_news_generator_prompt(articles=articles)
+        return self.build_prompt_with_estimate(articles)[0]
+    
+    def build_prompt_with_estimate(self, articles: List[MDArticle]) -> Tuple[str, Optional[int]]:
+        prompt = build_news_generator_prompt(articles)
+        return prompt.text, prompt.estimated_tokens
     
     def post_process(self, response: str, articles: List[MDArticle]) -> Dict[str, str]:
         # Brief task only produces the main output
@@ -2,10 +2,10 @@
 Outline Task - Generate research paper outlines.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from .base import Task, TaskRegistry
 from ..data_models import MDArticle
-from ..config.load_prompt import load_research_outliner_prompt
+from ..config.load_prompt import RESEARCH_OUTLINER_PROMPT_FILE, build_research_outliner_prompt
 
 
 @TaskRegistry.register("outline")
@@ -15,6 +15,7 @@ class OutlineTask(Task):
     name = "outline"
     description = "Generate structured research outline with Chinese translation"
     supports_multi_input = False
+    prompt_template = RESEARCH_OUTLINER_PROMPT_FILE
     
     def validate(self, articles: List[MDArticle]) -> tuple[bool, str]:
         if len(articles) != 1:
@@ -22,7 +23,11 @@ class OutlineTask(Task):
         return True, ""
     
     def build_prompt(self, articles: List[MDArticle]) -> str:
-        return load_research_outliner_prompt(content=articles[0].content)
+        return self.build_prompt_with_estimate(articles)[0]
+    
+    def build_prompt_with_estimate(self, articles: List[MDArticle]) -> Tuple[str, Optional[int]]:
+        prompt = build_research_outliner_prompt(articles[0].content)
+        return prompt.text, prompt.estimated_tokens
     
     def post_process(self, response: str, articles: List[MDArticle]) -> Dict[str, str]:
         return {"main": response}
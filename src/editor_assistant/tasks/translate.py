@@ -2,10 +2,10 @@
 Translate Task - Generate Chinese translation with bilingual output.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from .base import Task, TaskRegistry
 from ..data_models import MDArticle
-from ..config.load_prompt import load_translation_prompt
+from ..config.load_prompt import TRANSLATOR_PROMPT_FILE, build_translation_prompt
 from ..config.logging_config import warning
 
 
@@ -16,6 +16,7 @@ class TranslateTask(Task):
     name = "translate"
     description = "Translate content to Chinese with bilingual output"
     supports_multi_input = False
+    prompt_template = TRANSLATOR_PROMPT_FILE
     
     def validate(self, articles: List[MDArticle]) -> tuple[bool, str]:
         if len(articles) != 1:
@@ -23,7 +24,15 @@ class TranslateTask(Task):
         return True, ""
     
     def build_prompt(self, articles: List[MDArticle]) -> str:
-        return load_translation_prompt(content=articles[0].content)
+        return self.build_prompt_with_estimate(articles)[0]
+    
+    def build_prompt_with_estimate(self, articles: List[MDArticle]) -> Tuple[str, Optional[int]]:
+        prompt = build_translation_prompt(articles[0].content)
+        return prompt.text, prompt.estimated_tokens
+    
+    def expected_output_tokens(self, prompt_tokens: int) -> int:
+        # A translation is about as long as its source
+        return prompt_tokens
     
     def post_process(self, response: str, articles: List[MDArticle]) -> Dict[str, str]:
         """Generate both Chinese-only and bilingual versions."""
@@ -2,7 +2,13 @@
 Utility functions for Editor Assistant.
 """
 
-from .config.constants import CHAR_TOKEN_RATIO_EN, CHAR_TOKEN_RATIO_ZH
+import hashlib
+import re
+
+from .config.constants import CHAR_TOKEN_RATIO_EN, CHAR_TOKEN_RATIO_ZH, FILE_HASH_CHUNK_SIZE
+
+# Runs of CJK Unified Ideographs, counted in one regex scan instead of a per-char loop
+_CJK_RUN = re.compile("[\u4e00-\u9fff]+")
 
 
 def estimate_tokens(text: str) -> int:
@@ -23,7 +29,10 @@ def estimate_tokens(text: str) -> int:
         return 0
     
     # Count Chinese characters (CJK Unified Ideographs range)
-    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    if text.isascii():
+        chinese_chars = 0
+    else:
+        chinese_chars = sum(len(run) for run in _CJK_RUN.findall(text))
     total_chars = len(text)
     
     if total_chars == 0:
@@ -44,3 +53,19 @@ def estimate_tokens(text: str) -> int:
     
     return int(total_chars / blended_ratio)
 
+
+def hash_file(path: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's bytes.
+
+    Args:
+        path: Path to a local file
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FILE_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
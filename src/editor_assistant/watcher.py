@@ -0,0 +1,270 @@
+"""
+Watch-folder ingestion: `editor-assistant watch <dir> --task ...`.
+
+A FolderWatcher polls the folder (with the same include/exclude globs as
+`batch`) and reports a file once it is stable: its size and mtime have not
+changed for `settle_seconds` since it was last modified. Files still being
+copied into the folder are therefore not picked up half-written, and a burst
+of writes to one file yields one event (debouncing). A file is reported again
+only when its size or mtime changes.
+
+A Watcher feeds stable files into one long-running process_multiple()
+pipeline, so the assistant's LLM client, HTTP connections, conversion
+workers and DB writer stay warm between files. Files are hashed through the
+batch file index; content that already has a successful run of the task,
+model and prompt (unless force), or that is already queued in this session,
+is skipped.
+
+Stopping (Ctrl+C / SIGTERM in the CLI) ends the stream of new files: files
+already in the pipeline are finished, files not yet started are left for the
+next start.
+"""
+
+import asyncio
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .config.constants import (
+    WATCH_POLL_INTERVAL_SECONDS,
+    WATCH_SETTLE_SECONDS,
+    WATCH_STATUS_INTERVAL_SECONDS,
+    WATCH_THROUGHPUT_WINDOW_SECONDS,
+)
+from .config.logging_config import progress, warning
+from .data_models import Input, InputType
+from .scanning import scan_files
+from .storage import FileIndex, RunRepository
+from .tasks import TaskRegistry
+
+
+class FolderWatcher:
+    """Polls a folder and reports files whose size and mtime have settled."""
+
+    def __init__(
+        self,
+        root: Path,
+        include: Sequence[str],
+        exclude: Sequence[str] = (),
+        recursive: bool = False,
+        settle_seconds: float = WATCH_SETTLE_SECONDS,
+    ):
+        self.root = Path(root)
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+        # path -> (size, mtime_ns, stable since) for files not reported yet
+        self._candidates: Dict[Path, Tuple[int, int, float]] = {}
+        # path -> (size, mtime_ns) when last reported
+        self._reported: Dict[Path, Tuple[int, int]] = {}
+
+    def poll(self, now: Optional[float] = None) -> List[Path]:
+        """
+        Scan the folder once.
+
+        Args:
+            now: Current time (epoch seconds; default: time.time())
+
+        Returns:
+            Files that became stable since they were last reported
+        """
+        now = time.time() if now is None else now
+        ready = []
+        present = set()
+        for path in scan_files(self.root, self.include, self.exclude, recursive=self.recursive):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed since the listing
+            present.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._reported.get(path) == signature or stat.st_size == 0:
+                continue
+            candidate = self._candidates.get(path)
+            if candidate is None or candidate[:2] != signature:
+                # Stable since its last modification (files that were already
+                # there when watching started are ready at once)
+                candidate = self._candidates[path] = (*signature, min(now, stat.st_mtime_ns / 1e9))
+            if now - candidate[2] >= self.settle_seconds:
+                del self._candidates[path]
+                self._reported[path] = signature
+                ready.append(path)
+
+        for seen in (self._candidates, self._reported):
+            for path in [p for p in seen if p not in present]:
+                del seen[path]
+        return ready
+
+
+class Watcher:
+    """Runs the files reported by a FolderWatcher through one persistent pipeline."""
+
+    def __init__(
+        self,
+        assistant: Any,
+        folder: FolderWatcher,
+        task: str,
+        model: str,
+        force: bool = False,
+        save_files: bool = False,
+        repository: Optional[RunRepository] = None,
+        poll_interval: float = WATCH_POLL_INTERVAL_SECONDS,
+        status_interval: float = WATCH_STATUS_INTERVAL_SECONDS,
+        on_status: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            assistant: EditorAssistant (kept open for the whole session)
+            folder: Folder to watch
+            task: Task to run on each file
+            model: Model name, for skipping files already done
+            force: Also process files that already have a successful run
+            save_files: Persist generated files to disk
+            repository: Run database for the file index and done lookups
+            poll_interval: Seconds between folder scans
+            status_interval: Seconds between status reports (0 = none)
+            on_status: Called with stats() every status_interval
+        """
+        self.assistant = assistant
+        self.folder = folder
+        self.task = task
+        self.model = model
+        self.force = force
+        self.save_files = save_files
+        self.repository = repository if repository is not None else RunRepository()
+        self.poll_interval = poll_interval
+        self.status_interval = status_interval
+        self.on_status = on_status
+
+        task_cls = TaskRegistry.get(task)
+        self.prompt_version = task_cls().prompt_version() if task_cls else None
+        self._stopping = asyncio.Event()
+        self._backlog: Deque[Tuple[Path, str]] = deque()
+        self._in_flight: Dict[str, str] = {}  # path -> content hash
+        self._queued_hashes: set = set()
+        self._finished: Deque[float] = deque()  # completion times within the throughput window
+        self.counts = {"detected": 0, "skipped": 0, "done": 0, "failed": 0}
+
+    # =========================================================================
+    # Control
+    # =========================================================================
+
+    def stop(self) -> None:
+        """Stop taking new files; run() returns once in-flight files finish."""
+        self._stopping.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and throughput.
+
+        Returns:
+            waiting (stable files not yet in the pipeline), in_flight,
+            queue_depth (both), detected, skipped, done, failed, and
+            per_minute (files finished over the last throughput window)
+        """
+        now = time.monotonic()
+        while self._finished and now - self._finished[0] > WATCH_THROUGHPUT_WINDOW_SECONDS:
+            self._finished.popleft()
+        return {
+            "waiting": len(self._backlog),
+            "in_flight": len(self._in_flight),
+            "queue_depth": len(self._backlog) + len(self._in_flight),
+            **self.counts,
+            "per_minute": len(self._finished) * 60 / WATCH_THROUGHPUT_WINDOW_SECONDS,
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Watch and process until stop() is called, then drain in-flight files.
+
+        Returns:
+            Final stats()
+        """
+        reporter = asyncio.create_task(self._status_loop()) if self.status_interval and self.on_status else None
+        try:
+            await self.assistant.process_multiple(
+                self._inputs(),
+                self.task,
+                output_to_console=False,
+                save_files=self.save_files,
+                done_callback=self._on_done,
+            )
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        return self.stats()
+
+    # =========================================================================
+    # Pipeline source
+    # =========================================================================
+
+    async def _inputs(self):
+        """Stable, new files as Inputs, until stopped."""
+        last_poll = None
+        while not self.stopping:
+            now = time.monotonic()
+            if last_poll is None or now - last_poll >= self.poll_interval:
+                last_poll = now
+                # Walking and stat()ing a large folder must not stall LLM streams
+                ready = await asyncio.to_thread(self.folder.poll)
+                if ready:
+                    self._queue(ready, *await asyncio.to_thread(self._lookup, ready))
+            if self._backlog:
+                path, file_hash = self._backlog.popleft()
+                self._in_flight[str(path)] = file_hash
+                yield Input(type=InputType.PAPER, path=str(path), source_hash=file_hash)
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _lookup(self, paths: List[Path]) -> Tuple[Dict[Path, str], set]:
+        """Content hashes of the files and the ones already done (worker thread)."""
+        hashes = FileIndex(self.repository).hashes(paths, skip_unreadable=True)
+        unreadable = [path for path in paths if path not in hashes]
+        if unreadable:
+            # Removed or unreadable between the poll and hashing: seen again on change
+            warning(f"Skipping files that could not be read: {', '.join(path.name for path in unreadable)}")
+        done = set()
+        if not self.force:
+            done = self.repository.find_done_sources(list(hashes.values()), self.task, self.model, self.prompt_version)
+        return hashes, done
+
+    def _queue(self, paths: List[Path], hashes: Dict[Path, str], done: set) -> None:
+        """Add files to the backlog, skipping content already done or queued."""
+        for path in paths:
+            file_hash = hashes.get(path)
+            if file_hash is None:
+                continue
+            self.counts["detected"] += 1
+            if file_hash in done or file_hash in self._queued_hashes:
+                self.counts["skipped"] += 1
+                continue
+            self._queued_hashes.add(file_hash)
+            self._backlog.append((path, file_hash))
+
+    def _on_done(self, path: str, success: bool) -> None:
+        file_hash = self._in_flight.pop(path, None)
+        self._finished.append(time.monotonic())
+        if success:
+            self.counts["done"] += 1
+            progress(f"✔ {Path(path).name} processed (queue depth {self.stats()['queue_depth']})")
+        else:
+            self.counts["failed"] += 1
+            # Retried when the file changes (or is touched)
+            self._queued_hashes.discard(file_hash)
+            warning(f"✗ {Path(path).name} failed")
+
+    async def _status_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.status_interval)
+            self.on_status(self.stats())
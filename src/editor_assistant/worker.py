@@ -0,0 +1,253 @@
+"""
+Queue worker: drains jobs written by `editor-assistant enqueue`.
+
+Each `editor-assistant worker` process claims up to `concurrency` jobs at a
+time from the job queue in the run database (see storage/jobs.py) and runs
+each one through an EditorAssistant. Several worker processes, on one host
+or sharing the database file, drain the same queue in parallel:
+
+- claims, heartbeats and results go through the DB writer thread, so the
+  event loop never blocks on SQLite;
+- a heartbeat task renews the leases of running jobs; a job whose lease was
+  lost (e.g. this worker stalled past the lease) is cancelled here, since
+  another worker may already hold it;
+- a failed job is retried after a backoff, then dead-lettered;
+- on shutdown (Ctrl+C), unfinished jobs are released back to the queue;
+- with a budget (--max-cost / --max-tokens, see budget.py), the worker stops
+  claiming jobs once it is exhausted, releases jobs it could not start
+  and exits when the jobs already sent to the LLM finish.
+
+Jobs with the same model and options share one assistant (one LLM client and
+HTTP connection pool), created on first use and closed when the worker exits.
+"""
+
+import asyncio
+import os
+import socket
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config.constants import (
+    JOB_HEARTBEAT_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_RETRY_DELAY_SECONDS,
+)
+from .config.logging_config import progress, warning
+from .budget import Budget
+from .data_models import Input, InputType
+from .storage import AsyncRunRepository, JobQueue
+
+
+def default_worker_id() -> str:
+    """Worker identity recorded on claimed jobs: host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Worker:
+    """Claims jobs from the queue and processes up to `concurrency` at once."""
+
+    def __init__(
+        self,
+        db: AsyncRunRepository,
+        assistant_factory: Callable[..., Any],
+        concurrency: int = 1,
+        worker_id: Optional[str] = None,
+        debug: bool = False,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        retry_delay: float = JOB_RETRY_DELAY_SECONDS,
+        budget: Optional[Budget] = None,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            db: Database facade; jobs and runs are written through its writer
+            assistant_factory: EditorAssistant (or a stand-in with the same
+                               constructor and process_multiple/aclose)
+            concurrency: Jobs processed at once
+            worker_id: Identity on claimed jobs (default: host:pid)
+            debug: Debug mode for the assistants
+            budget: Token/cost budget shared by all jobs of this worker
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.db = db
+        self.queue = JobQueue(db.repository)
+        self.assistant_factory = assistant_factory
+        self.concurrency = concurrency
+        self.worker_id = worker_id or default_worker_id()
+        self.debug = debug
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.budget = budget
+        self.stats = {"done": 0, "retried": 0, "dead": 0, "lost": 0, "deferred": 0}
+        self._assistants: Dict[Tuple, Any] = {}
+        self._running: Dict[int, asyncio.Task] = {}
+
+    async def run(self, drain: bool = False) -> Dict[str, int]:
+        """
+        Process jobs until cancelled, or (with `drain`) until no job is
+        queued or running anywhere.
+
+        Returns:
+            Counts of jobs done, retried, dead-lettered, lost (lease taken
+            over) and deferred (released when the budget ran out)
+        """
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while True:
+                self._reap()
+                if self.budget is not None and self.budget.exhausted:
+                    if not self._running:
+                        progress(f"Budget exhausted ({self.budget.describe()}), stopping")
+                        break
+                    # Let jobs in flight finish, claim nothing new
+                    await asyncio.wait(self._running.values(), return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                claimed = []
+                free = self.concurrency - len(self._running)
+                if free > 0:
+                    claimed = await self.db.write(
+                        self.queue.claim, self.worker_id, free, self.lease_seconds
+                    )
+                    for job in claimed:
+                        self._running[job["id"]] = asyncio.create_task(self._process(job))
+
+                if self._running:
+                    if free == 0 or not claimed:
+                        # Busy: wake up when a job finishes (or to poll for more)
+                        await asyncio.wait(
+                            self._running.values(),
+                            timeout=self.poll_interval,
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                elif not claimed:
+                    # Jobs waiting out a retry backoff, or held by other
+                    # workers (which may die), still count as pending
+                    if drain and await self.db.read(self.queue.pending) == 0:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            heartbeat.cancel()
+            await self._shutdown()
+        return self.stats
+
+    # =========================================================================
+    # Jobs
+    # =========================================================================
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome."""
+        job_id = job["id"]
+        options = job["options"]
+        progress(f"Job #{job_id}: {job['task']} with {job['model']} on {job['source_path']} "
+                 f"(attempt {job['attempts']}/{job['max_attempts']})")
+        run_id = None
+        try:
+            assistant = self._assistant_for(job)
+            input_type = InputType.PAPER if job["input_type"] == "paper" else InputType.NEWS
+            results = await assistant.process_multiple(
+                [Input(type=input_type, path=job["source_path"])],
+                job["task"],
+                output_to_console=False,
+                save_files=options.get("save_files", False),
+            )
+            result = results[0] if results else None
+            if result is not None and result.budget_exhausted:
+                # Not started: back to the queue without using an attempt
+                await self.db.write(self.queue.release, [job_id], self.worker_id)
+                self.stats["deferred"] += 1
+                progress(f"Job #{job_id} released: {result.error}")
+                return
+            if result is not None and result.success:
+                if await self.db.write(self.queue.complete, job_id, self.worker_id, result.run_id):
+                    self.stats["done"] += 1
+                    progress(f"Job #{job_id} done (run #{result.run_id})")
+                else:
+                    self._lost(job_id)
+                return
+            error_message = (result.error if result is not None else None) or "processing failed"
+            run_id = result.run_id if result is not None else None
+        except Exception as e:
+            error_message = str(e) or type(e).__name__
+
+        status = await self.db.write(
+            self.queue.fail, job_id, self.worker_id, error_message, run_id, self.retry_delay
+        )
+        if status == "dead":
+            self.stats["dead"] += 1
+            warning(f"Job #{job_id} failed permanently after {job['attempts']} attempt(s): {error_message}")
+        elif status == "queued":
+            self.stats["retried"] += 1
+            warning(f"Job #{job_id} failed, will retry: {error_message}")
+        else:
+            self._lost(job_id)
+
+    def _assistant_for(self, job: Dict[str, Any]) -> Any:
+        """Shared assistant for the job's model and options (created on first use)."""
+        options = job["options"]
+        key = (job["model"], options.get("thinking_level"), options.get("stream", True),
+               options.get("reconvert", False))
+        if key not in self._assistants:
+            model, thinking_level, stream, reconvert = key
+            self._assistants[key] = self.assistant_factory(
+                model,
+                debug_mode=self.debug,
+                thinking_level=thinking_level,
+                stream=stream,
+                reconvert=reconvert,
+                db=self.db,
+                budget=self.budget,
+            )
+        return self._assistants[key]
+
+    def _lost(self, job_id: int) -> None:
+        self.stats["lost"] += 1
+        warning(f"Job #{job_id}: lease lost to another worker, result not recorded")
+
+    def _reap(self) -> None:
+        """Forget finished job tasks."""
+        for job_id, task in list(self._running.items()):
+            if task.done():
+                del self._running[job_id]
+
+    # =========================================================================
+    # Leases
+    # =========================================================================
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            job_ids = [job_id for job_id, task in self._running.items() if not task.done()]
+            if not job_ids:
+                continue
+            held = set(await self.db.write(
+                self.queue.heartbeat, job_ids, self.worker_id, self.lease_seconds
+            ))
+            for job_id in job_ids:
+                task = self._running.get(job_id)
+                if job_id not in held and task is not None and not task.done():
+                    # Another worker may be running it by now
+                    task.cancel()
+                    self._lost(job_id)
+
+    async def _shutdown(self) -> None:
+        """Release unfinished jobs back to the queue and close the assistants."""
+        unfinished: List[int] = []
+        for job_id, task in self._running.items():
+            if not task.done():
+                task.cancel()
+                unfinished.append(job_id)
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+        self._running.clear()
+        if unfinished:
+            released = await self.db.write(self.queue.release, unfinished, self.worker_id)
+            progress(f"Released {released} unfinished job(s) back to the queue")
+        for assistant in self._assistants.values():
+            await assistant.aclose()
+        self._assistants.clear()
@@ -93,6 +93,13 @@ def temp_dir():
         yield Path(tmpdir)
 
 
+@pytest.fixture
+def repo(temp_dir):
+    """Run repository backed by a fresh database in temp_dir."""
+    from editor_assistant.storage import RunRepository
+    return RunRepository(db_path=temp_dir / "test.db")
+
+
 # ============================================================================
 # SAMPLE DATA FIXTURES
 # ============================================================================
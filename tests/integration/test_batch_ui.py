@@ -1,7 +1,7 @@
 import pytest
 import asyncio
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 from editor_assistant.cli import cmd_batch_process
 from editor_assistant.data_models import Input, InputType
 
@@ -34,6 +34,18 @@ async def test_batch_process_ui_flow(tmp_path, capsys):
     args.thinking = None
     args.no_stream = False
     args.save_files = True
+    args.per_host = 2
+    args.host_delay = 0.0
+    args.shard = None
+    args.schedule = "fifo"
+    args.deadline = None
+    args.max_cost = None
+    args.max_tokens = None
+    args.manifest = None
+    args.recursive = False
+    args.include = None
+    args.exclude = None
+    args.force = True
 
     # 3. Mock EditorAssistant to avoid real API calls and speed up test
     with patch("editor_assistant.cli.EditorAssistant") as MockAssistant:
@@ -57,6 +69,7 @@ async def test_batch_process_ui_flow(tmp_path, capsys):
             return
             
         mock_instance.process_multiple.side_effect = mock_process
+        mock_instance.aclose = AsyncMock()
         
         # Mock LLMClient token usage for summary
         mock_client = MagicMock()
@@ -96,6 +109,9 @@ async def test_batch_process_ui_flow(tmp_path, capsys):
                 assert call_kwargs.get("transient") is True, "Progress should be transient"
                 assert call_kwargs.get("console") == MockConsole.return_value, "Progress should use our forced console"
                 
+                # Conversion workers are released after the batch
+                mock_instance.aclose.assert_awaited_once()
+
                 # Verify file discovery
                 assert mock_instance.process_multiple.called
                 call_args = mock_instance.process_multiple.call_args
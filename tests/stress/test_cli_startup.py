@@ -0,0 +1,65 @@
+"""
+CLI startup benchmark (`python -X importtime`).
+
+DB-only commands (history, stats, show, export) should not pay for rich,
+httpx, pydantic models, MarkItDown, Jinja or the LLM YAML config. These tests
+run a fresh interpreter, so they measure cold import cost:
+
+- heavy modules must not be imported when building the parser
+- the cumulative import time of editor_assistant.cli must stay under a threshold
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Generous regression threshold for CI machines; a warm local run is ~35ms.
+# Before lazy imports the CLI took ~450ms to import.
+CLI_IMPORT_BUDGET_US = 200_000
+
+HEAVY_MODULES = ("httpx", "rich", "pydantic", "jinja2", "yaml", "markitdown")
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        timeout=60,
+    )
+
+
+def _cli_import_time_us() -> int:
+    """Cumulative import time of editor_assistant.cli in microseconds."""
+    result = _run_python("import editor_assistant.cli", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "editor_assistant.cli":
+            return int(parts[1])
+    raise AssertionError("editor_assistant.cli missing from -X importtime output")
+
+
+@pytest.mark.slow
+def test_parser_does_not_import_heavy_modules():
+    # Build the parser twice: the first run may have to refresh the model index
+    code = (
+        "import sys\n"
+        "import editor_assistant.cli as cli\n"
+        "cli.create_parser()\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    _run_python(code)
+    result = _run_python(code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.slow
+def test_cli_import_time_budget():
+    # Best of 3 to reduce noise from a busy machine
+    best = min(_cli_import_time_us() for _ in range(3))
+    assert best < CLI_IMPORT_BUDGET_US, f"editor_assistant.cli import took {best / 1000:.0f}ms"
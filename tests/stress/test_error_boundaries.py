@@ -159,7 +159,7 @@ class TestErrorBoundaries:
             mock_task_instance = MagicMock()
             # This was the failure point: validate must return (bool, str)
             mock_task_instance.validate.return_value = (True, "")
-            mock_task_instance.build_prompt.return_value = "prompt " * 100
+            mock_task_instance.build_prompt_with_estimate.return_value = ("prompt " * 100, None)
             mock_task_instance.post_process.return_value = {"main": "response"}
             mock_task_instance.get_output_suffix.return_value = "_suffix"
             mock_task_instance.supports_multi_input = False
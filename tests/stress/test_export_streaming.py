@@ -0,0 +1,95 @@
+"""
+Export benchmark: streaming chunked export vs. the previous in-memory export.
+
+The previous `export_runs` loaded every run, ran three queries per run
+(inputs, outputs, token usage), kept everything in a list and wrote one JSON
+document. The streaming exporter fetches chunks with set-based queries and
+writes rows as it goes, so its peak memory does not grow with history size.
+"""
+
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage.database import get_connection
+from editor_assistant.storage.export import export_history
+
+RUNS = 3000
+OUTPUT_CHARS = 4000
+
+
+def _populate(db_path):
+    repo = RunRepository(db_path=db_path)
+    output = "x" * OUTPUT_CHARS
+    with repo.transaction():
+        for n in range(RUNS):
+            input_id = repo.get_or_create_input("paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+            run_id = repo.create_run("brief", "bench-model", [input_id])
+            repo.add_output(run_id, "main", output)
+            repo.add_token_usage(run_id, 100, 50, 0.001, 0.001, 0.1)
+            repo.update_run_status(run_id, "success")
+    return repo
+
+
+def _legacy_export(db_path, output_path):
+    """The previous implementation: N+1 queries, whole history in memory."""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, timestamp, task, model, thinking_level, stream, currency, status, error_message
+        FROM runs ORDER BY id DESC
+    """)
+    runs = []
+    for row in cursor.fetchall():
+        run = dict(row)
+        cursor.execute("""
+            SELECT i.id, i.type, i.source_path, i.title FROM inputs i
+            JOIN run_inputs ri ON i.id = ri.input_id WHERE ri.run_id = ?
+        """, (run["id"],))
+        run["inputs"] = [dict(r) for r in cursor.fetchall()]
+        # Bodies now live in blob storage; blob_text() yields the text stored inline before
+        cursor.execute("""
+            SELECT o.output_type, o.content_type, COALESCE(o.content, blob_text(b.codec, b.data)) AS content
+            FROM outputs o LEFT JOIN blobs b ON b.hash = o.blob_hash WHERE o.run_id = ?
+        """, (run["id"],))
+        run["outputs"] = [dict(r) for r in cursor.fetchall()]
+        cursor.execute("""
+            SELECT input_tokens, output_tokens, cost_input, cost_output, process_time
+            FROM token_usage WHERE run_id = ?
+        """, (run["id"],))
+        usage = cursor.fetchone()
+        run["token_usage"] = dict(usage) if usage else None
+        runs.append(run)
+    conn.close()
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"total_runs": len(runs), "runs": runs}, f, indent=2, ensure_ascii=False)
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+@pytest.mark.slow
+def test_streaming_export_uses_bounded_memory(tmp_path):
+    repo = _populate(tmp_path / "history.db")
+
+    legacy_time, legacy_peak = _measure(lambda: _legacy_export(repo.db_path, tmp_path / "legacy.json"))
+    stream_time, stream_peak = _measure(
+        lambda: export_history(repo.db_path, tmp_path / "stream.jsonl")
+    )
+
+    print(f"\nlegacy: {legacy_time:.2f}s, peak {legacy_peak / 1e6:.1f} MB; "
+          f"streaming: {stream_time:.2f}s, peak {stream_peak / 1e6:.1f} MB")
+
+    with open(tmp_path / "stream.jsonl", encoding="utf-8") as f:
+        assert sum(1 for _ in f) == RUNS
+    assert stream_peak * 4 < legacy_peak
@@ -0,0 +1,86 @@
+"""
+History browsing benchmarks: keyset pages and metadata-first `show`.
+
+- A page deep in a 200k-run history is read with `--before-id` (keyset on the
+  runs primary key) as fast as the first page, where LIMIT/OFFSET paging
+  walks every newer run first.
+- `show` without `--output` reads run metadata and a bounded preview of each
+  output instead of decompressing whole bodies (here a 500 KB bilingual
+  output per run).
+"""
+
+import time
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+
+RUNS = 200_000
+BIG_RUNS = 20
+BIG_BODY_BYTES = 500_000
+REPEAT = 20
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT
+
+
+@pytest.mark.slow
+def test_deep_keyset_page_costs_the_same_as_the_first(tmp_path):
+    repo = RunRepository(db_path=tmp_path / "history.db")
+    with repo.transaction() as conn:
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {RUNS})
+            INSERT INTO runs (task, model, status) SELECT 'brief', 'bench-model', 'success' FROM n
+        """)
+        conn.execute("INSERT INTO inputs (type, source_path, title, content_hash) VALUES ('paper', '/p.pdf', 'P', 'h')")
+        conn.execute("INSERT INTO run_inputs (run_id, input_id) SELECT id, 1 FROM runs")
+        conn.execute("INSERT INTO token_usage (run_id, input_tokens, output_tokens) SELECT id, 100, 50 FROM runs")
+
+    conn = repo._conn()
+    depth = RUNS - 1000
+
+    def offset_page():
+        rows = conn.execute("""
+            SELECT r.id, GROUP_CONCAT(i.title, ', '), t.input_tokens
+            FROM runs r
+            LEFT JOIN run_inputs ri ON r.id = ri.run_id
+            LEFT JOIN inputs i ON ri.input_id = i.id
+            LEFT JOIN token_usage t ON r.id = t.run_id
+            GROUP BY r.id ORDER BY r.id DESC LIMIT 20 OFFSET ?
+        """, (depth,)).fetchall()
+        assert rows[0][0] == RUNS - depth
+
+    first = _timed(lambda: repo.get_recent_runs(limit=20))
+    deep = _timed(lambda: repo.get_recent_runs(limit=20, before_id=RUNS - depth + 1))
+    offset = _timed(offset_page)
+
+    print(f"\nfirst page: {first * 1000:.2f} ms, keyset page at depth {depth:,}: {deep * 1000:.2f} ms, "
+          f"OFFSET page: {offset * 1000:.2f} ms")
+    assert deep < offset
+    assert deep < first * 5 + 0.005
+
+
+@pytest.mark.slow
+def test_show_metadata_first_skips_output_bodies(tmp_path):
+    repo = RunRepository(db_path=tmp_path / "history.db")
+    line = "Translated paragraph / 翻译后的段落 with its source sentence. "
+    with repo.transaction():
+        for n in range(BIG_RUNS):
+            input_id = repo.get_or_create_input("paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+            run_id = repo.create_run("translate", "bench-model", [input_id])
+            body = f"Run {n}. " + (line * (BIG_BODY_BYTES // len(line.encode())))
+            repo.add_output(run_id, "bilingual", body)
+
+    full = _timed(lambda: [repo.get_run_details(run_id) for run_id in range(1, BIG_RUNS + 1)])
+    preview = _timed(lambda: [
+        repo.get_run_details(run_id, include_content=False, preview_chars=200)
+        for run_id in range(1, BIG_RUNS + 1)
+    ])
+
+    print(f"\nshow with full bodies: {full / BIG_RUNS * 1000:.2f} ms/run, "
+          f"metadata + preview: {preview / BIG_RUNS * 1000:.2f} ms/run ({full / preview:.1f}x)")
+    assert preview < full
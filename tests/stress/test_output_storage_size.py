@@ -0,0 +1,69 @@
+"""
+Output storage benchmark: inline TEXT outputs vs. content-addressed blobs.
+
+Simulates translated papers: each run stores a bilingual output (source
+paragraphs interleaved with their translation) and a translation, and every
+paper is translated twice (a rerun producing identical text). The history is
+first written the way it was before blob storage (inline `outputs.content`),
+then `compact()` moves it into deduplicated, zlib-compressed blobs.
+"""
+
+import random
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+
+PAPERS = 60
+PARAGRAPHS = 80
+RERUNS = 2
+
+_WORDS = (
+    "model data result method sample analysis protein cell signal network "
+    "training error study effect growth energy structure response rate level"
+).split()
+
+
+def _paper(rng, n):
+    source = [" ".join(rng.choice(_WORDS) for _ in range(60)) + "." for _ in range(PARAGRAPHS)]
+    translation = [f"第{n}篇第{i}段：" + "".join(rng.choice("数据模型结果方法样本分析蛋白细胞信号网络") for _ in range(90))
+                   for i in range(PARAGRAPHS)]
+    bilingual = "\n\n".join(f"{s}\n\n{t}" for s, t in zip(source, translation))
+    return bilingual, "\n\n".join(translation)
+
+
+def _populate_inline(db_path):
+    """Write outputs inline, like databases created before blob storage."""
+    repo = RunRepository(db_path=db_path)
+    rng = random.Random(7)
+    with repo.transaction() as conn:
+        for n in range(PAPERS):
+            bilingual, translation = _paper(rng, n)
+            for _ in range(RERUNS):
+                run_id = repo.create_run("translate", "bench-model", [])
+                conn.executemany(
+                    "INSERT INTO outputs (run_id, output_type, content) VALUES (?, ?, ?)",
+                    [(run_id, "bilingual", bilingual), (run_id, "main", translation)],
+                )
+    return repo
+
+
+@pytest.mark.slow
+def test_blob_storage_space_savings(tmp_path):
+    repo = _populate_inline(tmp_path / "history.db")
+    # Like-for-like baseline: the inline history, vacuumed
+    conn = repo._get_conn()
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    stats = repo.compact()
+
+    saved = 1 - stats["stored_bytes"] / stats["logical_bytes"]
+    print(f"\noutput text {stats['logical_bytes'] / 1e6:.1f} MB -> {stats['stored_bytes'] / 1e6:.1f} MB "
+          f"stored ({saved:.0%} smaller); database file "
+          f"{stats['file_bytes_before'] / 1e6:.1f} MB -> {stats['file_bytes'] / 1e6:.1f} MB")
+
+    assert stats["migrated"] == PAPERS * RERUNS * 2
+    assert stats["blobs"] == PAPERS * 2
+    assert stats["file_bytes"] * 3 < stats["file_bytes_before"]
@@ -0,0 +1,64 @@
+"""
+Prompt build benchmark on large inputs.
+
+Compares assembling a prompt from precompiled template segments (with a
+composed token estimate) against the previous path: a full Jinja render of
+the document followed by a per-character rescan of the whole prompt for
+the estimate.
+"""
+
+import time
+
+import pytest
+
+from editor_assistant.config import load_prompt
+
+# ~2 MB of mixed English/Chinese markdown, like a large converted paper
+LARGE_CONTENT = ("## Section\n\nThe results show a 12% improvement. 结果显示性能提升。\n" * 30000)
+
+ROUNDS = 10
+
+# Absolute regression bound per build on a 2 MB input (generous for CI)
+MAX_BUILD_SECONDS = 0.25
+
+
+def _legacy_estimate_tokens(text: str) -> int:
+    """Token estimate as computed before (per-character Python loop)."""
+    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    chinese_ratio = chinese_chars / len(text)
+    if chinese_ratio > 0.2:
+        return int(len(text) / (chinese_ratio * 1.5 + (1 - chinese_ratio) * 3.5))
+    return int(len(text) / 3.5)
+
+
+def _best_of(fn, rounds=ROUNDS) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.slow
+def test_large_prompt_build_time():
+    def assembled():
+        built = load_prompt.build_research_outliner_prompt(LARGE_CONTENT)
+        return built.text, built.estimated_tokens
+
+    def full_render():
+        text = load_prompt._loader.render(load_prompt.RESEARCH_OUTLINER_PROMPT_FILE, content=LARGE_CONTENT)
+        return text, _legacy_estimate_tokens(text)
+
+    # Same prompt either way, and a close token estimate
+    new_text, new_tokens = assembled()
+    old_text, old_tokens = full_render()
+    assert new_text == old_text
+    assert abs(new_tokens - old_tokens) <= old_tokens * 0.01
+
+    new = _best_of(assembled)
+    old = _best_of(full_render)
+    print(f"\nprompt build (2 MB): assembled {new * 1000:.1f}ms, full render {old * 1000:.1f}ms")
+
+    assert new < MAX_BUILD_SECONDS
+    assert new < old
@@ -0,0 +1,176 @@
+"""
+Query-plan checks for the history queries on a seeded 1M-run database.
+
+Every statement the repository executes for history, details, stats,
+resume, stored-article lookups, batch skip checks, search and export is captured with a trace
+callback and run through EXPLAIN QUERY PLAN. A statement fails the check if its plan:
+
+- reads a whole table or index ("SCAN runs", "SCAN runs USING INDEX ..."
+  without a search constraint), unless it is the outer loop of a query
+  whose LIMIT stops it early (no temp B-tree between the scan and the
+  LIMIT, e.g. newest-first by rowid) or the index is partial (it only
+  holds the rows the query wants);
+- builds an automatic index (SQLite indexing a table on the fly because a
+  join has no usable index).
+
+Plans are checked twice: with SQLite's default estimates (the database
+has never been ANALYZEd, as in normal use) and with ANALYZE statistics.
+"""
+
+import re
+import time
+
+import pytest
+
+from editor_assistant.storage import FileIndex, RunRepository
+from editor_assistant.storage.export import iter_run_chunks, parse_since
+
+RUNS = 1_000_000
+INPUTS = 200_000
+DAYS = 2000
+
+_BASE_TABLES = {"runs", "inputs", "run_inputs", "outputs", "token_usage", "blobs", "daily_stats", "file_index"}
+
+
+@pytest.fixture(scope="module")
+def seeded_repo(tmp_path_factory):
+    repo = RunRepository(db_path=tmp_path_factory.mktemp("plans") / "history.db")
+    start = time.perf_counter()
+    with repo.transaction() as conn:
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {INPUTS})
+            INSERT INTO inputs (type, source_path, title, content_hash)
+            SELECT 'paper', '/papers/p' || i || '.pdf', 'Paper ' || i || ' on topic ' || (i % 97), 'h' || i
+            FROM n
+        """)
+        # Newest run now, one every DAYS/RUNS days before it; a few pending/aborted
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {RUNS})
+            INSERT INTO runs (timestamp, task, model, status)
+            SELECT datetime('now', '-' || (({RUNS} - i) * {DAYS} * 86400 / {RUNS}) || ' seconds'),
+                   CASE i % 3 WHEN 0 THEN 'brief' WHEN 1 THEN 'outline' ELSE 'translate' END,
+                   'model-' || (i % 5),
+                   CASE WHEN i % 50000 = 0 THEN 'pending'
+                        WHEN i % 40000 = 0 THEN 'aborted'
+                        WHEN i % 1000 = 0 THEN 'failed'
+                        ELSE 'success' END
+            FROM n
+        """)
+        conn.execute(f"INSERT INTO run_inputs (run_id, input_id) SELECT id, (id % {INPUTS}) + 1 FROM runs")
+        conn.execute("""
+            INSERT INTO token_usage (run_id, input_tokens, output_tokens, cost_input, cost_output)
+            SELECT id, 1000, 200, 0.001, 0.002 FROM runs
+        """)
+    # A few real outputs (blob storage + search index) at the newest runs,
+    # then one output per older run sharing one of those bodies
+    for run_id in range(RUNS, RUNS - 50, -1):
+        repo.add_output(run_id, "main", f"Summary {run_id} about topic {run_id % 97}")
+    with repo.transaction() as conn:
+        conn.execute(f"""
+            INSERT INTO outputs (run_id, output_type, blob_hash)
+            SELECT id, 'main', (SELECT MIN(hash) FROM blobs)
+            FROM runs WHERE id <= {RUNS - 50}
+        """)
+    print(f"\nseeded {RUNS:,} runs in {time.perf_counter() - start:.1f}s")
+    return repo
+
+
+@pytest.fixture(params=["default", "analyzed"])
+def planner_stats(request, seeded_repo):
+    conn = seeded_repo._conn()
+    if request.param == "analyzed":
+        conn.execute("ANALYZE")
+    else:
+        conn.execute("ANALYZE sqlite_schema")  # creates sqlite_stat1 if missing
+        conn.execute("DELETE FROM sqlite_stat1")
+        conn.commit()
+        conn.execute("ANALYZE sqlite_schema")  # reload: no statistics
+    return request.param
+
+
+def _aliases(sql: str) -> dict:
+    """alias -> table for every FROM/JOIN in the statement."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|GROUP\b|ORDER\b|LIMIT\b)(\w+))?", sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql: str) -> list:
+    """Plan lines that read a whole table (see module docstring)."""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    aliases = _aliases(sql)
+    partial_indexes = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'"
+        )
+    }
+    limited = re.search(r"\bLIMIT\b", sql, re.IGNORECASE) and not any("TEMP B-TREE" in line for line in plan)
+
+    problems = []
+    for position, line in enumerate(plan):
+        if "AUTOMATIC" in line:
+            problems.append(line)
+            continue
+        match = re.fullmatch(r"SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?", line)
+        if match and aliases.get(match.group(1)) in _BASE_TABLES:
+            if position == 0 and limited:
+                continue  # Outer loop cut short by LIMIT
+            if match.group(2) in partial_indexes:
+                continue
+            problems.append(line)
+    return problems
+
+
+def _captured(repo, call) -> list:
+    conn = repo._conn()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def _export_chunk(repo):
+    chunks = iter_run_chunks(repo._conn(), since=parse_since("2020-01-01"), chunk_size=100)
+    next(chunks)
+    chunks.close()
+
+
+QUERIES = {
+    "recent_runs": lambda repo: repo.get_recent_runs(limit=20),
+    "recent_runs_deep_page": lambda repo: repo.get_recent_runs(limit=20, before_id=RUNS // 10),
+    "run_details": lambda repo: repo.get_run_details(RUNS - 1),
+    "run_details_preview": lambda repo: repo.get_run_details(RUNS - 1, include_content=False, preview_chars=200),
+    "output": lambda repo: repo.get_output(RUNS // 2),
+    "stats_7_days": lambda repo: repo.get_stats(days=7),
+    "resumable_runs": lambda repo: repo.get_resumable_runs(),
+    "input_article": lambda repo: repo.get_input_article(1234),
+    "input_article_by_path": lambda repo: repo.find_input_article(source_path="/papers/p1234.pdf"),
+    "input_article_by_hash": lambda repo: repo.find_input_article(source_hash="0" * 64),
+    "search_by_title": lambda repo: repo.search_by_title("Paper 1234 ", limit=20),
+    "search": lambda repo: repo.search("Paper 1234", task="brief", limit=20),
+    "export_chunk": _export_chunk,
+    "done_sources": lambda repo: repo.find_done_sources(["0" * 64, "1" * 64], "brief", "m1", "v1"),
+    "file_index": lambda repo: FileIndex(repo)._lookup(["/papers/p1.pdf", "/papers/p2.pdf"]),
+}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_no_full_table_scans(seeded_repo, planner_stats, name):
+    start = time.perf_counter()
+    statements = _captured(seeded_repo, lambda: QUERIES[name](seeded_repo))
+    elapsed = time.perf_counter() - start
+    assert statements
+
+    conn = seeded_repo._conn()
+    problems = {sql: full_scans(conn, sql) for sql in statements}
+    problems = {sql: lines for sql, lines in problems.items() if lines}
+    print(f"\n{name} ({planner_stats}): {len(statements)} statements in {elapsed * 1000:.1f} ms")
+
+    assert not problems, "\n\n".join(f"{sql}\n  -> {lines}" for sql, lines in problems.items())
@@ -0,0 +1,56 @@
+"""
+Search benchmark: FTS5 trigram index vs. LIKE scans over output content.
+
+The previous way to find a run by what it produced was a `LIKE '%term%'`
+scan over every stored output (now also decompressing each body from blob
+storage). The FTS5 index answers the same query from the trigram index and
+ranks the hits.
+"""
+
+import time
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+
+RUNS = 3000
+QUERIES = 20
+
+
+def _populate(db_path):
+    repo = RunRepository(db_path=db_path)
+    filler = "The model summarises the paper's methods and results in detail. " * 60
+    with repo.transaction():
+        for n in range(RUNS):
+            input_id = repo.get_or_create_input("paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+            run_id = repo.create_run("brief", "bench-model", [input_id])
+            repo.add_output(run_id, "main", f"{filler} Keyword topic{n:05d}.")
+    return repo
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    for n in range(QUERIES):
+        results = fn(f"topic{n * 97:05d}")
+        assert len(results) == 1
+    return (time.perf_counter() - start) / QUERIES
+
+
+@pytest.mark.slow
+def test_fts_search_outperforms_like_scan(tmp_path):
+    repo = _populate(tmp_path / "history.db")
+    conn = repo._get_conn()
+
+    def like(term):
+        return conn.execute("""
+            SELECT o.run_id FROM outputs o LEFT JOIN blobs b ON b.hash = o.blob_hash
+            WHERE COALESCE(o.content, blob_text(b.codec, b.data)) LIKE ?
+        """, (f"%{term}%",)).fetchall()
+
+    like_time = _timed(like)
+    fts_time = _timed(repo.search)
+    conn.close()
+
+    print(f"\nLIKE scan: {like_time * 1000:.2f} ms/query, FTS5: {fts_time * 1000:.2f} ms/query "
+          f"({like_time / fts_time:.1f}x)")
+    assert fts_time < like_time
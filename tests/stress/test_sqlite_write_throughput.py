@@ -0,0 +1,146 @@
+"""
+SQLite write-throughput benchmarks.
+
+Each simulated run performs the writes `process_mds` makes (input, run,
+output, token usage, status update).
+
+- Pooled WAL connections vs. connect-per-call, from several threads like
+  concurrent `asyncio.to_thread` calls. The baseline reproduces the previous
+  behaviour: a new rollback-journal connection for every statement.
+- Group commit through `DBWriter` vs. one `asyncio.to_thread` hop and one
+  transaction per write, from many concurrent asyncio tasks.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from editor_assistant.storage import DBWriter, RunRepository
+from editor_assistant.storage.migrations import BASE_SCHEMA
+
+THREADS = 8
+RUNS_PER_THREAD = 40
+CONCURRENT_RUNS = 400
+
+
+class _ConnectPerCallWriter:
+    """The previous repository write path: connect, execute, commit, close."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(BASE_SCHEMA)
+        conn.close()
+
+    def _execute(self, sql, params):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        cursor = conn.execute(sql, params)
+        row_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return row_id
+
+    def write_run(self, n):
+        input_id = self._execute(
+            "INSERT INTO inputs (type, source_path, title, content_hash) VALUES (?, ?, ?, ?)",
+            ("paper", f"/p{n}.pdf", f"Paper {n}", f"hash-{n}"),
+        )
+        run_id = self._execute(
+            "INSERT INTO runs (task, model, status) VALUES ('brief', 'bench-model', 'pending')", ()
+        )
+        self._execute("INSERT INTO run_inputs (run_id, input_id) VALUES (?, ?)", (run_id, input_id))
+        self._execute(
+            "INSERT INTO outputs (run_id, output_type, content) VALUES (?, 'main', ?)",
+            (run_id, "output " * 200),
+        )
+        self._execute(
+            "INSERT INTO token_usage (run_id, input_tokens, output_tokens) VALUES (?, 100, 50)",
+            (run_id,),
+        )
+        self._execute("UPDATE runs SET status = 'success' WHERE id = ?", (run_id,))
+
+
+class _RepositoryWriter:
+    def __init__(self, db_path):
+        self.repo = RunRepository(db_path=db_path)
+
+    def write_run(self, n):
+        input_id = self.repo.get_or_create_input("paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+        run_id = self.repo.create_run("brief", "bench-model", [input_id])
+        self.repo.add_output(run_id, "main", "output " * 200)
+        self.repo.add_token_usage(run_id, 100, 50, 0.001, 0.001, 0.1)
+        self.repo.update_run_status(run_id, "success")
+
+
+def _runs_per_second(writer) -> float:
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(RUNS_PER_THREAD):
+                writer.write_run(offset + i)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(t * RUNS_PER_THREAD,)) for t in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert not errors, f"{len(errors)} writers failed, first: {errors[0]!r}"
+    return THREADS * RUNS_PER_THREAD / elapsed
+
+
+@pytest.mark.slow
+def test_pooled_wal_writes_outperform_connect_per_call(tmp_path):
+    baseline = _runs_per_second(_ConnectPerCallWriter(tmp_path / "baseline.db"))
+    pooled = _runs_per_second(_RepositoryWriter(tmp_path / "pooled.db"))
+
+    print(f"\nconnect-per-call: {baseline:.0f} runs/s, pooled WAL: {pooled:.0f} runs/s "
+          f"({pooled / baseline:.1f}x)")
+
+    runs = RunRepository(db_path=tmp_path / "pooled.db").get_stats(days=1)
+    assert runs["total_runs"] == THREADS * RUNS_PER_THREAD
+    assert runs["by_status"] == {"success": THREADS * RUNS_PER_THREAD}
+    assert pooled > baseline
+
+
+async def _write_run_async(call, repo, n):
+    input_id = await call(repo.get_or_create_input, "paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+    run_id = await call(repo.create_run, "brief", "bench-model", [input_id])
+    await call(repo.add_output, run_id, "main", "output " * 200)
+    await call(repo.add_token_usage, run_id, 100, 50, 0.001, 0.001, 0.1)
+    await call(repo.update_run_status, run_id, "success")
+
+
+async def _async_runs_per_second(call, repo) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[_write_run_async(call, repo, n) for n in range(CONCURRENT_RUNS)])
+    return CONCURRENT_RUNS / (time.perf_counter() - start)
+
+
+@pytest.mark.asyncio
+@pytest.mark.slow
+async def test_group_commit_batches_concurrent_writes(tmp_path):
+    per_write = await _async_runs_per_second(asyncio.to_thread, RunRepository(db_path=tmp_path / "per_write.db"))
+
+    repo = RunRepository(db_path=tmp_path / "group.db")
+    writer = DBWriter(repo)
+    grouped = await _async_runs_per_second(writer.run, repo)
+    writer.close()
+
+    writes = CONCURRENT_RUNS * 5
+    print(f"\nto_thread per write: {per_write:.0f} runs/s, group commit: {grouped:.0f} runs/s "
+          f"({writes} writes in {writer.stats['commits']} commits)")
+
+    stats = repo.get_stats(days=1)
+    assert stats["by_status"] == {"success": CONCURRENT_RUNS}
+    assert writer.stats["writes"] == writes
+    assert writer.stats["commits"] < writes // 4
@@ -0,0 +1,76 @@
+"""
+Stats benchmark: aggregates over runs/token_usage vs. daily_stats rollups.
+
+`get_stats` used to join and aggregate every run in the window on each
+call, so a dashboard polling a year of stats got slower as history grew. It
+now sums the per-day rollups, whose size depends on days x models x tasks,
+not on the number of runs.
+"""
+
+import time
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+
+RUNS = 300_000
+DAYS = 365
+CALLS = 5
+
+
+def _populate(db_path):
+    repo = RunRepository(db_path=db_path)
+    with repo.transaction() as conn:
+        conn.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {RUNS})
+            INSERT INTO runs (timestamp, task, model, status)
+            SELECT datetime('now', '-' || (i * {DAYS} * 86400 / {RUNS}) || ' seconds'),
+                   CASE i % 3 WHEN 0 THEN 'brief' WHEN 1 THEN 'outline' ELSE 'translate' END,
+                   'model-' || (i % 5),
+                   CASE WHEN i % 20 = 0 THEN 'failed' ELSE 'success' END
+            FROM n
+        """)
+        conn.execute("""
+            INSERT INTO token_usage (run_id, input_tokens, output_tokens, cost_input, cost_output, process_time)
+            SELECT id, 1000, 200, 0.001, 0.002, 1.5 FROM runs
+        """)
+    return repo
+
+
+def _aggregate_stats(conn, days):
+    """The previous get_stats queries, over the raw tables."""
+    window = (f'-{days} days',)
+    total = conn.execute("SELECT COUNT(*) FROM runs WHERE timestamp > datetime('now', ?)", window).fetchone()[0]
+    conn.execute("""
+        SELECT r.model, COUNT(*),
+               SUM(COALESCE(t.cost_input, 0) + COALESCE(t.cost_output, 0)),
+               SUM(COALESCE(t.input_tokens, 0) + COALESCE(t.output_tokens, 0))
+        FROM runs r LEFT JOIN token_usage t ON r.id = t.run_id
+        WHERE r.timestamp > datetime('now', ?) GROUP BY r.model
+    """, window).fetchall()
+    conn.execute("SELECT task, COUNT(*) FROM runs WHERE timestamp > datetime('now', ?) GROUP BY task", window).fetchall()
+    conn.execute("SELECT status, COUNT(*) FROM runs WHERE timestamp > datetime('now', ?) GROUP BY status", window).fetchall()
+    return total
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        result = fn()
+    return (time.perf_counter() - start) / CALLS, result
+
+
+@pytest.mark.slow
+def test_rollup_stats_outperform_aggregates(tmp_path):
+    repo = _populate(tmp_path / "history.db")
+    conn = repo._conn()
+
+    aggregate_time, total = _timed(lambda: _aggregate_stats(conn, DAYS + 1))
+    rollup_time, stats = _timed(lambda: repo.get_stats(days=DAYS + 1))
+
+    print(f"\nstats over {RUNS:,} runs / {DAYS} days: aggregates {aggregate_time * 1000:.1f} ms, "
+          f"rollups {rollup_time * 1000:.1f} ms ({aggregate_time / rollup_time:.0f}x)")
+
+    assert stats["total_runs"] == total == RUNS
+    assert sum(row["total_tokens"] for row in stats["by_model"]) == RUNS * 1200
+    assert rollup_time * 10 < aggregate_time
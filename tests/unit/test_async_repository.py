@@ -0,0 +1,129 @@
+"""
+Unit tests for the async repository facade
+(src/editor_assistant/storage/async_repository.py).
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from editor_assistant.data_models import InputType, MDArticle
+from editor_assistant.storage import AsyncRunRepository
+
+pytestmark = pytest.mark.unit
+
+
+def _record_threads(repo, names, *methods):
+    """Wrap repository methods to record the thread each call runs on."""
+    for name in methods:
+        original = getattr(repo, name)
+
+        def wrapper(*args, _original=original, _name=name, **kwargs):
+            names.append((_name, threading.current_thread().name))
+            return _original(*args, **kwargs)
+
+        setattr(repo, name, wrapper)
+
+
+@pytest.mark.asyncio
+async def test_writes_commit_and_reads_see_them(repo):
+    async with AsyncRunRepository(repo) as db:
+        input_id = await db.get_or_create_input("paper", "/p.pdf", "Title", "content")
+        run_id = await db.create_run("brief", "model", [input_id], currency="¥")
+        await db.add_output(run_id, "main", "summary text")
+        await db.add_token_usage(run_id, 10, 5, 0.1, 0.2, 1.0)
+        await db.update_run_status(run_id, "success")
+
+        details = await db.get_run_details(run_id)
+        assert details["status"] == "success"
+        assert details["currency"] == "¥"
+        assert details["outputs"][0]["content"] == "summary text"
+        assert (await db.get_recent_runs())[0]["id"] == run_id
+        assert (await db.get_stats())["total_runs"] == 1
+        assert [r["id"] for r in await db.search_by_title("Title")] == [run_id]
+
+
+@pytest.mark.asyncio
+async def test_create_run_records_prompt_version(repo):
+    async with AsyncRunRepository(repo) as db:
+        input_id = await db.get_or_create_input("paper", "/p.pdf", "Title", "content", source_hash="abc")
+        run_id = await db.create_run("brief", "model", [input_id], prompt_version="v1")
+        await db.update_run_status(run_id, "success")
+
+    # Batches skip the file only for the same prompt version
+    assert repo.find_done_sources(["abc"], "brief", "model", "v1") == {"abc"}
+    assert repo.find_done_sources(["abc"], "brief", "model", "v2") == set()
+
+
+@pytest.mark.asyncio
+async def test_calls_run_on_dedicated_db_threads(repo):
+    calls = []
+    _record_threads(repo, calls, "create_run", "get_recent_runs")
+
+    async with AsyncRunRepository(repo) as db:
+        await db.create_run("brief", "model", [])
+        await db.get_recent_runs()
+
+    assert calls == [
+        ("create_run", "editor-assistant-db-writer"),
+        ("get_recent_runs", "editor-assistant-db-reader_0"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_read_does_not_block_the_loop(repo):
+    repo.get_stats = lambda days=7: time.sleep(0.3) or {}
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async with AsyncRunRepository(repo) as db:
+        task = asyncio.create_task(ticker())
+        await db.get_stats()
+        task.cancel()
+
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_failed_write_raises_to_caller(repo):
+    async with AsyncRunRepository(repo) as db:
+        # Unknown input id violates the run_inputs foreign key
+        with pytest.raises(Exception):
+            await db.create_run("brief", "model", [999])
+        assert await db.get_recent_runs() == []
+
+
+@pytest.mark.asyncio
+async def test_md_processor_records_runs_through_db_threads(repo):
+    calls = []
+    _record_threads(repo, calls, "create_run", "add_output", "add_token_usage", "update_run_status")
+    client = MagicMock()
+    client.generate_response = AsyncMock(return_value=("Summary", {
+        "total_input_tokens": 10, "total_output_tokens": 20,
+        "cost": {"input_cost": 0.1, "output_cost": 0.2}, "process_times": {"total_time": 1.0},
+    }))
+    client.context_window = 100000
+    client.max_tokens = 1000
+    client.pricing_currency = "$"
+
+    with patch("editor_assistant.md_processor.LLMClient", return_value=client), \
+         patch("editor_assistant.md_processor.RunRepository", return_value=repo):
+        from editor_assistant.md_processor import MDProcessor
+        processor = MDProcessor("test-model", stream=False)
+        article = MDArticle(type=InputType.PAPER, content="Test content " * 500,
+                            title="Title", source_path="test.pdf")
+        success, run_id = await processor.process_mds([article], "brief", output_to_console=False)
+        await processor.aclose()
+
+    assert success
+    assert repo.get_run_details(run_id)["status"] == "success"
+    assert {thread for _, thread in calls} == {"editor-assistant-db-writer"}
+    assert [name for name, _ in calls] == ["create_run", "add_output", "add_token_usage", "update_run_status"]
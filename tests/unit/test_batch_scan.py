@@ -0,0 +1,142 @@
+"""
+Unit tests for incremental batches: file scanning (scanning.py), the file
+hash index (storage/file_index.py) and skipping done or duplicate files.
+"""
+
+import os
+
+import pytest
+
+from editor_assistant.cli import _select_new_files
+from editor_assistant.scanning import scan_files
+from editor_assistant.storage import FileIndex
+from editor_assistant.tasks import TaskRegistry
+from editor_assistant.utils import hash_file
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def library(temp_dir):
+    root = temp_dir / "library"
+    for rel_path, content in {
+        "a.pdf": "alpha",
+        "b.md": "beta",
+        "sub/c.pdf": "gamma",
+        "sub/deep/d.pdf": "delta",
+        "drafts/e.pdf": "epsilon",
+        "copy-of-a.pdf": "alpha",
+    }.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+def _names(files, root):
+    return [f.relative_to(root).as_posix() for f in files]
+
+
+# =============================================================================
+# Scanning
+# =============================================================================
+
+def test_scan_top_level_and_recursive(library):
+    assert _names(scan_files(library, ["*.pdf"]), library) == ["a.pdf", "copy-of-a.pdf"]
+    assert _names(scan_files(library, ["*.pdf"], recursive=True), library) == [
+        "a.pdf", "copy-of-a.pdf", "drafts/e.pdf", "sub/c.pdf", "sub/deep/d.pdf"
+    ]
+
+
+def test_scan_include_exclude(library):
+    files = scan_files(library, ["*.pdf", "*.md"], ["drafts", "copy-*"], recursive=True)
+    assert _names(files, library) == ["a.pdf", "b.md", "sub/c.pdf", "sub/deep/d.pdf"]
+    # Globs with a slash match the relative path
+    assert _names(scan_files(library, ["sub/*"], recursive=True), library) == ["sub/c.pdf", "sub/deep/d.pdf"]
+    assert _names(scan_files(library, ["*.pdf"], ["sub/deep/*"], recursive=True), library) == [
+        "a.pdf", "copy-of-a.pdf", "drafts/e.pdf", "sub/c.pdf"
+    ]
+
+
+# =============================================================================
+# File index
+# =============================================================================
+
+def test_file_index_rehashes_only_changed_files(repo, library):
+    files = scan_files(library, ["*.pdf"], recursive=True)
+    # Indexed well after the files were written
+    past = os.stat(files[0]).st_mtime - 10
+    for f in files:
+        os.utime(f, (past, past))
+
+    first = FileIndex(repo)
+    hashes = first.hashes(files)
+    assert hashes == {f: hash_file(str(f)) for f in files}
+    assert (first.hashed, first.cached) == (5, 0)
+
+    changed = library / "sub" / "c.pdf"
+    changed.write_text("gamma, revised")
+    os.utime(changed, (past, past))
+    second = FileIndex(repo)
+    rehashed = second.hashes(files)
+    assert (second.hashed, second.cached) == (1, 4)
+    assert rehashed[changed] == hash_file(str(changed)) != hashes[changed]
+
+
+def test_file_index_does_not_trust_racy_entries(repo, library):
+    f = library / "a.pdf"
+    index = FileIndex(repo)
+    index.hashes([f])
+    # Modified after indexing without changing size or mtime
+    stat = f.stat()
+    f.write_text("ALPHA")
+    future = stat.st_mtime + 60
+    os.utime(f, (future, future))
+    repo._conn().execute("UPDATE file_index SET mtime_ns = ?", (f.stat().st_mtime_ns,))
+    repo._conn().commit()
+
+    assert index.hashes([f])[f] == hash_file(str(f))
+
+
+# =============================================================================
+# Done and duplicate files
+# =============================================================================
+
+def _record_run(repo, path, task="outline", model="m1", prompt_version=None, status="success"):
+    input_id = repo.get_or_create_input("paper", str(path), path.stem, f"article {path.read_text()}",
+                                        source_hash=hash_file(str(path)))
+    run_id = repo.create_run(task, model, [input_id], prompt_version=prompt_version)
+    repo.update_run_status(run_id, status)
+    return run_id
+
+
+def test_find_done_sources_matches_task_model_and_prompt(repo, library):
+    a, c = library / "a.pdf", library / "sub" / "c.pdf"
+    _record_run(repo, a, prompt_version="v1")
+    _record_run(repo, c, prompt_version="v1", status="failed")
+    hashes = [hash_file(str(a)), hash_file(str(c))]
+
+    assert repo.find_done_sources(hashes, "outline", "m1", "v1") == {hash_file(str(a))}
+    assert repo.find_done_sources(hashes, "outline", "m1", "v2") == set()
+    assert repo.find_done_sources(hashes, "outline", "m2", "v1") == set()
+    assert repo.find_done_sources(hashes, "brief", "m1", "v1") == set()
+
+
+def test_select_new_files_skips_done_and_duplicates(repo, library, capsys):
+    files = scan_files(library, ["*.pdf"], recursive=True)
+    version = TaskRegistry.get("outline")().prompt_version()
+    _record_run(repo, library / "sub" / "c.pdf", prompt_version=version)
+
+    selected = _select_new_files(files, "outline", "m1", repository=repo)
+
+    assert _names([f for f, _ in selected], library) == ["a.pdf", "drafts/e.pdf", "sub/deep/d.pdf"]
+    assert all(file_hash == hash_file(str(f)) for f, file_hash in selected)
+    assert "1 duplicate skipped" in capsys.readouterr().out
+    forced = _select_new_files(files, "outline", "m1", force=True, repository=repo)
+    assert len(forced) == 4
+
+
+def test_prompt_versions_identify_templates():
+    versions = {name: TaskRegistry.get(name)().prompt_version() for name in ("brief", "outline", "translate")}
+    assert len(set(versions.values())) == 3
+    assert all(len(v) == 12 for v in versions.values())
@@ -0,0 +1,217 @@
+"""
+Unit tests for the token/cost budget (budget.py) and its use in MDProcessor,
+EditorAssistant.process_multiple and the queue worker.
+"""
+
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+
+from editor_assistant.budget import Budget, BudgetExceededError
+from editor_assistant.cli import _budget_remaining
+from editor_assistant.data_models import Input, InputType, MDArticle, ProcessResult
+from editor_assistant.storage import AsyncRunRepository, JobQueue, RunRepository
+from editor_assistant.worker import Worker
+
+pytestmark = pytest.mark.unit
+
+
+# =============================================================================
+# Reservations
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_reservations_settle_against_actual_usage():
+    budget = Budget(max_cost=1.0, max_tokens=10_000)
+
+    first = await budget.reserve(6_000, 0.5)
+    assert (budget.reserved_tokens, budget.reserved_cost) == (6_000, 0.5)
+    budget.settle(first, tokens=2_000, cost=0.1)
+    second = await budget.reserve(6_000, 0.5)
+    budget.settle(second, tokens=5_000, cost=0.3)
+
+    assert budget.remaining() == {"cost": pytest.approx(0.6), "tokens": 3_000}
+    assert (budget.reserved_tokens, budget.in_flight, budget.settled) == (0, 0, 2)
+    assert _budget_remaining(budget, "$") == "$0.6000 of $1.0000; 3,000 of 10,000 tokens"
+
+
+@pytest.mark.asyncio
+async def test_request_waits_for_in_flight_then_budget_is_exhausted():
+    budget = Budget(max_tokens=10_000)
+    in_flight = await budget.reserve(8_000, 0.0)
+
+    # Does not fit while the first request holds its reservation
+    waiting = asyncio.create_task(budget.reserve(4_000, 0.0))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    # Actual usage was smaller: the waiting request is admitted
+    budget.settle(in_flight, tokens=3_000)
+    admitted = await asyncio.wait_for(waiting, timeout=1)
+    budget.settle(admitted, tokens=4_000)
+
+    # Nothing in flight and no room left: refused, and so is everything after
+    with pytest.raises(BudgetExceededError, match="7,000 of 10,000 tokens"):
+        await budget.reserve(4_000, 0.0)
+    with pytest.raises(BudgetExceededError):
+        await budget.reserve(100, 0.0)
+    assert budget.exhausted and budget.refused == 2
+    assert "exhausted" in _budget_remaining(budget)
+
+
+def test_unlimited_and_invalid_budgets():
+    assert Budget().remaining() == {"cost": None, "tokens": None}
+    with pytest.raises(ValueError):
+        Budget(max_cost=-1)
+
+
+# =============================================================================
+# MDProcessor
+# =============================================================================
+
+@pytest.fixture
+def processor():
+    with patch("editor_assistant.md_processor.LLMClient") as MockClient, \
+         patch("editor_assistant.md_processor.RunRepository"), \
+         patch("editor_assistant.md_processor.TaskRegistry") as MockRegistry:
+        client = MockClient.return_value
+        client.generate_response = AsyncMock(return_value=(
+            "Response",
+            {"total_input_tokens": 400, "total_output_tokens": 100,
+             "cost": {"input_cost": 0.004, "output_cost": 0.002, "total_cost": 0.006},
+             "process_times": {"total_time": 0.1}}
+        ))
+        client.estimate_cost.side_effect = lambda input_tokens, output_tokens: (input_tokens + 2 * output_tokens) / 100_000
+        client.model_name = "test-model"
+        client.context_window = 100_000
+        client.max_tokens = 1_000
+
+        task = MagicMock()
+        task.validate.return_value = (True, "")
+        task.build_prompt_with_estimate.return_value = ("prompt", 500)
+        task.expected_output_tokens.return_value = 5_000  # Capped at max_tokens
+        task.post_process.return_value = {"main": "Response"}
+        task.get_output_suffix.return_value = "_brief"
+        task.supports_multi_input = False
+        MockRegistry.get.return_value.return_value = task
+
+        from editor_assistant.md_processor import MDProcessor
+        processor = MDProcessor("test-model", stream=False)
+        processor._update_run_status = AsyncMock()
+        processor._save_output_to_db = AsyncMock()
+        processor._save_token_usage_to_db = AsyncMock()
+        yield processor
+
+
+_ARTICLE = MDArticle(type=InputType.PAPER, content="text " * 500, title="Paper", source_path="paper.pdf")
+
+
+@pytest.mark.asyncio
+async def test_process_mds_reserves_estimate_and_settles_usage(processor):
+    processor.budget = budget = Budget(max_cost=1.0, max_tokens=1_600)
+    reserved = []
+    reserve = budget.reserve
+
+    async def spy(tokens, cost):
+        reserved.append((tokens, cost))
+        return await reserve(tokens, cost)
+
+    budget.reserve = spy
+    success, _ = await processor.process_mds([_ARTICLE], "brief", output_to_console=False, validated=True, run_id=1)
+
+    assert success
+    # Prompt estimate plus expected output capped at max_tokens, priced by the client
+    assert reserved == [(1_500, pytest.approx(0.025))]
+    assert (budget.spent_tokens, budget.spent_cost, budget.reserved_tokens) == (500, pytest.approx(0.006), 0)
+
+
+@pytest.mark.asyncio
+async def test_process_mds_refused_by_budget_is_not_sent(processor):
+    processor.budget = Budget(max_tokens=1_000)
+
+    with pytest.raises(BudgetExceededError):
+        await processor.process_mds([_ARTICLE], "brief", output_to_console=False, validated=True, run_id=7)
+
+    processor.llm_client.generate_response.assert_not_called()
+    processor._update_run_status.assert_awaited_once()
+    assert processor._update_run_status.call_args.args[:2] == (7, "aborted")
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_its_reservation(processor):
+    processor.budget = budget = Budget(max_tokens=2_000)
+    processor.llm_client.generate_response.side_effect = RuntimeError("HTTP 500")
+
+    success, _ = await processor.process_mds([_ARTICLE], "brief", output_to_console=False, validated=True, run_id=1)
+
+    assert not success
+    assert (budget.spent_tokens, budget.reserved_tokens, budget.in_flight) == (0, 0, 0)
+
+
+# =============================================================================
+# Batch pipeline and worker
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_process_multiple_stops_admitting_when_exhausted():
+    from editor_assistant.main import EditorAssistant
+
+    good = MDArticle(type=InputType.PAPER, content="text " * 500, title="good", source_path="a.pdf")
+    budget = Budget(max_cost=1.0)
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor") as MockProcessor:
+        MockConverter.return_value.convert_content.return_value = good
+        MockProcessor.return_value.process_mds = AsyncMock(side_effect=BudgetExceededError("Budget exhausted"))
+        MockProcessor.return_value.register_run = AsyncMock(return_value=3)
+        MockProcessor.return_value.validate_articles.return_value = True
+
+        assistant = EditorAssistant("test-model", stream=False, use_conversion_cache=False, budget=budget)
+        inputs = [Input(type=InputType.PAPER, path="a.pdf"), Input(type=InputType.PAPER, path="b.pdf")]
+        refused = await assistant.process_multiple(inputs[:1], "brief")
+        # Once exhausted, inputs are not even converted
+        budget.exhausted = True
+        MockConverter.return_value.convert_content.reset_mock()
+        skipped = await assistant.process_multiple(inputs, "brief")
+
+    assert MockProcessor.call_args.kwargs["budget"] is budget
+    assert refused[0].budget_exhausted and refused[0].error == "Budget exhausted"
+    assert all(r.budget_exhausted and not r.success for r in skipped)
+    MockConverter.return_value.convert_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_releases_jobs_it_cannot_afford(temp_dir):
+    repo = RunRepository(db_path=temp_dir / "test.db")
+    queue = JobQueue(repo)
+    job_ids = [queue.enqueue("paper", f"/p{i}.pdf", "brief", "m1") for i in range(4)]
+    budget = Budget(max_tokens=250)
+
+    class BudgetedAssistant:
+        def __init__(self, model, **kwargs):
+            self.budget = kwargs["budget"]
+            self.db = kwargs["db"]
+
+        async def process_multiple(self, inputs, task, **kwargs):
+            path = inputs[0].path
+            try:
+                reservation = await self.budget.reserve(100, 0.0)
+            except BudgetExceededError as e:
+                return [ProcessResult(source_path=path, error=str(e), budget_exhausted=True)]
+            self.budget.settle(reservation, tokens=100)
+            input_id = await self.db.get_or_create_input("paper", path, path, path)
+            run_id = await self.db.create_run(task, "m1", [input_id])
+            return [ProcessResult(source_path=path, success=True, run_id=run_id)]
+
+        async def aclose(self):
+            pass
+
+    async with AsyncRunRepository(repo) as db:
+        worker = Worker(db, BudgetedAssistant, worker_id="w1", poll_interval=0.01, budget=budget)
+        stats = await asyncio.wait_for(worker.run(), timeout=5)
+
+    assert (stats["done"], stats["deferred"]) == (2, 1)
+    assert queue.counts()["done"] == 2 and queue.counts()["queued"] == 2
+    # The released job did not use up an attempt
+    assert {job["id"]: job["attempts"] for job in queue.list_jobs("queued")} == {job_ids[2]: 0, job_ids[3]: 0}
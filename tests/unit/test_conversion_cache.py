@@ -0,0 +1,150 @@
+"""
+Unit tests for the content-addressed conversion cache (src/editor_assistant/conversion_cache.py).
+
+What we check:
+- Cache entries round-trip the conversion result (markdown + metadata)
+- The key depends on file bytes and converter version (not on the path)
+- EditorAssistant skips conversion on a hit and coalesces concurrent
+  conversions of identical files within one batch
+"""
+
+import asyncio
+import uuid
+from pathlib import Path
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+from editor_assistant.conversion_cache import ConversionCache
+from editor_assistant.data_models import MDArticle, InputType, Input
+from editor_assistant.utils import hash_file
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def cache(tmp_path) -> ConversionCache:
+    return ConversionCache(cache_dir=tmp_path / "cache", converter_version="test")
+
+
+@pytest.fixture
+def pdf_file(tmp_path) -> Path:
+    path = tmp_path / "paper.pdf"
+    # Unique bytes so tests never share entries in the session-wide data dir
+    path.write_bytes(f"%PDF-fake {uuid.uuid4()}".encode())
+    return path
+
+
+def _article(path: Path) -> MDArticle:
+    return MDArticle(
+        type=InputType.PAPER,
+        content="converted " * 200,
+        title="Paper Title",
+        authors="A. Author",
+        converter="MarkItDown",
+        source_path=str(path),
+    )
+
+
+def test_hash_file_depends_on_bytes_only(tmp_path):
+    a = tmp_path / "a.pdf"
+    b = tmp_path / "b.pdf"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    assert hash_file(str(a)) == hash_file(str(b))
+
+    b.write_bytes(b"different")
+    assert hash_file(str(a)) != hash_file(str(b))
+
+
+def test_put_get_roundtrip(cache, pdf_file):
+    key = cache.make_key(hash_file(str(pdf_file)))
+    assert cache.get(key, InputType.PAPER, str(pdf_file)) is None
+
+    cache.put(key, _article(pdf_file))
+    hit = cache.get(key, InputType.NEWS, str(pdf_file))
+
+    assert hit is not None
+    assert hit.content == "converted " * 200
+    assert hit.title == "Paper Title"
+    assert hit.authors == "A. Author"
+    assert hit.converter == "MarkItDown"
+    # Type and source come from the caller, not from the cached entry
+    assert hit.type == InputType.NEWS
+    assert hit.output_path == pdf_file
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_converter_version_invalidates(tmp_path, pdf_file):
+    file_hash = hash_file(str(pdf_file))
+    old = ConversionCache(cache_dir=tmp_path / "cache", converter_version="v1")
+    old.put(old.make_key(file_hash), _article(pdf_file))
+
+    new = ConversionCache(cache_dir=tmp_path / "cache", converter_version="v2")
+    assert new.get(new.make_key(file_hash), InputType.PAPER, str(pdf_file)) is None
+
+
+def test_corrupt_entry_is_a_miss(cache, pdf_file):
+    key = cache.make_key(hash_file(str(pdf_file)))
+    entry = cache._entry_path(key)
+    entry.parent.mkdir(parents=True)
+    entry.write_bytes(b"not gzip")
+    assert cache.get(key, InputType.PAPER, str(pdf_file)) is None
+
+
+def test_urls_and_missing_files_not_cacheable(cache, pdf_file):
+    assert cache.is_cacheable(str(pdf_file))
+    assert not cache.is_cacheable("https://example.com/paper.pdf")
+    assert not cache.is_cacheable("/does/not/exist.pdf")
+
+
+@pytest.mark.asyncio
+async def test_editor_assistant_skips_conversion_on_hit(pdf_file):
+    from editor_assistant.main import EditorAssistant
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor") as MockProcessor:
+        MockConverter.return_value.convert_content.return_value = _article(pdf_file)
+        MockProcessor.return_value.process_mds = AsyncMock(return_value=(True, 1))
+
+        first = EditorAssistant("test-model", stream=False)
+        article, err = await first._process_input_to_article(Input(type=InputType.PAPER, path=str(pdf_file)))
+        assert err is None and article is not None
+
+        second = EditorAssistant("test-model", stream=False)
+        article, err = await second._process_input_to_article(Input(type=InputType.PAPER, path=str(pdf_file)))
+
+        assert err is None
+        assert article.title == "Paper Title"
+        assert MockConverter.return_value.convert_content.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_editor_assistant_coalesces_identical_files(tmp_path):
+    from editor_assistant.main import EditorAssistant
+
+    payload = f"%PDF-fake {uuid.uuid4()}".encode()
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"copy{i}.pdf"
+        path.write_bytes(payload)
+        paths.append(path)
+
+    def slow_convert(path, type=InputType.PAPER):
+        import time
+        time.sleep(0.2)  # keep the first conversion in flight
+        return _article(Path(path))
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor"):
+        MockConverter.return_value.convert_content.side_effect = slow_convert
+
+        assistant = EditorAssistant("test-model", stream=False)
+        results = await asyncio.gather(*[
+            assistant._process_input_to_article(Input(type=InputType.PAPER, path=str(p)))
+            for p in paths
+        ])
+
+    assert MockConverter.return_value.convert_content.call_count == 1
+    assert [article.source_path for article, _ in results] == [str(p) for p in paths]
+    assert not assistant._inflight_conversions
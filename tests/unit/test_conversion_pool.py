@@ -0,0 +1,173 @@
+"""
+Unit tests for the process-pool conversion backend (src/editor_assistant/conversion_pool.py).
+
+The pool runs a picklable module-level job function in worker processes.
+Instead of real PDF conversion (slow, needs MarkItDown), these tests use the
+small job functions below to exercise the pool mechanics:
+parallelism, per-task timeouts, crash recovery and RSS-based recycling.
+"""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from editor_assistant.conversion_pool import (
+    ConversionPool,
+    ConversionTimeoutError,
+    ConversionWorkerError,
+)
+from editor_assistant.data_models import InputType
+
+pytestmark = pytest.mark.unit
+
+
+# Job functions must live at module level so worker processes can unpickle them.
+
+def echo_job(value):
+    return value
+
+
+def pid_job(_):
+    return os.getpid()
+
+
+def sleep_job(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def crash_job(_):
+    os._exit(3)
+
+
+def raise_job(_):
+    raise ValueError("bad document")
+
+
+def article_job(path, type_value):
+    return {"type": type_value, "content": f"converted {path}", "title": "T", "source_path": path}
+
+
+def _pool(job_fn, **kwargs) -> ConversionPool:
+    kwargs.setdefault("workers", 1)
+    kwargs.setdefault("task_timeout", 10)
+    return ConversionPool(job_fn=job_fn, preload=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_result():
+    async with _pool(echo_job) as pool:
+        assert await pool.submit({"a": 1}) == {"a": 1}
+        assert pool.get_stats()["tasks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_convert_builds_article():
+    async with _pool(article_job) as pool:
+        article = await pool.convert("paper.pdf", InputType.NEWS)
+    assert article.content == "converted paper.pdf"
+    assert article.type == InputType.NEWS
+
+
+@pytest.mark.asyncio
+async def test_tasks_run_in_parallel_processes():
+    async with _pool(sleep_job, workers=3) as pool:
+        # Let the spawned workers finish booting before timing
+        await asyncio.gather(*[pool.submit(0) for _ in range(3)])
+        start = time.perf_counter()
+        await asyncio.gather(*[pool.submit(1.0) for _ in range(3)])
+        elapsed = time.perf_counter() - start
+    # Serial execution would take 3s
+    assert elapsed < 2.5
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_worker_and_pool_recovers():
+    async with _pool(sleep_job, task_timeout=0.5) as pool:
+        with pytest.raises(ConversionTimeoutError):
+            await pool.submit(30)
+        # Replacement worker serves the next task
+        assert await pool.submit(0) == 0
+        assert pool.get_stats()["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_crash_is_reported_and_worker_replaced():
+    async with _pool(crash_job) as pool:
+        with pytest.raises(ConversionWorkerError):
+            await pool.submit(None)
+        # The replacement worker is spawned in the background after the crash,
+        # so it picks up the job function set here.
+        pool.job_fn = echo_job
+        assert await pool.submit("ok") == "ok"
+        assert pool.get_stats()["crashes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_exception_keeps_worker():
+    async with _pool(raise_job) as pool:
+        with pytest.raises(ConversionWorkerError, match="bad document"):
+            await pool.submit(None)
+        assert pool.get_stats()["failures"] == 1
+        assert pool.get_stats()["recycled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_recycled_above_rss_limit():
+    # Any real process exceeds 1 MB RSS, so every task triggers recycling
+    async with _pool(pid_job, max_rss_mb=1) as pool:
+        first_pid = await pool.submit(None)
+        second_pid = await pool.submit(None)
+    assert first_pid != second_pid
+    assert pool.get_stats()["recycled"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_worker_recycled_after_max_tasks():
+    async with _pool(pid_job, max_rss_mb=0, max_tasks_per_worker=2) as pool:
+        pids = [await pool.submit(None) for _ in range(3)]
+    assert pids[0] == pids[1]
+    assert pids[2] != pids[0]
+
+
+@pytest.mark.asyncio
+async def test_large_reply_is_received():
+    async with _pool(echo_job) as pool:
+        payload = "x" * (8 * 1024 * 1024)
+        assert await pool.submit(payload) == payload
+
+
+@pytest.mark.asyncio
+async def test_failed_respawn_fails_waiting_and_later_tasks():
+    def broken_spawn():
+        raise OSError("Resource temporarily unavailable")
+
+    with patch("editor_assistant.conversion_pool.CONVERSION_WORKER_SPAWN_RETRY_SECONDS", 0):
+        async with _pool(crash_job) as pool:
+            with pytest.raises(ConversionWorkerError, match="died"):
+                await pool.submit(None)
+            # The replacement is spawned in the background, with this spawner
+            pool._spawn_worker = broken_spawn
+            waiting = asyncio.create_task(pool.submit(None))
+            with pytest.raises(ConversionWorkerError, match="Could not start a conversion worker"):
+                await asyncio.wait_for(waiting, timeout=5)
+            with pytest.raises(ConversionWorkerError, match="Could not start"):
+                await pool.submit(None)
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_waiting_tasks():
+    pool = _pool(sleep_job)
+    await pool.start()
+    busy = asyncio.create_task(pool.submit(0.5))
+    await asyncio.sleep(0.1)
+    waiting = asyncio.create_task(pool.submit(0))
+    await asyncio.sleep(0.1)
+
+    await pool.close()
+    with pytest.raises(ConversionWorkerError, match="closed"):
+        await asyncio.wait_for(waiting, timeout=5)
+    await asyncio.gather(busy, return_exceptions=True)
@@ -0,0 +1,80 @@
+"""
+Unit tests for the daily_stats rollups behind RunRepository.get_stats().
+"""
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _rollups(repo):
+    rows = repo._conn().execute("""
+        SELECT model, task, status, runs, input_tokens, output_tokens, cost, process_time
+        FROM daily_stats ORDER BY model, task, status
+    """).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _finished_run(repo, task="brief", model="model-a", status="success", tokens=(100, 50)):
+    run_id = repo.create_run(task, model, [])
+    repo.add_token_usage(run_id, tokens[0], tokens[1], 0.25, 0.5, 2.0)
+    repo.update_run_status(run_id, status)
+    return run_id
+
+
+def test_rollup_follows_run_lifecycle(repo):
+    run_id = repo.create_run("brief", "model-a", [])
+    assert _rollups(repo) == [("model-a", "brief", "pending", 1, 0, 0, 0.0, 0.0)]
+
+    # Usage lands in the run's current bucket and moves with its status
+    repo.add_token_usage(run_id, 100, 50, 0.25, 0.5, 2.0)
+    repo.update_run_status(run_id, "success")
+
+    assert _rollups(repo) == [("model-a", "brief", "success", 1, 100, 50, 0.75, 2.0)]
+
+
+def test_get_stats_reads_rollups(repo):
+    _finished_run(repo)
+    _finished_run(repo, task="outline")
+    _finished_run(repo, model="model-b", status="failed", tokens=(10, 0))
+
+    stats = repo.get_stats()
+
+    assert stats["total_runs"] == 3
+    assert stats["by_status"] == {"success": 2, "failed": 1}
+    assert stats["success_rate"] == pytest.approx(2 / 3)
+    assert stats["by_model"][0] == {"model": "model-a", "runs": 2, "total_cost": 1.5, "total_tokens": 300}
+    assert {row["task"]: row["runs"] for row in stats["by_task"]} == {"brief": 2, "outline": 1}
+
+
+def test_window_is_calendar_days(repo):
+    old = _finished_run(repo)
+    _finished_run(repo)
+    with repo.transaction() as conn:
+        conn.execute("UPDATE runs SET timestamp = datetime('now', '-3 days') WHERE id = ?", (old,))
+
+    assert repo.get_stats(days=3)["total_runs"] == 1
+    assert repo.get_stats(days=4)["total_runs"] == 2
+
+
+def test_deleted_run_leaves_rollups(repo):
+    run_id = _finished_run(repo)
+    _finished_run(repo, model="model-b")
+    with repo.transaction() as conn:
+        conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    assert _rollups(repo) == [("model-b", "brief", "success", 1, 100, 50, 0.75, 2.0)]
+
+
+def test_rebuild_matches_incremental(repo):
+    for n in range(6):
+        _finished_run(repo, model=f"model-{n % 2}", status="success" if n % 3 else "failed")
+    repo.create_run("translate", "model-0", [])
+    incremental = _rollups(repo)
+
+    with repo.transaction() as conn:
+        conn.execute("DELETE FROM daily_stats")
+    assert repo.get_stats()["total_runs"] == 0
+
+    assert repo.rebuild_stats() == len(incremental)
+    assert _rollups(repo) == incremental
@@ -0,0 +1,101 @@
+"""
+Unit tests for the group-committing DB writer (src/editor_assistant/storage/writer.py).
+"""
+
+import threading
+
+import pytest
+
+from editor_assistant.storage import DBWriter
+
+pytestmark = pytest.mark.unit
+
+
+def _run_count(repo) -> int:
+    conn = repo._get_conn()
+    count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_queued_writes_are_group_committed(repo):
+    writer = DBWriter(repo, batch_size=50, flush_interval=0.2)
+    futures = [writer.submit(repo.create_run, "brief", "model", []) for _ in range(20)]
+
+    run_ids = [f.result(timeout=5) for f in futures]
+    writer.close()
+
+    assert len(set(run_ids)) == 20
+    assert _run_count(repo) == 20
+    assert writer.stats["writes"] == 20
+    assert writer.stats["commits"] < 20
+
+
+def test_failing_write_does_not_affect_its_batch(repo):
+    writer = DBWriter(repo, flush_interval=0.2)
+    ok = writer.submit(repo.create_run, "brief", "model", [])
+    # Unknown input id violates the run_inputs foreign key
+    bad = writer.submit(repo.create_run, "brief", "model", [999])
+    also_ok = writer.submit(repo.create_run, "brief", "model", [])
+
+    assert ok.result(timeout=5) > 0
+    with pytest.raises(Exception):
+        bad.result(timeout=5)
+    assert also_ok.result(timeout=5) > 0
+    writer.close()
+
+    # The failed run's INSERT INTO runs was rolled back with its savepoint
+    assert _run_count(repo) == 2
+    assert writer.stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_awaits_committed_result(repo):
+    writer = DBWriter(repo)
+    input_id = await writer.run(repo.get_or_create_input, "paper", "/p.pdf", "Title", "content")
+    run_id = await writer.run(repo.create_run, "brief", "model", [input_id])
+    writer.close()
+
+    # Visible to a separate connection, so it was committed
+    assert repo.get_run_details(run_id)["inputs"][0]["id"] == input_id
+
+
+def test_idle_thread_exits_and_restarts(repo):
+    writer = DBWriter(repo, idle_timeout=0.05)
+    writer.submit(repo.create_run, "brief", "model", []).result(timeout=5)
+    thread = writer._thread
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+    writer.submit(repo.create_run, "brief", "model", []).result(timeout=5)
+    writer.close()
+    assert _run_count(repo) == 2
+
+
+def test_close_commits_pending_writes_and_rejects_new_ones(repo):
+    writer = DBWriter(repo, flush_interval=0.5)
+    futures = [writer.submit(repo.create_run, "brief", "model", []) for _ in range(5)]
+    writer.close()
+
+    assert all(f.done() for f in futures)
+    assert _run_count(repo) == 5
+    with pytest.raises(RuntimeError):
+        writer.submit(repo.create_run, "brief", "model", [])
+
+
+def test_get_or_create_input_upsert_is_race_free(repo):
+    ids = []
+    lock = threading.Lock()
+
+    def create():
+        input_id = repo.get_or_create_input("paper", "/p.pdf", "Title", "same content")
+        with lock:
+            ids.append(input_id)
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(ids)) == 1
@@ -0,0 +1,132 @@
+"""
+Unit tests for the streaming history exporter (src/editor_assistant/storage/export.py).
+"""
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from editor_assistant.storage.export import (
+    detect_format,
+    export_history,
+    parse_since,
+    parse_until,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def repo(repo):
+    paper = repo.get_or_create_input("paper", "/paper.pdf", "Paper", "paper content")
+    news = repo.get_or_create_input("news", "/news.md", "News", "news content")
+    for i in range(7):
+        run_id = repo.create_run("brief", f"model-{i}", [paper, news] if i % 2 else [paper])
+        repo.add_output(run_id, "main", f"output {i}")
+        repo.add_output(run_id, "bilingual", f"bilingual {i}")
+        repo.add_token_usage(run_id, 100 + i, 10, 0.1, 0.2, 1.0)
+        repo.update_run_status(run_id, "success")
+    return repo
+
+
+def _set_timestamps(repo, timestamps):
+    conn = repo._get_conn()
+    for run_id, ts in timestamps.items():
+        conn.execute("UPDATE runs SET timestamp = ? WHERE id = ?", (ts, run_id))
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("history.json", ("json", None)),
+    ("history.csv", ("csv", None)),
+    ("history.jsonl", ("jsonl", None)),
+    ("history.jsonl.gz", ("jsonl", "gzip")),
+    ("history.csv.zst", ("csv", "zstd")),
+    ("history", ("json", None)),
+])
+def test_detect_format(name, expected):
+    assert detect_format(name) == expected
+
+
+def test_chunked_jsonl_matches_per_run_details(repo, temp_dir):
+    output = temp_dir / "runs.jsonl"
+    seen = []
+
+    total = export_history(repo.db_path, output, chunk_size=3, progress_callback=seen.append)
+
+    lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert total == len(lines) == 7
+    assert seen == [3, 6, 7]
+    assert [run["id"] for run in lines] == list(range(7, 0, -1))
+
+    for run in lines:
+        details = repo.get_run_details(run["id"])
+        assert [i["id"] for i in run["inputs"]] == [i["id"] for i in details["inputs"]]
+        assert [o["content"] for o in run["outputs"]] == [o["content"] for o in details["outputs"]]
+        assert run["token_usage"]["input_tokens"] == details["token_usage"]["input_tokens"]
+
+
+def test_streamed_json_document_is_valid(repo, temp_dir):
+    output = temp_dir / "runs.json"
+    export_history(repo.db_path, output, limit=5, chunk_size=2)
+
+    data = json.loads(output.read_text(encoding="utf-8"))
+    assert data["total_runs"] == 5
+    assert [run["id"] for run in data["runs"]] == [7, 6, 5, 4, 3]
+
+
+def test_gzip_csv(repo, temp_dir):
+    output = temp_dir / "runs.csv.gz"
+    export_history(repo.db_path, output)
+
+    with gzip.open(output, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 7
+    assert [row["input_titles"] for row in rows[:2]] == ["Paper", "Paper, News"]
+    assert float(rows[0]["total_cost"]) == pytest.approx(0.3)
+
+
+def test_zstd_output_or_clear_error(repo, temp_dir):
+    output = temp_dir / "runs.jsonl.zst"
+    try:
+        import zstandard
+    except ImportError:
+        with pytest.raises(ValueError, match="zstandard"):
+            export_history(repo.db_path, output)
+        return
+
+    export_history(repo.db_path, output)
+    with zstandard.open(output, "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 7
+
+
+def test_since_until_filters(repo, temp_dir):
+    _set_timestamps(repo, {
+        1: "2026-01-01 09:00:00",
+        2: "2026-01-15 12:00:00",
+        3: "2026-01-31 23:59:59",
+        4: "2026-02-01 00:00:00",
+    })
+    output = temp_dir / "filtered.jsonl"
+
+    export_history(repo.db_path, output, since=parse_since("2026-01-15"), until=parse_until("2026-01-31"))
+
+    ids = [json.loads(line)["id"] for line in output.read_text().splitlines()]
+    assert ids == [3, 2]
+
+
+def test_parse_time_bounds():
+    assert parse_since("2026-01-15") == "2026-01-15 00:00:00"
+    assert parse_until("2026-01-15") == "2026-01-16 00:00:00"
+    assert parse_until("2026-01-15T08:30") == "2026-01-15 08:30:00"
+    assert parse_since("2026-01-15T08:30:00+02:00") == "2026-01-15 06:30:00"
+    with pytest.raises(ValueError):
+        parse_since("last week")
+
+
+def test_unsupported_format_raises(repo, temp_dir):
+    with pytest.raises(ValueError):
+        export_history(repo.db_path, temp_dir / "out.xml", format="xml")
@@ -0,0 +1,131 @@
+"""
+Unit tests for per-host fetch politeness (src/editor_assistant/fetch_scheduler.py).
+
+No network access: fetches are simulated inside `scheduler.slot(url)`,
+and robots.txt / HTTP calls are patched.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from editor_assistant.fetch_scheduler import FetchScheduler
+
+pytestmark = pytest.mark.unit
+
+
+def _scheduler(**kwargs) -> FetchScheduler:
+    kwargs.setdefault("min_delay", 0.0)
+    kwargs.setdefault("respect_crawl_delay", False)
+    return FetchScheduler(**kwargs)
+
+
+def _fetch_in_threads(scheduler, urls, duration=0.1):
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def fetch(url):
+        host = url.split("/")[2]
+        with scheduler.slot(url):
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(duration)
+            with lock:
+                active[host] -= 1
+
+    threads = [threading.Thread(target=fetch, args=(url,)) for url in urls]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return peak
+
+
+def test_per_host_concurrency_cap():
+    scheduler = _scheduler(max_per_host=2)
+    urls = [f"https://news.example/{i}" for i in range(6)] + [f"https://other.example/{i}" for i in range(3)]
+
+    peak = _fetch_in_threads(scheduler, urls)
+
+    assert peak["news.example"] == 2
+    assert peak["other.example"] == 2
+
+
+def test_min_delay_spaces_requests_to_same_host():
+    scheduler = _scheduler(max_per_host=4, min_delay=0.1)
+    start = time.monotonic()
+    _fetch_in_threads(scheduler, [f"https://news.example/{i}" for i in range(4)], duration=0)
+    # Starts at 0, 0.1, 0.2, 0.3
+    assert time.monotonic() - start >= 0.3
+
+
+def test_robots_crawl_delay_overrides_smaller_min_delay():
+    scheduler = _scheduler(min_delay=0.0, respect_crawl_delay=True)
+    with patch.object(scheduler, "_fetch_robots", return_value=0.2) as robots:
+        start = time.monotonic()
+        for i in range(3):
+            with scheduler.slot(f"https://slow.example/{i}"):
+                pass
+        elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.4
+    robots.assert_called_once_with("https", "slow.example")
+
+
+def test_stats_record_failures_and_bytes():
+    scheduler = _scheduler()
+    with scheduler.slot("https://a.example/ok") as record:
+        record.bytes = 2048
+    with pytest.raises(ConnectionError):
+        with scheduler.slot("https://a.example/bad"):
+            raise ConnectionError("refused")
+
+    stats = scheduler.get_stats()["a.example"]
+    assert stats["requests"] == 2
+    assert stats["failures"] == 1
+    assert stats["bytes"] == 2048
+    assert stats["max_latency"] >= stats["avg_latency"] >= 0
+
+
+def test_request_counts_http_errors_as_failures():
+    import requests
+
+    response = requests.Response()
+    response.status_code = 429
+    response._content = b"slow down"
+    response.url = "https://a.example/page"
+
+    scheduler = _scheduler()
+    with patch("requests.request", return_value=response) as mock_request:
+        with pytest.raises(requests.HTTPError):
+            scheduler.get("https://a.example/page", headers={"Accept": "text/html"})
+
+    headers = mock_request.call_args.kwargs["headers"]
+    assert headers["Accept"] == "text/html"
+    assert "User-Agent" in headers
+    stats = scheduler.get_stats()["a.example"]
+    assert (stats["requests"], stats["failures"], stats["bytes"]) == (1, 1, 9)
+
+
+def test_markitdown_url_path_goes_through_scheduler(monkeypatch, tmp_path):
+    from editor_assistant.md_converter import MarkdownConverter
+
+    monkeypatch.chdir(tmp_path)
+    converter = MarkdownConverter()
+    converter._markitdown = SimpleNamespace(
+        convert_response=lambda response: SimpleNamespace(markdown="doc", title="Doc"),
+    )
+    monkeypatch.setattr(converter, "_is_url_html", lambda _: False)
+
+    scheduler = _scheduler()
+    with patch("editor_assistant.md_converter.get_fetch_scheduler", return_value=scheduler), \
+         patch.object(scheduler, "get", return_value=object()) as mock_get:
+        article = converter.convert_content("https://files.example/paper.pdf")
+
+    mock_get.assert_called_once_with("https://files.example/paper.pdf")
+    assert article.content == "doc"
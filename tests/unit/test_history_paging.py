@@ -0,0 +1,98 @@
+"""
+Unit tests for keyset-paginated history (RunRepository.get_recent_runs) and
+lazy output loading (get_run_details without content, previews, get_output).
+"""
+
+import zlib
+
+import pytest
+
+from editor_assistant.storage.blobs import CODEC_NONE, CODEC_ZLIB, decode_blob_prefix, preview_stored_bytes
+
+pytestmark = pytest.mark.unit
+
+# Large enough to be zlib-compressed; bilingual outputs mix scripts
+BODY = "双语输出 bilingual output line. " * 2000
+
+
+def _run(repo, n, body=BODY):
+    first = repo.get_or_create_input("paper", f"/p{n}.pdf", f"Paper {n}", f"content {n}")
+    second = repo.get_or_create_input("news", f"/n{n}.html", f"News {n}", f"news {n}")
+    run_id = repo.create_run("brief", "model-a", [first, second])
+    repo.add_output(run_id, "main", body)
+    repo.add_token_usage(run_id, 100 + n, 50, 0.01, 0.02, 1.0)
+    return run_id
+
+
+def test_pages_cover_history_once_newest_first(repo):
+    run_ids = [_run(repo, n, body=f"body {n}") for n in range(7)]
+
+    pages, before_id = [], None
+    while True:
+        page = repo.get_recent_runs(limit=3, before_id=before_id)
+        if not page:
+            break
+        pages.append([run["id"] for run in page])
+        before_id = page[-1]["id"]
+
+    assert pages == [run_ids[6:3:-1], run_ids[3:0:-1], run_ids[:1]]
+
+
+def test_page_rows_have_titles_and_usage(repo):
+    run_id = _run(repo, 1, body="short")
+
+    [run] = repo.get_recent_runs(limit=5)
+
+    assert run["id"] == run_id
+    assert set(run["input_titles"].split(", ")) == {"Paper 1", "News 1"}
+    assert run["input_tokens"] == 101
+    assert run["total_cost"] == pytest.approx(0.03)
+
+
+def test_details_without_content_report_size(repo):
+    run_id = _run(repo, 1)
+
+    details = repo.get_run_details(run_id, include_content=False)
+
+    [output] = details["outputs"]
+    assert "content" not in output and "preview" not in output
+    assert output["size"] == len(BODY.encode("utf-8"))
+    assert output["archived"] is False
+    assert len(details["inputs"]) == 2
+
+
+def test_preview_reads_only_the_start(repo):
+    run_id = _run(repo, 1)
+
+    [output] = repo.get_run_details(run_id, include_content=False, preview_chars=50)["outputs"]
+
+    assert output["preview"] == BODY[:50]
+    assert repo.get_output(output["id"])["content"] == BODY
+
+
+def test_preview_of_inline_and_archived_outputs(repo):
+    run_id = _run(repo, 1)
+    with repo.transaction() as conn:
+        conn.execute(
+            "INSERT INTO outputs (run_id, output_type, content) VALUES (?, 'legacy', 'inline text body')",
+            (run_id,)
+        )
+        conn.execute("UPDATE runs SET timestamp = datetime('now', '-200 days') WHERE id = ?", (run_id,))
+    repo.compact(vacuum=False)
+    repo.gc(keep_days=90)
+
+    outputs = repo.get_run_details(run_id, include_content=False, preview_chars=6)["outputs"]
+
+    assert [o["archived"] for o in outputs] == [True, True]
+    assert [o["preview"] for o in outputs] == [BODY[:6], "inline"]
+    assert outputs[0]["size"] == len(BODY.encode("utf-8"))
+
+
+@pytest.mark.parametrize("codec", [CODEC_ZLIB, CODEC_NONE])
+def test_decode_blob_prefix_from_truncated_data(codec):
+    raw = BODY.encode("utf-8")
+    data = zlib.compress(raw) if codec == CODEC_ZLIB else raw
+
+    for max_chars in (1, 3, 7, 200):
+        prefix = data[:preview_stored_bytes(max_chars)]
+        assert decode_blob_prefix(codec, prefix, max_chars) == BODY[:max_chars]
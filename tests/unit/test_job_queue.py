@@ -0,0 +1,226 @@
+"""
+Unit tests for the job queue (storage/jobs.py) and queue workers (worker.py):
+exclusive claims, leases and heartbeats, retries with backoff, dead letters,
+and a worker draining the queue.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from editor_assistant.data_models import ProcessResult
+from editor_assistant.storage import AsyncRunRepository, JobQueue, RunRepository
+from editor_assistant.worker import Worker
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def queue(repo):
+    return JobQueue(repo)
+
+
+@pytest.fixture
+def t0():
+    """Claim times in tests are offsets from just after enqueueing."""
+    return time.time() + 1
+
+
+def _enqueue(queue, n, **kwargs):
+    return [queue.enqueue("paper", f"/p{i}.pdf", "brief", "m1", **kwargs) for i in range(n)]
+
+
+def test_claims_are_exclusive_across_threads(temp_dir):
+    db_path = temp_dir / "test.db"
+    job_ids = _enqueue(JobQueue(RunRepository(db_path=db_path)), 60)
+
+    claimed = {}
+
+    def drain(worker):
+        queue = JobQueue(RunRepository(db_path=db_path))
+        mine = []
+        while jobs := queue.claim(worker, limit=3):
+            mine.extend(job["id"] for job in jobs)
+        claimed[worker] = mine
+
+    threads = [threading.Thread(target=drain, args=(f"w{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    everything = [job_id for mine in claimed.values() for job_id in mine]
+    assert sorted(everything) == job_ids
+
+
+def test_claim_takes_oldest_available_and_decodes_options(queue, t0):
+    first, second, third = _enqueue(queue, 3, options={"thinking_level": "high", "save_files": True})
+
+    jobs = queue.claim("w1", limit=2, lease_seconds=60, now=t0 + 1000.0)
+
+    assert [job["id"] for job in jobs] == [first, second]
+    job = jobs[0]
+    assert job["status"] == "running" and job["worker"] == "w1" and job["attempts"] == 1
+    assert job["lease_expires_at"] == t0 + 1060.0
+    assert job["options"] == {"thinking_level": "high", "save_files": True}
+    assert queue.counts() == {"queued": 1, "running": 2, "done": 0, "dead": 0}
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, t0):
+    [job_id] = _enqueue(queue, 1)
+    queue.claim("w1", lease_seconds=60, now=t0 + 1000.0)
+
+    assert queue.claim("w2", now=t0 + 1030.0) == []
+    [job] = queue.claim("w2", now=t0 + 1061.0)
+
+    assert job["id"] == job_id and job["worker"] == "w2" and job["attempts"] == 2
+    # The first worker can no longer record a result or renew the lease
+    assert queue.complete(job_id, "w1") is False
+    assert queue.heartbeat([job_id], "w1") == []
+    assert queue.complete(job_id, "w2", run_id=None) is True
+
+
+def test_heartbeat_extends_the_lease(queue, t0):
+    [job_id] = _enqueue(queue, 1)
+    queue.claim("w1", lease_seconds=60, now=t0 + 1000.0)
+
+    assert queue.heartbeat([job_id], "w1", lease_seconds=60, now=t0 + 1050.0) == [job_id]
+
+    assert queue.claim("w2", now=t0 + 1100.0) == []
+    assert queue.claim("w2", now=t0 + 1111.0)[0]["worker"] == "w2"
+
+
+def test_failures_back_off_then_dead_letter(queue, t0):
+    [job_id] = _enqueue(queue, 1, max_attempts=3)
+
+    queue.claim("w1", now=t0 + 0.0)
+    assert queue.fail(job_id, "w1", "boom 1", retry_delay=10, now=t0 + 100.0) == "queued"
+    assert queue.claim("w1", now=t0 + 109.0) == []
+    queue.claim("w1", now=t0 + 110.0)
+    # Second failure waits twice as long
+    assert queue.fail(job_id, "w1", "boom 2", retry_delay=10, now=t0 + 200.0) == "queued"
+    assert queue.claim("w1", now=t0 + 219.0) == []
+    queue.claim("w1", now=t0 + 220.0)
+    assert queue.fail(job_id, "w1", "boom 3", retry_delay=10, now=t0 + 300.0) == "dead"
+
+    assert queue.claim("w1", now=t0 + 10_000.0) == []
+    [dead] = queue.list_jobs("dead")
+    assert dead["attempts"] == 3 and dead["last_error"] == "boom 3"
+    assert queue.pending() == 0
+
+    assert queue.retry_dead() == 1
+    assert queue.claim("w1")[0]["attempts"] == 1
+
+
+def test_expired_last_attempt_is_dead_lettered(queue, t0):
+    [job_id] = _enqueue(queue, 1, max_attempts=1)
+    queue.claim("w1", lease_seconds=60, now=t0 + 1000.0)
+
+    assert queue.claim("w2", now=t0 + 2000.0) == []
+
+    [dead] = queue.list_jobs("dead")
+    assert dead["id"] == job_id
+    assert "lease expired" in dead["last_error"]
+
+
+def test_release_returns_jobs_without_using_an_attempt(queue):
+    job_ids = _enqueue(queue, 2)
+    queue.claim("w1", limit=2)
+
+    assert queue.release(job_ids, "w1") == 2
+
+    assert [job["attempts"] for job in queue.claim("w2", limit=2)] == [1, 1]
+
+
+def test_claim_reads_queued_jobs_in_index_order(queue):
+    plan = " ".join(row[3] for row in queue.repository._conn().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ? "
+        "ORDER BY available_at, id LIMIT 5", (0,)
+    ))
+    assert "idx_jobs_status (status=? AND available_at<?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def _fake_assistant(created, fail_paths=()):
+    """EditorAssistant stand-in: one run per input, failing for `fail_paths`."""
+
+    class FakeAssistant:
+        def __init__(self, model, **kwargs):
+            self.model = model
+            self.kwargs = kwargs
+            self.closed = False
+            created.append(self)
+
+        async def process_multiple(self, inputs, task, **kwargs):
+            await asyncio.sleep(0)
+            db = self.kwargs["db"]
+            results = []
+            for inp in inputs:
+                input_id = await db.get_or_create_input("paper", inp.path, inp.path, inp.path)
+                run_id = await db.create_run(task, self.model, [input_id])
+                success = inp.path not in fail_paths
+                await db.update_run_status(run_id, "success" if success else "failed")
+                results.append(ProcessResult(source_path=inp.path, success=success, run_id=run_id,
+                                             error=None if success else "boom"))
+            return results
+
+        async def aclose(self):
+            self.closed = True
+
+    return FakeAssistant
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_the_queue(repo, queue):
+    good = _enqueue(queue, 5)
+    models = [queue.enqueue("paper", "/q.pdf", "outline", "m2", options={"thinking_level": "high"})]
+    bad = queue.enqueue("paper", "/bad.pdf", "brief", "m1", max_attempts=2)
+
+    created = []
+    async with AsyncRunRepository(repo) as db:
+        worker = Worker(db, _fake_assistant(created, fail_paths={"/bad.pdf"}), concurrency=3,
+                        worker_id="w1", poll_interval=0.01, retry_delay=0)
+        stats = await worker.run(drain=True)
+
+    assert stats == {"done": 6, "retried": 1, "dead": 1, "lost": 0, "deferred": 0}
+    assert queue.counts() == {"queued": 0, "running": 0, "done": 6, "dead": 1}
+    # One shared assistant per model and options, closed at exit
+    assert sorted((x.model, x.kwargs["thinking_level"]) for x in created) == [("m1", None), ("m2", "high")]
+    assert all(x.closed and x.kwargs["db"] is db for x in created)
+
+    done = {job["id"]: job for job in queue.list_jobs("done")}
+    assert set(done) == set(good + models)
+    assert all(repo.get_run_details(job["run_id"], include_content=False)["status"] == "success"
+               for job in done.values())
+    [dead] = queue.list_jobs("dead")
+    assert dead["id"] == bad and dead["last_error"] == "boom" and dead["run_id"] is not None
+
+
+@pytest.mark.asyncio
+async def test_stopped_worker_releases_unfinished_jobs(repo, queue):
+    _enqueue(queue, 2)
+    started = asyncio.Event()
+
+    class Hanging:
+        def __init__(self, model, **kwargs):
+            pass
+
+        async def process_multiple(self, inputs, task, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        async def aclose(self):
+            pass
+
+    async with AsyncRunRepository(repo) as db:
+        worker = Worker(db, Hanging, concurrency=2, worker_id="w1", poll_interval=0.01)
+        task = asyncio.create_task(worker.run())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert queue.counts()["queued"] == 2
+    assert [job["attempts"] for job in queue.claim("w2", limit=2)] == [1, 1]
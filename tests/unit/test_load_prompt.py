@@ -0,0 +1,76 @@
+"""
+Unit tests for precompiled prompt assembly (src/editor_assistant/config/load_prompt.py).
+
+What we check:
+- Prompts assembled from cached segments match a full Jinja render
+- Token estimates are composed from segment and content estimates
+- Templates that cannot be split fall back to a full render
+"""
+
+import pytest
+
+from editor_assistant.config import load_prompt
+from editor_assistant.config.load_prompt import PromptLoader
+from editor_assistant.data_models import MDArticle, InputType
+from editor_assistant.utils import estimate_tokens
+
+pytestmark = pytest.mark.unit
+
+CONTENT = "# Paper\n\nBody with {{ braces }} and 中文内容。\n" * 50
+
+
+def test_outliner_matches_full_render():
+    built = load_prompt.build_research_outliner_prompt(CONTENT)
+    expected = load_prompt._loader.render(load_prompt.RESEARCH_OUTLINER_PROMPT_FILE, content=CONTENT)
+    assert built.text == expected
+
+
+def test_translation_matches_full_render():
+    built = load_prompt.build_translation_prompt(CONTENT, title="Title")
+    expected = load_prompt._loader.render(load_prompt.TRANSLATOR_PROMPT_FILE, content=CONTENT, title="Title")
+    assert built.text == expected
+
+
+def test_news_matches_full_render_for_multiple_articles():
+    articles = [
+        MDArticle(type=InputType.PAPER, content=CONTENT, title="paper"),
+        MDArticle(type=InputType.NEWS, content="news body " * 30, title="news"),
+    ]
+    built = load_prompt.build_news_generator_prompt(articles)
+    expected = load_prompt._loader.render(load_prompt.NEWS_GENERATOR_PROMPT_FILE, articles=articles)
+    assert built.text == expected
+
+
+def test_estimate_is_composed_from_parts():
+    loader = load_prompt._loader
+    built = load_prompt.build_research_outliner_prompt(CONTENT)
+    parts = loader.get_parts(
+        load_prompt.RESEARCH_OUTLINER_PROMPT_FILE, 1, lambda contents: {"content": contents[0]}
+    )
+    assert parts is not None
+    assert built.estimated_tokens == parts.segment_tokens + estimate_tokens(CONTENT)
+
+
+def test_segments_are_cached():
+    loader = load_prompt._loader
+    make_context = lambda contents: {"content": contents[0]}  # noqa: E731
+    first = loader.get_parts(load_prompt.RESEARCH_OUTLINER_PROMPT_FILE, 1, make_context)
+    second = loader.get_parts(load_prompt.RESEARCH_OUTLINER_PROMPT_FILE, 1, make_context)
+    assert first is second
+
+
+def test_filtered_content_falls_back_to_full_render(tmp_path):
+    (tmp_path / "upper.txt").write_text("Intro\n{{ content | upper }}\nEnd", encoding="utf-8")
+    loader = PromptLoader(prompts_dir=tmp_path)
+
+    make_context = lambda contents: {"content": contents[0]}  # noqa: E731
+    assert loader.get_parts("upper.txt", 1, make_context) is None
+
+    built = loader.build("upper.txt", ["body"], make_context)
+    assert built.text == "Intro\nBODY\nEnd"
+    assert built.estimated_tokens == estimate_tokens(built.text)
+
+
+def test_legacy_loaders_still_render():
+    assert CONTENT in load_prompt.load_research_outliner_prompt(content=CONTENT)
+    assert CONTENT in load_prompt.load_translation_prompt(content=CONTENT, title="T")
@@ -81,6 +81,7 @@ async def test_process_multiple_partial_fail_warns_but_processes(tmp_path, capsy
         mock_processor = MockProcessor.return_value
         # `process_mds` is async, so we use AsyncMock to avoid "coroutine was never awaited" errors.
         mock_processor.process_mds = AsyncMock(return_value=(True, 123))
+        mock_processor.register_run = AsyncMock(return_value=123)
         assistant = EditorAssistant("test-model", stream=False)
 
         await assistant.process_multiple([good_input, bad_input], "brief")
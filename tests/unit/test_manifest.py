@@ -0,0 +1,221 @@
+"""
+Unit tests for manifest-driven batches (manifest.py): parsing and
+validation, concurrent jobs with streamed results, and result details
+(tokens, output paths) filled in by MDProcessor.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from unittest.mock import MagicMock, AsyncMock, patch
+
+import pytest
+
+from editor_assistant.cli import cmd_batch_process, create_parser, main, parse_source_spec
+from editor_assistant.data_models import InputType, MDArticle, ProcessResult
+from editor_assistant.manifest import ManifestError, ManifestRunner, load_manifest
+
+pytestmark = pytest.mark.unit
+
+MODEL = "deepseek-v3.2"
+
+
+def _write_manifest(path, lines):
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n")
+    return path
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+def test_load_manifest_with_defaults_and_input_forms(temp_dir):
+    manifest = _write_manifest(temp_dir / "jobs.jsonl", [
+        "# comment",
+        {"id": 7, "inputs": ["paper=a.pdf", "news=https://example.com/story"], "options": {"thinking": "high"}},
+        "",
+        {"task": "translate", "model": "kimi-k2", "input": {"type": "paper", "path": "b.pdf"}},
+        {"input": "c.pdf", "options": {"save_files": False}},
+    ])
+
+    jobs = load_manifest(manifest, task="brief", model=MODEL, options={"save_files": True})
+
+    assert [(j.line, j.id, j.task, j.model) for j in jobs] == [
+        (2, "7", "brief", MODEL), (4, None, "translate", "kimi-k2"), (5, None, "brief", MODEL)
+    ]
+    assert [(i.type, i.path) for i in jobs[0].inputs] == [
+        (InputType.PAPER, "a.pdf"), (InputType.NEWS, "https://example.com/story")
+    ]
+    assert jobs[1].inputs[0].path == "b.pdf" and jobs[2].inputs[0].type == InputType.PAPER
+    assert jobs[0].options == {"save_files": True, "thinking": "high"}
+    assert jobs[2].options == {"save_files": False}
+
+
+@pytest.mark.parametrize("line, message", [
+    ("{not json", "invalid JSON"),
+    ({"inputs": ["a.pdf"]}, "missing task"),
+    ({"task": "summarize", "inputs": ["a.pdf"]}, "unknown or missing task 'summarize'"),
+    ({"task": "brief", "model": "gpt-9", "inputs": ["a.pdf"]}, "unknown or missing model"),
+    ({"task": "brief", "inputs": []}, "non-empty list"),
+    ({"task": "brief", "inputs": [{"type": "blog", "path": "x.html"}]}, "Invalid source type 'blog'"),
+    ({"task": "outline", "inputs": ["a.pdf", "b.pdf"]}, "one input per job"),
+    ({"task": "brief", "inputs": ["a.pdf"], "options": {"temperature": 0}}, "unknown option 'temperature'"),
+    ({"task": "brief", "inputs": ["a.pdf"], "options": {"save_files": "yes"}}, "must be a bool"),
+    ({"task": "brief", "inputs": ["a.pdf"], "priority": 1}, "unknown field(s) priority"),
+])
+def test_load_manifest_rejects_bad_lines(temp_dir, line, message):
+    manifest = _write_manifest(temp_dir / "jobs.jsonl", [{"task": "brief", "input": "ok.pdf"}, line])
+    with pytest.raises(ManifestError, match=rf"line 2: .*{message.replace('(', '.').replace(')', '.')}"):
+        load_manifest(manifest, model=MODEL)
+
+
+def test_parse_source_spec_errors_are_argparse_errors():
+    assert parse_source_spec("news= https://example.com ").path == "https://example.com"
+    with pytest.raises(argparse.ArgumentTypeError, match="type=path"):
+        parse_source_spec("file.pdf")
+
+
+# =============================================================================
+# Running
+# =============================================================================
+
+class FakeAssistant:
+    """process_multiple() stand-in: inputs finish after their delay, in completion order."""
+
+    created = []
+
+    def __init__(self, model, thinking_level, reconvert):
+        self.model = model
+        self.thinking_level = thinking_level
+        self.calls = []
+        self.closed = False
+        FakeAssistant.created.append(self)
+
+    async def process_multiple(self, inputs, task, output_to_console=True, save_files=False,
+                               schedule="fifo", result_callback=None):
+        self.calls.append((task, save_files, [inp.path for inp in inputs]))
+
+        async def one(inp):
+            await asyncio.sleep(0.2 if "slow" in inp.path else 0)
+            ok = "bad" not in inp.path
+            result = ProcessResult(source_path=inp.path, success=ok, run_id=len(inp.path) if ok else -1,
+                                   error=None if ok else "boom", started_at=1.0, finished_at=1.5,
+                                   input_tokens=100, output_tokens=20, cost=0.01)
+            result_callback(result)
+            return result
+
+        return await asyncio.gather(*(one(inp) for inp in inputs))
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_runner_groups_jobs_and_streams_results(temp_dir):
+    FakeAssistant.created = []
+    jobs = load_manifest(_write_manifest(temp_dir / "jobs.jsonl", [
+        {"id": "slow", "task": "brief", "inputs": ["slow.pdf", "news=fast.html"]},
+        {"id": "dup", "task": "brief", "input": "fast.html"},
+        {"id": "t", "task": "translate", "input": "bad.pdf", "options": {"thinking": "high"}},
+        {"task": "outline", "input": "o.pdf"},
+    ]), model=MODEL)
+
+    records = []
+    seen_slow_running = []
+
+    def emit(record):
+        records.append(record)
+        seen_slow_running.append(not any(r["source"] == "slow.pdf" for r in records))
+
+    counts = await ManifestRunner(jobs, FakeAssistant, emit).run()
+
+    # One assistant per model and thinking level, one pipeline per task
+    assert {(a.model, a.thinking_level) for a in FakeAssistant.created} == {(MODEL, None), (MODEL, "high")}
+    assert len(FakeAssistant.created) == 2
+    assert all(a.closed for a in FakeAssistant.created)
+    plain = next(a for a in FakeAssistant.created if a.thinking_level is None)
+    assert sorted(task for task, _, _ in plain.calls) == ["brief", "outline"]
+
+    # Streamed as they complete: fast results came out while slow.pdf was still running
+    assert records[-1]["source"] == "slow.pdf" and seen_slow_running[0]
+    assert counts == {"success": 4, "failed": 1, "budget_exhausted": 0}
+    by_source = {}
+    for record in records:
+        by_source.setdefault(record["source"], []).append(record)
+    # The same source in two jobs: one result for each
+    assert sorted(r["id"] for r in by_source["fast.html"]) == ["dup", "slow"]
+    failed = by_source["bad.pdf"][0]
+    assert (failed["id"], failed["line"], failed["status"], failed["run_id"], failed["error"]) == ("t", 3, "failed", None, "boom")
+    assert by_source["o.pdf"][0]["latency"] == 0.5 and by_source["o.pdf"][0]["input_tokens"] == 100
+
+
+@pytest.mark.asyncio
+async def test_batch_manifest_writes_jsonl_results(temp_dir, capsys):
+    FakeAssistant.created = []
+    manifest = _write_manifest(temp_dir / "jobs.jsonl", [{"input": "a.pdf"}, {"input": "bad.pdf"}])
+    results = temp_dir / "results.jsonl"
+    args = create_parser().parse_args(
+        ["batch", "--manifest", str(manifest), "--task", "brief", "--results", str(results), "--max-tokens", "1000"]
+    )
+
+    with patch("editor_assistant.cli.EditorAssistant",
+               side_effect=lambda model, thinking_level=None, reconvert=False, **kwargs:
+               FakeAssistant(model, thinking_level, reconvert)):
+        await cmd_batch_process(args)
+
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert [(r["source"], r["status"]) for r in lines] == [("a.pdf", "success"), ("bad.pdf", "failed")]
+    out = capsys.readouterr().out
+    assert "1 succeeded, 1 failed" in out and "Budget remaining" in out
+
+    # Invalid manifests stop before anything runs
+    _write_manifest(manifest, [{"input": "a.pdf", "task": "nope"}])
+    await cmd_batch_process(args)
+    assert "line 1: unknown or missing task" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("argv", [["batch"], ["batch", "./papers"], ["batch", "--task", "brief"]])
+def test_batch_without_folder_task_or_manifest_is_a_usage_error(argv, capsys):
+    with patch.object(sys, "argv", ["editor-assistant", *argv]), pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 2
+    assert "a folder and --task are required" in capsys.readouterr().err
+
+
+# =============================================================================
+# Result details
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_process_mds_fills_result_details(temp_dir):
+    with patch("editor_assistant.md_processor.LLMClient") as MockClient, \
+         patch("editor_assistant.md_processor.RunRepository"):
+        client = MockClient.return_value
+        client.generate_response = AsyncMock(return_value=(
+            "Brief text",
+            {"total_input_tokens": 1200, "total_output_tokens": 300,
+             "cost": {"input_cost": 0.01, "output_cost": 0.02, "total_cost": 0.03},
+             "process_times": {"total_time": 0.1}}
+        ))
+        client.model_name = MODEL
+        client.context_window = 100_000
+        client.max_tokens = 4_000
+
+        from editor_assistant.md_processor import MDProcessor
+        processor = MDProcessor(MODEL, stream=False)
+        processor._update_run_status = AsyncMock()
+        processor._save_output_to_db = AsyncMock()
+        processor._save_token_usage_to_db = AsyncMock()
+        processor.llm_client.save_token_usage_report = MagicMock()
+
+        article = MDArticle(type=InputType.PAPER, content="text " * 500, title="Paper",
+                            source_path=str(temp_dir / "paper.pdf"), output_path=temp_dir)
+        result = ProcessResult(source_path=article.source_path)
+        success, _ = await processor.process_mds([article], "brief", output_to_console=False,
+                                                 save_files=True, validated=True, run_id=1, result=result)
+
+    assert success
+    assert (result.input_tokens, result.output_tokens, result.cost) == (1200, 300, 0.03)
+    [path] = result.output_paths
+    assert path.startswith(str(temp_dir / "llm_summaries" / MODEL)) and open(path).read().endswith("Brief text")
@@ -64,7 +64,7 @@ class TestAsyncMDProcessor:
             mock_task_cls = MagicMock()
             mock_task = MagicMock()
             mock_task.validate.return_value = (True, "")
-            mock_task.build_prompt.return_value = "Test Prompt " * 100  # Sufficient length
+            mock_task.build_prompt_with_estimate.return_value = ("Test Prompt " * 100, None)  # Sufficient length
             mock_task.post_process.return_value = {"main": "Processed Content"}
             mock_task.get_output_suffix.return_value = "_test"
             mock_task.supports_multi_input = False
@@ -112,7 +112,7 @@ class TestAsyncMDProcessor:
             mock_task_cls = MagicMock()
             mock_task = MagicMock()
             mock_task.validate.return_value = (True, "")
-            mock_task.build_prompt.return_value = "Test Prompt " * 100
+            mock_task.build_prompt_with_estimate.return_value = ("Test Prompt " * 100, None)
             mock_task.post_process.return_value = {"main": "Processed Content"}
             mock_task.get_output_suffix.return_value = "_test"
             mock_task.supports_multi_input = False
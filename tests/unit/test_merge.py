@@ -0,0 +1,182 @@
+"""
+Unit tests for batch sharding (sharding.py) and merging run histories
+(storage/merge.py, RunRepository.merge_from).
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from editor_assistant.sharding import parse_shard, select_shard, shard_of
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage.database import close_all_connections
+from editor_assistant.storage.migrations import BASE_SCHEMA
+
+pytestmark = pytest.mark.unit
+
+
+# =============================================================================
+# Sharding
+# =============================================================================
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("0/4", "5/4", "1/0", "1", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_partition_files_stably():
+    root = Path("/data/batch")
+    files = [root / f"sub{i % 3}" / f"paper{i}.pdf" for i in range(500)]
+
+    shards = [select_shard(files, root, index, 4) for index in range(1, 5)]
+
+    assert sorted(f for shard in shards for f in shard) == sorted(files)
+    assert all(60 < len(shard) < 190 for shard in shards)
+    # Same shard on another mount point and in another listing order
+    moved = [Path("/mnt/other") / f.relative_to(root) for f in reversed(files)]
+    assert {f.name for f in select_shard(moved, Path("/mnt/other"), 2, 4)} == {f.name for f in shards[1]}
+    assert shard_of("sub0/paper0.pdf", 4) == shard_of("sub0/paper0.pdf", 4)
+
+
+# =============================================================================
+# Merge
+# =============================================================================
+
+def _shard_db(path, n, prefix, shared_content="shared article"):
+    repo = RunRepository(db_path=path)
+    shared = repo.get_or_create_input("paper", "/shared.pdf", "Shared", shared_content, source_hash="s" * 64)
+    run_ids = []
+    for i in range(n):
+        own = repo.get_or_create_input("paper", f"/{prefix}{i}.pdf", f"{prefix} {i}", f"{prefix} content {i}")
+        run_id = repo.create_run("brief", "m1", [own, shared])
+        repo.add_output(run_id, "main", f"{prefix} brief {i}")
+        repo.add_token_usage(run_id, 100, 10, 0.1, 0.2, 1.0)
+        repo.update_run_status(run_id, "success")
+        run_ids.append(run_id)
+    return repo, run_ids
+
+
+def test_merge_databases_without_duplicates(temp_dir):
+    a, _ = _shard_db(temp_dir / "a.db", 3, "alpha")
+    b, _ = _shard_db(temp_dir / "b.db", 2, "beta")
+    target = RunRepository(db_path=temp_dir / "merged.db")
+
+    first = target.merge_from(a.db_path)
+    target.merge_from(b.db_path)
+    again = target.merge_from(a.db_path)
+
+    assert first == {"runs": 3, "skipped": 0, "inputs": 4, "outputs": 3, "missing_outputs": 0}
+    assert again["runs"] == 0 and again["skipped"] == 3
+    runs = target.get_recent_runs(limit=50)
+    assert len(runs) == 5
+    # Oldest first within a source: run ids follow the source order
+    assert [target.get_run_details(run_id)["outputs"][0]["content"] for run_id in (1, 2, 3)] == [
+        "alpha brief 0", "alpha brief 1", "alpha brief 2"
+    ]
+    # The shared input is stored once, with its article
+    conn = target._conn()
+    assert conn.execute("SELECT COUNT(*) FROM inputs WHERE source_path = '/shared.pdf'").fetchone()[0] == 1
+    assert target.find_input_article(source_hash="s" * 64)["content"] == "shared article"
+
+    stats = target.get_stats(days=1)
+    assert stats["total_runs"] == 5
+    assert target.search("beta brief")
+
+
+def test_merge_keeps_run_details(temp_dir):
+    a, [run_id] = _shard_db(temp_dir / "a.db", 1, "alpha")
+    target = RunRepository(db_path=temp_dir / "merged.db")
+
+    target.merge_from(a.db_path)
+
+    source = a.get_run_details(run_id)
+    [merged] = target.get_recent_runs()
+    details = target.get_run_details(merged["id"])
+    for key in ("task", "model", "status", "timestamp"):
+        assert details[key] == source[key]
+    assert [o["content"] for o in details["outputs"]] == ["alpha brief 0"]
+    assert sorted(i["title"] for i in details["inputs"]) == ["Shared", "alpha 0"]
+
+
+@pytest.mark.parametrize("name", ["a.jsonl", "a.json", "a.jsonl.gz"])
+def test_merge_exports(temp_dir, name):
+    a, _ = _shard_db(temp_dir / "a.db", 3, "alpha")
+    export = temp_dir / name
+    a.export_runs(export)
+    target = RunRepository(db_path=temp_dir / "merged.db")
+
+    stats = target.merge_from(export)
+    # The run database and its export hold the same runs
+    again = target.merge_from(a.db_path)
+
+    assert stats["runs"] == 3 and stats["outputs"] == 3
+    assert again["skipped"] == 3
+    assert [run["id"] for run in target.get_recent_runs()] == [3, 2, 1]
+    assert target.get_run_details(1)["outputs"][0]["content"] == "alpha brief 0"
+
+
+def test_merge_rejects_csv_and_self(temp_dir):
+    a, _ = _shard_db(temp_dir / "a.db", 1, "alpha")
+    export = temp_dir / "a.csv"
+    a.export_runs(export)
+
+    with pytest.raises(ValueError, match="CSV"):
+        RunRepository(db_path=temp_dir / "merged.db").merge_from(export)
+    with pytest.raises(ValueError, match="itself"):
+        a.merge_from(a.db_path)
+
+
+def test_runs_have_unique_ids(temp_dir):
+    repo, _ = _shard_db(temp_dir / "a.db", 3, "alpha")
+    uuids = [row[0] for row in repo._conn().execute("SELECT uuid FROM runs")]
+    assert len(set(uuids)) == 3 and all(len(u) == 32 for u in uuids)
+
+
+def _digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def test_merge_reads_source_without_changing_it(temp_dir):
+    a, run_ids = _shard_db(temp_dir / "a.db", 2, "alpha")
+    # A run inserted by hand has no uuid
+    a._conn().execute("UPDATE runs SET uuid = NULL WHERE id = ?", (run_ids[1],))
+    a._conn().commit()
+    a._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    close_all_connections()
+    before = _digest(a.db_path)
+    target = RunRepository(db_path=temp_dir / "merged.db")
+
+    first = target.merge_from(a.db_path)
+    again = target.merge_from(a.db_path)
+
+    assert (first["runs"], again["runs"], again["skipped"]) == (2, 0, 2)
+    assert _digest(a.db_path) == before
+
+
+def test_merge_reads_older_schema_without_migrating(temp_dir):
+    old = temp_dir / "v1.db"
+    conn = sqlite3.connect(old)
+    conn.executescript(BASE_SCHEMA)
+    conn.execute("INSERT INTO schema_version (id, version) VALUES (1, 1)")
+    conn.execute("INSERT INTO inputs (type, source_path, title, content_hash) VALUES ('paper', '/old.pdf', 'Old', 'h1')")
+    for i in range(2):
+        run_id = conn.execute("INSERT INTO runs (task, model, status) VALUES ('brief', 'm1', 'success')").lastrowid
+        conn.execute("INSERT INTO run_inputs (run_id, input_id) VALUES (?, 1)", (run_id,))
+        conn.execute("INSERT INTO outputs (run_id, output_type, content) VALUES (?, 'main', ?)", (run_id, f"old brief {i}"))
+    conn.commit()
+    conn.close()
+    before = _digest(old)
+    target = RunRepository(db_path=temp_dir / "merged.db")
+
+    first = target.merge_from(old)
+    again = target.merge_from(old)
+
+    assert (first["runs"], first["outputs"], again["skipped"]) == (2, 2, 2)
+    assert [target.get_run_details(i)["outputs"][0]["content"] for i in (1, 2)] == ["old brief 0", "old brief 1"]
+    assert _digest(old) == before
+    with sqlite3.connect(old) as conn:
+        assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == 1
@@ -0,0 +1,140 @@
+"""
+Unit tests for versioned schema migrations (src/editor_assistant/storage/migrations.py).
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage import migrations
+from editor_assistant.storage.database import get_connection, init_database
+from editor_assistant.storage.migrations import (
+    BASE_SCHEMA,
+    MIGRATIONS,
+    SCHEMA_VERSION,
+    get_schema_version,
+    migrate,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _indexes(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def _database_at(db_path, version):
+    """A database built by the released steps up to `version`."""
+    conn = get_connection(db_path)
+    for step_version, _, apply in MIGRATIONS:
+        if step_version > version:
+            break
+        apply(conn)
+    conn.execute("INSERT OR REPLACE INTO schema_version (id, version) VALUES (1, ?)", (version,))
+    conn.commit()
+    return conn
+
+
+def test_versions_are_ordered_and_contiguous():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+    assert SCHEMA_VERSION == versions[-1]
+
+
+def test_new_database_applies_every_step_once(temp_dir):
+    conn = get_connection(temp_dir / "new.db")
+
+    assert migrate(conn) == [version for version, _, _ in MIGRATIONS]
+    assert migrate(conn) == []
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    conn.close()
+
+
+def test_query_indexes_created(temp_dir):
+    init_database(temp_dir / "test.db")
+    conn = get_connection(temp_dir / "test.db")
+    indexes = _indexes(conn)
+    conn.close()
+
+    assert {
+        "idx_run_inputs_input",
+        "idx_token_usage_run",
+        "idx_runs_resumable",
+        "idx_runs_timestamp_model",
+    } <= indexes
+    # Superseded or unused
+    assert not {"idx_runs_timestamp", "idx_runs_task", "idx_runs_model"} & indexes
+
+
+def test_upgrade_applies_only_pending_steps_and_keeps_data(temp_dir):
+    db_path = temp_dir / "v2.db"
+    conn = _database_at(db_path, 2)
+    conn.execute("INSERT INTO runs (task, model, status) VALUES ('brief', 'm', 'pending')")
+    conn.execute("INSERT INTO outputs (run_id, output_type, content) VALUES (1, 'main', 'kept text')")
+    conn.commit()
+
+    assert migrate(conn) == list(range(3, SCHEMA_VERSION + 1))
+    conn.close()
+
+    repo = RunRepository(db_path=db_path)
+    assert repo.get_run_details(1)["outputs"][0]["content"] == "kept text"
+    assert [run["id"] for run in repo.get_resumable_runs()] == [1]
+
+
+def test_unversioned_database_is_adopted(temp_dir):
+    db_path = temp_dir / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(BASE_SCHEMA)
+    conn.execute("INSERT INTO runs (task, model) VALUES ('brief', 'm')")
+    conn.commit()
+    conn.close()
+
+    # Opening through the repository upgrades it
+    repo = RunRepository(db_path=db_path)
+
+    conn = get_connection(db_path)
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    conn.close()
+    assert repo.get_recent_runs()[0]["id"] == 1
+
+
+def test_failed_step_rolls_back_to_last_completed_version(temp_dir, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS + [(SCHEMA_VERSION + 1, "broken", broken)])
+    conn = get_connection(temp_dir / "test.db")
+
+    with pytest.raises(RuntimeError):
+        migrate(conn)
+
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "half_done" not in tables
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_concurrent_initialization(temp_dir):
+    db_path = temp_dir / "race.db"
+    errors = []
+
+    def init():
+        try:
+            init_database(db_path)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=init) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    conn = get_connection(db_path)
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    conn.close()
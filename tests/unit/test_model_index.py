@@ -0,0 +1,45 @@
+"""
+Unit tests for the cached model-name index (src/editor_assistant/config/model_index.py).
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from editor_assistant.config import model_index
+from editor_assistant.config.llm_models import get_supported_models
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "model_index.json"
+    with patch.object(model_index, "_get_index_path", return_value=path):
+        yield path
+
+
+def test_builds_and_reuses_index(index_path):
+    assert model_index.get_model_names() == list(get_supported_models())
+    assert index_path.exists()
+
+    # A fresh index is served without loading llm_models
+    with patch("editor_assistant.config.llm_models.get_supported_models") as loader:
+        assert model_index.get_model_names() == list(get_supported_models())
+        loader.assert_not_called()
+
+
+def test_stale_index_is_rebuilt(index_path):
+    model_index.get_model_names()
+    data = json.loads(index_path.read_text())
+    data["fingerprint"]["mtime_ns"] -= 1
+    data["models"] = ["removed-model"]
+    index_path.write_text(json.dumps(data))
+
+    assert model_index.get_model_names() == list(get_supported_models())
+
+
+def test_corrupt_index_is_ignored(index_path):
+    index_path.write_text("{not json")
+    assert model_index.get_model_names() == list(get_supported_models())
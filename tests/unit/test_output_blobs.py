@@ -0,0 +1,186 @@
+"""
+Unit tests for content-addressed output storage (storage/blobs.py) and
+RunRepository.compact().
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage.blobs import CODEC_NONE, CODEC_ZLIB, decode_blob, encode_text
+from editor_assistant.storage.database import SCHEMA_VERSION, get_schema_version
+from editor_assistant.storage.export import export_history
+
+pytestmark = pytest.mark.unit
+
+BILINGUAL = "\n\n".join(
+    f"Paragraph {n} of the source text.\n\n第{n}段的中文译文。" for n in range(200)
+)
+
+# Schema v2 as released: inline outputs.content, external-content output index
+V2_SCHEMA = """
+CREATE TABLE schema_version (id INTEGER PRIMARY KEY, version INTEGER NOT NULL);
+CREATE TABLE inputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, source_path TEXT,
+    title TEXT, content_hash TEXT UNIQUE, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    task TEXT NOT NULL, model TEXT NOT NULL, thinking_level TEXT, stream INTEGER DEFAULT 1,
+    currency TEXT DEFAULT '$', status TEXT DEFAULT 'pending', error_message TEXT
+);
+CREATE TABLE run_inputs (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    input_id INTEGER NOT NULL REFERENCES inputs(id) ON DELETE CASCADE,
+    PRIMARY KEY (run_id, input_id)
+);
+CREATE TABLE outputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    output_type TEXT NOT NULL, content_type TEXT DEFAULT 'text', content TEXT
+);
+CREATE TABLE token_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    input_tokens INTEGER DEFAULT 0, output_tokens INTEGER DEFAULT 0,
+    cost_input REAL DEFAULT 0, cost_output REAL DEFAULT 0, process_time REAL DEFAULT 0
+);
+CREATE VIRTUAL TABLE inputs_fts USING fts5(
+    title, source_path, content='inputs', content_rowid='id', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE outputs_fts USING fts5(
+    content, content='outputs', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER inputs_fts_ai AFTER INSERT ON inputs BEGIN
+    INSERT INTO inputs_fts(rowid, title, source_path) VALUES (new.id, new.title, new.source_path);
+END;
+CREATE TRIGGER outputs_fts_ai AFTER INSERT ON outputs BEGIN
+    INSERT INTO outputs_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER outputs_fts_au AFTER UPDATE OF content ON outputs BEGIN
+    INSERT INTO outputs_fts(outputs_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO outputs_fts(rowid, content) VALUES (new.id, new.content);
+END;
+INSERT INTO schema_version (id, version) VALUES (1, 2);
+"""
+
+
+@pytest.fixture
+def v2_db(temp_dir):
+    db_path = temp_dir / "v2.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(V2_SCHEMA)
+    conn.execute(
+        "INSERT INTO inputs (type, source_path, title, content_hash) "
+        "VALUES ('paper', '/p.pdf', 'Legacy paper', 'h')"
+    )
+    for run_id in (1, 2, 3):
+        conn.execute("INSERT INTO runs (task, model, status) VALUES ('translate', 'm', 'success')")
+        conn.execute("INSERT INTO run_inputs (run_id, input_id) VALUES (?, 1)", (run_id,))
+        # Three reruns produced the same bilingual output
+        conn.execute(
+            "INSERT INTO outputs (run_id, output_type, content) VALUES (?, 'bilingual', ?)",
+            (run_id, BILINGUAL),
+        )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _blob_rows(repo):
+    conn = repo._get_conn()
+    rows = conn.execute("SELECT hash, codec, size, LENGTH(data) AS stored FROM blobs").fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.mark.parametrize("text, codec", [
+    ("short", CODEC_NONE),
+    (BILINGUAL, CODEC_ZLIB),
+])
+def test_encode_round_trip(text, codec):
+    digest, used, size, data = encode_text(text)
+    assert used == codec
+    assert size == len(text.encode("utf-8"))
+    assert decode_blob(used, data) == text
+    assert len(digest) == 64
+
+
+def test_identical_outputs_share_one_compressed_blob(repo):
+    for _ in range(3):
+        run_id = repo.create_run("translate", "model", [])
+        repo.add_output(run_id, "bilingual", BILINGUAL)
+
+    blobs = _blob_rows(repo)
+    assert len(blobs) == 1
+    assert blobs[0]["codec"] == CODEC_ZLIB
+    assert blobs[0]["stored"] * 5 < blobs[0]["size"]
+
+    stats = repo.get_storage_stats()
+    assert stats["outputs"] == 3 and stats["blobs"] == 1
+    assert stats["logical_bytes"] == 3 * len(BILINGUAL.encode("utf-8"))
+
+
+def test_details_and_export_decompress_transparently(repo, temp_dir):
+    run_id = repo.create_run("translate", "model", [])
+    repo.add_output(run_id, "main", "简短摘要")
+    repo.add_output(run_id, "bilingual", BILINGUAL)
+
+    outputs = repo.get_run_details(run_id)["outputs"]
+    assert [(o["output_type"], o["content"]) for o in outputs] == [
+        ("main", "简短摘要"), ("bilingual", BILINGUAL)
+    ]
+
+    export_history(repo.db_path, temp_dir / "out.jsonl")
+    exported = json.loads((temp_dir / "out.jsonl").read_text(encoding="utf-8"))
+    assert [o["content"] for o in exported["outputs"]] == ["简短摘要", BILINGUAL]
+
+
+def test_v2_database_upgrade_keeps_inline_rows_readable_and_searchable(v2_db):
+    repo = RunRepository(db_path=v2_db)
+
+    conn = repo._get_conn()
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    conn.close()
+    assert repo.get_run_details(2)["outputs"][0]["content"] == BILINGUAL
+    assert {r["id"] for r in repo.search("中文译文")} == {1, 2, 3}
+    assert repo.get_storage_stats()["inline_outputs"] == 3
+
+
+def test_compact_migrates_deduplicates_and_reports_savings(v2_db):
+    repo = RunRepository(db_path=v2_db)
+
+    stats = repo.compact()
+
+    assert stats["migrated"] == 3
+    assert stats["inline_outputs"] == 0
+    assert stats["blobs"] == 1
+    assert stats["stored_bytes"] * 10 < stats["logical_bytes"]
+    assert stats["file_bytes"] < stats["file_bytes_before"]
+
+    # Contents, search and later writes still work on the compacted database
+    assert all(repo.get_run_details(i)["outputs"][0]["content"] == BILINGUAL for i in (1, 2, 3))
+    assert {r["id"] for r in repo.search("中文译文")} == {1, 2, 3}
+    run_id = repo.create_run("translate", "m", [])
+    repo.add_output(run_id, "bilingual", BILINGUAL)
+    assert repo.get_storage_stats()["blobs"] == 1
+
+    # Nothing left to do on a second pass
+    assert repo.compact(vacuum=False)["migrated"] == 0
+
+
+def test_compact_removes_unreferenced_blobs(repo):
+    run_id = repo.create_run("brief", "model", [])
+    repo.add_output(run_id, "main", "kept")
+    repo.add_output(run_id, "bilingual", "dropped")
+
+    conn = repo._get_conn()
+    conn.execute("DELETE FROM outputs WHERE output_type = 'bilingual'")
+    conn.commit()
+    conn.close()
+
+    stats = repo.compact(vacuum=False)
+    assert stats["blobs_removed"] == 1
+    assert stats["blobs"] == 1
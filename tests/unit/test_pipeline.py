@@ -0,0 +1,178 @@
+"""
+Unit tests for the staged batch pipeline (src/editor_assistant/pipeline.py)
+and its use in EditorAssistant.process_multiple.
+
+What we check:
+- Items flow through all stages; handlers returning None drop items
+- Bounded queues apply backpressure (items in flight stay bounded)
+- Handler exceptions cancel the pipeline and propagate
+- The first LLM call starts before the last conversion finishes
+"""
+
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+from editor_assistant.pipeline import Pipeline, Stage
+from editor_assistant.data_models import Input, InputType, MDArticle
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.asyncio
+async def test_items_flow_through_stages():
+    seen = []
+
+    async def double(x):
+        return x * 2
+
+    async def drop_odd_input(x):
+        return None if x % 4 else x
+
+    async def collect(x):
+        seen.append(x)
+        return x
+
+    pipeline = Pipeline([
+        Stage("double", double, concurrency=3),
+        Stage("filter", drop_odd_input),
+        Stage("collect", collect, concurrency=2),
+    ])
+    await pipeline.run(range(10))
+
+    assert sorted(seen) == [0, 4, 8, 12, 16]
+    stats = pipeline.stats["filter"]
+    assert (stats["in"], stats["out"], stats["dropped"]) == (10, 5, 5)
+
+
+@pytest.mark.asyncio
+async def test_async_source():
+    async def source():
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield i
+
+    seen = []
+
+    async def collect(x):
+        seen.append(x)
+        return x
+
+    await Pipeline([Stage("collect", collect)]).run(source())
+    assert seen == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_backpressure_bounds_items_in_flight():
+    in_flight = 0
+    peak = 0
+    release = asyncio.Event()
+
+    async def produce(x):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        return x
+
+    async def slow_consume(x):
+        nonlocal in_flight
+        await release.wait()
+        in_flight -= 1
+        return x
+
+    pipeline = Pipeline([
+        Stage("produce", produce, concurrency=2, queue_size=2),
+        Stage("consume", slow_consume, concurrency=1, queue_size=3),
+    ])
+    run = asyncio.create_task(pipeline.run(range(100)))
+    await asyncio.sleep(0.05)
+
+    # consumer (1) + its queue (3) + producers blocked on put (2)
+    assert peak <= 6
+    release.set()
+    await run
+    assert in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_exception_propagates():
+    async def fail(x):
+        if x == 3:
+            raise RuntimeError("stage broke")
+        return x
+
+    async def never_done(x):
+        await asyncio.sleep(10)
+
+    pipeline = Pipeline([Stage("fail", fail), Stage("slow", never_done, concurrency=2)])
+    with pytest.raises(RuntimeError, match="stage broke"):
+        await asyncio.wait_for(pipeline.run(range(10)), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_process_multiple_overlaps_conversion_and_llm(tmp_path):
+    from editor_assistant.main import EditorAssistant
+
+    events = []
+
+    def convert(path, type=InputType.PAPER):
+        import time
+        time.sleep(0.05)
+        events.append(("converted", path))
+        return MDArticle(type=type, content="text " * 500, title=path, source_path=path)
+
+    async def process_mds(articles, task, *args, **kwargs):
+        events.append(("llm", articles[0].source_path))
+        return True, len(events)
+
+    inputs = [Input(type=InputType.PAPER, path=f"https://example.com/{i}") for i in range(6)]
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor") as MockProcessor:
+        MockConverter.return_value.convert_content.side_effect = convert
+        MockProcessor.return_value.process_mds = AsyncMock(side_effect=process_mds)
+        MockProcessor.return_value.register_run = AsyncMock(return_value=1)
+        MockProcessor.return_value.validate_articles.return_value = True
+
+        assistant = EditorAssistant("test-model", stream=False, use_conversion_cache=False)
+        with patch("editor_assistant.main.PIPELINE_CONVERT_CONCURRENCY", 1):
+            results = await assistant.process_multiple(inputs, "brief")
+
+    first_llm = next(i for i, e in enumerate(events) if e[0] == "llm")
+    last_convert = max(i for i, e in enumerate(events) if e[0] == "converted")
+    assert first_llm < last_convert
+
+    assert [r.source_path for r in results] == [inp.path for inp in inputs]
+    assert all(r.success and r.run_id > 0 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_process_multiple_reports_per_input_failures():
+    from editor_assistant.main import EditorAssistant
+
+    good = MDArticle(type=InputType.PAPER, content="text " * 500, title="good", source_path="good.pdf")
+    done = {}
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor") as MockProcessor:
+        MockConverter.return_value.convert_content.side_effect = (
+            lambda path, type: good if path == "good.pdf" else None
+        )
+        MockProcessor.return_value.process_mds = AsyncMock(return_value=(True, 7))
+        MockProcessor.return_value.register_run = AsyncMock(return_value=7)
+        MockProcessor.return_value.validate_articles.return_value = True
+
+        assistant = EditorAssistant("test-model", stream=False)
+        results = await assistant.process_multiple(
+            [Input(type=InputType.PAPER, path="bad.pdf"), Input(type=InputType.PAPER, path="good.pdf")],
+            "brief",
+            done_callback=lambda path, ok: done.__setitem__(path, ok),
+        )
+
+    assert [(r.source_path, r.success, r.run_id) for r in results] == [
+        ("bad.pdf", False, -1),
+        ("good.pdf", True, 7),
+    ]
+    assert results[0].error == "conversion returned None"
+    assert done == {"bad.pdf": False, "good.pdf": True}
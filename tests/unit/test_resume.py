@@ -0,0 +1,139 @@
+"""
+Unit tests for `resume` (cli._resume_runs): runs grouped by model, thinking
+level and task, one shared assistant per group, groups of different models
+running concurrently.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from editor_assistant.cli import _resume_runs
+from editor_assistant.data_models import Input, InputType, ProcessResult
+from editor_assistant.storage import AsyncRunRepository
+
+pytestmark = pytest.mark.unit
+
+
+def _args(**overrides):
+    args = dict(dry_run=False, debug=False, save_files=False, reconvert=False)
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+def _fake_assistant(created, fail_paths=(), started=None, release=None):
+    """EditorAssistant stand-in recording how it is built and used."""
+
+    class FakeAssistant:
+        def __init__(self, model, **kwargs):
+            self.model = model
+            self.kwargs = kwargs
+            self.calls = []
+            self.closed = False
+            created.append(self)
+
+        async def process_multiple(self, inputs, task, **kwargs):
+            self.calls.append((task, [inp.input_id for inp in inputs], kwargs))
+            if started is not None:
+                started.append(self.model)
+                await release.wait()
+            return [
+                ProcessResult(source_path=inp.path, success=inp.path not in fail_paths,
+                              error="boom" if inp.path in fail_paths else None)
+                for inp in inputs
+            ]
+
+        async def aclose(self):
+            self.closed = True
+
+    return FakeAssistant
+
+
+def test_resumable_runs_are_read_in_one_query(repo):
+    a = repo.get_or_create_input("paper", "/a.pdf", "A", "content a")
+    b = repo.get_or_create_input("news", "/b.html", "B", "content b")
+    repo.create_run("brief", "m1", [a, b])
+    repo.create_run("outline", "m1", [a])
+    repo.create_run("brief", "m1", [])
+
+    conn = repo._conn()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        runs = repo.get_resumable_runs()
+    finally:
+        conn.set_trace_callback(None)
+
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    assert [sorted(inp["title"] for inp in run["inputs"]) for run in runs] == [["A", "B"], ["A"], []]
+    assert runs[0]["inputs"][0].keys() == {"id", "type", "source_path", "title", "content_hash"}
+
+
+@pytest.mark.asyncio
+async def test_runs_grouped_with_one_shared_assistant_each(repo):
+    a = repo.get_or_create_input("paper", "/a.pdf", "A", "content a")
+    b = repo.get_or_create_input("paper", "/b.pdf", "B", "content b")
+    run1 = repo.create_run("brief", "m1", [a])
+    run2 = repo.create_run("brief", "m1", [a, b])
+    run3 = repo.create_run("outline", "m1", [b], thinking_level="high")
+    run4 = repo.create_run("brief", "m2", [b])
+    run5 = repo.create_run("brief", "m2", [])
+
+    created = []
+    async with AsyncRunRepository(repo) as db:
+        await _resume_runs(_args(), db, _fake_assistant(created, fail_paths={"/b.pdf"}), Input, InputType)
+
+    groups = {(x.model, x.kwargs["thinking_level"], x.calls[0][0]): x for x in created}
+    assert set(groups) == {("m1", None, "brief"), ("m1", "high", "outline"), ("m2", None, "brief")}
+    # Input A is shared by runs 1 and 2 and processed once
+    assert groups[("m1", None, "brief")].calls[0][1] == [a, b]
+    assert all(x.kwargs["db"] is db and x.closed for x in created)
+    assert all(x.calls[0][2]["output_to_console"] is False for x in created)
+
+    status = {run_id: repo.get_run_details(run_id, include_content=False) for run_id in (run1, run2, run3, run4, run5)}
+    assert status[run1]["status"] == "success"
+    assert status[run2]["status"] == "failed"
+    assert "/b.pdf: boom" in status[run2]["error_message"]
+    assert status[run5]["error_message"] == "No inputs found for resume"
+
+
+@pytest.mark.asyncio
+async def test_models_resume_concurrently(repo):
+    a = repo.get_or_create_input("paper", "/a.pdf", "A", "content a")
+    for model in ("m1", "m2", "m3"):
+        repo.create_run("brief", model, [a])
+
+    created, started = [], []
+    release = asyncio.Event()
+    FakeAssistant = _fake_assistant(created, started=started, release=release)
+
+    async with AsyncRunRepository(repo) as db:
+        task = asyncio.create_task(_resume_runs(_args(), db, FakeAssistant, Input, InputType))
+        for _ in range(100):
+            if len(started) == 3:
+                break
+            await asyncio.sleep(0.01)
+        # All three models are in flight before any of them finishes
+        assert sorted(started) == ["m1", "m2", "m3"]
+        release.set()
+        await task
+
+    assert [run["status"] for run in repo.get_recent_runs()] == ["success"] * 3
+
+
+@pytest.mark.asyncio
+async def test_assistant_errors_fail_the_group(repo):
+    a = repo.get_or_create_input("paper", "/a.pdf", "A", "content a")
+    run_id = repo.create_run("brief", "retired-model", [a])
+
+    class Broken:
+        def __init__(self, model, **kwargs):
+            raise ValueError(f"Unknown model: {model}")
+
+    async with AsyncRunRepository(repo) as db:
+        await _resume_runs(_args(), db, Broken, Input, InputType)
+
+    run = repo.get_run_details(run_id, include_content=False)
+    assert run["status"] == "failed"
+    assert run["error_message"] == "Unknown model: retired-model"
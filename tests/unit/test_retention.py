@@ -0,0 +1,147 @@
+"""
+Unit tests for output retention: RunRepository.gc() and archive files
+(storage/archive.py).
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage.archive import ArchiveReader
+from editor_assistant.storage.export import export_history
+
+pytestmark = pytest.mark.unit
+
+BODY = "Archived summary text with several sentences. " * 40
+
+
+def _run(repo, days_ago, body=BODY, title="Paper"):
+    input_id = repo.get_or_create_input("paper", f"/{title}.pdf", title, f"content {title}")
+    run_id = repo.create_run("brief", "model-a", [input_id])
+    repo.add_output(run_id, "main", body)
+    repo.add_token_usage(run_id, 100, 50, 0.01, 0.02, 1.0)
+    repo.update_run_status(run_id, "success")
+    with repo.transaction() as conn:
+        conn.execute(
+            "UPDATE runs SET timestamp = datetime('now', ?) WHERE id = ?", (f"-{days_ago} days", run_id)
+        )
+    return run_id
+
+
+def test_new_database_uses_incremental_vacuum(repo):
+    assert repo._conn().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_gc_archives_old_outputs_and_keeps_metadata(repo):
+    old = _run(repo, 120, body=BODY + "old", title="Old")
+    recent = _run(repo, 10, body=BODY + "recent", title="Recent")
+
+    stats = repo.gc(keep_days=90)
+
+    assert stats["archived"] == 1
+    assert stats["archive_files"] == 1
+    assert stats["blobs_removed"] == 1
+    assert stats["archived_bytes"] == len((BODY + "old").encode())
+    assert len(list(repo.archive_dir.glob("*.zip"))) == 1
+
+    details = repo.get_run_details(old)
+    assert details["outputs"][0]["content"] == BODY + "old"
+    assert details["token_usage"]["input_tokens"] == 100
+    assert repo.get_run_details(recent)["outputs"][0]["content"] == BODY + "recent"
+
+    storage = repo.get_storage_stats()
+    assert storage["archived_outputs"] == 1
+    assert storage["inline_outputs"] == 0
+    # Freed pages were returned by the incremental vacuum
+    assert repo._conn().execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert repo.get_stats(days=365)["total_runs"] == 2
+
+
+def test_gc_is_idempotent(repo):
+    _run(repo, 120)
+    repo.gc(keep_days=90)
+
+    stats = repo.gc(keep_days=90)
+
+    assert stats["archived"] == 0
+    assert stats["archive_files"] == 0
+    assert len(list(repo.archive_dir.glob("*.zip"))) == 1
+
+
+def test_archived_outputs_leave_search_index(repo):
+    _run(repo, 120, body=BODY + " zebrafish", title="Old")
+    recent = _run(repo, 1, body=BODY + " zebrafish", title="Recent")
+
+    repo.gc(keep_days=90)
+
+    assert [r["id"] for r in repo.search("zebrafish")] == [recent]
+    # Index is still consistent after the contentless deletes
+    conn = repo._conn()
+    conn.execute("INSERT INTO outputs_fts(outputs_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_shared_blob_kept_while_recent_output_uses_it(repo):
+    old = _run(repo, 120, title="Old")
+    recent = _run(repo, 1, title="Recent")
+
+    stats = repo.gc(keep_days=90)
+
+    assert stats["blobs_removed"] == 0
+    assert repo.get_run_details(old)["outputs"][0]["content"] == BODY
+    assert repo.get_run_details(recent)["outputs"][0]["content"] == BODY
+
+
+def test_inline_outputs_are_archived(repo):
+    run_id = _run(repo, 120)
+    with repo.transaction() as conn:
+        conn.execute("INSERT INTO outputs (run_id, output_type, content) VALUES (?, 'bilingual', 'inline text')", (run_id,))
+
+    assert repo.gc(keep_days=90)["archived"] == 2
+    assert [o["content"] for o in repo.get_run_details(run_id)["outputs"]] == [BODY, "inline text"]
+
+
+def test_dry_run_and_zero_retention_change_nothing(repo):
+    run_id = _run(repo, 120)
+
+    assert repo.gc(keep_days=90, dry_run=True)["archived"] == 1
+    assert repo.gc(keep_days=0)["archived"] == 0
+    assert repo.get_storage_stats()["archived_outputs"] == 0
+    assert repo.get_run_details(run_id)["outputs"][0]["content"] == BODY
+
+
+def test_export_reads_archived_outputs(repo, temp_dir):
+    _run(repo, 120)
+    repo.gc(keep_days=90)
+
+    export_history(repo.db_path, temp_dir / "history.jsonl")
+
+    run = json.loads((temp_dir / "history.jsonl").read_text(encoding="utf-8"))
+    assert run["outputs"][0]["content"] == BODY
+
+
+def test_missing_archive_reads_as_none(repo):
+    run_id = _run(repo, 120)
+    repo.gc(keep_days=90)
+    for path in repo.archive_dir.glob("*.zip"):
+        path.unlink()
+
+    assert repo.get_run_details(run_id)["outputs"][0]["content"] is None
+    with ArchiveReader(repo.archive_dir) as archive:
+        assert archive.read("missing.zip/abc") is None
+
+
+def test_legacy_database_switches_to_incremental_vacuum(temp_dir):
+    db_path = temp_dir / "legacy.db"
+    RunRepository(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    conn.execute("VACUUM")
+    conn.close()
+
+    repo = RunRepository(db_path=db_path)
+    _run(repo, 120)
+    repo.gc(keep_days=90)
+
+    assert repo._conn().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,180 @@
+"""
+Unit tests for batch scheduling (scheduling.py): policy keys, input
+ordering, deadline specs, the pipeline's priority queue and the schedule
+of EditorAssistant.process_multiple.
+"""
+
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+from editor_assistant.cli import _batch_deadlines, _schedule_report
+from editor_assistant.data_models import Input, InputType, MDArticle, ProcessResult
+from editor_assistant.pipeline import Pipeline, Stage
+from editor_assistant.scheduling import (
+    estimate_source_tokens,
+    order_inputs,
+    parse_deadline_spec,
+    parse_duration,
+    schedule_key,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def papers(temp_dir):
+    """Three PDFs of different sizes, in name order: medium, large, small."""
+    sizes = {"a.pdf": 6_000, "b.pdf": 60_000, "c.pdf": 600}
+    paths = []
+    for name, size in sizes.items():
+        path = temp_dir / name
+        path.write_bytes(b"x" * size)
+        paths.append(path)
+    return paths
+
+
+# =============================================================================
+# Policies
+# =============================================================================
+
+def test_estimate_source_tokens(papers, temp_dir):
+    assert estimate_source_tokens(str(papers[0])) == 100  # 6000 bytes at 60 bytes/token
+    notes = temp_dir / "notes.md"
+    notes.write_text("x" * 700)
+    assert estimate_source_tokens(str(notes)) == 200
+    assert estimate_source_tokens("https://example.com/a") == estimate_source_tokens(str(temp_dir / "missing.pdf"))
+
+
+def test_order_inputs_by_policy(papers):
+    inputs = [Input(type=InputType.PAPER, path=str(p)) for p in papers]
+
+    def names(policy):
+        return [inp.path[-5:] for inp in order_inputs(inputs, policy)]
+
+    assert names("fifo") == ["a.pdf", "b.pdf", "c.pdf"]
+    assert names("sjf") == ["c.pdf", "a.pdf", "b.pdf"]
+    assert names("longest-first") == ["b.pdf", "a.pdf", "c.pdf"]
+
+    # edf: earliest deadline first, then inputs without one (smallest first)
+    inputs[1].deadline = 200.0
+    inputs[0].deadline = 100.0
+    assert names("edf") == ["a.pdf", "b.pdf", "c.pdf"]
+    inputs[0].deadline = None
+    assert names("edf") == ["b.pdf", "c.pdf", "a.pdf"]
+
+    with pytest.raises(ValueError, match="Unknown scheduling policy"):
+        schedule_key("random", 10)
+
+
+def test_parse_durations_and_deadline_specs():
+    assert parse_duration("90") == parse_duration("90s") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("1.5h") == 5400
+    assert parse_duration("1d") == 86400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+    assert parse_deadline_spec("urgent/*=30m") == ("urgent/*", 1800)
+    with pytest.raises(ValueError, match="GLOB=DURATION"):
+        parse_deadline_spec("30m")
+
+
+def test_batch_deadlines_first_match_wins(temp_dir):
+    files = [temp_dir / "urgent" / "a.pdf", temp_dir / "b-draft.pdf", temp_dir / "c.pdf"]
+    specs = [("urgent/*", 60.0), ("*-draft.pdf", 3600.0), ("*.pdf", 86400.0)]
+
+    deadlines = _batch_deadlines(files, temp_dir, specs[:2], start=1000.0)
+    assert deadlines == {files[0]: 1060.0, files[1]: 4600.0}
+    # First match wins, so catch-all globs go last
+    assert _batch_deadlines(files, temp_dir, specs, start=0.0)[files[0]] == 60.0
+    assert _batch_deadlines(files, temp_dir, None, start=0.0) == {}
+
+
+def test_schedule_report():
+    results = [
+        ProcessResult(source_path="a", success=True, finished_at=110.0, deadline=120.0),
+        ProcessResult(source_path="b", success=True, finished_at=130.0, deadline=120.0),
+        ProcessResult(source_path="c", success=False, finished_at=102.0),
+        ProcessResult(source_path="d"),
+    ]
+
+    assert dict(_schedule_report(results, start=100.0)) == {
+        "Time to First Result": "2.0s",
+        "Mean Completion Time": "14.0s",
+        "Missed Deadlines": "1 of 2",
+    }
+    assert _schedule_report(None, start=0.0) == []
+
+
+# =============================================================================
+# Pipeline priority
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_priority_stage_takes_lowest_key_first():
+    order = []
+    release = asyncio.Event()
+
+    async def produce(x):
+        return x
+
+    async def consume(x):
+        await release.wait()
+        order.append(x)
+        return x
+
+    pipeline = Pipeline([
+        Stage("produce", produce),
+        Stage("consume", consume, queue_size=10, priority=lambda x: x % 3),
+    ])
+    run = asyncio.create_task(pipeline.run(range(7)))
+    # The consumer holds the first item while the rest wait in its queue
+    while pipeline.queue_depths().get("consume", 0) < 6:
+        await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.wait_for(run, timeout=5)
+
+    # 0 was taken at once; then by key, equal keys in arrival order
+    assert order == [0, 3, 6, 1, 4, 2, 5]
+
+
+@pytest.mark.asyncio
+async def test_process_multiple_sjf_runs_short_documents_first():
+    from editor_assistant.main import EditorAssistant
+
+    sizes = {"https://example.com/long": 4000, "https://example.com/mid": 800, "https://example.com/short": 50}
+    llm_order = []
+    release = asyncio.Event()
+
+    def convert(path, type=InputType.PAPER):
+        return MDArticle(type=type, content="word " * sizes[path], title=path, source_path=path)
+
+    async def process_mds(articles, task, *args, **kwargs):
+        await release.wait()
+        llm_order.append(articles[0].source_path)
+        return True, 1
+
+    inputs = [Input(type=InputType.PAPER, path=path) for path in sizes]
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor") as MockProcessor:
+        MockConverter.return_value.convert_content.side_effect = convert
+        MockProcessor.return_value.process_mds = AsyncMock(side_effect=process_mds)
+        MockProcessor.return_value.register_run = AsyncMock(return_value=1)
+        MockProcessor.return_value.validate_articles.return_value = True
+
+        assistant = EditorAssistant("test-model", stream=False, use_conversion_cache=False, llm_concurrency=1)
+        with patch("editor_assistant.main.PIPELINE_CONVERT_CONCURRENCY", 1):
+            run = asyncio.create_task(assistant.process_multiple(inputs, "brief", schedule="sjf"))
+            await asyncio.sleep(0.2)  # All converted: one in the LLM slot, two waiting
+            release.set()
+            results = await asyncio.wait_for(run, timeout=5)
+
+    # URLs start in input order (same size guess); then the shorter article overtakes
+    assert llm_order == ["https://example.com/long", "https://example.com/short", "https://example.com/mid"]
+    # Results stay in input order, with the size estimate and completion time
+    assert [r.source_path for r in results] == list(sizes)
+    assert results[2].estimated_tokens < results[1].estimated_tokens < results[0].estimated_tokens
+    assert all(r.success and r.finished_at for r in results)
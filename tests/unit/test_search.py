@@ -0,0 +1,146 @@
+"""
+Unit tests for full-text history search (FTS5 index in storage/database.py,
+RunRepository.search).
+"""
+
+import sqlite3
+
+import pytest
+
+from editor_assistant.storage import RunRepository
+from editor_assistant.storage.database import (
+    SCHEMA_VERSION,
+    get_schema_version,
+    has_search_index,
+    rebuild_search_index,
+)
+from editor_assistant.storage.export import parse_since, parse_until
+from editor_assistant.storage.migrations import BASE_SCHEMA
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def repo(repo):
+    crispr = repo.get_or_create_input("paper", "/papers/crispr.pdf", "CRISPR base editing in wheat", "c1")
+    market = repo.get_or_create_input("news", "/news/markets.md", "Market report", "c2")
+
+    run = repo.create_run("brief", "model-a", [crispr])
+    repo.add_output(run, "main", "A brief on CRISPR base editors. CRISPR editing of wheat genomes is precise.")
+    run = repo.create_run("outline", "model-b", [market])
+    repo.add_output(run, "main", "Markets fell. One analyst mentioned a CRISPR startup in passing.")
+    run = repo.create_run("translate", "model-a", [market])
+    repo.add_output(run, "bilingual", "基因编辑技术在农业中的应用越来越广泛")
+    return repo
+
+
+def test_ranks_best_match_first_with_snippet(repo):
+    results = repo.search("CRISPR")
+
+    assert [r["id"] for r in results] == [1, 2]
+    assert "[CRISPR]" in results[0]["snippet"]
+    assert results[0]["input_titles"] == "CRISPR base editing in wheat"
+    assert results[0]["score"] <= results[1]["score"]
+
+
+def test_all_terms_must_match(repo):
+    results = repo.search("crispr wheat")
+    assert [r["id"] for r in results] == [1]
+
+
+def test_matches_source_path(repo):
+    results = repo.search("markets.md")
+    assert {r["id"] for r in results} == {2, 3}
+    assert all(r["field"] == "input" for r in results)
+
+
+def test_filters_by_task_model_and_date(repo):
+    assert [r["id"] for r in repo.search("CRISPR", task="outline")] == [2]
+    assert [r["id"] for r in repo.search("CRISPR", model="model-a")] == [1]
+
+    conn = repo._get_conn()
+    conn.execute("UPDATE runs SET timestamp = '2026-01-10 12:00:00' WHERE id = 1")
+    conn.execute("UPDATE runs SET timestamp = '2026-02-10 12:00:00' WHERE id = 2")
+    conn.commit()
+    conn.close()
+
+    january = repo.search("CRISPR", since=parse_since("2026-01-01"), until=parse_until("2026-01-31"))
+    assert [r["id"] for r in january] == [1]
+
+
+def test_cjk_substring_match(repo):
+    results = repo.search("基因编辑")
+    assert [r["id"] for r in results] == [3]
+    assert results[0]["field"] == "bilingual"
+    assert "[基因编辑]" in results[0]["snippet"]
+
+
+def test_new_outputs_are_indexed(repo):
+    run = repo.create_run("brief", "model-c", [])
+    repo.add_output(run, "main", "Notes on photosynthesis")
+    assert [r["id"] for r in repo.search("photosynthesis")] == [run]
+    assert "[photosynthesis]" in repo.search("photosynthesis")[0]["snippet"]
+
+
+def test_input_index_follows_updates(repo):
+    conn = repo._get_conn()
+    conn.execute("UPDATE inputs SET title = 'Soil microbiome survey' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    assert repo.search("wheat", task="brief")[0]["field"] == "main"
+    assert [r["id"] for r in repo.search("microbiome")] == [1]
+
+
+def test_rebuild_restores_index(repo):
+    conn = repo._get_conn()
+    conn.execute("INSERT INTO outputs_fts(outputs_fts) VALUES ('delete-all')")
+    conn.commit()
+    assert repo.search("基因编辑") == []
+
+    rebuild_search_index(conn)
+    conn.commit()
+    conn.close()
+    assert [r["id"] for r in repo.search("基因编辑")] == [3]
+
+
+def test_short_terms_fall_back_to_like(repo):
+    results = repo.search("of")
+    assert [r["id"] for r in results] == [1]
+    assert results[0]["score"] is None
+    assert "[of]" in results[0]["snippet"]
+
+
+def test_query_syntax_is_not_interpreted(repo):
+    # FTS5 operators and quotes are searched literally, not parsed
+    assert repo.search('CRISPR" OR "Market') == []
+    assert repo.search("NEAR(CRISPR") == []
+
+
+def test_search_by_title_uses_index(repo):
+    results = repo.search_by_title("base edit")
+    assert [r["id"] for r in results] == [1]
+
+
+def test_v1_database_is_upgraded_and_backfilled(temp_dir):
+    db_path = temp_dir / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(BASE_SCHEMA)
+    conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+    conn.execute(
+        "INSERT INTO inputs (type, source_path, title, content_hash) "
+        "VALUES ('paper', '/old.pdf', 'Legacy transformer survey', 'h')"
+    )
+    conn.execute("INSERT INTO runs (task, model, status) VALUES ('brief', 'm', 'success')")
+    conn.execute("INSERT INTO run_inputs (run_id, input_id) VALUES (1, 1)")
+    conn.execute("INSERT INTO outputs (run_id, output_type, content) VALUES (1, 'main', 'attention is all')")
+    conn.commit()
+    conn.close()
+
+    repo = RunRepository(db_path=db_path)
+
+    conn = repo._get_conn()
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert has_search_index(conn)
+    conn.close()
+    assert [r["id"] for r in repo.search("transformer")] == [1]
+    assert [r["id"] for r in repo.search("attention")] == [1]
@@ -11,6 +11,7 @@ import threading
 from editor_assistant.storage.database import (
     init_database,
     get_connection,
+    get_connection_manager,
     get_database_path,
     SCHEMA_VERSION,
 )
@@ -97,6 +98,74 @@ class TestDatabaseInitialization:
         conn.close()
         
         assert fk_enabled == 1
+    
+    def test_connection_pragmas(self, temp_dir):
+        """Connections should use WAL, synchronous=NORMAL and a busy timeout."""
+        db_path = temp_dir / "test.db"
+        init_database(db_path)
+        
+        conn = get_connection(db_path)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.close()
+        
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout > 0
+        assert cache_size < 0  # Sized in KiB
+
+
+class TestConnectionManager:
+    """Tests for per-thread pooled connections."""
+    
+    def test_same_thread_reuses_connection(self, temp_dir):
+        """Repeated calls on one thread should return the same connection."""
+        db_path = temp_dir / "test.db"
+        init_database(db_path)
+        manager = get_connection_manager(db_path)
+        
+        assert manager.connection() is manager.connection()
+        assert get_connection_manager(db_path) is manager
+    
+    def test_threads_get_separate_connections(self, temp_dir):
+        """Each thread should get its own connection."""
+        db_path = temp_dir / "test.db"
+        init_database(db_path)
+        manager = get_connection_manager(db_path)
+        
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(manager.connection()))
+        thread.start()
+        thread.join()
+        
+        assert seen[0] is not manager.connection()
+    
+    def test_transaction_rolls_back_on_error(self, temp_dir):
+        """A failing transaction should leave no partial writes."""
+        db_path = temp_dir / "test.db"
+        init_database(db_path)
+        manager = get_connection_manager(db_path)
+        
+        with pytest.raises(RuntimeError):
+            with manager.transaction() as conn:
+                conn.execute("INSERT INTO runs (task, model) VALUES ('brief', 'm')")
+                raise RuntimeError("boom")
+        
+        count = manager.connection().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        assert count == 0
+    
+    def test_close_all_reconnects_on_next_use(self, temp_dir):
+        """Closed pooled connections should be replaced transparently."""
+        db_path = temp_dir / "test.db"
+        repo = RunRepository(db_path=db_path)
+        first = repo._conn()
+        
+        get_connection_manager(db_path).close_all()
+        
+        assert repo._conn() is not first
+        assert repo.get_recent_runs() == []
 
 
 class TestRunRepository:
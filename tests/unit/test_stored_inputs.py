@@ -0,0 +1,147 @@
+"""
+Unit tests for converted markdown stored with inputs
+(RunRepository.get_or_create_input / find_input_article and
+EditorAssistant loading stored articles instead of converting).
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from editor_assistant.data_models import Input, InputType, MDArticle
+from editor_assistant.storage import AsyncRunRepository
+from editor_assistant.utils import hash_file
+
+pytestmark = pytest.mark.unit
+
+URL = "https://example.com/news/story"
+
+
+@pytest.fixture
+def pdf_file(temp_dir) -> Path:
+    path = temp_dir / "paper.pdf"
+    path.write_bytes(b"%PDF-fake original")
+    return path
+
+
+def _converted(path, type=InputType.PAPER):
+    return MDArticle(type=type, content=f"converted {Path(path).name} " * 50,
+                     title="Converted Title", source_path=str(path))
+
+
+def test_article_round_trips_through_blob_storage(repo, pdf_file):
+    content = "# Paper\n\n" + "body text " * 500
+    input_id = repo.get_or_create_input("paper", str(pdf_file), "Paper", content, source_hash="abc")
+
+    article = repo.get_input_article(input_id)
+    assert article == {"id": input_id, "type": "paper", "source_path": str(pdf_file),
+                       "title": "Paper", "content": content}
+    assert repo.find_input_article(source_hash="abc")["id"] == input_id
+    assert repo.find_input_article(source_hash="other") is None
+    assert repo.find_input_article() is None
+    # Stored compressed
+    assert repo.get_storage_stats()["stored_bytes"] < len(content)
+
+
+def test_find_by_url_returns_latest_article(repo):
+    repo.get_or_create_input("news", URL, "Old", "old version of the story")
+    latest = repo.get_or_create_input("news", URL, "New", "updated version of the story")
+
+    assert repo.find_input_article(source_path=URL)["id"] == latest
+    assert repo.find_input_article(source_path=URL)["content"] == "updated version of the story"
+
+
+def test_existing_input_is_backfilled(repo):
+    with repo.transaction() as conn:
+        conn.execute(
+            "INSERT INTO inputs (type, source_path, title, content_hash) VALUES ('paper', '/p.pdf', 'P', ?)",
+            (repo._hash_content("legacy content"),)
+        )
+    assert repo.get_input_article(1) is None
+
+    assert repo.get_or_create_input("paper", "/p.pdf", "P", "legacy content", source_hash="h1") == 1
+    assert repo.get_input_article(1)["content"] == "legacy content"
+    # First values are kept
+    repo.get_or_create_input("paper", "/copy.pdf", "P", "legacy content", source_hash="h2")
+    assert repo.find_input_article(source_hash="h1")["id"] == 1
+    assert repo.find_input_article(source_hash="h2") is None
+
+
+def test_compact_keeps_input_articles(repo):
+    input_id = repo.get_or_create_input("paper", "/p.pdf", "P", "article text " * 100)
+
+    assert repo.compact(vacuum=False)["blobs_removed"] == 0
+    assert repo.get_input_article(input_id)["content"] == "article text " * 100
+
+
+@pytest.mark.asyncio
+async def test_editor_assistant_loads_stored_article(repo, pdf_file):
+    from editor_assistant.main import EditorAssistant
+
+    db = AsyncRunRepository(repo)
+
+    def assistant(**kwargs):
+        instance = EditorAssistant("test-model", stream=False, use_conversion_cache=False, **kwargs)
+        instance.md_processor.db = db
+        return instance
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor"):
+        convert = MockConverter.return_value.convert_content
+        convert.side_effect = _converted
+        source = Input(type=InputType.PAPER, path=str(pdf_file))
+
+        first = assistant()
+        article, err = await first._process_input_to_article(source)
+        assert err is None and convert.call_count == 1
+        assert article.source_hash == hash_file(str(pdf_file))
+        input_id = repo.get_or_create_input("paper", article.source_path, article.title,
+                                            article.content, source_hash=article.source_hash)
+
+        # Same bytes: loaded from storage
+        second = assistant()
+        stored, err = await second._process_input_to_article(source)
+        assert err is None and convert.call_count == 1
+        assert (stored.title, stored.content) == (article.title, article.content)
+        assert stored.output_path == pdf_file
+
+        # Forced
+        forced = assistant(reconvert=True)
+        await forced._process_input_to_article(source)
+        assert convert.call_count == 2
+
+        # Resume: by input id, even when the source is gone
+        pdf_file.unlink()
+        resumed, err = await second._process_input_to_article(
+            Input(type=InputType.PAPER, path=str(pdf_file), input_id=input_id)
+        )
+        assert err is None and resumed.content == article.content
+        assert convert.call_count == 2
+
+        # Edited file: converted again
+        pdf_file.write_bytes(b"%PDF-fake edited")
+        await second._process_input_to_article(source)
+        assert convert.call_count == 3
+    await db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_editor_assistant_loads_stored_url(repo):
+    from editor_assistant.main import EditorAssistant
+
+    repo.get_or_create_input("news", URL, "Story", "stored story text")
+
+    with patch("editor_assistant.main.MarkdownConverter") as MockConverter, \
+         patch("editor_assistant.main.MDProcessor"):
+        assistant = EditorAssistant("test-model", stream=False)
+        assistant.md_processor.db = AsyncRunRepository(repo)
+        try:
+            article, err = await assistant._process_input_to_article(Input(type=InputType.NEWS, path=URL))
+        finally:
+            await assistant.md_processor.db.aclose()
+
+    assert err is None
+    assert article.content == "stored story text"
+    assert article.source_hash is None
+    MockConverter.return_value.convert_content.assert_not_called()
@@ -0,0 +1,174 @@
+"""
+Unit tests for watch mode (watcher.py): stable-file detection and the
+persistent pipeline with skipping, stats and draining on stop.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from editor_assistant.tasks import TaskRegistry
+from editor_assistant.utils import hash_file
+from editor_assistant.watcher import FolderWatcher, Watcher
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def inbox(temp_dir):
+    folder = temp_dir / "inbox"
+    folder.mkdir()
+    return folder
+
+
+def _drop(folder, name, content, age=60.0):
+    """Write a file last modified `age` seconds ago."""
+    path = folder / name
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+# =============================================================================
+# Stable files
+# =============================================================================
+
+def test_folder_watcher_waits_for_files_to_settle(inbox):
+    old = _drop(inbox, "old.pdf", "old paper")
+    fresh = _drop(inbox, "fresh.pdf", "partial", age=0)
+    _drop(inbox, "empty.pdf", "")
+    _drop(inbox, "notes.txt", "not a pdf")
+    watcher = FolderWatcher(inbox, ["*.pdf"], settle_seconds=5)
+    now = time.time()
+
+    # Files that were already there are ready at once
+    assert watcher.poll(now) == [old]
+    assert watcher.poll(now + 1) == []
+    # Still being written: the settle window restarts
+    fresh.write_text("partial, more")
+    os.utime(fresh, (now + 3, now + 3))
+    assert watcher.poll(now + 4) == []
+    assert watcher.poll(now + 7) == []
+    assert watcher.poll(now + 8) == [fresh]
+    assert watcher.poll(now + 20) == []
+
+
+def test_folder_watcher_reports_changed_files_again(inbox):
+    paper = _drop(inbox, "paper.pdf", "v1")
+    watcher = FolderWatcher(inbox, ["*.pdf"], settle_seconds=5)
+    now = time.time()
+    assert watcher.poll(now) == [paper]
+
+    paper.write_text("v2, revised")
+    os.utime(paper, (now + 1, now + 1))
+    assert watcher.poll(now + 2) == []
+    assert watcher.poll(now + 6) == [paper]
+
+    # A removed and re-added file is new again
+    paper.unlink()
+    assert watcher.poll(now + 7) == []
+    _drop(inbox, "paper.pdf", "v2, revised")
+    assert watcher.poll(now + 8) == [paper]
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+class FakeAssistant:
+    """Consumes the input stream like process_multiple(): items finish after a delay."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.inputs = []
+
+    async def process_multiple(self, inputs, task, output_to_console=True, save_files=False, done_callback=None):
+        async def one(inp):
+            await asyncio.sleep(self.delay)
+            done_callback(inp.path, not inp.path.endswith("bad.pdf"))
+
+        running = []
+        async for inp in inputs:
+            self.inputs.append(inp)
+            running.append(asyncio.create_task(one(inp)))
+        # Drain: finish what was taken before the stream ended
+        await asyncio.gather(*running)
+
+
+async def _run_until(watcher, condition, timeout=5.0):
+    run = asyncio.create_task(watcher.run())
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    watcher.stop()
+    return await asyncio.wait_for(run, timeout)
+
+
+@pytest.mark.asyncio
+async def test_watcher_processes_new_files_and_drains_on_stop(repo, inbox):
+    a = _drop(inbox, "a.pdf", "alpha")
+    _drop(inbox, "copy-of-a.pdf", "alpha")
+    _drop(inbox, "bad.pdf", "broken")
+    assistant = FakeAssistant(delay=0.2)
+    watcher = Watcher(assistant, FolderWatcher(inbox, ["*.pdf"], settle_seconds=1), "brief", "m1",
+                      repository=repo, poll_interval=0.01)
+
+    # Stop as soon as the files are taken: in-flight files still finish
+    stats = await _run_until(watcher, lambda: len(assistant.inputs) == 2)
+
+    assert sorted(os.path.basename(i.path) for i in assistant.inputs) == ["a.pdf", "bad.pdf"]
+    assert {i.source_hash for i in assistant.inputs} == {hash_file(str(a)), hash_file(str(inbox / "bad.pdf"))}
+    assert stats["done"] == 1 and stats["failed"] == 1 and stats["skipped"] == 1
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert stats["per_minute"] > 0
+
+
+@pytest.mark.asyncio
+async def test_watcher_skips_done_files_unless_forced(repo, inbox):
+    paper = _drop(inbox, "paper.pdf", "alpha")
+    input_id = repo.get_or_create_input("paper", str(paper), "paper", "article", source_hash=hash_file(str(paper)))
+    version = TaskRegistry.get("brief")().prompt_version()
+    repo.update_run_status(repo.create_run("brief", "m1", [input_id], prompt_version=version), "success")
+
+    assistant = FakeAssistant(delay=0)
+    watcher = Watcher(assistant, FolderWatcher(inbox, ["*.pdf"]), "brief", "m1",
+                      repository=repo, poll_interval=0.01)
+    stats = await _run_until(watcher, lambda: watcher.counts["skipped"] == 1)
+    assert assistant.inputs == [] and stats["detected"] == 1
+
+    forced = Watcher(assistant, FolderWatcher(inbox, ["*.pdf"]), "brief", "m1",
+                     repository=repo, force=True, poll_interval=0.01)
+    stats = await _run_until(forced, lambda: forced.counts["done"] == 1)
+    assert [i.path for i in assistant.inputs] == [str(paper)]
+
+
+def test_watcher_queues_readable_files_when_one_disappears(repo, inbox):
+    a = _drop(inbox, "a.md", "alpha")
+    b = _drop(inbox, "b.md", "beta")
+    folder = FolderWatcher(inbox, ["*.md"])
+    watcher = Watcher(FakeAssistant(), folder, "brief", "m1", repository=repo)
+    ready = folder.poll()
+    assert sorted(ready) == [a, b]
+
+    # Removed between the poll and hashing: only that file is skipped
+    b.unlink()
+    watcher._queue(ready, *watcher._lookup(ready))
+
+    assert [path for path, _ in watcher._backlog] == [a]
+    assert watcher.counts["detected"] == 1
+    assert folder.poll() == []
+
+
+@pytest.mark.asyncio
+async def test_watcher_reports_status(repo, inbox):
+    _drop(inbox, "a.pdf", "alpha")
+    reports = []
+    watcher = Watcher(FakeAssistant(delay=0), FolderWatcher(inbox, ["*.pdf"]), "brief", "m1",
+                      repository=repo, poll_interval=0.01, status_interval=0.02, on_status=reports.append)
+
+    await _run_until(watcher, lambda: len(reports) >= 2)
+
+    assert {"queue_depth", "waiting", "in_flight", "done", "per_minute"} <= set(reports[-1])